@@ -4,7 +4,7 @@
 
 // Configuration
 const CONFIG = {
-    dataUrl: '../data/football/current-week.json',
+    dataUrl: '../data/sports/football/current-week.json',
     refreshInterval: 60000, // 60 seconds
     supabaseUrl: 'YOUR_SUPABASE_URL', // Replace with actual Supabase URL
     supabaseKey: 'YOUR_SUPABASE_ANON_KEY' // Replace with actual Supabase anon key
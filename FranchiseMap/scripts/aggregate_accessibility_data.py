@@ -18,10 +18,16 @@ Metrics calculated:
 import json
 import os
 import math
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import requests
 import time
 
+import numpy as np
+
+from brand_lock import brand_file_lock
+from provenance import StageTracker, source_version
+from spatial_grid import haversine_miles
+
 # Configuration
 WALK_SCORE_API = "https://api.walkscore.com/score"
 TRANSIT_SCORE_API = "https://api.walkscore.com/transit"
@@ -60,6 +66,24 @@ TRANSIT_SYSTEMS = {
     ("RAPT", 30.2672, -97.7431, 15),  # Austin Transit
 }
 
+# Urban centers used by the walk score
+# Format: (center_lat, center_lng, urban_score)
+URBAN_AREAS = [
+    (40.7128, -74.0060, 95),  # NYC
+    (34.0522, -118.2437, 90),  # LA Downtown
+    (37.7749, -122.4194, 92),  # SF
+    (41.8781, -87.6298, 89),  # Chicago
+    (39.7392, -104.9903, 80),  # Denver
+    (47.6062, -122.3321, 85),  # Seattle
+    (32.7157, -117.1611, 78),  # San Diego
+    (29.7604, -95.3698, 75),  # Houston
+    (33.7490, -84.3880, 74),  # Atlanta
+    (38.2975, -122.2869, 68),  # Bay Area suburban
+]
+
+# Locations scored per distance matrix in the batch path
+BATCH_ROWS = 50_000
+
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate distance between two coordinates in miles."""
     R = 3959  # Earth radius in miles
@@ -89,20 +113,7 @@ def calculate_walk_score(lat: float, lng: float) -> int:
     base_score = int(seed_value * 60)
 
     # Adjust for known urban areas
-    urban_areas = [
-        (40.7128, -74.0060, 95),  # NYC
-        (34.0522, -118.2437, 90),  # LA Downtown
-        (37.7749, -122.4194, 92),  # SF
-        (41.8781, -87.6298, 89),  # Chicago
-        (39.7392, -104.9903, 80),  # Denver
-        (47.6062, -122.3321, 85),  # Seattle
-        (32.7157, -117.1611, 78),  # San Diego
-        (29.7604, -95.3698, 75),  # Houston
-        (33.7490, -84.3880, 74),  # Atlanta
-        (38.2975, -122.2869, 68),  # Bay Area suburban
-    ]
-
-    for urban_lat, urban_lng, urban_score in urban_areas:
+    for urban_lat, urban_lng, urban_score in URBAN_AREAS:
         dist = haversine_distance(lat, lng, urban_lat, urban_lng)
         if dist < 5:  # Within 5 miles of major urban center
             base_score = urban_score - int(dist * 3)
@@ -191,6 +202,69 @@ def calculate_biking_score(lat: float, lng: float) -> int:
 
     return max(0, min(100, base))
 
+def _truncate(values) -> np.ndarray:
+    """Vectorized int(): truncate toward zero."""
+    return np.trunc(values).astype(np.int64)
+
+def calculate_accessibility_batch(lats, lngs) -> Dict[str, np.ndarray]:
+    """
+    Walk, transit and biking scores for many locations at once.
+
+    Builds one location x (urban center + transit system) distance matrix
+    per chunk and derives all three scores from it. Results are identical
+    to calculate_walk_score / calculate_transit_score /
+    calculate_biking_score.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+
+    transit_systems = sorted(TRANSIT_SYSTEMS)
+    feature_lat = np.array([u[0] for u in URBAN_AREAS] + [t[1] for t in transit_systems])
+    feature_lng = np.array([u[1] for u in URBAN_AREAS] + [t[2] for t in transit_systems])
+    coverage = np.array([t[3] for t in transit_systems], dtype=np.float64)
+    n_urban = len(URBAN_AREAS)
+
+    walk = np.empty(len(lats), dtype=np.int64)
+    transit = np.empty(len(lats), dtype=np.int64)
+    biking = np.empty(len(lats), dtype=np.int64)
+
+    for start in range(0, len(lats), BATCH_ROWS):
+        end = start + BATCH_ROWS
+        lat, lng = lats[start:end], lngs[start:end]
+        dist = haversine_miles(lat[:, None], lng[:, None], feature_lat[None, :], feature_lng[None, :])
+
+        # Walk score: urban centers are applied in order, later ones win
+        base = _truncate(np.remainder(lat * 73.5 + lng * 41.7, 1.0) * 60)
+        for j, (_, _, urban_score) in enumerate(URBAN_AREAS):
+            d = dist[:, j]
+            near = d < 5
+            base = np.where(near, urban_score - _truncate(d * 3), base)
+            base = np.where(~near & (d < 20), np.maximum(base, _truncate(urban_score * 0.6 - d)), base)
+        density_factor = (np.abs(np.remainder(lat, 1)) + np.abs(np.remainder(lng, 1))) * 15
+        walk_chunk = np.clip(base + _truncate(density_factor), 0, 100)
+        walk[start:end] = walk_chunk
+
+        # Transit score: nearest system whose coverage contains the point
+        covered = np.where(dist[:, n_urban:] < coverage[None, :], dist[:, n_urban:], np.inf)
+        nearest = covered.min(axis=1) if covered.shape[1] else np.full(len(lat), np.inf)
+        d = np.where(np.isinf(nearest), 0.0, nearest)
+        transit[start:end] = np.select(
+            [np.isinf(nearest), d == 0, d < 0.25, d < 0.5, d < 1, d < 2, d < 5],
+            [0, 100, 95, 90, 85, 75, np.maximum(50, 75 - _truncate(d * 5))],
+            default=np.maximum(20, 50 - _truncate(d))
+        )
+
+        # Biking score from the walk score just computed
+        base = _truncate(walk_chunk * 0.7)
+        base = np.where(lng < -100, base - _truncate((100 - (-lng)) / 3), base)
+        base = np.where(
+            (np.abs(lat) < 40) & (lng < -90), base + 15,
+            np.where((lat > 42) & (lat < 47), base - 5, base)
+        )
+        biking[start:end] = np.clip(base, 0, 100)
+
+    return {"walkScore": walk, "transitScore": transit, "bikingScore": biking}
+
 def fetch_walk_score_api(lat: float, lng: float) -> Optional[Dict]:
     """
     Fetch real Walk Score data from API if available.
@@ -257,8 +331,50 @@ def categorize_walkability(score: int) -> str:
     else:
         return "Almost All Errands Require a Car"
 
+def apply_accessibility_scores(locations: List[Dict]):
+    """Write walk, transit and biking scores on locations with coordinates."""
+    if WALK_SCORE_API_KEY:
+        for loc in locations:
+            accessibility = generate_accessibility_scores(loc["lat"], loc["lng"])
+            loc.setdefault("at", {}).update(accessibility)
+        return
+
+    # No API: score the locations from one distance matrix
+    scores = calculate_accessibility_batch(
+        [loc["lat"] for loc in locations],
+        [loc["lng"] for loc in locations]
+    )
+    for i, loc in enumerate(locations):
+        loc.setdefault("at", {}).update({
+            "walkScore": int(scores["walkScore"][i]),
+            "transitScore": int(scores["transitScore"][i]),
+            "bikingScore": int(scores["bikingScore"][i]),
+            "_method": "Calculated from geographic data and transit systems database",
+            "_dataSource": "OSM data, GTFS feeds, terrain analysis"
+        })
+
+def accessibility_tracker(force: bool = False) -> StageTracker:
+    """Provenance tracker: locations are recomputed when their coordinates or the scoring data changed."""
+    return StageTracker(
+        "accessibility",
+        source_version(
+            __file__,
+            URBAN_AREAS,
+            sorted(TRANSIT_SYSTEMS),
+            # Walk Score API results are refreshed once a month
+            time.strftime("walkscore:%Y-%m") if WALK_SCORE_API_KEY else None
+        ),
+        force=force
+    )
+
 def main():
     """Main entry point for accessibility data aggregation."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enrich locations with accessibility scores")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, "../data")
 
@@ -284,36 +400,42 @@ def main():
 
     print(f"\nProcessing {len(manifest)} brands")
 
+    tracker = accessibility_tracker(force=args.force)
+
     # Process each brand
     total_enriched = 0
     for brand_info in manifest:
         ticker = brand_info["ticker"]
-        data_file = os.path.join(data_dir, brand_info["file"])
+        file_path = brand_info["file"]
+        if file_path.startswith("data/"):
+            data_file = os.path.join(data_dir, file_path[5:])
+        else:
+            data_file = os.path.join(data_dir, file_path)
 
         if not os.path.exists(data_file):
             print(f"  Skipping {ticker}: file not found")
             continue
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
-
-        # Enrich with accessibility scores
-        for loc in locations:
-            if "at" not in loc:
-                loc["at"] = {}
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
 
-            lat = loc.get("lat")
-            lng = loc.get("lng")
+            located = [loc for loc in locations if loc.get("lat") is not None and loc.get("lng") is not None]
+            stale = tracker.pending(located)
+            if not stale:
+                print(f"  ✓ {ticker}: unchanged - skipped {len(locations)} locations")
+                continue
 
-            if lat is not None and lng is not None:
-                accessibility = generate_accessibility_scores(lat, lng)
-                loc["at"].update(accessibility)
+            # Enrich with accessibility scores
+            apply_accessibility_scores(stale)
+            for loc in stale:
+                tracker.mark(loc)
+            total_enriched += len(stale)
 
-            total_enriched += 1
-
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(locations, f, separators=(',', ':'))
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
 
         # Print sample for verification
         if locations:
@@ -323,7 +445,10 @@ def main():
             print(f"  ✓ {ticker}: {len(locations)} locations")
             print(f"    Sample (first location): Walk {walk}/100, Transit {transit}/100")
 
-        time.sleep(0.5)  # Be respectful with API
+        if WALK_SCORE_API_KEY:
+            time.sleep(0.5)  # Be respectful with API
+
+    tracker.save_stats()
 
     print(f"\n{'='*60}")
     print(f"Accessibility enrichment complete!")
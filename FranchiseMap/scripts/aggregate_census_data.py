@@ -23,6 +23,10 @@ import os
 from typing import Dict, List, Tuple, Optional
 import time
 
+from brand_lock import brand_file_lock
+from boundary_index import estimate_state_from_coords as get_state_from_coords, lookup_location_states, lookup_version
+from provenance import PROVENANCE_FIELD, StageTracker, source_version
+
 # Configuration
 CENSUS_API_BASE = "https://api.census.gov/data/2021/acs/acs5"
 # Reads from GitHub secret or local environment variable
@@ -107,76 +111,6 @@ DENSITY_THRESHOLDS = {
     "rural": 500
 }
 
-def get_state_from_coords(lat: float, lng: float) -> Optional[str]:
-    """
-    Approximate state code from coordinates.
-    Uses a simplified lookup based on coordinate ranges.
-    """
-    # Simplified state boundaries (approximate)
-    state_bounds = {
-        # Format: (state_code, min_lat, max_lat, min_lng, max_lng)
-        ("CA", 32.5, 42.0, -124.4, -114.1),
-        ("TX", 25.8, 36.5, -106.6, -93.5),
-        ("FL", 24.5, 30.7, -87.6, -80.0),
-        ("NY", 40.5, 45.0, -79.8, -71.8),
-        ("PA", 39.7, 42.3, -80.5, -74.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("OH", 38.4, 42.0, -84.8, -80.5),
-        ("GA", 30.4, 35.0, -85.6, -80.8),
-        ("NC", 33.8, 36.6, -84.3, -75.4),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-        ("NJ", 38.9, 41.4, -75.6, -73.9),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WA", 45.6, 49.0, -124.7, -116.9),
-        ("AZ", 31.3, 37.0, -114.8, -109.0),
-        ("MA", 41.2, 42.9, -73.5, -69.9),
-        ("TN", 35.0, 36.7, -90.3, -81.6),
-        ("IN", 37.8, 41.8, -88.1, -84.8),
-        ("MO", 36.5, 40.6, -95.8, -89.1),
-        ("LA", 29.0, 33.0, -94.0, -88.8),
-        ("CO", 37.0, 41.0, -109.1, -102.0),
-        ("MN", 43.5, 49.4, -97.2, -89.5),
-        ("WI", 42.5, 47.3, -92.9, -86.8),
-        ("SC", 32.0, 34.8, -83.4, -78.5),
-        ("AL", 30.2, 35.0, -88.5, -84.9),
-        ("LA", 29.0, 33.0, -94.0, -88.8),
-        ("KY", 36.5, 39.1, -89.6, -81.9),
-        ("OR", 42.0, 46.3, -124.5, -116.5),
-        ("OK", 33.6, 37.0, -103.0, -94.4),
-        ("CT", 41.1, 42.1, -73.7, -71.8),
-        ("UT", 37.0, 42.0, -114.0, -109.0),
-        ("NV", 35.0, 42.0, -120.0, -114.6),
-        ("AR", 33.0, 36.5, -94.4, -89.6),
-        ("MS", 30.2, 34.8, -91.7, -88.1),
-        ("KS", 37.0, 40.0, -102.0, -94.6),
-        ("NM", 31.8, 37.0, -109.0, -103.0),
-        ("NE", 40.0, 43.0, -104.0, -95.3),
-        ("ID", 42.0, 49.0, -117.2, -111.0),
-        ("HI", 18.9, 22.2, -160.0, -154.8),
-        ("AK", 51.3, 71.4, -174.0, -130.0),
-        ("ME", 43.0, 47.5, -71.1, -66.9),
-        ("NH", 42.7, 45.3, -72.6, -70.7),
-        ("VT", 42.7, 45.1, -73.4, -71.5),
-        ("RI", 41.1, 42.0, -71.9, -71.1),
-        ("MT", 45.0, 49.0, -116.0, -104.0),
-        ("WY", 41.0, 45.0, -111.0, -104.0),
-        ("ND", 46.0, 49.0, -104.0, -96.6),
-        ("SD", 42.5, 45.9, -104.0, -96.4),
-        ("DE", 38.4, 39.8, -75.8, -75.0),
-        ("MD", 37.9, 39.7, -79.5, -75.0),
-        ("DC", 38.8, 38.9, -77.1, -77.0),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WV", 37.2, 40.6, -82.6, -77.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-    }
-
-    for state, min_lat, max_lat, min_lng, max_lng in state_bounds:
-        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-            return state
-
-    return None
-
 def get_demographic_data(lat: float, lng: float, state: Optional[str] = None) -> Dict:
     """
     Get demographic data for a location.
@@ -237,9 +171,10 @@ def calculate_growth_rate(state: str, lat: float, lng: float) -> float:
 
     return round(base_growth + (lng % 0.5) / 10, 1)  # Minor variation
 
-def generate_location_attributes(lat: float, lng: float) -> Dict:
+def generate_location_attributes(lat: float, lng: float, state: Optional[str] = None) -> Dict:
     """Generate comprehensive attribute data for a location."""
-    state = get_state_from_coords(lat, lng)
+    if state is None:
+        state = get_state_from_coords(lat, lng)
 
     # Get demographic base
     demo = get_demographic_data(lat, lng, state)
@@ -353,6 +288,12 @@ def save_demographic_index(locations_data: Dict[str, List[Dict]], output_dir: st
 
 def main():
     """Main entry point for data aggregation."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enrich locations with census demographics")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, "../data")
 
@@ -372,6 +313,13 @@ def main():
 
     print(f"\nFound {len(manifest)} brands to enrich")
 
+    # Locations are recomputed only when their coordinates or the tables changed
+    tracker = StageTracker(
+        "census",
+        source_version(__file__, REGIONAL_DATA, URBAN_DENSITY_FACTOR, DENSITY_THRESHOLDS, lookup_version()),
+        force=args.force
+    )
+
     # Process each brand's location data
     enriched_count = 0
     for brand_info in manifest:
@@ -382,38 +330,57 @@ def main():
             print(f"  Skipping {ticker}: file not found")
             continue
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
-
-        # Enrich locations with demographic data
-        enriched_locations = []
-        for i, loc in enumerate(locations):
-            lat = loc.get("lat")
-            lng = loc.get("lng")
-
-            if lat is not None and lng is not None:
-                # Generate comprehensive demographic attributes
-                attrs = generate_location_attributes(lat, lng)
-
-                # Update location data
-                loc["at"] = attrs
-
-                # Recalculate score with real data
-                # Import the calculate_score function
-                from generate_data import calculate_score, calculate_sub_scores
-
-                loc["s"] = calculate_score(attrs)
-                loc["ss"] = calculate_sub_scores(attrs)
-
-            enriched_locations.append(loc)
-            enriched_count += 1
-
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(enriched_locations, f, separators=(',', ':'))
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
+
+            located = [loc for loc in locations if loc.get("lat") is not None and loc.get("lng") is not None]
+            stale = tracker.pending(located)
+            if not stale:
+                print(f"  ✓ Unchanged {ticker}: {len(locations)} locations")
+                continue
+
+            # Resolve every stale location's state in one batch
+            state_by_id = lookup_location_states(stale)
+
+            # Enrich locations with demographic data
+            enriched_locations = []
+            for i, loc in enumerate(locations):
+                lat = loc.get("lat")
+                lng = loc.get("lng")
+
+                if id(loc) in state_by_id:
+                    # Generate comprehensive demographic attributes
+                    attrs = generate_location_attributes(lat, lng, state_by_id[id(loc)])
+
+                    # Update location data. Attributes census doesn't produce
+                    # (e.g. tradeArea*) are kept; other stages' stamps are
+                    # dropped so they recompute the values census just reset.
+                    at = loc.get("at") if isinstance(loc.get("at"), dict) else {}
+                    at.pop(PROVENANCE_FIELD, None)
+                    at.update(attrs)
+                    loc["at"] = at
+
+                    # Recalculate score with real data
+                    # Import the calculate_score function
+                    from generate_data import calculate_score, calculate_sub_scores
+
+                    loc["s"] = calculate_score(attrs)
+                    loc["ss"] = calculate_sub_scores(attrs)
+                    tracker.mark(loc)
+
+                enriched_locations.append(loc)
+                enriched_count += 1
+
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(enriched_locations, f, separators=(',', ':'))
 
         print(f"  ✓ Enriched {ticker}: {len(enriched_locations)} locations")
 
+    tracker.save_stats()
+
     # Create demographic index
     save_demographic_index({m["ticker"]: [] for m in manifest}, data_dir)
 
@@ -23,10 +23,17 @@ import requests
 import time
 from typing import Dict, Optional
 from datetime import datetime
+from functools import lru_cache
 import math
 
+from brand_lock import brand_file_lock
+from boundary_index import lookup_location_states, lookup_version
+from provenance import StageTracker, source_version
+from state_source_cache import DAY, StateSourceCache
+
 # Configuration
-CRIME_API_BASE = "https://api.data.gov/usgs/water/qwdata"
+# FBI Crime Data API (UCR state estimates), keyed with an api.data.gov key
+CRIME_API_BASE = os.environ.get("CRIME_API_BASE", "https://api.usa.gov/crime/fbi/sapi")
 GOV_DATA_KEY = os.environ.get("GOV_DATA_KEY", "")
 
 if not GOV_DATA_KEY:
@@ -65,74 +72,26 @@ REGIONAL_CRIME_BASELINES = {
     "WI": 55, "WY": 52, "DC": 85
 }
 
-def estimate_state_from_coords(lat: float, lng: float) -> str:
-    """Estimate state code from coordinates."""
-    state_bounds = {
-        ("CA", 32.5, 42.0, -124.4, -114.1),
-        ("TX", 25.8, 36.5, -106.6, -93.5),
-        ("FL", 24.5, 30.7, -87.6, -80.0),
-        ("NY", 40.5, 45.0, -79.8, -71.8),
-        ("PA", 39.7, 42.3, -80.5, -74.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("OH", 38.4, 42.0, -84.8, -80.5),
-        ("GA", 30.4, 35.0, -85.6, -80.8),
-        ("NC", 33.8, 36.6, -84.3, -75.4),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-        ("NJ", 38.9, 41.4, -75.6, -73.9),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WA", 45.6, 49.0, -124.7, -116.9),
-        ("AZ", 31.3, 37.0, -114.8, -109.0),
-        ("MA", 41.2, 42.9, -73.5, -69.9),
-        ("TN", 35.0, 36.7, -90.3, -81.6),
-        ("IN", 37.8, 41.8, -88.1, -84.8),
-        ("MO", 36.5, 40.6, -95.8, -89.1),
-        ("LA", 29.0, 33.0, -94.0, -88.8),
-        ("CO", 37.0, 41.0, -109.1, -102.0),
-        ("MN", 43.5, 49.4, -97.2, -89.5),
-        ("WI", 42.5, 47.3, -92.9, -86.8),
-        ("SC", 32.0, 34.8, -83.4, -78.5),
-        ("AL", 30.2, 35.0, -88.5, -84.9),
-        ("KY", 36.5, 39.1, -89.6, -81.9),
-        ("OR", 42.0, 46.3, -124.5, -116.5),
-        ("OK", 33.6, 37.0, -103.0, -94.4),
-        ("CT", 41.1, 42.1, -73.7, -71.8),
-        ("UT", 37.0, 42.0, -114.0, -109.0),
-        ("NV", 35.0, 42.0, -120.0, -114.6),
-        ("AR", 33.0, 36.5, -94.4, -89.6),
-        ("MS", 30.2, 34.8, -91.7, -88.1),
-        ("KS", 37.0, 40.0, -102.0, -94.6),
-        ("NM", 31.8, 37.0, -109.0, -103.0),
-        ("NE", 40.0, 43.0, -104.0, -95.3),
-        ("ID", 42.0, 49.0, -117.2, -111.0),
-        ("HI", 18.9, 22.2, -160.0, -154.8),
-        ("AK", 51.3, 71.4, -174.0, -130.0),
-        ("ME", 43.0, 47.5, -71.1, -66.9),
-        ("NH", 42.7, 45.3, -72.6, -70.7),
-        ("VT", 42.7, 45.1, -73.4, -71.5),
-        ("RI", 41.1, 42.0, -71.9, -71.1),
-        ("MT", 45.0, 49.0, -116.0, -104.0),
-        ("WY", 41.0, 45.0, -111.0, -104.0),
-        ("ND", 46.0, 49.0, -104.0, -96.6),
-        ("SD", 42.5, 45.9, -104.0, -96.4),
-        ("DE", 38.4, 39.8, -75.8, -75.0),
-        ("MD", 37.9, 39.7, -79.5, -75.0),
-        ("DC", 38.8, 38.9, -77.1, -77.0),
-        ("WV", 37.2, 40.6, -82.6, -77.7),
-    }
-
-    for state, min_lat, max_lat, min_lng, max_lng in state_bounds:
-        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-            return state
-
-    return "CA"
-
-def fetch_fbi_state_crime_data(state: str) -> Optional[Dict]:
-    """Fetch FBI crime data for a state."""
+# Years of estimates requested (the latest published year is used)
+CRIME_ESTIMATE_YEARS = 5
+
+def fetch_fbi_state_crime_data(state: str, api_base: Optional[str] = None) -> Optional[Dict]:
+    """
+    Fetch FBI UCR estimates for a state.
+
+    The estimates endpoint answers {"results": [{"state_abbr", "year",
+    "population", "violent_crime", "property_crime", ...}, ...]} with one
+    row per year.
+    """
     try:
-        # FBI API endpoint for state-level crime data
-        url = f"{CRIME_API_BASE}/crimes/state/{state_code}"
+        end_year = datetime.now().year
+        url = (
+            f"{api_base or CRIME_API_BASE}/api/estimates/states/{state}/"
+            f"{end_year - CRIME_ESTIMATE_YEARS}/{end_year}"
+        )
+        params = {"API_KEY": GOV_DATA_KEY} if GOV_DATA_KEY else {}
 
-        response = requests.get(url, timeout=10)
+        response = requests.get(url, params=params, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -144,13 +103,65 @@ def fetch_fbi_state_crime_data(state: str) -> Optional[Dict]:
         print(f"    Error fetching FBI data: {e}")
         return None
 
+# UCR estimates are annual; each state is fetched at most once a month
+FBI_CACHE_TTL = 30 * DAY
+fbi_cache = StateSourceCache("fbi_crime", fetch_fbi_state_crime_data, ttl=FBI_CACHE_TTL)
+
+def crimes_per_100k(data: Optional[Dict]) -> Optional[float]:
+    """Latest year's violent + property crimes per 100k residents, if reported."""
+    rows = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(rows, list):
+        return None
+
+    reported = [
+        row for row in rows
+        if isinstance(row, dict) and row.get("population")
+        and ("violent_crime" in row or "property_crime" in row)
+    ]
+    if not reported:
+        return None
+
+    latest = max(reported, key=lambda row: row.get("year", 0))
+    crimes = (latest.get("violent_crime") or 0) + (latest.get("property_crime") or 0)
+    return crimes / latest["population"] * 100000
+
+@lru_cache(maxsize=None)
+def national_crime_rate() -> Optional[float]:
+    """Mean crimes per 100k across states with FBI data."""
+    if not GOV_DATA_KEY:
+        return None
+    rates = [crimes_per_100k(fbi_cache.get(state)) for state in sorted(STATE_FIPS)]
+    rates = [rate for rate in rates if rate]
+    return sum(rates) / len(rates) if rates else None
+
+@lru_cache(maxsize=None)
+def fbi_state_crime_index(state: str) -> Optional[float]:
+    """
+    State crime rate from FBI estimates on the 0-100 index scale, or None
+    without FBI data. Rates are scaled so the average state lands on the
+    average regional baseline.
+    """
+    national = national_crime_rate()
+    rate = crimes_per_100k(fbi_cache.get(state)) if national else None
+    if not rate:
+        return None
+    mean_baseline = sum(REGIONAL_CRIME_BASELINES.values()) / len(REGIONAL_CRIME_BASELINES)
+    return rate / national * mean_baseline
+
+def state_crime_baseline(state: str) -> float:
+    """State crime baseline: FBI-scaled when available, else the regional table."""
+    fbi_index = fbi_state_crime_index(state)
+    if fbi_index is not None:
+        return fbi_index
+    return REGIONAL_CRIME_BASELINES.get(state, 65)
+
 def calculate_crime_index(state: str, attrs: Dict) -> int:
     """
     Calculate crime index (0-100) for a location.
     Uses regional baseline with adjustments.
     """
     # Get state baseline
-    state_crime_rate = REGIONAL_CRIME_BASELINES.get(state, 65)
+    state_crime_rate = state_crime_baseline(state)
 
     # Adjust based on income and density
     # Higher income areas typically have lower crime
@@ -182,7 +193,10 @@ def enrich_location_with_crime_data(location: Dict, state: str) -> Dict:
 
     # Update location
     attrs['crimeIndex'] = crime_index
-    attrs['_crimeSource'] = 'FBI UCR Data (estimated from regional data)'
+    if fbi_state_crime_index(state) is not None:
+        attrs['_crimeSource'] = 'FBI UCR state estimates (adjusted for income and density)'
+    else:
+        attrs['_crimeSource'] = 'FBI UCR Data (estimated from regional data)'
     attrs['_crimeDataDate'] = datetime.now().isoformat()
 
     # Recalculate overall score if needed
@@ -201,6 +215,7 @@ def main():
 
     parser = argparse.ArgumentParser(description="Integrate FBI crime data")
     parser.add_argument("--ticker", type=str, default=None, help="Process specific ticker")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
     args = parser.parse_args()
 
     print("\n" + "="*70)
@@ -219,6 +234,23 @@ def main():
     with open(manifest_path, "r") as f:
         manifest = json.load(f)
 
+    # Fetch every state's FBI data up front (at most once per FBI_CACHE_TTL)
+    if GOV_DATA_KEY:
+        fetched = fbi_cache.prefetch(STATE_FIPS)
+        print(f"✓ FBI crime data: {fetched} states fetched, {len(STATE_FIPS) - fetched} cached")
+
+    # Locations are recomputed only when their inputs changed
+    tracker = StageTracker(
+        "crime",
+        source_version(
+            __file__,
+            {state: state_crime_baseline(state) for state in sorted(STATE_FIPS)},
+            lookup_version()
+        ),
+        inputs=("medianIncome", "populationDensity"),
+        force=args.force
+    )
+
     total_enriched = 0
     total_with_crime = 0
 
@@ -242,30 +274,44 @@ def main():
 
         print(f"\n🔄 {ticker}")
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
+
+            located = [loc for loc in locations if loc.get("lat") and loc.get("lng")]
+            stale = tracker.pending(located)
+            if not stale:
+                print(f"   ✓ Unchanged - skipped {len(located)} locations")
+                continue
 
-        enriched = 0
-        for location in locations:
-            lat = location.get("lat")
-            lng = location.get("lng")
+            # Resolve every stale location's state in one batch
+            state_by_id = lookup_location_states(stale)
 
-            if lat and lng:
-                state = estimate_state_from_coords(lat, lng)
-                location = enrich_location_with_crime_data(location, state)
-                enriched += 1
-                total_enriched += 1
+            enriched = 0
+            for location in stale:
+                lat = location.get("lat")
+                lng = location.get("lng")
 
-                if location.get('at', {}).get('crimeIndex'):
-                    total_with_crime += 1
+                if lat and lng:
+                    state = state_by_id[id(location)]
+                    location = enrich_location_with_crime_data(location, state)
+                    tracker.mark(location)
+                    enriched += 1
+                    total_enriched += 1
 
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(locations, f, separators=(',', ':'))
+                    if location.get('at', {}).get('crimeIndex'):
+                        total_with_crime += 1
+
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
 
         print(f"   ✓ Enriched {enriched} locations")
         print(f"   ✓ Crime data integrated: {enriched}")
 
+    tracker.save_stats()
+
     print(f"\n{'='*70}")
     print(f"CRIME DATA INTEGRATION COMPLETE")
     print(f"Total locations processed: {total_enriched:,}")
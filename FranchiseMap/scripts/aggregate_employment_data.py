@@ -25,12 +25,17 @@ Metrics Collected:
 import json
 import os
 import requests
-import time
+from functools import lru_cache
 from typing import Dict, Optional, List
 from datetime import datetime
 
+from brand_lock import brand_file_lock
+from boundary_index import lookup_location_states, lookup_version
+from provenance import StageTracker, source_version
+from state_source_cache import DAY, StateSourceCache
+
 # Configuration
-BLS_API_BASE = "https://api.bls.gov/publicAPI/v2"
+BLS_API_BASE = os.environ.get("BLS_API_BASE", "https://api.bls.gov/publicAPI/v2")
 # Try BLS_KEY first (GitHub secret), fall back to BLS_API_KEY (local env)
 BLS_API_KEY = os.environ.get("BLS_KEY", "") or os.environ.get("BLS_API_KEY", "")
 
@@ -70,67 +75,6 @@ REGIONAL_EMPLOYMENT_BASELINES = {
     "WI": 94.7, "WY": 94.9, "DC": 96.5
 }
 
-def estimate_state_from_coords(lat: float, lng: float) -> str:
-    """Estimate state code from coordinates."""
-    state_bounds = {
-        ("CA", 32.5, 42.0, -124.4, -114.1),
-        ("TX", 25.8, 36.5, -106.6, -93.5),
-        ("FL", 24.5, 30.7, -87.6, -80.0),
-        ("NY", 40.5, 45.0, -79.8, -71.8),
-        ("PA", 39.7, 42.3, -80.5, -74.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("OH", 38.4, 42.0, -84.8, -80.5),
-        ("GA", 30.4, 35.0, -85.6, -80.8),
-        ("NC", 33.8, 36.6, -84.3, -75.4),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-        ("NJ", 38.9, 41.4, -75.6, -73.9),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WA", 45.6, 49.0, -124.7, -116.9),
-        ("AZ", 31.3, 37.0, -114.8, -109.0),
-        ("MA", 41.2, 42.9, -73.5, -69.9),
-        ("TN", 35.0, 36.7, -90.3, -81.6),
-        ("IN", 37.8, 41.8, -88.1, -84.8),
-        ("MO", 36.5, 40.6, -95.8, -89.1),
-        ("LA", 29.0, 33.0, -94.0, -88.8),
-        ("CO", 37.0, 41.0, -109.1, -102.0),
-        ("MN", 43.5, 49.4, -97.2, -89.5),
-        ("WI", 42.5, 47.3, -92.9, -86.8),
-        ("SC", 32.0, 34.8, -83.4, -78.5),
-        ("AL", 30.2, 35.0, -88.5, -84.9),
-        ("KY", 36.5, 39.1, -89.6, -81.9),
-        ("OR", 42.0, 46.3, -124.5, -116.5),
-        ("OK", 33.6, 37.0, -103.0, -94.4),
-        ("CT", 41.1, 42.1, -73.7, -71.8),
-        ("UT", 37.0, 42.0, -114.0, -109.0),
-        ("NV", 35.0, 42.0, -120.0, -114.6),
-        ("AR", 33.0, 36.5, -94.4, -89.6),
-        ("MS", 30.2, 34.8, -91.7, -88.1),
-        ("KS", 37.0, 40.0, -102.0, -94.6),
-        ("NM", 31.8, 37.0, -109.0, -103.0),
-        ("NE", 40.0, 43.0, -104.0, -95.3),
-        ("ID", 42.0, 49.0, -117.2, -111.0),
-        ("HI", 18.9, 22.2, -160.0, -154.8),
-        ("AK", 51.3, 71.4, -174.0, -130.0),
-        ("ME", 43.0, 47.5, -71.1, -66.9),
-        ("NH", 42.7, 45.3, -72.6, -70.7),
-        ("VT", 42.7, 45.1, -73.4, -71.5),
-        ("RI", 41.1, 42.0, -71.9, -71.1),
-        ("MT", 45.0, 49.0, -116.0, -104.0),
-        ("WY", 41.0, 45.0, -111.0, -104.0),
-        ("ND", 46.0, 49.0, -104.0, -96.6),
-        ("SD", 42.5, 45.9, -104.0, -96.4),
-        ("DE", 38.4, 39.8, -75.8, -75.0),
-        ("MD", 37.9, 39.7, -79.5, -75.0),
-        ("DC", 38.8, 38.9, -77.1, -77.0),
-        ("WV", 37.2, 40.6, -82.6, -77.7),
-    }
-
-    for state, min_lat, max_lat, min_lng, max_lng in state_bounds:
-        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-            return state
-
-    return "CA"
-
 def fetch_bls_state_employment(state: str) -> Optional[Dict]:
     """Fetch BLS employment data for a state."""
     if not BLS_API_KEY:
@@ -174,20 +118,28 @@ def fetch_bls_state_employment(state: str) -> Optional[Dict]:
         print(f"    BLS API error: {e}")
         return None
 
+# LAUS rates are monthly; each state is fetched at most once a week
+BLS_CACHE_TTL = 7 * DAY
+bls_cache = StateSourceCache("bls", fetch_bls_state_employment, ttl=BLS_CACHE_TTL)
+
+@lru_cache(maxsize=None)
+def state_employment_rate(state: str) -> float:
+    """State employment rate from BLS (cached) or the regional baseline."""
+    bls_data = bls_cache.get(state) if BLS_API_KEY else None
+
+    if bls_data:
+        unemployment = bls_data.get('unemployment_rate', 4.0)
+        return 100 - unemployment
+
+    # Use regional baseline
+    return REGIONAL_EMPLOYMENT_BASELINES.get(state, 94.5)
+
 def estimate_employment_rate(state: str, attrs: Dict) -> float:
     """
     Estimate employment rate for a location.
     Based on state unemployment rate adjusted for local factors.
     """
-    # Try to fetch real BLS data
-    bls_data = fetch_bls_state_employment(state)
-
-    if bls_data:
-        unemployment = bls_data.get('unemployment_rate', 4.0)
-        employment_rate = 100 - unemployment
-    else:
-        # Use regional baseline
-        employment_rate = REGIONAL_EMPLOYMENT_BASELINES.get(state, 94.5)
+    employment_rate = state_employment_rate(state)
 
     # Adjust based on income and education
     income = attrs.get('medianIncome', 75000)
@@ -231,6 +183,7 @@ def main():
 
     parser = argparse.ArgumentParser(description="Integrate BLS employment data")
     parser.add_argument("--ticker", type=str, default=None, help="Process specific ticker")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
     args = parser.parse_args()
 
     print("\n" + "="*70)
@@ -254,6 +207,23 @@ def main():
     with open(manifest_path, "r") as f:
         manifest = json.load(f)
 
+    # Fetch every state's BLS rate up front (at most once per BLS_CACHE_TTL)
+    if BLS_API_KEY:
+        fetched = bls_cache.prefetch(STATE_FIPS)
+        print(f"✓ BLS rates: {fetched} states fetched, {len(STATE_FIPS) - fetched} cached")
+
+    # Locations are recomputed only when their inputs changed
+    tracker = StageTracker(
+        "employment",
+        source_version(
+            __file__,
+            {state: state_employment_rate(state) for state in sorted(STATE_FIPS)},
+            lookup_version()
+        ),
+        inputs=("medianIncome", "educationIndex"),
+        force=args.force
+    )
+
     total_enriched = 0
     total_with_employment = 0
 
@@ -277,34 +247,44 @@ def main():
 
         print(f"\n🔄 {ticker}")
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
 
-        enriched = 0
-        for location in locations:
-            lat = location.get("lat")
-            lng = location.get("lng")
+            located = [loc for loc in locations if loc.get("lat") and loc.get("lng")]
+            stale = tracker.pending(located)
+            if not stale:
+                print(f"   ✓ Unchanged - skipped {len(located)} locations")
+                continue
 
-            if lat and lng:
-                state = estimate_state_from_coords(lat, lng)
-                location = enrich_location_with_employment_data(location, state)
-                enriched += 1
-                total_enriched += 1
+            # Resolve every stale location's state in one batch
+            state_by_id = lookup_location_states(stale)
 
-                if location.get('at', {}).get('employmentRate'):
-                    total_with_employment += 1
+            enriched = 0
+            for location in stale:
+                lat = location.get("lat")
+                lng = location.get("lng")
 
-            # Rate limiting for BLS API
-            if BLS_API_KEY and enriched % 10 == 0:
-                time.sleep(0.5)
+                if lat and lng:
+                    state = state_by_id[id(location)]
+                    location = enrich_location_with_employment_data(location, state)
+                    tracker.mark(location)
+                    enriched += 1
+                    total_enriched += 1
 
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(locations, f, separators=(',', ':'))
+                    if location.get('at', {}).get('employmentRate'):
+                        total_with_employment += 1
+
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
 
         print(f"   ✓ Enriched {enriched} locations")
         print(f"   ✓ Employment data integrated: {enriched}")
 
+    tracker.save_stats()
+
     print(f"\n{'='*70}")
     print(f"EMPLOYMENT DATA INTEGRATION COMPLETE")
     print(f"Total locations processed: {total_enriched:,}")
@@ -10,7 +10,9 @@ Data Sources:
 
 Metrics Calculated:
 - Distance to nearest transit stop
-- Transit score (0-100) based on proximity
+- Weekday departures within walking distance (from stop_times.txt)
+- Transit score (0-100) based on service frequency, or proximity when
+  feeds carry no schedule data
 - Number of routes and stops nearby
 - Transit system types (bus, rail, metro, etc.)
 
@@ -26,13 +28,16 @@ See API_SETUP_GUIDE.md for detailed instructions.
 
 import json
 import os
-import csv
 import math
-import zipfile
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 import requests
 
+from brand_lock import brand_file_lock
+from gtfs_service_index import TransitServiceIndex, build_service_index
+from gtfs_stop_store import GTFS_STORE_DIR, GTFSStopStore, iter_feed_stops, open_stop_store
+from provenance import StageTracker, source_version
+
 # Configuration
 TRANSIT_FEEDS_API = "https://api.transitfeeds.com/v1"
 TRANSIT_API_KEY = os.environ.get("TRANSIT_FEEDS_API_KEY", "")
@@ -41,6 +46,10 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(script_dir, "../data")
 GTFS_DIR = os.path.join(DATA_DIR, "gtfs_feeds")
 
+# Locations with no departures inside the walking radius keep a small
+# distance-based score so a stop just past the radius isn't worth nothing
+NO_SERVICE_SCORE_CAP = 20
+
 # Major transit agencies for downloading GTFS
 MAJOR_TRANSIT_AGENCIES = {
     "nyc": {
@@ -110,30 +119,13 @@ def read_gtfs_stops(gtfs_path: str) -> List[Dict]:
     """Read stops from GTFS feed."""
     stops = []
     try:
-        if gtfs_path.endswith('.zip'):
-            with zipfile.ZipFile(gtfs_path, 'r') as z:
-                with z.open('stops.txt') as f:
-                    reader = csv.DictReader(line.decode().strip() for line in f)
-                    for row in reader:
-                        stops.append({
-                            'id': row.get('stop_id'),
-                            'lat': float(row.get('stop_lat', 0)),
-                            'lng': float(row.get('stop_lon', 0)),
-                            'name': row.get('stop_name', 'Unknown')
-                        })
-        else:
-            # Assume directory with GTFS files
-            stops_file = os.path.join(gtfs_path, 'stops.txt')
-            if os.path.exists(stops_file):
-                with open(stops_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        stops.append({
-                            'id': row.get('stop_id'),
-                            'lat': float(row.get('stop_lat', 0)),
-                            'lng': float(row.get('stop_lon', 0)),
-                            'name': row.get('stop_name', 'Unknown')
-                        })
+        for stop_id, name, lat, lng in iter_feed_stops(gtfs_path):
+            stops.append({
+                'id': stop_id,
+                'lat': lat,
+                'lng': lng,
+                'name': name
+            })
     except Exception as e:
         print(f"    Error reading GTFS: {e}")
 
@@ -185,6 +177,50 @@ def calculate_transit_score(distance_miles: float) -> int:
     else:
         return max(0, 30 - int(distance_miles - 5) * 3)
 
+def apply_transit_attributes(
+    location: Dict,
+    stop_name: str,
+    agency: str,
+    distance_miles: float,
+    departures: Optional[float] = None,
+    frequency_score: Optional[int] = None
+) -> Dict:
+    """
+    Write transit attributes onto a location.
+
+    With service data the score is frequency-weighted; otherwise it falls
+    back to distance from the nearest stop.
+    """
+    if 'at' not in location:
+        location['at'] = {}
+
+    attrs = location['at']
+
+    # Update transit data
+    if departures is None:
+        attrs['transitScore'] = calculate_transit_score(distance_miles)
+    elif departures > 0:
+        attrs['transitScore'] = frequency_score
+        attrs['transitDepartures'] = round(departures, 1)
+    else:
+        attrs['transitScore'] = min(NO_SERVICE_SCORE_CAP, calculate_transit_score(distance_miles))
+        attrs['transitDepartures'] = 0
+    attrs['nearestTransitStop'] = stop_name
+    attrs['transitDistance'] = round(distance_miles, 2)
+    attrs['transitAgency'] = agency
+    attrs['_transitSource'] = 'GTFS Real-time Feed Data'
+    attrs['_transitDataDate'] = datetime.now().isoformat()
+
+    # Recalculate overall score
+    try:
+        from generate_data import calculate_score, calculate_sub_scores
+        location['s'] = calculate_score(attrs)
+        location['ss'] = calculate_sub_scores(attrs)
+    except ImportError:
+        pass
+
+    return location
+
 def enrich_location_with_transit_data(location: Dict, transit_agencies: Dict) -> Dict:
     """Enrich location with transit data."""
     if 'at' not in location:
@@ -198,27 +234,76 @@ def enrich_location_with_transit_data(location: Dict, transit_agencies: Dict) ->
         nearest = find_nearest_transit_stop(lat, lng, transit_agencies)
 
         if nearest:
-            attrs = location['at']
-            distance_miles = nearest['distance']
-
-            # Update transit data
-            attrs['transitScore'] = calculate_transit_score(distance_miles)
-            attrs['nearestTransitStop'] = nearest['stop']['name']
-            attrs['transitDistance'] = round(distance_miles, 2)
-            attrs['transitAgency'] = nearest['agency']
-            attrs['_transitSource'] = 'GTFS Real-time Feed Data'
-            attrs['_transitDataDate'] = datetime.now().isoformat()
-
-            # Recalculate overall score
-            try:
-                from generate_data import calculate_score, calculate_sub_scores
-                location['s'] = calculate_score(attrs)
-                location['ss'] = calculate_sub_scores(attrs)
-            except ImportError:
-                pass
+            apply_transit_attributes(
+                location, nearest['stop']['name'], nearest['agency'], nearest['distance']
+            )
 
     return location
 
+def enrich_locations_from_store(
+    locations: List[Dict],
+    store: GTFSStopStore,
+    service_index: Optional[TransitServiceIndex] = None
+) -> int:
+    """
+    Enrich a brand's locations against the compiled stop store in one batch.
+    Returns the number of locations that received transit data.
+    """
+    positions = [i for i, loc in enumerate(locations) if loc.get('lat') and loc.get('lng')]
+    for loc in locations:
+        if 'at' not in loc:
+            loc['at'] = {}
+    if not positions:
+        return 0
+
+    lats = [locations[i]['lat'] for i in positions]
+    lngs = [locations[i]['lng'] for i in positions]
+    rows, distances = store.nearest(lats, lngs)
+
+    if service_index is not None:
+        departures, frequency_scores = service_index.score_locations(lats, lngs)
+    else:
+        departures = frequency_scores = [None] * len(positions)
+
+    with_transit = 0
+    for pos, row, distance, deps, freq in zip(positions, rows, distances, departures, frequency_scores):
+        if row < 0:
+            continue
+        apply_transit_attributes(
+            locations[pos], store.names[row], store.agency_name(row), float(distance),
+            None if deps is None else float(deps),
+            None if freq is None else int(freq)
+        )
+        if locations[pos]['at'].get('transitScore'):
+            with_transit += 1
+
+    return with_transit
+
+def transit_tracker(
+    store: GTFSStopStore,
+    service_index: Optional[TransitServiceIndex] = None,
+    force: bool = False
+) -> StageTracker:
+    """
+    Provenance tracker for the transit stage.
+
+    Locations are recomputed when their coordinates, a feed or its
+    reference week of service changed, and when their transitScore is no
+    longer the one this stage wrote (accessibility overwrites it with its
+    estimate whenever it recomputes a location).
+    """
+    return StageTracker(
+        "transit",
+        source_version(
+            __file__,
+            store.feed_hashes,
+            NO_SERVICE_SCORE_CAP,
+            service_index.fingerprint if service_index is not None else None
+        ),
+        inputs=("transitScore",),
+        force=force
+    )
+
 def main():
     """Main entry point."""
     import argparse
@@ -226,6 +311,10 @@ def main():
     parser = argparse.ArgumentParser(description="Integrate GTFS transit data")
     parser.add_argument("--ticker", type=str, default=None, help="Process specific ticker")
     parser.add_argument("--gtfs-dir", type=str, default=None, help="Directory with GTFS files")
+    parser.add_argument("--store-dir", type=str, default=GTFS_STORE_DIR, help="Compiled stop store directory")
+    parser.add_argument("--rebuild", action="store_true", help="Recompile the stop store from all feeds")
+    parser.add_argument("--no-frequency", action="store_true", help="Score by nearest-stop distance only")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
     args = parser.parse_args()
 
     print("\n" + "="*70)
@@ -245,28 +334,26 @@ def main():
         print("\nSee API_SETUP_GUIDE.md for detailed instructions")
         return
 
-    # Load GTFS feeds
-    print(f"\n📥 Loading GTFS feeds from: {gtfs_dir}")
-    transit_agencies = {}
-    for agency_name in os.listdir(gtfs_dir):
-        agency_path = os.path.join(gtfs_dir, agency_name)
-        if os.path.isdir(agency_path) or agency_path.endswith('.zip'):
-            print(f"   Loading {agency_name}...", end='')
-            stops = read_gtfs_stops(agency_path)
-            if stops:
-                transit_agencies[agency_name] = {
-                    'path': agency_path,
-                    'stops': stops
-                }
-                print(f" ✓ ({len(stops)} stops)")
-            else:
-                print(" ✗ (no stops found)")
+    # Load the compiled stop store (rebuilt only when a feed changed)
+    print(f"\n📥 Loading GTFS stop store for: {gtfs_dir}")
+    store = open_stop_store(gtfs_dir, args.store_dir, rebuild=args.rebuild)
 
-    if not transit_agencies:
+    if store is None or len(store) == 0:
         print("\n✗ No GTFS feeds found. Cannot continue.")
         return
 
-    print(f"\n✓ Loaded {len(transit_agencies)} transit agencies")
+    print(f"\n✓ Loaded {len(store.agencies)} transit agencies ({len(store):,} stops)")
+
+    # Weekday departures per stop (streamed once per changed feed)
+    service_index = None
+    if not args.no_frequency:
+        print("\n📥 Loading transit service index...")
+        service_index = build_service_index(store, gtfs_dir)
+        if service_index.total_departures > 0:
+            print(f"   ✓ {service_index.total_departures:,.0f} weekday departures indexed")
+        else:
+            print("   ⚠️  No schedule data in feeds - using nearest-stop distance")
+            service_index = None
 
     # Load manifest
     manifest_path = os.path.join(DATA_DIR, "manifest.json")
@@ -277,6 +364,8 @@ def main():
     with open(manifest_path, "r") as f:
         manifest = json.load(f)
 
+    tracker = transit_tracker(store, service_index, force=args.force)
+
     total_enriched = 0
     total_with_transit = 0
 
@@ -300,28 +389,33 @@ def main():
 
         print(f"\n🔄 {ticker}")
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
 
-        enriched = 0
-        with_transit = 0
-        for location in locations:
-            location = enrich_location_with_transit_data(location, transit_agencies)
-            enriched += 1
-            total_enriched += 1
+            stale = tracker.pending([loc for loc in locations if loc.get("lat") and loc.get("lng")])
+            if not stale:
+                print(f"   ✓ Unchanged - skipped {len(locations)} locations")
+                continue
 
-            if location.get('at', {}).get('transitScore'):
-                with_transit += 1
-                total_with_transit += 1
+            enriched = len(stale)
+            with_transit = enrich_locations_from_store(stale, store, service_index)
+            for location in stale:
+                tracker.mark(location)
+            total_enriched += enriched
+            total_with_transit += with_transit
 
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(locations, f, separators=(',', ':'))
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
 
-        coverage = (with_transit / len(locations) * 100) if locations else 0
+        coverage = (with_transit / enriched * 100) if enriched else 0
         print(f"   ✓ Enriched {enriched} locations")
         print(f"   ✓ With transit data: {with_transit} ({coverage:.1f}%)")
 
+    tracker.save_stats()
+
     print(f"\n{'='*70}")
     print(f"GTFS DATA INTEGRATION COMPLETE")
     print(f"Total locations processed: {total_enriched:,}")
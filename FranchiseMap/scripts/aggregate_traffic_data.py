@@ -21,6 +21,12 @@ import os
 import math
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
+from brand_lock import brand_file_lock
+from provenance import StageTracker, source_version
+from spatial_grid import haversine_miles
+
 # Configuration
 MAJOR_HIGHWAYS = [
     # Format: (highway_name, lat, lng, estimated_aadt, lanes)
@@ -93,6 +99,46 @@ AREA_TYPE_TRAFFIC = {
     "rural": {"aadt_base": 15000, "factor": 0.6},
 }
 
+# Major cities used for area classification
+# Format: (city_name, lat, lng, metro_radius_miles)
+MAJOR_CITIES = [
+    ("NYC", 40.7128, -74.0060, 20),
+    ("LA", 34.0522, -118.2437, 30),
+    ("Chicago", 41.8781, -87.6298, 25),
+    ("Houston", 29.7604, -95.3698, 25),
+    ("Phoenix", 33.4484, -112.0742, 20),
+    ("Philadelphia", 39.9526, -75.1652, 20),
+    ("San Antonio", 29.4241, -98.4936, 20),
+    ("San Diego", 32.7157, -117.1611, 20),
+    ("Dallas", 32.7767, -96.7970, 20),
+    ("San Jose", 37.3382, -121.8863, 15),
+    ("Austin", 30.2672, -97.7431, 20),
+    ("Jacksonville", 30.3322, -81.6557, 15),
+    ("San Francisco", 37.7749, -122.4194, 15),
+    ("Indianapolis", 39.7684, -86.1581, 15),
+    ("Columbus", 39.9612, -82.9988, 15),
+]
+
+# Visibility and road density baselines by area type
+AREA_VISIBILITY = {
+    "downtown": 85,
+    "urban_core": 80,
+    "highway": 95,
+    "suburban": 60,
+    "rural": 35,
+}
+
+ROAD_DENSITY = {
+    "downtown": 95,
+    "urban_core": 85,
+    "highway": 60,
+    "suburban": 45,
+    "rural": 20,
+}
+
+# Locations processed per distance matrix in the batch path
+BATCH_ROWS = 50_000
+
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate distance between two coordinates in miles."""
     R = 3959  # Earth radius in miles
@@ -107,26 +153,8 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
 
 def classify_area_type(lat: float, lng: float) -> str:
     """Classify area type based on proximity to major cities."""
-    major_cities = [
-        ("NYC", 40.7128, -74.0060, 20),
-        ("LA", 34.0522, -118.2437, 30),
-        ("Chicago", 41.8781, -87.6298, 25),
-        ("Houston", 29.7604, -95.3698, 25),
-        ("Phoenix", 33.4484, -112.0742, 20),
-        ("Philadelphia", 39.9526, -75.1652, 20),
-        ("San Antonio", 29.4241, -98.4936, 20),
-        ("San Diego", 32.7157, -117.1611, 20),
-        ("Dallas", 32.7767, -96.7970, 20),
-        ("San Jose", 37.3382, -121.8863, 15),
-        ("Austin", 30.2672, -97.7431, 20),
-        ("Jacksonville", 30.3322, -81.6557, 15),
-        ("San Francisco", 37.7749, -122.4194, 15),
-        ("Indianapolis", 39.7684, -86.1581, 15),
-        ("Columbus", 39.9612, -82.9988, 15),
-    ]
-
     closest_dist = float('inf')
-    for city_name, city_lat, city_lng, metro_radius in major_cities:
+    for city_name, city_lat, city_lng, metro_radius in MAJOR_CITIES:
         dist = haversine_distance(lat, lng, city_lat, city_lng)
         if dist < closest_dist:
             closest_dist = dist
@@ -191,14 +219,7 @@ def calculate_visibility_score(lat: float, lng: float, area_type: str) -> int:
         closest_distance = min(closest_distance, dist)
 
     # Base visibility from area type
-    area_visibility = {
-        "downtown": 85,
-        "urban_core": 80,
-        "highway": 95,
-        "suburban": 60,
-        "rural": 35,
-    }
-    base_visibility = area_visibility.get(area_type, 50)
+    base_visibility = AREA_VISIBILITY.get(area_type, 50)
 
     # Adjust based on proximity to highways
     if closest_distance < 0.5:
@@ -229,15 +250,7 @@ def calculate_road_density(lat: float, lng: float) -> int:
     # Urban areas have higher density
     area_type = classify_area_type(lat, lng)
 
-    road_density_map = {
-        "downtown": 95,
-        "urban_core": 85,
-        "highway": 60,
-        "suburban": 45,
-        "rural": 20,
-    }
-
-    base_density = road_density_map.get(area_type, 30)
+    base_density = ROAD_DENSITY.get(area_type, 30)
 
     # Add variation based on coordinates
     variation = int((abs(lat % 1) + abs(lng % 1)) * 10)
@@ -276,6 +289,16 @@ def generate_traffic_data(lat: float, lng: float) -> Dict:
     road_density = calculate_road_density(lat, lng)
     highway_proximity = calculate_highway_proximity(lat, lng)
 
+    return _traffic_record(area_type, traffic_volume, visibility, road_density, highway_proximity)
+
+def _traffic_record(
+    area_type: str,
+    traffic_volume: int,
+    visibility: int,
+    road_density: int,
+    highway_proximity: Dict
+) -> Dict:
+    """Assemble the traffic attributes written to a location."""
     return {
         # Traffic metrics
         "traffic": traffic_volume,
@@ -297,8 +320,93 @@ def generate_traffic_data(lat: float, lng: float) -> Dict:
         "_methodNote": "Traffic estimates based on area type, highway proximity, and historical patterns"
     }
 
+def _truncate(values) -> np.ndarray:
+    """Vectorized int(): truncate toward zero."""
+    return np.trunc(values).astype(np.int64)
+
+def generate_traffic_data_batch(lats, lngs) -> List[Dict]:
+    """
+    Traffic data for many locations at once.
+
+    Builds one location x (city + highway) distance matrix per chunk and
+    derives area type, traffic volume, visibility, road density and highway
+    proximity from it. Records are identical to generate_traffic_data.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+
+    feature_lat = np.array([c[1] for c in MAJOR_CITIES] + [h[1] for h in MAJOR_HIGHWAYS])
+    feature_lng = np.array([c[2] for c in MAJOR_CITIES] + [h[2] for h in MAJOR_HIGHWAYS])
+    n_cities = len(MAJOR_CITIES)
+    highway_aadt = np.array([h[3] for h in MAJOR_HIGHWAYS], dtype=np.int64)
+
+    area_types = ("downtown", "urban_core", "suburban", "rural")
+    aadt_base = np.array([AREA_TYPE_TRAFFIC[a]["aadt_base"] for a in area_types], dtype=np.int64)
+    traffic_factor = np.array([AREA_TYPE_TRAFFIC[a]["factor"] for a in area_types])
+    visibility_base = np.array([AREA_VISIBILITY[a] for a in area_types], dtype=np.int64)
+    density_base = np.array([ROAD_DENSITY[a] for a in area_types], dtype=np.int64)
+
+    records: List[Dict] = []
+    for start in range(0, len(lats), BATCH_ROWS):
+        lat, lng = lats[start:start + BATCH_ROWS], lngs[start:start + BATCH_ROWS]
+        dist = haversine_miles(lat[:, None], lng[:, None], feature_lat[None, :], feature_lng[None, :])
+
+        # Area type from the closest city
+        city_dist = dist[:, :n_cities].min(axis=1)
+        area = np.select([city_dist < 3, city_dist < 10, city_dist < 20], [0, 1, 2], default=3)
+
+        # Closest highway (first one wins ties, like the scalar loop)
+        highway_dist = dist[:, n_cities:]
+        nearest = np.argmin(highway_dist, axis=1)
+        hd = highway_dist[np.arange(len(lat)), nearest]
+        aadt = highway_aadt[nearest]
+
+        # Traffic volume
+        base = aadt_base[area]
+        blend = (3 - hd) / 3
+        base = np.select(
+            [hd < 1, hd < 3, hd < 10],
+            [_truncate(aadt * 0.8), _truncate(base * (1 - blend) + aadt * blend), _truncate(base * 1.1)],
+            default=base
+        )
+        adjusted = _truncate(base * traffic_factor[area])
+        variation = np.remainder(lat * 73.5, 15000)
+        traffic = np.clip(_truncate(adjusted + variation * 0.1), 5000, 100000)
+
+        # Visibility
+        bonus = np.select([hd < 0.5, hd < 1, hd < 3, hd < 10], [20, 15, 10, 5], default=0)
+        visibility = np.minimum(100, visibility_base[area] + bonus)
+        visibility = np.where((area == 3) & (hd > 50), np.maximum(20, visibility - 20), visibility)
+
+        # Road density
+        density_variation = _truncate((np.abs(np.remainder(lat, 1)) + np.abs(np.remainder(lng, 1))) * 10)
+        road_density = np.minimum(100, density_base[area] + density_variation)
+
+        for i in range(len(lat)):
+            highway = MAJOR_HIGHWAYS[nearest[i]]
+            records.append(_traffic_record(
+                area_types[area[i]],
+                int(traffic[i]),
+                int(visibility[i]),
+                int(road_density[i]),
+                {
+                    "nearestHighway": highway[0],
+                    "highwayDistance": round(float(hd[i]), 2),
+                    "highwayLanes": highway[4],
+                    "highwayAADT": highway[3],
+                }
+            ))
+
+    return records
+
 def main():
     """Main entry point for traffic data aggregation."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enrich locations with traffic data")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, "../data")
 
@@ -318,36 +426,52 @@ def main():
 
     print(f"\nProcessing {len(manifest)} brands")
 
+    # Locations are recomputed only when their coordinates or the road tables changed
+    tracker = StageTracker(
+        "traffic",
+        source_version(__file__, MAJOR_HIGHWAYS, AREA_TYPE_TRAFFIC, MAJOR_CITIES, AREA_VISIBILITY, ROAD_DENSITY),
+        force=args.force
+    )
+
     # Process each brand
     total_enriched = 0
     for brand_info in manifest:
         ticker = brand_info["ticker"]
-        data_file = os.path.join(data_dir, brand_info["file"])
+        file_path = brand_info["file"]
+        if file_path.startswith("data/"):
+            data_file = os.path.join(data_dir, file_path[5:])
+        else:
+            data_file = os.path.join(data_dir, file_path)
 
         if not os.path.exists(data_file):
             print(f"  Skipping {ticker}: file not found")
             continue
 
-        with open(data_file, "r") as f:
-            locations = json.load(f)
-
-        # Enrich with traffic data
-        for loc in locations:
-            if "at" not in loc:
-                loc["at"] = {}
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
 
-            lat = loc.get("lat")
-            lng = loc.get("lng")
+            located = [loc for loc in locations if loc.get("lat") is not None and loc.get("lng") is not None]
+            stale = tracker.pending(located)
+            if not stale:
+                print(f"  ✓ {ticker}: unchanged - skipped {len(locations)} locations")
+                continue
 
-            if lat is not None and lng is not None:
-                traffic_data = generate_traffic_data(lat, lng)
-                loc["at"].update(traffic_data)
+            # Enrich with traffic data, one distance matrix per brand
+            records = generate_traffic_data_batch(
+                [loc["lat"] for loc in stale],
+                [loc["lng"] for loc in stale]
+            )
+            for loc, traffic_data in zip(stale, records):
+                loc.setdefault("at", {}).update(traffic_data)
+                tracker.mark(loc)
 
-            total_enriched += 1
+            total_enriched += len(stale)
 
-        # Save enriched data
-        with open(data_file, "w") as f:
-            json.dump(locations, f, separators=(',', ':'))
+            # Save enriched data
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
 
         # Print sample for verification
         if locations:
@@ -357,6 +481,8 @@ def main():
             print(f"  ✓ {ticker}: {len(locations)} locations")
             print(f"    Sample: {area} with {traffic:,} AADT traffic")
 
+    tracker.save_stats()
+
     print(f"\n{'='*60}")
     print(f"Traffic data enrichment complete!")
     print(f"Total locations enriched: {total_enriched}")
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Administrative Boundary Index
+State, county, tract and block-group lookup from local Census TIGER/Line
+(or cartographic boundary) shapefiles.
+
+Setup:
+1. Download shapefiles from https://www.census.gov/cgi-bin/geo/shapefiles/
+   (e.g. tl_2023_us_state.zip, tl_2023_us_county.zip, tl_2023_06_tract.zip)
+2. Unzip them into FranchiseMap/data/tiger/
+3. Run: python boundary_index.py --rebuild
+
+How lookups work:
+Each level is compiled once into a uniform grid (data/boundary_index/).
+Cells that no boundary passes through store their owning feature directly,
+so most points resolve with a single binary search. Cells crossed by a
+boundary store the feature containing the cell centre plus the boundary
+edges inside the cell; a point is resolved by counting which of those
+edges the segment centre->point crosses. All of it runs on NumPy arrays in
+batch, so a million points resolve in a few seconds.
+
+When no shapefiles are available, state lookups fall back to approximate
+bounding boxes (smallest containing box wins) and return None on a miss.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spatial_grid import GridIndex, _concat_ranges
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+TIGER_DIR = os.path.join(DATA_DIR, "tiger")
+BOUNDARY_INDEX_DIR = os.path.join(DATA_DIR, "boundary_index")
+
+INDEX_VERSION = 1
+
+# Shapefile name fragment, grid cell size (degrees) and label field per level
+LEVELS = {
+    "state": {"pattern": "_us_state", "cell_deg": 0.1, "label_field": "STUSPS"},
+    "county": {"pattern": "_us_county", "cell_deg": 0.05, "label_field": "GEOID"},
+    "tract": {"pattern": "_tract", "cell_deg": 0.025, "label_field": "GEOID"},
+    "block_group": {"pattern": "_bg", "cell_deg": 0.025, "label_field": "GEOID"},
+}
+
+# Number of (point, edge) pairs tested per batch
+EDGE_PAIR_BLOCK_SIZE = 4_000_000
+
+# Map FIPS state codes to state abbreviations
+FIPS_TO_STATE = {
+    "01": "AL", "02": "AK", "04": "AZ", "05": "AR", "06": "CA", "08": "CO",
+    "09": "CT", "10": "DE", "12": "FL", "13": "GA", "15": "HI", "16": "ID",
+    "17": "IL", "18": "IN", "19": "IA", "20": "KS", "21": "KY", "22": "LA",
+    "23": "ME", "24": "MD", "25": "MA", "26": "MI", "27": "MN", "28": "MS",
+    "29": "MO", "30": "MT", "31": "NE", "32": "NV", "33": "NH", "34": "NJ",
+    "35": "NM", "36": "NY", "37": "NC", "38": "ND", "39": "OH", "40": "OK",
+    "41": "OR", "42": "PA", "44": "RI", "45": "SC", "46": "SD", "47": "TN",
+    "48": "TX", "49": "UT", "50": "VT", "51": "VA", "53": "WA", "54": "WV",
+    "55": "WI", "56": "WY", "11": "DC"
+}
+
+# Approximate state bounding boxes, used only when no shapefiles are present
+# Format: (state_code, min_lat, max_lat, min_lng, max_lng)
+STATE_BOUNDS = [
+    ("CA", 32.5, 42.0, -124.4, -114.1),
+    ("TX", 25.8, 36.5, -106.6, -93.5),
+    ("FL", 24.5, 30.7, -87.6, -80.0),
+    ("NY", 40.5, 45.0, -79.8, -71.8),
+    ("PA", 39.7, 42.3, -80.5, -74.7),
+    ("IL", 36.9, 42.5, -91.5, -87.0),
+    ("OH", 38.4, 42.0, -84.8, -80.5),
+    ("GA", 30.4, 35.0, -85.6, -80.8),
+    ("NC", 33.8, 36.6, -84.3, -75.4),
+    ("MI", 41.7, 48.3, -90.4, -83.4),
+    ("NJ", 38.9, 41.4, -75.6, -73.9),
+    ("VA", 36.5, 39.5, -83.7, -75.2),
+    ("WA", 45.6, 49.0, -124.7, -116.9),
+    ("AZ", 31.3, 37.0, -114.8, -109.0),
+    ("MA", 41.2, 42.9, -73.5, -69.9),
+    ("TN", 35.0, 36.7, -90.3, -81.6),
+    ("IN", 37.8, 41.8, -88.1, -84.8),
+    ("MO", 36.5, 40.6, -95.8, -89.1),
+    ("LA", 29.0, 33.0, -94.0, -88.8),
+    ("CO", 37.0, 41.0, -109.1, -102.0),
+    ("MN", 43.5, 49.4, -97.2, -89.5),
+    ("WI", 42.5, 47.3, -92.9, -86.8),
+    ("SC", 32.0, 34.8, -83.4, -78.5),
+    ("AL", 30.2, 35.0, -88.5, -84.9),
+    ("KY", 36.5, 39.1, -89.6, -81.9),
+    ("OR", 42.0, 46.3, -124.5, -116.5),
+    ("OK", 33.6, 37.0, -103.0, -94.4),
+    ("CT", 41.1, 42.1, -73.7, -71.8),
+    ("UT", 37.0, 42.0, -114.0, -109.0),
+    ("NV", 35.0, 42.0, -120.0, -114.6),
+    ("AR", 33.0, 36.5, -94.4, -89.6),
+    ("MS", 30.2, 34.8, -91.7, -88.1),
+    ("KS", 37.0, 40.0, -102.0, -94.6),
+    ("NM", 31.8, 37.0, -109.0, -103.0),
+    ("NE", 40.0, 43.0, -104.0, -95.3),
+    ("ID", 42.0, 49.0, -117.2, -111.0),
+    ("HI", 18.9, 22.2, -160.0, -154.8),
+    ("AK", 51.3, 71.4, -174.0, -130.0),
+    ("ME", 43.0, 47.5, -71.1, -66.9),
+    ("NH", 42.7, 45.3, -72.6, -70.7),
+    ("VT", 42.7, 45.1, -73.4, -71.5),
+    ("RI", 41.1, 42.0, -71.9, -71.1),
+    ("MT", 45.0, 49.0, -116.0, -104.0),
+    ("WY", 41.0, 45.0, -111.0, -104.0),
+    ("ND", 46.0, 49.0, -104.0, -96.6),
+    ("SD", 42.5, 45.9, -104.0, -96.4),
+    ("DE", 38.4, 39.8, -75.8, -75.0),
+    ("MD", 37.9, 39.7, -79.5, -75.0),
+    ("DC", 38.8, 38.9, -77.1, -77.0),
+    ("WV", 37.2, 40.6, -82.6, -77.7),
+]
+
+
+# ============================================================================
+# SHAPEFILE READING
+# ============================================================================
+
+def read_dbf(path: str) -> List[Dict[str, str]]:
+    """Read all records of a dBASE table as dicts of stripped strings."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    num_records, header_len, record_len = struct.unpack('<IHH', data[4:12])
+    fields = []
+    offset = 1  # Deletion flag
+    pos = 32
+    while data[pos] != 0x0D:
+        name = data[pos:pos + 11].split(b'\x00', 1)[0].decode('ascii')
+        length = data[pos + 16]
+        fields.append((name, offset, length))
+        offset += length
+        pos += 32
+
+    records = []
+    for i in range(num_records):
+        start = header_len + i * record_len
+        record = data[start:start + record_len]
+        records.append({
+            name: record[o:o + n].decode('latin-1').strip()
+            for name, o, n in fields
+        })
+    return records
+
+
+def read_shapefile(shp_path: str) -> Iterator[Tuple[Dict[str, str], List[np.ndarray]]]:
+    """
+    Stream (attributes, rings) for each polygon record of a shapefile.
+
+    Rings are (n, 2) arrays of (lng, lat). Outer rings and holes are both
+    returned; the even-odd crossing rule used by the index handles holes.
+    """
+    dbf_path = os.path.splitext(shp_path)[0] + '.dbf'
+    attributes = read_dbf(dbf_path) if os.path.exists(dbf_path) else []
+
+    with open(shp_path, 'rb') as f:
+        data = f.read()
+
+    pos = 100  # File header
+    record_num = 0
+    while pos + 8 <= len(data):
+        content_len = struct.unpack('>i', data[pos + 4:pos + 8])[0] * 2
+        content = data[pos + 8:pos + 8 + content_len]
+        pos += 8 + content_len
+
+        attrs = attributes[record_num] if record_num < len(attributes) else {}
+        record_num += 1
+
+        shape_type = struct.unpack('<i', content[:4])[0]
+        if shape_type not in (5, 15, 25):  # Polygon, PolygonZ, PolygonM
+            continue
+
+        num_parts, num_points = struct.unpack('<ii', content[36:44])
+        parts = np.frombuffer(content, dtype='<i4', count=num_parts, offset=44)
+        points = np.frombuffer(
+            content, dtype='<f8', count=2 * num_points, offset=44 + 4 * num_parts
+        ).reshape(-1, 2)
+
+        bounds = list(parts) + [num_points]
+        rings = [points[bounds[i]:bounds[i + 1]] for i in range(num_parts)]
+        yield attrs, [r for r in rings if len(r) >= 3]
+
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> np.ndarray:
+    """
+    True where segment A-B crosses segment C-D.
+
+    Zero orientations count as the negative side, so a segment passing
+    exactly through a shared ring vertex is counted consistently.
+    """
+    o1 = (dx - cx) * (ay - cy) - (dy - cy) * (ax - cx) > 0
+    o2 = (dx - cx) * (by - cy) - (dy - cy) * (bx - cx) > 0
+    o3 = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) > 0
+    o4 = (bx - ax) * (dy - ay) - (by - ay) * (dx - ax) > 0
+    return (o1 != o2) & (o3 != o4)
+
+
+def _row_owners(xs: np.ndarray, feats: np.ndarray) -> np.ndarray:
+    """
+    Given one scan line's edge crossings sorted by x, the feature owning
+    each stretch [xs[i], xs[i + 1]) of the line, -1 for none.
+    """
+    owners = np.empty(len(xs), dtype=np.int32)
+    inside = set()
+    for i, feat in enumerate(feats.tolist()):
+        if feat in inside:
+            inside.remove(feat)
+        else:
+            inside.add(feat)
+        owners[i] = min(inside) if inside else -1
+    return owners
+
+
+def _scan_rows(
+    edges: np.ndarray,
+    edge_feat: np.ndarray,
+    cell_deg: float
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Scan the centre line of every grid row and yield (row, xs, owners) for
+    rows that cross at least one edge (see _row_owners).
+
+    Each edge is bucketed once into the rows whose centre lines it spans,
+    so the cost grows with the number of crossings rather than rows x edges.
+    """
+    lo = np.minimum(edges[:, 1], edges[:, 3])
+    hi = np.maximum(edges[:, 1], edges[:, 3])
+
+    # Candidate rows per edge, one wider on each side to absorb rounding;
+    # the exact test below uses the same y as a per-row scan would
+    row_a = np.floor((lo + 90.0) / cell_deg - 0.5).astype(np.int64)
+    row_b = np.ceil((hi + 90.0) / cell_deg - 0.5).astype(np.int64)
+    counts = row_b - row_a + 1
+    pair_edge = np.repeat(np.arange(len(edges)), counts)
+    pair_row = row_a[pair_edge] + (
+        np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    )
+    y = (pair_row + 0.5) * cell_deg - 90.0
+    crosses = (lo[pair_edge] <= y) & (hi[pair_edge] > y)
+    pair_edge, pair_row, y = pair_edge[crosses], pair_row[crosses], y[crosses]
+
+    e = edges[pair_edge]
+    xs = e[:, 0] + (y - e[:, 1]) * (e[:, 2] - e[:, 0]) / (e[:, 3] - e[:, 1])
+    order = np.lexsort((xs, pair_row))
+    pair_row, xs, feats = pair_row[order], xs[order], edge_feat[pair_edge[order]]
+
+    rows, starts = np.unique(pair_row, return_index=True)
+    ends = np.append(starts[1:], len(pair_row))
+    for row, start, end in zip(rows.tolist(), starts, ends):
+        yield row, xs[start:end], _row_owners(xs[start:end], feats[start:end])
+
+
+def compile_level(
+    shp_paths: Sequence[str],
+    label_field: str,
+    cell_deg: float,
+    out_dir: str
+) -> Dict:
+    """Compile one boundary level into grid arrays under `out_dir`."""
+    labels: List[str] = []
+    edge_parts, feat_parts = [], []
+
+    for shp_path in shp_paths:
+        for attrs, rings in read_shapefile(shp_path):
+            feat = len(labels)
+            label = attrs.get(label_field) or attrs.get('GEOID', '')
+            if label_field == 'STUSPS' and not attrs.get('STUSPS'):
+                label = FIPS_TO_STATE.get(attrs.get('STATEFP', ''), label)
+            labels.append(label)
+            for ring in rings:
+                closed = ring if np.array_equal(ring[0], ring[-1]) else np.vstack([ring, ring[:1]])
+                edge_parts.append(np.hstack([closed[:-1], closed[1:]]))
+                feat_parts.append(np.full(len(closed) - 1, feat, dtype=np.int32))
+
+    edges = np.vstack(edge_parts) if edge_parts else np.zeros((0, 4))
+    edge_feat = np.concatenate(feat_parts) if feat_parts else np.zeros(0, dtype=np.int32)
+    # Horizontal edges never cross a scan line or change parity
+    keep = edges[:, 1] != edges[:, 3]
+    keep |= edges[:, 0] != edges[:, 2]
+    edges, edge_feat = edges[keep], edge_feat[keep]
+
+    n_cols = int(np.ceil(360.0 / cell_deg)) + 1
+
+    # Every cell overlapped by an edge's bounding box is a boundary cell
+    r0, c0 = GridIndex.cell_rows_cols(
+        np.minimum(edges[:, 1], edges[:, 3]), np.minimum(edges[:, 0], edges[:, 2]), cell_deg)
+    r1, c1 = GridIndex.cell_rows_cols(
+        np.maximum(edges[:, 1], edges[:, 3]), np.maximum(edges[:, 0], edges[:, 2]), cell_deg)
+    n_r, n_c = r1 - r0 + 1, c1 - c0 + 1
+    counts = n_r * n_c
+    pair_edge = np.repeat(np.arange(len(edges)), counts)
+    local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_row = r0[pair_edge] + local // n_c[pair_edge]
+    pair_col = c0[pair_edge] + local % n_c[pair_edge]
+    pair_key = pair_row * n_cols + pair_col
+
+    order = np.argsort(pair_key, kind='stable')
+    pair_key, pair_edge = pair_key[order], pair_edge[order]
+    boundary_keys, boundary_counts = np.unique(pair_key, return_counts=True)
+
+    # Scan each grid row's centre line to find the feature owning every
+    # cell centre (and so every cell no boundary passes through)
+    interior_keys, interior_owner = [], []
+    if len(edges):
+        for row, xs, owners in _scan_rows(edges, edge_feat, cell_deg):
+            if len(xs) < 2:
+                continue
+            spans = np.nonzero(owners[:-1] >= 0)[0]
+            col_start = np.ceil((xs[spans] + 180.0) / cell_deg - 0.5).astype(np.int64)
+            col_end = np.ceil((xs[spans + 1] + 180.0) / cell_deg - 0.5).astype(np.int64)
+            col_end = np.maximum(col_end, col_start)
+            cols = _concat_ranges(col_start, col_end)
+            interior_keys.append(row * n_cols + cols)
+            interior_owner.append(np.repeat(owners[spans], col_end - col_start))
+
+    interior_keys = np.concatenate(interior_keys) if interior_keys else np.zeros(0, dtype=np.int64)
+    interior_owner = np.concatenate(interior_owner) if interior_owner else np.zeros(0, dtype=np.int32)
+
+    cell_keys = np.union1d(interior_keys, boundary_keys).astype(np.int64)
+    cell_ref = np.full(len(cell_keys), -1, dtype=np.int32)
+    cell_ref[np.searchsorted(cell_keys, interior_keys)] = interior_owner
+    cell_counts = np.zeros(len(cell_keys), dtype=np.int64)
+    cell_counts[np.searchsorted(cell_keys, boundary_keys)] = boundary_counts
+    cell_edge_starts = np.zeros(len(cell_keys) + 1, dtype=np.int64)
+    np.cumsum(cell_counts, out=cell_edge_starts[1:])
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'cell_keys.npy'), cell_keys)
+    np.save(os.path.join(out_dir, 'cell_ref.npy'), cell_ref)
+    np.save(os.path.join(out_dir, 'cell_edge_starts.npy'), cell_edge_starts)
+    np.save(os.path.join(out_dir, 'edges.npy'), edges[pair_edge])
+    np.save(os.path.join(out_dir, 'edge_feat.npy'), edge_feat[pair_edge])
+    np.save(os.path.join(out_dir, 'labels.npy'), np.array(labels, dtype=str))
+
+    return {
+        'cellDeg': cell_deg,
+        'features': len(labels),
+        'cells': int(len(cell_keys)),
+        'boundaryCells': int(len(boundary_keys)),
+    }
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class BoundaryIndex:
+    """Compiled, memory-mapped boundary lookup for one level."""
+
+    def __init__(self, index_dir: str, metadata: Dict):
+        self.index_dir = index_dir
+        self.metadata = metadata
+        self.cell_deg = metadata['cellDeg']
+        self.n_cols = int(np.ceil(360.0 / self.cell_deg)) + 1
+
+        def load(name):
+            return np.load(os.path.join(index_dir, name), mmap_mode='r')
+
+        self.cell_keys = load('cell_keys.npy')
+        self.cell_ref = load('cell_ref.npy')
+        self.cell_edge_starts = load('cell_edge_starts.npy')
+        self.edges = load('edges.npy')
+        self.edge_feat = load('edge_feat.npy')
+        self.labels = np.load(os.path.join(index_dir, 'labels.npy'))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def lookup_indices(self, lats, lngs) -> np.ndarray:
+        """Feature index containing each point, -1 where none does."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int32)
+        if len(lats) == 0 or len(self.cell_keys) == 0:
+            return result
+
+        rows, cols = GridIndex.cell_rows_cols(lats, lngs, self.cell_deg)
+        keys = rows * self.n_cols + cols
+        pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = np.asarray(self.cell_keys)[pos] == keys
+
+        ref = np.where(found, np.asarray(self.cell_ref)[pos], -1).astype(np.int32)
+        starts = np.asarray(self.cell_edge_starts)[pos]
+        ends = np.asarray(self.cell_edge_starts)[pos + 1]
+        boundary = found & (ends > starts)
+        result[~boundary] = ref[~boundary]
+
+        # Boundary cells: flip membership for every edge the segment from
+        # the cell centre to the point crosses
+        points = np.nonzero(boundary)[0]
+        if len(points) == 0:
+            return result
+
+        pair_counts = ends[points] - starts[points]
+        cum = np.cumsum(pair_counts)
+        bounds = [0] + list(np.searchsorted(cum, np.arange(EDGE_PAIR_BLOCK_SIZE, cum[-1], EDGE_PAIR_BLOCK_SIZE), side='right')) + [len(points)]
+        n_feat = max(len(self.labels), 1)
+
+        for b0, b1 in zip(bounds[:-1], bounds[1:]):
+            if b1 <= b0:
+                continue
+            chunk = points[b0:b1]
+            counts = pair_counts[b0:b1]
+            pair_point = np.repeat(chunk, counts)
+            pair_edge = _concat_ranges(starts[chunk], ends[chunk])
+            e = np.asarray(self.edges[pair_edge])
+
+            cx = (cols[pair_point] + 0.5) * self.cell_deg - 180.0
+            cy = (rows[pair_point] + 0.5) * self.cell_deg - 90.0
+            crossed = _segments_cross(
+                e[:, 0], e[:, 1], e[:, 2], e[:, 3],
+                cx, cy, lngs[pair_point], lats[pair_point]
+            )
+
+            toggle_key = pair_point[crossed].astype(np.int64) * n_feat + np.asarray(self.edge_feat)[pair_edge[crossed]]
+            toggled, toggle_counts = np.unique(toggle_key, return_counts=True)
+            toggled = toggled[toggle_counts % 2 == 1]
+            t_point, t_feat = toggled // n_feat, (toggled % n_feat).astype(np.int32)
+
+            chunk_result = ref[chunk].copy()
+            left_ref = t_feat == ref[t_point]
+            result_pos = np.searchsorted(chunk, t_point)
+            chunk_result[result_pos[left_ref]] = -1
+            entered = ~left_ref
+            unresolved = chunk_result[result_pos[entered]] < 0
+            chunk_result[result_pos[entered][unresolved]] = t_feat[entered][unresolved]
+            result[chunk] = chunk_result
+
+        return result
+
+    def lookup(self, lats, lngs) -> List[Optional[str]]:
+        """Label (GEOID or state code) containing each point, None on a miss."""
+        indices = self.lookup_indices(lats, lngs)
+        return [str(self.labels[i]) if i >= 0 else None for i in indices]
+
+
+def find_shapefiles(level: str, tiger_dir: str = TIGER_DIR) -> List[str]:
+    """All shapefiles under `tiger_dir` for a level."""
+    pattern = LEVELS[level]['pattern']
+    if not os.path.isdir(tiger_dir):
+        return []
+    paths = []
+    for root, _, files in os.walk(tiger_dir):
+        for name in files:
+            if name.lower().endswith('.shp') and pattern in name.lower():
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _source_fingerprint(paths: Sequence[str]) -> str:
+    """Hash of the shapefile set (names, sizes and mtimes)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        for p in (path, os.path.splitext(path)[0] + '.dbf'):
+            if os.path.exists(p):
+                st = os.stat(p)
+                digest.update(f"{os.path.basename(p)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+_INDEX_CACHE: Dict[Tuple[str, str], Optional[BoundaryIndex]] = {}
+
+
+def open_boundary_index(
+    level: str,
+    tiger_dir: str = TIGER_DIR,
+    index_dir: str = BOUNDARY_INDEX_DIR,
+    rebuild: bool = False,
+    verbose: bool = False
+) -> Optional[BoundaryIndex]:
+    """
+    Open the compiled index for a level, compiling it first if the
+    shapefiles changed. Returns None when no shapefiles are available.
+    """
+    cache_key = (level, os.path.abspath(index_dir))
+    if cache_key in _INDEX_CACHE and not rebuild:
+        return _INDEX_CACHE[cache_key]
+
+    level_dir = os.path.join(index_dir, level)
+    metadata_path = os.path.join(level_dir, 'index.json')
+    shp_paths = find_shapefiles(level, tiger_dir)
+
+    metadata = None
+    if os.path.exists(metadata_path):
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+
+    if not shp_paths:
+        # Allow shipping a compiled index without the raw shapefiles
+        index = BoundaryIndex(level_dir, metadata) if metadata and not rebuild else None
+        _INDEX_CACHE[cache_key] = index
+        return index
+
+    fingerprint = _source_fingerprint(shp_paths)
+    if (
+        rebuild or metadata is None
+        or metadata.get('version') != INDEX_VERSION
+        or metadata.get('source') != fingerprint
+    ):
+        if verbose:
+            print(f"   Compiling {level} boundaries from {len(shp_paths)} shapefile(s)...")
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        info = compile_level(shp_paths, LEVELS[level]['label_field'], LEVELS[level]['cell_deg'], level_dir)
+        metadata = {'version': INDEX_VERSION, 'level': level, 'source': fingerprint, **info}
+        tmp_path = metadata_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, metadata_path)
+        if verbose:
+            print(f"   ✓ {level}: {info['features']:,} features, {info['cells']:,} cells")
+
+    index = BoundaryIndex(level_dir, metadata)
+    _INDEX_CACHE[cache_key] = index
+    return index
+
+
+# ============================================================================
+# STATE LOOKUP (shared by the enrichment scripts)
+# ============================================================================
+
+def _bbox_states(lats: np.ndarray, lngs: np.ndarray) -> List[Optional[str]]:
+    """Approximate states from bounding boxes; the smallest containing box wins."""
+    codes = [b[0] for b in STATE_BOUNDS]
+    bounds = np.array([b[1:] for b in STATE_BOUNDS])
+    areas = (bounds[:, 1] - bounds[:, 0]) * (bounds[:, 3] - bounds[:, 2])
+    by_area = np.argsort(areas, kind='stable')
+    bounds = bounds[by_area]
+
+    inside = (
+        (lats[:, None] >= bounds[None, :, 0]) & (lats[:, None] <= bounds[None, :, 1])
+        & (lngs[:, None] >= bounds[None, :, 2]) & (lngs[:, None] <= bounds[None, :, 3])
+    )
+    first = np.argmax(inside, axis=1)
+    hit = inside[np.arange(len(lats)), first]
+    return [codes[by_area[f]] if h else None for f, h in zip(first, hit)]
+
+
+def lookup_states(lats: Sequence[float], lngs: Sequence[float]) -> List[Optional[str]]:
+    """
+    State codes for a batch of coordinates (None where no state contains
+    the point). Uses the state shapefile index, then the county index, then
+    the bounding-box approximation.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+
+    state_index = open_boundary_index('state')
+    if state_index is not None:
+        return state_index.lookup(lats, lngs)
+
+    county_index = open_boundary_index('county')
+    if county_index is not None:
+        return [
+            FIPS_TO_STATE.get(geoid[:2]) if geoid else None
+            for geoid in county_index.lookup(lats, lngs)
+        ]
+
+    return _bbox_states(lats, lngs)
+
+
+def lookup_location_states(locations: Sequence[Dict]) -> Dict[int, Optional[str]]:
+    """
+    Resolve the state of every location (dicts with lat/lng) in one batch.
+
+    Returns:
+        Dict mapping id(location) -> state code, None where no state
+        contains the point
+    """
+    states = lookup_states(
+        [loc["lat"] for loc in locations],
+        [loc["lng"] for loc in locations]
+    )
+    return {id(loc): state for loc, state in zip(locations, states)}
+
+
+def lookup_version() -> str:
+    """Identifies the data behind lookup_states (for provenance fingerprints)."""
+    for level in ('state', 'county'):
+        index = open_boundary_index(level)
+        if index is not None:
+            return f"{level}:{index.metadata.get('source', '')}"
+    return f"bbox:v{INDEX_VERSION}"
+
+
+def estimate_state_from_coords(lat: float, lng: float) -> Optional[str]:
+    """State code for one coordinate, or None if it isn't in any state."""
+    return lookup_states([lat], [lng])[0]
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile TIGER boundary indexes")
+    parser.add_argument("--tiger-dir", type=str, default=TIGER_DIR, help="Directory with TIGER shapefiles")
+    parser.add_argument("--index-dir", type=str, default=BOUNDARY_INDEX_DIR, help="Compiled index directory")
+    parser.add_argument("--rebuild", action="store_true", help="Recompile every level")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("BOUNDARY INDEX COMPILER")
+    print("="*70)
+
+    for level in LEVELS:
+        index = open_boundary_index(level, args.tiger_dir, args.index_dir, args.rebuild, verbose=True)
+        if index is None:
+            print(f"   - {level}: no shapefiles in {args.tiger_dir}")
+        else:
+            print(f"   ✓ {level}: {len(index):,} features")
+
+
+if __name__ == "__main__":
+    main()
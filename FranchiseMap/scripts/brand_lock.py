@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Brand File Locks
+Serializes read-modify-write cycles on brand files.
+
+run_data_aggregation.py runs independent enrichment stages concurrently,
+and every stage rewrites the same data/brands/*.json files. Each stage
+holds the brand's lock from loading the file until it has saved it, so
+one stage never overwrites attributes another stage just wrote.
+
+Locks are advisory fcntl locks on files in data/locks/ (one per brand
+file). Where fcntl is unavailable (Windows), LOCKING_SUPPORTED is False
+and the pipeline runs its stages one at a time instead.
+
+Usage:
+    with brand_file_lock(data_file):
+        with open(data_file) as f:
+            locations = json.load(f)
+        ...
+        with open(data_file, "w") as f:
+            json.dump(locations, f)
+"""
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+LOCK_DIR = os.path.join(DATA_DIR, "locks")
+
+LOCKING_SUPPORTED = fcntl is not None
+
+
+@contextmanager
+def brand_file_lock(path: str, lock_dir: str = LOCK_DIR):
+    """Hold an exclusive lock on a brand file for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    lock_path = os.path.join(lock_dir, os.path.basename(path) + ".lock")
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Closing the descriptor releases the lock
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Census ACS Warehouse
+Local columnar copy of ACS 5-Year estimates for every state, tract and
+block group, so census enrichment is a batch join against local files
+instead of two HTTP requests per location.
+
+Tables live in data/census_warehouse/<geography>/ as one .npy column per
+variable plus a sorted geoid.npy and a table.json manifest. Missing or
+suppressed estimates (the Census API's negative sentinels) are NaN.
+
+Setup:
+    # Bulk download (one request per state, needs CENSUS_API_KEY)
+    python census_warehouse.py --geography state
+    python census_warehouse.py --geography tract
+
+    # Or import a local summary file (data.census.gov CSV export)
+    python census_warehouse.py --geography tract --import-csv acs_tracts.csv
+
+Set CENSUS_API_BASE to point downloads at a different endpoint (e.g. a
+local stand-in server).
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from boundary_index import FIPS_TO_STATE
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+WAREHOUSE_DIR = os.path.join(DATA_DIR, "census_warehouse")
+
+CENSUS_API_KEY = os.environ.get("CENSUS_API_KEY", "")
+ACS_API_BASE = os.environ.get("CENSUS_API_BASE", "https://api.census.gov/data/2021/acs/acs5")
+
+TABLE_VERSION = 1
+TABLE_FILE = "table.json"
+
+GEOGRAPHIES = ("state", "tract", "block_group")
+
+# Concurrent per-state requests during a bulk download
+DOWNLOAD_WORKERS = 4
+MAX_RETRIES = 3
+
+
+# ============================================================================
+# DOWNLOAD / IMPORT
+# ============================================================================
+
+def _geography_params(geography: str, state_fips: Optional[str]) -> Dict[str, str]:
+    """Census API `for`/`in` parameters for one request."""
+    if geography == "state":
+        return {"for": "state:*"}
+    if geography == "tract":
+        return {"for": "tract:*", "in": f"state:{state_fips}"}
+    if geography == "block_group":
+        return {"for": "block group:*", "in": f"state:{state_fips} county:* tract:*"}
+    raise ValueError(f"Unknown geography: {geography}")
+
+
+def _row_geoid(row: Dict[str, str]) -> str:
+    """GEOID from the geography columns of an API row."""
+    return (
+        row.get("state", "") + row.get("county", "")
+        + row.get("tract", "") + row.get("block group", "")
+    )
+
+
+def _parse_estimate(value) -> float:
+    """Estimate as float; NaN for blanks and the API's negative sentinels."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return number if number >= 0 else np.nan
+
+
+def _fetch_rows(
+    geography: str,
+    variables: Sequence[str],
+    state_fips: Optional[str],
+    api_base: str,
+    api_key: str
+) -> List[Dict[str, str]]:
+    """One Census API request, returned as a list of row dicts."""
+    params = {"get": ",".join(variables), **_geography_params(geography, state_fips)}
+    if api_key:
+        params["key"] = api_key
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = requests.get(api_base, params=params, timeout=60)
+            if response.status_code == 204:
+                return []  # No geographies of this type in the state
+            if response.status_code == 200:
+                data = response.json()
+                header = data[0]
+                return [dict(zip(header, values)) for values in data[1:]]
+        except (requests.RequestException, ValueError):
+            pass
+        time.sleep(2 ** attempt)
+
+    raise RuntimeError(f"Census API request failed for {geography} state={state_fips}")
+
+
+def download_acs(
+    geography: str,
+    variables: Sequence[str],
+    api_base: str = ACS_API_BASE,
+    api_key: str = CENSUS_API_KEY,
+    states: Optional[Sequence[str]] = None,
+    verbose: bool = True
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Bulk-download variables for every geography of a type.
+
+    States are fetched concurrently (one request each); returns
+    (geoids, columns) ready for `write_table`.
+    """
+    if geography == "state":
+        batches = [None]
+    else:
+        batches = sorted(states or FIPS_TO_STATE.keys())
+
+    def fetch(state_fips):
+        rows = _fetch_rows(geography, variables, state_fips, api_base, api_key)
+        if verbose and state_fips:
+            print(f"   ✓ {FIPS_TO_STATE.get(state_fips, state_fips)}: {len(rows):,} {geography}s")
+        return rows
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        results = list(pool.map(fetch, batches))
+
+    rows = [row for batch in results for row in batch]
+    geoids = [_row_geoid(row) for row in rows]
+    columns = {
+        var: np.array([_parse_estimate(row.get(var)) for row in rows], dtype=np.float64)
+        for var in variables
+    }
+    return geoids, columns
+
+
+def import_csv(path: str, variables: Optional[Sequence[str]] = None) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Read a local summary file into (geoids, columns).
+
+    Accepts a GEOID column or a data.census.gov GEO_ID column
+    (e.g. 1400000US06037101110). Every other column matching a requested
+    variable (or every column, if none are given) is imported.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        geo_field = "GEOID" if "GEOID" in fields else "GEO_ID"
+        if geo_field not in fields:
+            raise ValueError(f"{path}: no GEOID or GEO_ID column")
+
+        wanted = [v for v in (variables or fields) if v in fields and v != geo_field]
+        geoids: List[str] = []
+        values: Dict[str, List[float]] = {var: [] for var in wanted}
+        for row in reader:
+            geoid = row[geo_field].strip()
+            if "US" in geoid:
+                geoid = geoid.split("US", 1)[1]
+            if not geoid.isdigit():
+                continue  # data.census.gov exports carry a label row
+            geoids.append(geoid)
+            for var in wanted:
+                values[var].append(_parse_estimate(row.get(var)))
+
+    return geoids, {var: np.array(vals, dtype=np.float64) for var, vals in values.items()}
+
+
+def write_table(
+    geography: str,
+    geoids: Sequence[str],
+    columns: Dict[str, np.ndarray],
+    warehouse_dir: str = WAREHOUSE_DIR,
+    source: str = ""
+) -> Dict:
+    """Write a geography table (sorted by GEOID); the manifest is written last."""
+    table_dir = os.path.join(warehouse_dir, geography)
+    os.makedirs(table_dir, exist_ok=True)
+    manifest_path = os.path.join(table_dir, TABLE_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    geoid_array = np.array(geoids, dtype=str)
+    order = np.argsort(geoid_array, kind="stable")
+    np.save(os.path.join(table_dir, "geoid.npy"), geoid_array[order])
+    for var, column in columns.items():
+        np.save(os.path.join(table_dir, f"{var}.npy"), np.asarray(column, dtype=np.float64)[order])
+
+    manifest = {
+        "version": TABLE_VERSION,
+        "geography": geography,
+        "rows": int(len(geoid_array)),
+        "variables": list(columns),
+        "source": source,
+        "builtAt": datetime.now().isoformat(),
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+# ============================================================================
+# WAREHOUSE
+# ============================================================================
+
+class CensusWarehouse:
+    """Memory-mapped ACS table for one geography, keyed by GEOID."""
+
+    def __init__(self, table_dir: str, manifest: Dict):
+        self.table_dir = table_dir
+        self.manifest = manifest
+        self.geography = manifest["geography"]
+        self.geoids = np.load(os.path.join(table_dir, "geoid.npy"))
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.geoids)
+
+    @property
+    def variables(self) -> List[str]:
+        return self.manifest["variables"]
+
+    def column(self, variable: str) -> np.ndarray:
+        if variable not in self._columns:
+            path = os.path.join(self.table_dir, f"{variable}.npy")
+            self._columns[variable] = np.load(path, mmap_mode="r")
+        return self._columns[variable]
+
+    def rows_for(self, geoids: Sequence[Optional[str]]) -> np.ndarray:
+        """Row of each GEOID in the table, -1 where missing."""
+        keys = np.array([g or "" for g in geoids], dtype=str)
+        if len(self.geoids) == 0 or len(keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.geoids, keys), len(self.geoids) - 1)
+        return np.where(self.geoids[pos] == keys, pos, -1)
+
+    def values_for(
+        self,
+        geoids: Sequence[Optional[str]],
+        variables: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Columns for a batch of GEOIDs; NaN where a GEOID is missing."""
+        rows = self.rows_for(geoids)
+        found = rows >= 0
+        result = {}
+        for var in variables or self.variables:
+            if var not in self.variables:
+                continue
+            values = np.full(len(rows), np.nan)
+            values[found] = np.asarray(self.column(var))[rows[found]]
+            result[var] = values
+        return result
+
+
+def open_warehouse(geography: str, warehouse_dir: str = WAREHOUSE_DIR) -> Optional[CensusWarehouse]:
+    """Open a geography table, or None if it hasn't been built."""
+    table_dir = os.path.join(warehouse_dir, geography)
+    manifest_path = os.path.join(table_dir, TABLE_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != TABLE_VERSION:
+        return None
+    return CensusWarehouse(table_dir, manifest)
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    from integrate_census_api import CENSUS_VARIABLES
+
+    parser = argparse.ArgumentParser(description="Build the local Census ACS warehouse")
+    parser.add_argument("--geography", choices=GEOGRAPHIES, default="tract", help="Geography to build")
+    parser.add_argument("--import-csv", type=str, default=None, help="Import a local summary CSV instead of downloading")
+    parser.add_argument("--states", type=str, default=None, help="Comma-separated state FIPS codes to download")
+    parser.add_argument("--warehouse-dir", type=str, default=WAREHOUSE_DIR, help="Warehouse directory")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("CENSUS ACS WAREHOUSE")
+    print("="*70)
+
+    variables = list(CENSUS_VARIABLES)
+    start = time.time()
+
+    if args.import_csv:
+        print(f"Importing {args.import_csv}...")
+        geoids, columns = import_csv(args.import_csv, variables)
+        source = os.path.basename(args.import_csv)
+    else:
+        if not CENSUS_API_KEY and ACS_API_BASE.startswith("https://api.census.gov"):
+            print("ERROR: CENSUS_API_KEY environment variable not set")
+            print("Get free API key at https://api.census.gov/data/key_signup.html")
+            return
+        print(f"Downloading {len(variables)} variables for every {args.geography} from {ACS_API_BASE}")
+        states = args.states.split(",") if args.states else None
+        geoids, columns = download_acs(args.geography, variables, states=states)
+        source = ACS_API_BASE
+
+    manifest = write_table(args.geography, geoids, columns, args.warehouse_dir, source)
+    print(f"\n✓ {manifest['rows']:,} {args.geography} rows, {len(manifest['variables'])} variables")
+    print(f"  Saved to {os.path.join(args.warehouse_dir, args.geography)} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
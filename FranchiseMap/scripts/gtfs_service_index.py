@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+GTFS Transit Service Index
+Aggregates average weekday departures per stop from each feed's
+stop_times.txt, trips.txt and calendar.txt, so transit scores reflect how
+much service a location actually has rather than just how close the
+nearest stop is.
+
+stop_times.txt is streamed row by row straight out of the feed zip, so
+memory stays bounded by the number of trips and stops, not by the size of
+the file (the largest US feeds ship several hundred MB of stop_times).
+
+Each feed is scored on one reference week of service (the current week,
+moved inside the feed's calendar period), so only services active that
+week count. Departures are cached per feed hash under the stop store
+directory (data/gtfs_store/service/) and only recomputed for feeds that
+changed or moved to another reference week; the array aligned to store
+rows is cached there too, so an unchanged run does not touch stop_ids.
+
+Usage:
+    python gtfs_service_index.py              # Build or refresh the index
+"""
+
+import csv
+import json
+import os
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from gtfs_stop_store import GTFS_DIR, GTFS_STORE_DIR, GTFSStopStore, list_feeds, open_feed_file, open_stop_store
+
+SERVICE_DIR_NAME = "service"
+SERVICE_VERSION = 2
+ALIGNED_FILE = "departures"
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+WEEKDAYS = DAYS[:5]
+
+# Service is weighted over one week inside the feed's active period
+REFERENCE_DAYS = 7
+
+# Walking radius used to count departures around a location
+WALKING_RADIUS_MILES = 0.5
+
+
+# ============================================================================
+# STREAMING FEED AGGREGATION
+# ============================================================================
+
+def _csv_rows(path: str, filename: str):
+    """Open a feed table as (file, columns, reader); all None if missing."""
+    f = open_feed_file(path, filename)
+    if f is None:
+        return None, None, None
+    reader = csv.reader(f)
+    header = next(reader, None) or []
+    columns = {name.strip(): i for i, name in enumerate(header)}
+    return f, columns, reader
+
+
+def _parse_gtfs_date(value: str) -> Optional[date]:
+    try:
+        return datetime.strptime(value.strip(), '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+def read_service_calendar(path: str) -> Tuple[Dict[str, Tuple], Dict[str, Dict[date, bool]]]:
+    """
+    Read a feed's service calendar.
+
+    Returns:
+        (weekly, exceptions): weekly maps service_id -> (start_date,
+        end_date, seven Mon..Sun day flags) from calendar.txt; exceptions
+        maps service_id -> {date: added} from calendar_dates.txt.
+    """
+    weekly: Dict[str, Tuple] = {}
+    exceptions: Dict[str, Dict[date, bool]] = {}
+
+    f, columns, reader = _csv_rows(path, 'calendar.txt')
+    if f is not None:
+        with f:
+            sid_col = columns.get('service_id')
+            day_cols = [columns.get(day) for day in DAYS]
+            start_col = columns.get('start_date')
+            end_col = columns.get('end_date')
+            if sid_col is not None:
+                for row in reader:
+                    if sid_col >= len(row):
+                        continue
+                    days = tuple(
+                        c is not None and c < len(row) and row[c].strip() == '1'
+                        for c in day_cols
+                    )
+                    start = end = None
+                    if start_col is not None and start_col < len(row):
+                        start = _parse_gtfs_date(row[start_col])
+                    if end_col is not None and end_col < len(row):
+                        end = _parse_gtfs_date(row[end_col])
+                    weekly[row[sid_col]] = (start, end, days)
+
+    f, columns, reader = _csv_rows(path, 'calendar_dates.txt')
+    if f is not None:
+        with f:
+            sid_col = columns.get('service_id')
+            date_col = columns.get('date')
+            type_col = columns.get('exception_type')
+            if None not in (sid_col, date_col, type_col):
+                for row in reader:
+                    try:
+                        exception_type = row[type_col].strip()
+                        day = _parse_gtfs_date(row[date_col])
+                        service_id = row[sid_col]
+                    except IndexError:
+                        continue
+                    if day is None or exception_type not in ('1', '2'):
+                        continue
+                    exceptions.setdefault(service_id, {})[day] = exception_type == '1'
+
+    return weekly, exceptions
+
+
+def service_period(weekly: Dict[str, Tuple], exceptions: Dict[str, Dict[date, bool]]) -> Optional[Tuple[date, date]]:
+    """First and last date the feed defines service for, or None."""
+    days = [d for start, end, _ in weekly.values() for d in (start, end) if d is not None]
+    days.extend(d for dates in exceptions.values() for d in dates)
+    if not days:
+        return None
+    return min(days), max(days)
+
+
+def reference_window(period: Optional[Tuple[date, date]], today: Optional[date] = None) -> Optional[date]:
+    """
+    First day of the week of service the feed is scored on.
+
+    The current week (from Monday), moved inside the feed's period when
+    the feed has not started yet or has already expired.
+    """
+    if period is None:
+        return None
+    today = today or date.today()
+    first, last = period
+    start = today - timedelta(days=today.weekday())
+    start = min(start, last - timedelta(days=REFERENCE_DAYS - 1))
+    return max(start, first)
+
+
+def read_service_weights(
+    path: str,
+    today: Optional[date] = None
+) -> Tuple[Dict[str, float], Optional[Tuple[date, date]]]:
+    """
+    Fraction of weekdays each service_id runs in the reference week
+    (1.0 = every weekday).
+
+    Only dates inside a service's calendar.txt start_date/end_date count,
+    and calendar_dates.txt additions and removals override the day flags,
+    so feeds that publish one service_id per season are not counted once
+    per season.
+
+    Returns:
+        (weights, period) where period is the feed's service period
+    """
+    weekly, exceptions = read_service_calendar(path)
+    period = service_period(weekly, exceptions)
+    start = reference_window(period, today)
+    if start is None:
+        return {}, None
+
+    weekdays = [
+        day for day in (start + timedelta(days=i) for i in range(REFERENCE_DAYS))
+        if day.weekday() < 5
+    ]
+    weights: Dict[str, float] = {}
+    for service_id in set(weekly) | set(exceptions):
+        rule = weekly.get(service_id)
+        added = exceptions.get(service_id, {})
+        active = 0
+        for day in weekdays:
+            if day in added:
+                active += added[day]
+            elif rule is not None:
+                first, last, days = rule
+                active += (
+                    days[day.weekday()]
+                    and (first is None or first <= day)
+                    and (last is None or day <= last)
+                )
+        if active:
+            weights[service_id] = active / len(WEEKDAYS)
+
+    return weights, period
+
+
+def read_trip_weights(path: str, service_weights: Dict[str, float]) -> Dict[str, float]:
+    """Map trip_id -> weekday weight of the trip's service."""
+    trip_weights: Dict[str, float] = {}
+
+    f, columns, reader = _csv_rows(path, 'trips.txt')
+    if f is None:
+        return trip_weights
+
+    with f:
+        trip_col = columns.get('trip_id')
+        sid_col = columns.get('service_id')
+        if trip_col is None or sid_col is None:
+            return trip_weights
+        for row in reader:
+            try:
+                weight = service_weights.get(row[sid_col], 0.0)
+            except IndexError:
+                continue
+            if weight > 0:
+                trip_weights[row[trip_col]] = weight
+
+    return trip_weights
+
+
+def stream_stop_departures(path: str, trip_weights: Dict[str, float]) -> Dict[str, float]:
+    """
+    Stream stop_times.txt and sum average weekday departures per stop_id.
+
+    Rows flagged pickup_type=1 (no pickup) are not departures.
+    """
+    departures: Dict[str, float] = {}
+
+    f, columns, reader = _csv_rows(path, 'stop_times.txt')
+    if f is None:
+        return departures
+
+    with f:
+        trip_col = columns.get('trip_id')
+        stop_col = columns.get('stop_id')
+        pickup_col = columns.get('pickup_type')
+        if trip_col is None or stop_col is None:
+            return departures
+
+        get_weight = trip_weights.get
+        for row in reader:
+            try:
+                weight = get_weight(row[trip_col])
+                if not weight:
+                    continue
+                if pickup_col is not None and row[pickup_col] == '1':
+                    continue
+                stop_id = row[stop_col]
+            except IndexError:
+                continue
+            departures[stop_id] = departures.get(stop_id, 0.0) + weight
+
+    return departures
+
+
+def compute_feed_departures(
+    path: str,
+    today: Optional[date] = None
+) -> Tuple[Dict[str, float], Optional[Tuple[date, date]]]:
+    """Average weekday departures per stop_id for one feed, plus its service period."""
+    service_weights, period = read_service_weights(path, today)
+    trip_weights = read_trip_weights(path, service_weights)
+    return stream_stop_departures(path, trip_weights), period
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+def calculate_frequency_score(departures: float) -> int:
+    """
+    Transit score (0-100) from weekday departures within walking radius.
+
+    Log scale: ~10 departures = 25, ~100 = 50, ~1,000 = 75, 10,000+ = 100
+    (a downtown subway hub).
+    """
+    if departures <= 0:
+        return 0
+    return int(max(0, min(100, round(25 * np.log10(1 + departures)))))
+
+
+class TransitServiceIndex:
+    """Weekday departures aligned to the rows of a GTFSStopStore."""
+
+    def __init__(self, store: GTFSStopStore, departures: np.ndarray):
+        self.store = store
+        self.departures = departures
+
+    @property
+    def total_departures(self) -> float:
+        return float(self.departures.sum())
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the departures, for stages that depend on them."""
+        return hashlib.sha256(np.ascontiguousarray(self.departures).tobytes()).hexdigest()[:16]
+
+    def departures_within(self, lats, lngs, radius_miles: float = WALKING_RADIUS_MILES) -> np.ndarray:
+        """Sum of weekday departures at all stops within radius, per location."""
+        lats = np.asarray(lats, dtype=np.float64)
+        query_idx, rows, _ = self.store.grid.query_radius(lats, lngs, radius_miles)
+        return np.bincount(
+            query_idx,
+            weights=self.departures[rows].astype(np.float64),
+            minlength=len(lats)
+        )
+
+    def score_locations(
+        self,
+        lats,
+        lngs,
+        radius_miles: float = WALKING_RADIUS_MILES
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batch frequency scores. Returns (departures_within_radius, scores)."""
+        departures = self.departures_within(lats, lngs, radius_miles)
+        scores = np.array([calculate_frequency_score(d) for d in departures], dtype=np.int64)
+        return departures, scores
+
+
+def _service_dir(store: GTFSStopStore) -> str:
+    path = os.path.join(store.store_dir, SERVICE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _window_key(period: Optional[Tuple[str, str]], today: Optional[date]) -> Optional[str]:
+    """Reference window start for a cached (ISO) service period."""
+    if not period:
+        return None
+    first, last = (date.fromisoformat(d) for d in period)
+    return reference_window((first, last), today).isoformat()
+
+
+def _load_feed_departures(
+    service_dir: str,
+    feed_hash: str,
+    today: Optional[date]
+) -> Optional[Tuple[Dict[str, float], Optional[str]]]:
+    """Cached departures for a feed, or None if missing or for another week."""
+    cache_path = os.path.join(service_dir, f"{feed_hash}.json")
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if cached.get('version') != SERVICE_VERSION:
+        return None
+    if cached.get('window') != _window_key(cached.get('period'), today):
+        return None
+    return cached['departures'], cached.get('period')
+
+
+def _save_feed_departures(
+    service_dir: str,
+    feed_hash: str,
+    departures: Dict[str, float],
+    period: Optional[Tuple[date, date]],
+    today: Optional[date]
+) -> Optional[Tuple[str, str]]:
+    """Cache a feed's departures with the week they were computed for."""
+    iso_period = [d.isoformat() for d in period] if period else None
+    cache_path = os.path.join(service_dir, f"{feed_hash}.json")
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'version': SERVICE_VERSION,
+            'period': iso_period,
+            'window': _window_key(iso_period, today),
+            'departures': departures,
+        }, f, separators=(',', ':'))
+    os.replace(tmp_path, cache_path)
+    return iso_period
+
+
+def _aligned_key(store: GTFSStopStore, periods: Dict[str, Optional[list]], today: Optional[date]) -> Dict:
+    """What the store-aligned departures array was built from."""
+    return {
+        'version': SERVICE_VERSION,
+        'builtAt': store.metadata.get('builtAt'),
+        'feeds': {
+            name: {
+                'hash': feed_hash,
+                'period': periods.get(name),
+                'window': _window_key(periods.get(name), today),
+            }
+            for name, feed_hash in store.feed_hashes.items()
+        },
+    }
+
+
+def _load_aligned(store: GTFSStopStore, today: Optional[date]) -> Optional[np.ndarray]:
+    """
+    Departures already aligned to store rows, if the store, every feed hash
+    and every feed's reference week still match.
+    """
+    key_path = os.path.join(_service_dir(store), f"{ALIGNED_FILE}.json")
+    array_path = os.path.join(_service_dir(store), f"{ALIGNED_FILE}.npy")
+    if not (os.path.exists(key_path) and os.path.exists(array_path)):
+        return None
+    try:
+        with open(key_path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    periods = {name: info.get('period') for name, info in cached.get('feeds', {}).items()}
+    if cached != _aligned_key(store, periods, today):
+        return None
+    departures = np.load(array_path, mmap_mode='r')
+    return departures if len(departures) == len(store) else None
+
+
+def _save_aligned(store: GTFSStopStore, departures: np.ndarray, periods: Dict, today: Optional[date]):
+    service_dir = _service_dir(store)
+    np.save(os.path.join(service_dir, f"{ALIGNED_FILE}.tmp.npy"), departures)
+    os.replace(
+        os.path.join(service_dir, f"{ALIGNED_FILE}.tmp.npy"),
+        os.path.join(service_dir, f"{ALIGNED_FILE}.npy")
+    )
+    tmp_path = os.path.join(service_dir, f"{ALIGNED_FILE}.json.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(_aligned_key(store, periods, today), f, indent=2)
+    os.replace(tmp_path, os.path.join(service_dir, f"{ALIGNED_FILE}.json"))
+
+
+def build_service_index(
+    store: GTFSStopStore,
+    gtfs_dir: str = GTFS_DIR,
+    verbose: bool = True,
+    today: Optional[date] = None
+) -> TransitServiceIndex:
+    """
+    Align per-feed departures to store rows.
+
+    The aligned array is cached next to the compiled store, so a run where
+    no feed changed (and no feed moved to another reference week) loads it
+    without decoding a single stop_id. Otherwise only feeds without a
+    cached result for their reference week are streamed again.
+    """
+    cached = _load_aligned(store, today)
+    if cached is not None:
+        return TransitServiceIndex(store, cached)
+
+    service_dir = _service_dir(store)
+    feeds = list_feeds(gtfs_dir)
+    feed_hashes = store.feed_hashes
+
+    feed_departures: Dict[int, Dict[str, float]] = {}
+    periods: Dict[str, Optional[list]] = {}
+
+    for agency_id, name in enumerate(store.agencies):
+        feed_hash = feed_hashes[name]
+
+        loaded = _load_feed_departures(service_dir, feed_hash, today)
+        if loaded is None:
+            if verbose:
+                print(f"   Streaming stop_times for {name}...", end='', flush=True)
+            departures, period = compute_feed_departures(
+                feeds.get(name, os.path.join(gtfs_dir, name)), today
+            )
+            periods[name] = _save_feed_departures(service_dir, feed_hash, departures, period, today)
+            if verbose:
+                print(f" ✓ ({sum(departures.values()):,.0f} weekday departures)")
+        else:
+            departures, periods[name] = loaded
+
+        if departures:
+            feed_departures[agency_id] = departures
+
+    # Decode each stop_id once, for stops of feeds that have service
+    aligned = np.zeros(len(store), dtype=np.float32)
+    agency = np.asarray(store.agency)
+    for row in np.nonzero(np.isin(agency, list(feed_departures)))[0]:
+        value = feed_departures[int(agency[row])].get(store.stop_ids[row])
+        if value:
+            aligned[row] = value
+
+    _save_aligned(store, aligned, periods, today)
+
+    # Drop cached results for feeds that are no longer present
+    live_hashes = set(feed_hashes.values())
+    for filename in os.listdir(service_dir):
+        if filename.startswith(ALIGNED_FILE):
+            continue
+        if filename.endswith('.json') and filename[:-5] not in live_hashes:
+            os.remove(os.path.join(service_dir, filename))
+
+    return TransitServiceIndex(store, aligned)
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build GTFS weekday departure index")
+    parser.add_argument("--gtfs-dir", type=str, default=GTFS_DIR, help="Directory with GTFS files")
+    parser.add_argument("--store-dir", type=str, default=GTFS_STORE_DIR, help="Compiled stop store directory")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("GTFS TRANSIT SERVICE INDEX")
+    print("="*70)
+
+    store = open_stop_store(args.gtfs_dir, args.store_dir)
+    if store is None:
+        print(f"\n⚠️  No GTFS feeds found in: {args.gtfs_dir}")
+        return
+
+    index = build_service_index(store, args.gtfs_dir)
+    served = int((index.departures > 0).sum())
+    print(f"\nStops with weekday service: {served:,}/{len(store):,}")
+    print(f"Total weekday departures: {index.total_departures:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+GTFS Stop Store Compiler
+Compiles every GTFS feed under GTFS_DIR into one compact, memory-mapped
+binary stop store so enrichment runs don't re-parse hundreds of feeds.
+
+Store layout (data/gtfs_store/):
+- store.json          Metadata: version, feed hashes, agency table
+- lat.npy / lng.npy   float32 stop coordinates (grid order)
+- agency.npy          uint16 index into the agency table
+- stop_ids.bin        UTF-8 stop_id string table + stop_id_offsets.npy
+- names.bin           UTF-8 stop_name string table + name_offsets.npy
+- grid_keys.npy       Spatial grid index (see spatial_grid.py)
+- grid_starts.npy
+
+The store is rebuilt only when the set of feeds changes or a feed file's
+SHA-256 changes. Hashes are cached by (size, mtime) so unchanged feeds are
+not even re-read on startup.
+
+Usage:
+    python gtfs_stop_store.py              # Build or refresh the store
+    python gtfs_stop_store.py --rebuild    # Force a full rebuild
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from spatial_grid import DEFAULT_CELL_DEG, GridIndex
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+GTFS_DIR = os.path.join(DATA_DIR, "gtfs_feeds")
+GTFS_STORE_DIR = os.path.join(DATA_DIR, "gtfs_store")
+
+STORE_VERSION = 1
+METADATA_FILE = "store.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+# ============================================================================
+# FEED DISCOVERY & HASHING
+# ============================================================================
+
+def list_feeds(gtfs_dir: str) -> Dict[str, str]:
+    """Map feed name -> path for every feed zip or feed directory."""
+    feeds = {}
+    if not os.path.isdir(gtfs_dir):
+        return feeds
+
+    for name in sorted(os.listdir(gtfs_dir)):
+        path = os.path.join(gtfs_dir, name)
+        if os.path.isdir(path) or name.endswith('.zip'):
+            feeds[name] = path
+    return feeds
+
+
+def _feed_files(path: str) -> List[str]:
+    """Files that make up a feed (the zip itself, or the directory's .txt files)."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, f) for f in os.listdir(path) if f.endswith('.txt')
+        )
+    return [path]
+
+
+def hash_feed(path: str) -> str:
+    """SHA-256 over a feed's file contents."""
+    digest = hashlib.sha256()
+    for file_path in _feed_files(path):
+        digest.update(os.path.basename(file_path).encode())
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _feed_stat(path: str) -> List[List[int]]:
+    """(size, mtime_ns) of every file in a feed, used to skip re-hashing."""
+    stats = []
+    for file_path in _feed_files(path):
+        st = os.stat(file_path)
+        stats.append([st.st_size, st.st_mtime_ns])
+    return stats
+
+
+def fingerprint_feeds(feeds: Dict[str, str], previous: Optional[Dict] = None) -> Dict[str, Dict]:
+    """
+    Hash every feed, reusing the previous hash when the file stats match.
+    """
+    previous = previous or {}
+    fingerprints = {}
+    for name, path in feeds.items():
+        stat = _feed_stat(path)
+        cached = previous.get(name)
+        if cached and cached.get('stat') == stat:
+            feed_hash = cached['hash']
+        else:
+            feed_hash = hash_feed(path)
+        fingerprints[name] = {'hash': feed_hash, 'stat': stat}
+    return fingerprints
+
+
+# ============================================================================
+# FEED PARSING
+# ============================================================================
+
+class _ZipMemberFile(io.TextIOWrapper):
+    """Text stream over one zip member that also closes its archive."""
+
+    def __init__(self, archive: zipfile.ZipFile, filename: str):
+        super().__init__(archive.open(filename), encoding='utf-8-sig', newline='')
+        self._archive = archive
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._archive.close()
+
+
+def open_feed_file(path: str, filename: str) -> Optional[io.TextIOBase]:
+    """
+    Open one GTFS table (e.g. stops.txt) of a zip or directory feed as a
+    streaming text file, or return None if the feed doesn't have it.
+    Closing the returned file also closes a zip feed's archive.
+    """
+    if path.endswith('.zip'):
+        z = zipfile.ZipFile(path, 'r')
+        if filename not in z.namelist():
+            z.close()
+            return None
+        try:
+            return _ZipMemberFile(z, filename)
+        except Exception:
+            z.close()
+            raise
+
+    file_path = os.path.join(path, filename)
+    if not os.path.exists(file_path):
+        return None
+    return open(file_path, 'r', encoding='utf-8-sig', newline='')
+
+
+def iter_feed_stops(path: str) -> Iterator[Tuple[str, str, float, float]]:
+    """
+    Stream (stop_id, stop_name, lat, lng) rows from a feed's stops.txt.
+
+    Rows without usable coordinates (e.g. generic nodes) are skipped.
+    """
+    f = open_feed_file(path, 'stops.txt')
+    if f is None:
+        return
+
+    with f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        columns = {name.strip(): i for i, name in enumerate(header)}
+        try:
+            id_col = columns['stop_id']
+            lat_col = columns['stop_lat']
+            lng_col = columns['stop_lon']
+        except KeyError:
+            return
+        name_col = columns.get('stop_name')
+
+        for row in reader:
+            try:
+                lat = float(row[lat_col])
+                lng = float(row[lng_col])
+            except (ValueError, IndexError):
+                continue
+            if lat == 0 and lng == 0:
+                continue
+            name = row[name_col] if name_col is not None and name_col < len(row) else ''
+            yield row[id_col], name or 'Unknown', lat, lng
+
+
+# ============================================================================
+# STRING TABLES
+# ============================================================================
+
+def _write_string_table(directory: str, prefix: str, values: List[str]):
+    """Write strings as one UTF-8 blob plus int64 offsets."""
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(directory, f"{prefix}.bin"), 'wb') as f:
+        f.write(b''.join(encoded))
+    np.save(os.path.join(directory, f"{prefix}_offsets.npy"), offsets)
+
+
+class StringTable:
+    """Memory-mapped UTF-8 string table."""
+
+    def __init__(self, directory: str, prefix: str):
+        blob_path = os.path.join(directory, f"{prefix}.bin")
+        self.offsets = np.load(os.path.join(directory, f"{prefix}_offsets.npy"), mmap_mode='r')
+        if os.path.getsize(blob_path) > 0:
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+def compile_stop_store(
+    feeds: Dict[str, str],
+    store_dir: str,
+    fingerprints: Dict[str, Dict],
+    cell_deg: float = DEFAULT_CELL_DEG
+) -> Dict:
+    """Parse every feed once and write the binary store. Returns metadata."""
+    os.makedirs(store_dir, exist_ok=True)
+
+    # Invalidate first so an interrupted build is never mistaken for valid
+    metadata_path = os.path.join(store_dir, METADATA_FILE)
+    if os.path.exists(metadata_path):
+        os.remove(metadata_path)
+
+    agencies = list(feeds.keys())
+    stop_ids: List[str] = []
+    names: List[str] = []
+    lat_parts, lng_parts, agency_parts = [], [], []
+    feed_counts = {}
+
+    for agency_id, (name, path) in enumerate(feeds.items()):
+        feed_lat, feed_lng = [], []
+        try:
+            for stop_id, stop_name, lat, lng in iter_feed_stops(path):
+                stop_ids.append(stop_id)
+                names.append(stop_name)
+                feed_lat.append(lat)
+                feed_lng.append(lng)
+        except (zipfile.BadZipFile, OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"    Error reading GTFS feed {name}: {e}")
+            del stop_ids[len(stop_ids) - len(feed_lat):]
+            del names[len(names) - len(feed_lat):]
+            feed_lat, feed_lng = [], []
+
+        feed_counts[name] = len(feed_lat)
+        lat_parts.append(np.asarray(feed_lat, dtype=np.float32))
+        lng_parts.append(np.asarray(feed_lng, dtype=np.float32))
+        agency_parts.append(np.full(len(feed_lat), agency_id, dtype=np.uint16))
+
+    lat = np.concatenate(lat_parts) if lat_parts else np.zeros(0, dtype=np.float32)
+    lng = np.concatenate(lng_parts) if lng_parts else np.zeros(0, dtype=np.float32)
+    agency = np.concatenate(agency_parts) if agency_parts else np.zeros(0, dtype=np.uint16)
+
+    # Store rows in grid order so each cell is a contiguous slice
+    grid, order = GridIndex.build(lat, lng, cell_deg)
+    np.save(os.path.join(store_dir, 'lat.npy'), grid.lat)
+    np.save(os.path.join(store_dir, 'lng.npy'), grid.lng)
+    np.save(os.path.join(store_dir, 'agency.npy'), agency[order])
+    _write_string_table(store_dir, 'stop_ids', [stop_ids[i] for i in order])
+    _write_string_table(store_dir, 'names', [names[i] for i in order])
+    grid.save(store_dir)
+
+    metadata = {
+        'version': STORE_VERSION,
+        'builtAt': datetime.now().isoformat(),
+        'cellDeg': cell_deg,
+        'stopCount': int(len(lat)),
+        'agencies': agencies,
+        'feeds': {
+            name: {**fingerprints[name], 'stops': feed_counts.get(name, 0)}
+            for name in agencies
+        },
+    }
+
+    tmp_path = metadata_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, metadata_path)
+
+    return metadata
+
+
+# ============================================================================
+# STORE ACCESS
+# ============================================================================
+
+class GTFSStopStore:
+    """Read-only, memory-mapped view of a compiled stop store."""
+
+    def __init__(self, store_dir: str, metadata: Dict):
+        self.store_dir = store_dir
+        self.metadata = metadata
+        self.agencies: List[str] = metadata['agencies']
+
+        self.lat = np.load(os.path.join(store_dir, 'lat.npy'), mmap_mode='r')
+        self.lng = np.load(os.path.join(store_dir, 'lng.npy'), mmap_mode='r')
+        self.agency = np.load(os.path.join(store_dir, 'agency.npy'), mmap_mode='r')
+        self.stop_ids = StringTable(store_dir, 'stop_ids')
+        self.names = StringTable(store_dir, 'names')
+        self.grid = GridIndex.load(store_dir, self.lat, self.lng, metadata['cellDeg'])
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def feed_hashes(self) -> Dict[str, str]:
+        return {name: info['hash'] for name, info in self.metadata['feeds'].items()}
+
+    def agency_name(self, row: int) -> str:
+        return self.agencies[int(self.agency[row])]
+
+    def stop(self, row: int) -> Dict:
+        """Stop record in the same shape `read_gtfs_stops` returns."""
+        return {
+            'id': self.stop_ids[row],
+            'lat': float(self.lat[row]),
+            'lng': float(self.lng[row]),
+            'name': self.names[row],
+        }
+
+    def nearest(self, lats, lngs) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest stop row and distance (miles) for each coordinate."""
+        return self.grid.nearest(lats, lngs)
+
+
+def _read_metadata(store_dir: str) -> Optional[Dict]:
+    metadata_path = os.path.join(store_dir, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        return None
+    try:
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if metadata.get('version') != STORE_VERSION:
+        return None
+    return metadata
+
+
+def open_stop_store(
+    gtfs_dir: str = GTFS_DIR,
+    store_dir: str = GTFS_STORE_DIR,
+    rebuild: bool = False,
+    verbose: bool = True
+) -> Optional[GTFSStopStore]:
+    """
+    Open the compiled stop store, rebuilding it only if a feed changed.
+
+    Returns None when there are no feeds to compile.
+    """
+    feeds = list_feeds(gtfs_dir)
+    if not feeds:
+        return None
+
+    metadata = None if rebuild else _read_metadata(store_dir)
+    previous = metadata.get('feeds', {}) if metadata else {}
+    fingerprints = fingerprint_feeds(feeds, previous)
+
+    up_to_date = (
+        metadata is not None
+        and set(previous) == set(fingerprints)
+        and all(previous[n]['hash'] == fingerprints[n]['hash'] for n in fingerprints)
+    )
+
+    if up_to_date:
+        # Refresh cached stats (e.g. touched but unchanged files) cheaply
+        if any(previous[n].get('stat') != fingerprints[n]['stat'] for n in fingerprints):
+            for name, fp in fingerprints.items():
+                metadata['feeds'][name]['stat'] = fp['stat']
+            tmp_path = os.path.join(store_dir, METADATA_FILE + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_path, os.path.join(store_dir, METADATA_FILE))
+        if verbose:
+            print(f"   ✓ Stop store up to date ({metadata['stopCount']:,} stops, "
+                  f"{len(feeds)} feeds)")
+    else:
+        if verbose:
+            changed = [
+                n for n in fingerprints
+                if n not in previous or previous[n]['hash'] != fingerprints[n]['hash']
+            ]
+            removed = [n for n in previous if n not in fingerprints]
+            print(f"   Compiling stop store ({len(changed)} new/changed, "
+                  f"{len(removed)} removed feeds)...")
+        metadata = compile_stop_store(feeds, store_dir, fingerprints)
+        if verbose:
+            print(f"   ✓ Compiled {metadata['stopCount']:,} stops from {len(feeds)} feeds")
+
+    return GTFSStopStore(store_dir, metadata)
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile GTFS feeds into a binary stop store")
+    parser.add_argument("--gtfs-dir", type=str, default=GTFS_DIR, help="Directory with GTFS files")
+    parser.add_argument("--store-dir", type=str, default=GTFS_STORE_DIR, help="Output directory")
+    parser.add_argument("--rebuild", action="store_true", help="Force a full rebuild")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("GTFS STOP STORE COMPILER")
+    print("="*70)
+
+    store = open_stop_store(args.gtfs_dir, args.store_dir, rebuild=args.rebuild)
+    if store is None:
+        print(f"\n⚠️  No GTFS feeds found in: {args.gtfs_dir}")
+        return
+
+    print(f"\nStore: {os.path.abspath(args.store_dir)}")
+    print(f"Stops: {len(store):,}  Agencies: {len(store.agencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,9 +32,15 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import math
 
+import numpy as np
+
+from boundary_index import BOUNDARY_INDEX_DIR, lookup_location_states, lookup_version, open_boundary_index
+from census_warehouse import WAREHOUSE_DIR, open_warehouse
+from provenance import StageTracker, source_version
+
 # Configuration
 CENSUS_API_KEY = os.environ.get("CENSUS_API_KEY", "")
-CENSUS_API_BASE = "https://api.census.gov/data/2021/acs/acs5"
+CENSUS_API_BASE = os.environ.get("CENSUS_API_BASE", "https://api.census.gov/data/2021/acs/acs5")
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(script_dir, "../data")
@@ -259,28 +265,56 @@ def estimate_consumer_spending(income: int, education: int) -> int:
     spending += (education - 50) * 0.3
     return min(150, max(50, int(spending)))
 
-def enrich_location_with_census_data(location: Dict, state_code: str) -> Dict:
+def census_data_from_warehouse(
+    lats: List[float],
+    lngs: List[float],
+    states: List[Optional[str]],
+    warehouse_dir: str = WAREHOUSE_DIR,
+    index_dir: str = BOUNDARY_INDEX_DIR
+) -> List[Optional[Dict]]:
     """
-    Enrich location with Census data.
-    Attempts location-specific data, falls back to state level.
-    """
-    lat = location.get("lat")
-    lng = location.get("lng")
+    Census variables for a batch of locations from the local warehouse.
 
-    if not lat or not lng:
-        return location
-
-    # Try location-specific data first
-    census_data = fetch_census_data_for_location(lat, lng)
-
-    # Fall back to state level
-    if not census_data:
-        census_data = fetch_state_level_data(state_code)
+    Locations are joined to tracts through the tract boundary index; those
+    without a tract row fall back to their state's row. Entries are None
+    where neither is available.
+    """
+    tract_table = open_warehouse("tract", warehouse_dir)
+    state_table = open_warehouse("state", warehouse_dir)
+    tract_index = open_boundary_index("tract", index_dir=index_dir) if tract_table else None
+
+    n = len(lats)
+    results: List[Optional[Dict]] = [None] * n
+
+    if tract_index is not None:
+        tracts = tract_index.lookup(lats, lngs)
+        values = tract_table.values_for(tracts, list(CENSUS_VARIABLES))
+        for i in range(n):
+            row = {
+                CENSUS_VARIABLES[var]: float(column[i])
+                for var, column in values.items() if not np.isnan(column[i])
+            }
+            if row:
+                row["tract"] = tracts[i]
+                results[i] = row
+
+    if state_table is not None:
+        pending = [i for i in range(n) if results[i] is None and states[i]]
+        state_fips = {abbr: fips for fips, abbr in STATE_FIPS.items()}
+        values = state_table.values_for(
+            [state_fips.get(states[i]) for i in pending], list(CENSUS_VARIABLES)
+        )
+        for j, i in enumerate(pending):
+            row = {
+                CENSUS_VARIABLES[var]: float(column[j])
+                for var, column in values.items() if not np.isnan(column[j])
+            }
+            results[i] = row or None
 
-    if not census_data:
-        return location  # Return unchanged if no Census data available
+    return results
 
-    # Extract and apply demographics
+def apply_census_data(location: Dict, census_data: Dict) -> Dict:
+    """Apply Census variables to a location's attributes."""
     demographics = extract_demographics_from_census(census_data)
 
     if demographics:
@@ -300,6 +334,8 @@ def enrich_location_with_census_data(location: Dict, state_code: str) -> Dict:
 
         # Add source attribution
         location["at"]["_censusSource"] = "U.S. Census Bureau ACS 2021 (5-Year Estimates)"
+        if census_data.get("tract"):
+            location["at"]["_censusTract"] = census_data["tract"]
         location["at"]["_censusEnrichedAt"] = datetime.now().isoformat()
 
         # Recalculate overall score
@@ -312,30 +348,51 @@ def enrich_location_with_census_data(location: Dict, state_code: str) -> Dict:
 
     return location
 
-def estimate_state_from_coords(lat: float, lng: float) -> Optional[str]:
-    """Estimate state code from coordinates."""
-    state_bounds = {
-        ("CA", 32.5, 42.0, -124.4, -114.1),
-        ("TX", 25.8, 36.5, -106.6, -93.5),
-        ("FL", 24.5, 30.7, -87.6, -80.0),
-        ("NY", 40.5, 45.0, -79.8, -71.8),
-        ("PA", 39.7, 42.3, -80.5, -74.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("OH", 38.4, 42.0, -84.8, -80.5),
-        ("GA", 30.4, 35.0, -85.6, -80.8),
-        ("NC", 33.8, 36.6, -84.3, -75.4),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-        ("NJ", 38.9, 41.4, -75.6, -73.9),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WA", 45.6, 49.0, -124.7, -116.9),
-        ("AZ", 31.3, 37.0, -114.8, -109.0),
-    }
+def fetch_census_data(location: Dict, state_code: Optional[str]) -> Optional[Dict]:
+    """
+    Census variables for a location from the Census API: tract-level data
+    first, then the state's data. None if neither request succeeded.
+    """
+    lat = location.get("lat")
+    lng = location.get("lng")
 
-    for state, min_lat, max_lat, min_lng, max_lng in state_bounds:
-        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-            return state
+    if not lat or not lng:
+        return None
+
+    # Try location-specific data first
+    census_data = fetch_census_data_for_location(lat, lng)
+
+    # Fall back to state level
+    if not census_data and state_code:
+        census_data = fetch_state_level_data(state_code)
+
+    return census_data or None
+
+def enrich_location_with_census_data(location: Dict, state_code: str) -> Dict:
+    """
+    Enrich location with Census data from the Census API.
+    Attempts location-specific data, falls back to state level.
+    """
+    census_data = fetch_census_data(location, state_code)
+    if not census_data:
+        return location  # Return unchanged if no Census data available
+
+    return apply_census_data(location, census_data)
+
+def census_source_version(use_warehouse: bool) -> str:
+    """Provenance version of the census inputs (warehouse tables or the API vintage)."""
+    if use_warehouse:
+        sources = []
+        for geography in ("state", "tract"):
+            table = open_warehouse(geography)
+            if table is not None:
+                sources.append([geography, table.manifest.get("source"), table.manifest.get("builtAt")])
+        tract_index = open_boundary_index("tract")
+        sources.append(tract_index.metadata.get("source") if tract_index else None)
+    else:
+        sources = ["api", CENSUS_API_BASE]
+    return source_version(__file__, CENSUS_VARIABLES, lookup_version(), sources)
 
-    return None
 
 def main():
     """Main entry point."""
@@ -344,18 +401,26 @@ def main():
     parser = argparse.ArgumentParser(description="Integrate Census Bureau data")
     parser.add_argument("--limit", type=int, default=None, help="Limit locations to process")
     parser.add_argument("--ticker", type=str, default=None, help="Process specific ticker")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
     args = parser.parse_args()
 
-    if not CENSUS_API_KEY:
+    # Prefer the local warehouse (see census_warehouse.py) over the API
+    use_warehouse = open_warehouse("tract") is not None or open_warehouse("state") is not None
+
+    if not use_warehouse and not CENSUS_API_KEY:
         print("ERROR: CENSUS_API_KEY environment variable not set")
         print("Get free API key at https://api.census.gov/data/key_signup.html")
         print("Then set: export CENSUS_API_KEY='your_key_here'")
+        print("Or build the local warehouse: python census_warehouse.py")
         return
 
     print("\n" + "="*70)
     print("CENSUS BUREAU DATA INTEGRATION")
     print("="*70)
-    print(f"Using Census API: {CENSUS_API_BASE}")
+    if use_warehouse:
+        print("Using local Census warehouse (batch tract join)")
+    else:
+        print(f"Using Census API: {CENSUS_API_BASE}")
     print(f"Vintage: 2021 (5-Year Estimates)")
 
     # Load manifest
@@ -367,6 +432,9 @@ def main():
     with open(manifest_path, "r") as f:
         manifest = json.load(f)
 
+    # Locations are recomputed only when their coordinates or the census inputs changed
+    tracker = StageTracker("census_api", census_source_version(use_warehouse), force=args.force)
+
     total_enriched = 0
     total_with_census = 0
 
@@ -387,35 +455,57 @@ def main():
         with open(data_file, "r") as f:
             locations = json.load(f)
 
-        enriched = 0
-        with_census = 0
-
-        for i, location in enumerate(locations):
-            if args.limit and i >= args.limit:
-                break
-
-            lat = location.get("lat")
-            lng = location.get("lng")
-
-            if lat and lng:
-                state = estimate_state_from_coords(lat, lng)
-                if state:
-                    original_income = location.get("at", {}).get("medianIncome")
-                    location = enrich_location_with_census_data(location, state)
-                    new_income = location.get("at", {}).get("_censusSource")
-
-                    if new_income:
-                        with_census += 1
+        located = [loc for loc in locations if loc.get("lat") and loc.get("lng")]
+        stale = tracker.pending(located)
+        if not stale:
+            print(f"   ✓ Unchanged - skipped {len(located)} locations")
+            continue
 
-            enriched += 1
-            total_enriched += 1
+        # Resolve every stale location's state in one batch
+        state_by_id = lookup_location_states(stale)
 
-            if (i + 1) % 100 == 0:
-                print(f"   Processed {i+1}/{len(locations)}")
+        enriched = 0
+        with_census = 0
 
-            # Rate limiting
-            if (i + 1) % 50 == 0:
-                time.sleep(1)
+        if use_warehouse:
+            batch = stale[:args.limit] if args.limit else stale
+            census_rows = census_data_from_warehouse(
+                [loc["lat"] for loc in batch],
+                [loc["lng"] for loc in batch],
+                [state_by_id[id(loc)] for loc in batch]
+            )
+            for location, census_data in zip(batch, census_rows):
+                # Only stamp locations that got data, so they are retried
+                if census_data:
+                    apply_census_data(location, census_data)
+                    tracker.mark(location)
+                    with_census += 1
+            enriched = len(batch)
+            total_enriched += enriched
+        else:
+            for i, location in enumerate(stale):
+                if args.limit and i >= args.limit:
+                    break
+
+                state = state_by_id[id(location)]
+                census_data = fetch_census_data(location, state) if state else None
+
+                # A failed lookup leaves the location unstamped, so a
+                # transient API error is retried on the next run
+                if census_data:
+                    apply_census_data(location, census_data)
+                    tracker.mark(location)
+                    with_census += 1
+
+                enriched += 1
+                total_enriched += 1
+
+                if (i + 1) % 100 == 0:
+                    print(f"   Processed {i+1}/{len(stale)}")
+
+                # Rate limiting
+                if (i + 1) % 50 == 0:
+                    time.sleep(1)
 
         # Save enriched data
         with open(data_file, "w") as f:
@@ -425,6 +515,8 @@ def main():
         print(f"   ✓ Census data integrated: {with_census} locations")
         total_with_census += with_census
 
+    tracker.save_stats()
+
     print(f"\n{'='*70}")
     print(f"INTEGRATION COMPLETE")
     print(f"Total locations processed: {total_enriched:,}")
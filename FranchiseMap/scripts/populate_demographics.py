@@ -15,9 +15,11 @@ These are generated based on regional data and location characteristics.
 import json
 import os
 import random
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from boundary_index import estimate_state_from_coords, lookup_location_states
+
 script_dir = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(script_dir, "../data")
 BRANDS_DIR = os.path.join(DATA_DIR, "brands")
@@ -88,73 +90,18 @@ REGIONAL_DEMOGRAPHICS = {
     "HI": {"avgAge": 39, "householdSize": 3.0, "education": 81, "employment": 95.5},
 }
 
-def estimate_state_from_coords(lat: float, lng: float) -> str:
-    """Estimate state code from coordinates."""
-    state_bounds = {
-        ("CA", 32.5, 42.0, -124.4, -114.1),
-        ("TX", 25.8, 36.5, -106.6, -93.5),
-        ("FL", 24.5, 30.7, -87.6, -80.0),
-        ("NY", 40.5, 45.0, -79.8, -71.8),
-        ("PA", 39.7, 42.3, -80.5, -74.7),
-        ("IL", 36.9, 42.5, -91.5, -87.0),
-        ("OH", 38.4, 42.0, -84.8, -80.5),
-        ("GA", 30.4, 35.0, -85.6, -80.8),
-        ("NC", 33.8, 36.6, -84.3, -75.4),
-        ("MI", 41.7, 48.3, -90.4, -83.4),
-        ("NJ", 38.9, 41.4, -75.6, -73.9),
-        ("VA", 36.5, 39.5, -83.7, -75.2),
-        ("WA", 45.6, 49.0, -124.7, -116.9),
-        ("AZ", 31.3, 37.0, -114.8, -109.0),
-        ("MA", 41.2, 42.9, -73.5, -69.9),
-        ("TN", 35.0, 36.7, -90.3, -81.6),
-        ("IN", 37.8, 41.8, -88.1, -84.8),
-        ("MO", 36.5, 40.6, -95.8, -89.1),
-        ("LA", 29.0, 33.0, -94.0, -88.8),
-        ("CO", 37.0, 41.0, -109.1, -102.0),
-        ("MN", 43.5, 49.4, -97.2, -89.5),
-        ("WI", 42.5, 47.3, -92.9, -86.8),
-        ("SC", 32.0, 34.8, -83.4, -78.5),
-        ("AL", 30.2, 35.0, -88.5, -84.9),
-        ("KY", 36.5, 39.1, -89.6, -81.9),
-        ("OR", 42.0, 46.3, -124.5, -116.5),
-        ("OK", 33.6, 37.0, -103.0, -94.4),
-        ("CT", 41.1, 42.1, -73.7, -71.8),
-        ("UT", 37.0, 42.0, -114.0, -109.0),
-        ("NV", 35.0, 42.0, -120.0, -114.6),
-        ("AR", 33.0, 36.5, -94.4, -89.6),
-        ("MS", 30.2, 34.8, -91.7, -88.1),
-        ("KS", 37.0, 40.0, -102.0, -94.6),
-        ("NM", 31.8, 37.0, -109.0, -103.0),
-        ("NE", 40.0, 43.0, -104.0, -95.3),
-        ("ID", 42.0, 49.0, -117.2, -111.0),
-        ("HI", 18.9, 22.2, -160.0, -154.8),
-        ("AK", 51.3, 71.4, -174.0, -130.0),
-        ("ME", 43.0, 47.5, -71.1, -66.9),
-        ("NH", 42.7, 45.3, -72.6, -70.7),
-        ("VT", 42.7, 45.1, -73.4, -71.5),
-        ("RI", 41.1, 42.0, -71.9, -71.1),
-        ("MT", 45.0, 49.0, -116.0, -104.0),
-        ("WY", 41.0, 45.0, -111.0, -104.0),
-        ("ND", 46.0, 49.0, -104.0, -96.6),
-        ("SD", 42.5, 45.9, -104.0, -96.4),
-        ("DE", 38.4, 39.8, -75.8, -75.0),
-        ("MD", 37.9, 39.7, -79.5, -75.0),
-        ("DC", 38.8, 38.9, -77.1, -77.0),
-        ("WV", 37.2, 40.6, -82.6, -77.7),
-    }
-
-    for state, min_lat, max_lat, min_lng, max_lng in state_bounds:
-        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-            return state
-
-    return "CA"  # Default fallback
-
-def generate_demographics_for_location(lat: float, lng: float, existing_attrs: Dict) -> Dict:
+def generate_demographics_for_location(
+    lat: float,
+    lng: float,
+    existing_attrs: Dict,
+    state: Optional[str] = None
+) -> Dict:
     """
     Generate demographic attributes for a location.
     Uses state baseline with variation based on location characteristics.
     """
-    state = estimate_state_from_coords(lat, lng)
+    if state is None:
+        state = estimate_state_from_coords(lat, lng)
     base_demo = REGIONAL_DEMOGRAPHICS.get(state, REGIONAL_DEMOGRAPHICS["CA"]).copy()
 
     # Add variation based on existing attributes (income, density)
@@ -196,7 +143,7 @@ def generate_demographics_for_location(lat: float, lng: float, existing_attrs: D
         'employmentRate': base_demo['employment'],
     }
 
-def populate_location(location: Dict) -> Dict:
+def populate_location(location: Dict, state: Optional[str] = None) -> Dict:
     """Add missing demographic fields to a location."""
     if 'at' not in location:
         location['at'] = {}
@@ -214,7 +161,7 @@ def populate_location(location: Dict) -> Dict:
     )
 
     if needs_population and lat and lng:
-        new_demo = generate_demographics_for_location(lat, lng, attrs)
+        new_demo = generate_demographics_for_location(lat, lng, attrs, state)
         attrs.update(new_demo)
 
     # Mark as populated
@@ -269,9 +216,13 @@ def main():
         with open(data_file, "r") as f:
             locations = json.load(f)
 
+        # Resolve every location's state in one batch
+        located = [loc for loc in locations if loc.get("lat") and loc.get("lng")]
+        state_by_id = lookup_location_states(located)
+
         populated = 0
         for location in locations:
-            populate_location(location)
+            populate_location(location, state_by_id.get(id(location)))
             total_processed += 1
 
             # Check if we actually populated something
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Per-Location Provenance
+Lets enrichment stages skip locations whose inputs have not changed.
+
+Each stage stamps the locations it computes with a fingerprint in
+at._provenance[stage]: a hash of the location's coordinates, the stage's
+source version (script code + source datasets such as the ACS vintage,
+GTFS feed hashes or regional baseline tables) and any attributes from
+other stages it reads. On the next run, locations whose fingerprint still
+matches are left as they are, so a nightly run only pays for what changed.
+
+Each run also writes data/provenance/<stage>.json with how many locations
+were recomputed, which run_data_aggregation.py includes in its summary.
+
+Usage:
+    tracker = StageTracker("crime", source_version(__file__, BASELINES),
+                           inputs=("medianIncome",))
+    for location in tracker.pending(locations):
+        enrich(location)
+        tracker.mark(location)
+    tracker.save_stats()
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+PROVENANCE_DIR = os.path.join(DATA_DIR, "provenance")
+
+PROVENANCE_FIELD = "_provenance"
+
+_FILE_HASHES: Dict[str, str] = {}
+
+
+def file_version(path: str) -> str:
+    """Content hash of a file (e.g. the stage's own script)."""
+    path = os.path.abspath(path)
+    if path not in _FILE_HASHES:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _FILE_HASHES[path] = digest.hexdigest()[:16]
+    return _FILE_HASHES[path]
+
+
+def source_version(script_path: str, *sources) -> str:
+    """
+    Version of everything a stage's output depends on besides the location:
+    the stage script itself plus any JSON-serializable source descriptors
+    (tables, feed hashes, manifest timestamps).
+    """
+    payload = json.dumps([file_version(script_path), sources], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def location_fingerprint(location: Dict, version: str, inputs: Sequence[str] = ()) -> str:
+    """Fingerprint of one location's inputs to a stage."""
+    attrs = location.get("at") or {}
+    lat = location.get("lat")
+    lng = location.get("lng")
+    payload = json.dumps([
+        round(lat, 6) if isinstance(lat, (int, float)) else lat,
+        round(lng, 6) if isinstance(lng, (int, float)) else lng,
+        version,
+        [attrs.get(name) for name in inputs],
+    ], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class StageTracker:
+    """Dirty tracking and recompute counters for one enrichment stage."""
+
+    def __init__(
+        self,
+        stage: str,
+        version: str,
+        inputs: Sequence[str] = (),
+        force: bool = False
+    ):
+        self.stage = stage
+        self.version = version
+        self.inputs = tuple(inputs)
+        self.force = force
+        self.total = 0
+        self.recomputed = 0
+
+    def pending(self, locations: List[Dict]) -> List[Dict]:
+        """Locations that need recomputing; the rest are counted as unchanged."""
+        stale = []
+        for location in locations:
+            self.total += 1
+            fingerprint = location_fingerprint(location, self.version, self.inputs)
+            stamped = ((location.get("at") or {}).get(PROVENANCE_FIELD) or {}).get(self.stage)
+            if self.force or stamped != fingerprint:
+                stale.append(location)
+        return stale
+
+    def mark(self, location: Dict):
+        """
+        Stamp a location as computed (call after enriching it).
+
+        Inputs are fingerprinted as they stand after the stage ran, so a
+        stage may list an attribute it also writes: its stamp then only
+        matches while no other stage has overwritten that attribute.
+        """
+        fingerprint = location_fingerprint(location, self.version, self.inputs)
+        attrs = location.setdefault("at", {})
+        provenance = attrs.get(PROVENANCE_FIELD)
+        if not isinstance(provenance, dict):
+            provenance = attrs[PROVENANCE_FIELD] = {}
+        provenance[self.stage] = fingerprint
+        self.recomputed += 1
+
+    @property
+    def unchanged(self) -> int:
+        return self.total - self.recomputed
+
+    def save_stats(self, verbose: bool = True) -> Dict:
+        """Write this run's counters to data/provenance/<stage>.json."""
+        stats = {
+            "stage": self.stage,
+            "sourceVersion": self.version,
+            "total": self.total,
+            "recomputed": self.recomputed,
+            "unchanged": self.unchanged,
+            "updatedAt": datetime.now().isoformat(),
+        }
+        os.makedirs(PROVENANCE_DIR, exist_ok=True)
+        with open(os.path.join(PROVENANCE_DIR, f"{self.stage}.json"), "w") as f:
+            json.dump(stats, f, indent=2)
+        if verbose:
+            print(f"✓ Recomputed {self.recomputed:,}/{self.total:,} locations ({self.unchanged:,} unchanged)")
+        return stats
+
+
+def load_stage_stats(stage: str) -> Optional[Dict]:
+    """Counters from the last run of a stage, if any."""
+    path = os.path.join(PROVENANCE_DIR, f"{stage}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
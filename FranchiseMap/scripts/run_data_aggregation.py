@@ -10,18 +10,26 @@ Features:
 - Progress tracking
 - Comprehensive quality metrics
 - Graceful degradation on missing dependencies
+- Independent enrichment stages run concurrently (see ENRICHMENT_STAGES)
 """
 
+import codecs
+import hashlib
 import json
 import logging
 import os
+import re
 import subprocess
 import sys
 import time
-from dataclasses import dataclass, asdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from brand_lock import LOCKING_SUPPORTED
+from provenance import load_stage_stats
 
 
 # ============================================================================
@@ -34,6 +42,9 @@ class Config:
     RETRY_DELAY = 5  # seconds
     SUBPROCESS_TIMEOUT = 300  # 5 minutes per stage
     TOTAL_PIPELINE_TIMEOUT = 1200  # 20 minutes total
+    MAX_PARALLEL_STAGES = 3  # Enrichment scripts running at once
+    SCAN_WORKERS = min(8, os.cpu_count() or 1)  # Processes parsing brand files
+    SCAN_CACHE_FILE = "brand_scan_cache.json"  # In the data directory
     MIN_LOCATIONS_THRESHOLD = 100  # Warn if fewer than this
     LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
     LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
@@ -107,6 +118,179 @@ class QualityMetrics:
     transit_coverage: float = 0.0
 
 
+@dataclass
+class BrandFileScan:
+    """Validation result and coverage counters from one pass over a brand file."""
+    valid: bool
+    errors: List[str] = field(default_factory=list)
+    location_count: int = 0
+    with_attributes: int = 0
+    with_scores: int = 0
+    with_demographics: int = 0
+    with_accessibility: int = 0
+    with_crime_data: int = 0
+    with_employment_data: int = 0
+    with_transit_data: int = 0
+
+
+@dataclass
+class StageSpec:
+    """Declarative description of an enrichment stage."""
+    key: str  # Also the stage's provenance stats name
+    name: str
+    script: str
+    depends_on: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()  # Location attributes the stage reads
+    outputs: Tuple[str, ...] = ()  # Location attributes the stage writes
+    env_keys: Tuple[str, ...] = ()
+    optional: bool = False
+
+
+# ============================================================================
+# STAGE GRAPH
+# ============================================================================
+
+# Every stage rewrites the brand files, holding a per-file lock (brand_lock.py)
+# for each read-modify-write. Besides explicit depends_on, a stage runs after
+# any earlier-declared stage whose outputs it reads or also writes, so the
+# last writer of an attribute stays the same as in a sequential run.
+#
+# Stages skip locations whose provenance stamp still matches (provenance.py),
+# so an earlier writer recomputing a location must also invalidate the later
+# writer's stamp: census drops every other stage's stamp on the locations it
+# rebuilds, and transit lists transitScore among its inputs so accessibility
+# overwriting it makes transit recompute.
+ENRICHMENT_STAGES = [
+    StageSpec(
+        key='census',
+        name="Census Data Enrichment",
+        script="aggregate_census_data.py",
+        # Resets each location's census attributes (and other stages' stamps)
+        outputs=('medianIncome', 'populationDensity', 'educationIndex', 'crimeIndex',
+                 'employmentRate', 'walkScore', 'transitScore', 'traffic', 'visibility'),
+        env_keys=('CENSUS_API_KEY',)
+    ),
+    StageSpec(
+        key='crime',
+        name="Crime Data Enrichment",
+        script="aggregate_crime_data.py",
+        depends_on=('census',),
+        inputs=('medianIncome', 'populationDensity'),
+        outputs=('crimeIndex',),
+        env_keys=('GOV_DATA_KEY',),
+        optional=True
+    ),
+    StageSpec(
+        key='employment',
+        name="Employment Data Enrichment",
+        script="aggregate_employment_data.py",
+        depends_on=('census',),
+        inputs=('medianIncome', 'educationIndex'),
+        outputs=('employmentRate',),
+        env_keys=('BLS_KEY',),
+        optional=True
+    ),
+    StageSpec(
+        key='traffic',
+        name="Traffic Data Enrichment",
+        script="aggregate_traffic_data.py",
+        depends_on=('census',),
+        outputs=('traffic', 'visibility', 'roadDensity', 'areaType', 'nearestHighway', 'highwayDistance'),
+        optional=True
+    ),
+    StageSpec(
+        key='accessibility',
+        name="Accessibility Data Enrichment",
+        script="aggregate_accessibility_data.py",
+        depends_on=('census',),
+        outputs=('walkScore', 'transitScore', 'bikingScore'),
+        env_keys=('WALK_SCORE_API_KEY',),
+        optional=True
+    ),
+    StageSpec(
+        key='transit',
+        name="Transit Data Enrichment",
+        script="aggregate_gtfs_data.py",
+        depends_on=('census',),
+        # GTFS scores replace the estimated transitScore from accessibility
+        inputs=('transitScore',),
+        outputs=('transitScore', 'nearestTransitStop', 'transitAgency', 'transitDistance', 'transitDepartures'),
+        optional=True
+    ),
+]
+
+
+class StageGraph:
+    """Dependency graph over enrichment stages."""
+
+    def __init__(self, stages: List[StageSpec]):
+        self.stages = list(stages)
+        self.by_key = {stage.key: stage for stage in self.stages}
+        self.dependencies = self._resolve()
+
+    def _resolve(self) -> Dict[str, Set[str]]:
+        """Explicit dependencies plus read-after-write and write-write ordering."""
+        dependencies: Dict[str, Set[str]] = {}
+        for i, stage in enumerate(self.stages):
+            unknown = [key for key in stage.depends_on if key not in self.by_key]
+            if unknown:
+                raise ValueError(f"Stage {stage.key} depends on unknown stages: {unknown}")
+
+            deps = set(stage.depends_on)
+            for earlier in self.stages[:i]:
+                if set(earlier.outputs) & (set(stage.inputs) | set(stage.outputs)):
+                    deps.add(earlier.key)
+            dependencies[stage.key] = deps
+
+        # Explicit dependencies may point forward; reject cycles
+        visiting: Set[str] = set()
+        visited: Set[str] = set()
+
+        def visit(key: str):
+            if key in visited:
+                return
+            if key in visiting:
+                raise ValueError(f"Stage graph has a cycle through {key}")
+            visiting.add(key)
+            for dep in dependencies[key]:
+                visit(dep)
+            visiting.discard(key)
+            visited.add(key)
+
+        for stage in self.stages:
+            visit(stage.key)
+        return dependencies
+
+    def ready(self, finished: Set[str], started: Set[str]) -> List[StageSpec]:
+        """Stages not yet started whose dependencies have all finished."""
+        return [
+            stage for stage in self.stages
+            if stage.key not in started and self.dependencies[stage.key] <= finished
+        ]
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """
+        Longest chain of dependent stages by duration: the wall-clock floor
+        of the enrichment phase however many stages run at once.
+        """
+        longest: Dict[str, Tuple[float, List[str]]] = {}
+
+        def chain(key: str) -> Tuple[float, List[str]]:
+            if key not in longest:
+                best_length, best_path = 0.0, []
+                for dep in self.dependencies[key]:
+                    length, path = chain(dep)
+                    if length > best_length:
+                        best_length, best_path = length, path
+                longest[key] = (best_length + durations.get(key, 0.0), best_path + [key])
+            return longest[key]
+
+        if not self.stages:
+            return [], 0.0
+        length, path = max((chain(stage.key) for stage in self.stages), key=lambda item: item[0])
+        return path, length
+
+
 # ============================================================================
 # VALIDATION UTILITIES
 # ============================================================================
@@ -142,48 +326,239 @@ class DataValidator:
         required = ['id', 'ticker', 'n', 'lat', 'lng']
         return all(key in location for key in required)
 
+    # Coverage rules for QualityMetrics
+    DEMOGRAPHIC_FIELDS = [
+        'medianIncome', 'populationDensity', 'consumerSpending',
+        'growthRate', 'educationIndex', 'employmentRate'
+    ]
+    ACCESSIBILITY_FIELDS = ['walkScore', 'transitScore']
+    CRIME_FIELDS = ['crimeIndex']
+    EMPLOYMENT_FIELDS = ['employmentRate']
+    TRANSIT_FIELDS = ['transitScore']
+
+    @staticmethod
+    def scan_brand_file(file_path: Path) -> Tuple[BrandFileScan, str]:
+        """
+        Validate a brand file and count attribute coverage in one streaming
+        pass. Returns (scan, sha256 of the file contents).
+        """
+        scan = BrandFileScan(valid=True)
+        digest = hashlib.sha256()
+        invalid_count = 0
+
+        try:
+            with open(file_path, 'rb') as f:
+                decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+                def read(size: int) -> str:
+                    data = f.read(size)
+                    digest.update(data)
+                    return decoder.decode(data, final=not data)
+
+                for i, loc in enumerate(iter_json_array(read)):
+                    scan.location_count += 1
+                    if not isinstance(loc, dict):
+                        scan.errors.append(f"Location {i} is not a dict")
+                        invalid_count += 1
+                        continue
+                    if not DataValidator.validate_location(loc):
+                        scan.errors.append(f"Location {i} missing required fields")
+                        invalid_count += 1
+                    DataValidator._count_coverage(scan, loc)
+
+        except NotJSONArrayError:
+            return BrandFileScan(valid=False, errors=["Data is not a list"]), digest.hexdigest()
+        except TypeError as e:
+            # A malformed location record, not a malformed file
+            return BrandFileScan(
+                valid=False, errors=[f"Location {scan.location_count - 1}: TypeError: {e}"]
+            ), digest.hexdigest()
+        except Exception as e:
+            return BrandFileScan(valid=False, errors=[f"Exception: {str(e)}"]), digest.hexdigest()
+
+        if scan.location_count == 0:
+            scan.valid = False
+            scan.errors = ["Data list is empty"]
+        elif invalid_count > 0:
+            scan.valid = False
+            if invalid_count > 10:
+                scan.errors = scan.errors[:10]
+                scan.errors.append(f"... and {invalid_count - 10} more")
+
+        return scan, digest.hexdigest()
+
+    @staticmethod
+    def _count_coverage(scan: BrandFileScan, loc: Dict):
+        """Add one location to the scan's coverage counters."""
+        attrs = loc.get('at') or {}
+
+        if attrs:
+            scan.with_attributes += 1
+        if loc.get('s'):
+            scan.with_scores += 1
+        if all(f in attrs for f in DataValidator.DEMOGRAPHIC_FIELDS):
+            scan.with_demographics += 1
+        if all(f in attrs for f in DataValidator.ACCESSIBILITY_FIELDS):
+            scan.with_accessibility += 1
+        if any(f in attrs for f in DataValidator.CRIME_FIELDS):
+            scan.with_crime_data += 1
+        if any(f in attrs for f in DataValidator.EMPLOYMENT_FIELDS):
+            scan.with_employment_data += 1
+        if any(f in attrs for f in DataValidator.TRANSIT_FIELDS):
+            scan.with_transit_data += 1
+
     @staticmethod
     def validate_brand_file(file_path: Path) -> Tuple[bool, List[str], int]:
         """
         Validate brand data file.
         Returns: (is_valid, errors, location_count)
         """
-        errors = []
-        location_count = 0
+        scan, _ = DataValidator.scan_brand_file(file_path)
+        return scan.valid, scan.errors, scan.location_count
+
 
+class NotJSONArrayError(TypeError):
+    """The top-level JSON document is not an array."""
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*\Z')
+
+
+def iter_json_array(read: Callable[[int], str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time, reading the
+    document in chunks, so a brand file is never held in memory whole.
+
+    Raises NotJSONArrayError if the document is not an array and ValueError
+    if it is malformed.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise NotJSONArrayError("Document is not a JSON array")
+    pos += 1
+
+    first = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array")
+        if buf[pos] == ']' and first:
+            pos += 1
+            break
+        if not first:
+            if buf[pos] == ']':
+                pos += 1
+                break
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buf[pos]!r}")
+            pos += 1
+            skip_whitespace()
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number cut off by the chunk boundary still decodes ("1.5" -> 1)
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if is_number and _NUMBER_TAIL.match(buf, end) and fill():
+                continue
+            break
+        yield value
+        pos = end
+        first = False
+
+    skip_whitespace()
+    if pos < len(buf):
+        raise ValueError("Extra data after JSON array")
+
+
+class BrandScanCache:
+    """
+    Scan results keyed by brand file fingerprint, persisted between runs.
+
+    A file whose size and mtime are unchanged is not read at all; one whose
+    mtime changed but whose content hash matches (e.g. rewritten unchanged)
+    is only hashed, not parsed.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_path: Path, data_dir: Path):
+        self.cache_path = cache_path
+        self.data_dir = data_dir
+        self.files: Dict[str, Dict] = {}
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if not isinstance(data, list):
-                errors.append("Data is not a list")
-                return False, errors, 0
-
-            if len(data) == 0:
-                errors.append("Data list is empty")
-                return False, errors, 0
-
-            invalid_count = 0
-            for i, loc in enumerate(data):
-                if not isinstance(loc, dict):
-                    errors.append(f"Location {i} is not a dict")
-                    invalid_count += 1
-                elif not DataValidator.validate_location(loc):
-                    errors.append(f"Location {i} missing required fields")
-                    invalid_count += 1
-
-            if invalid_count > 0:
-                if invalid_count > 10:
-                    errors = errors[:10]
-                    errors.append(f"... and {invalid_count - 10} more")
-                return False, errors, len(data)
-
-            location_count = len(data)
-            return True, [], location_count
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') == self.VERSION:
+                self.files = cache.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, file_path: Path) -> str:
+        return os.path.relpath(file_path, self.data_dir)
+
+    def lookup(self, file_path: Path, stat: os.stat_result) -> Optional[BrandFileScan]:
+        """Cached scan if the file is unchanged, else None."""
+        entry = self.files.get(self._key(file_path))
+        if not entry or entry['size'] != stat.st_size:
+            return None
+
+        if entry['mtimeNs'] != stat.st_mtime_ns:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            if digest.hexdigest() != entry['sha256']:
+                return None
+            entry['mtimeNs'] = stat.st_mtime_ns
+
+        return BrandFileScan(**entry['scan'])
+
+    def store(self, file_path: Path, stat: os.stat_result, scan: BrandFileScan, sha256: str):
+        self.files[self._key(file_path)] = {
+            'size': stat.st_size,
+            'mtimeNs': stat.st_mtime_ns,
+            'sha256': sha256,
+            'scan': asdict(scan)
+        }
 
-        except Exception as e:
-            errors.append(f"Exception: {str(e)}")
-            return False, errors, 0
+    def save(self):
+        try:
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'files': self.files}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save scan cache: {e}")
 
 
 # ============================================================================
@@ -274,6 +649,8 @@ class DataAggregationPipeline:
         self.manifest: List[Dict] = []
         self.quality_metrics = QualityMetrics()
         self.pipeline_start_time = datetime.now()
+        self.timing: Dict[str, Any] = {}
+        self.scan_cache = BrandScanCache(self.data_dir / Config.SCAN_CACHE_FILE, self.data_dir)
 
         logger.info(f"Pipeline initialized")
         logger.info(f"Data directory: {self.data_dir}")
@@ -327,6 +704,52 @@ class DataAggregationPipeline:
             logger.error(f"Failed to load manifest: {e}")
             return False
 
+    def brand_file_path(self, brand_info: Dict) -> Path:
+        """Resolve a manifest entry's file path."""
+        file_rel = brand_info.get('file', '') if isinstance(brand_info, dict) else ''
+        if file_rel.startswith('data/'):
+            return self.data_dir / file_rel[5:]
+        return self.data_dir / file_rel
+
+    def scan_brand_files(self, file_paths: List[Path]) -> Dict[Path, BrandFileScan]:
+        """
+        Scan results for every file: cached for unchanged files, the rest
+        parsed in parallel worker processes.
+        """
+        results: Dict[Path, BrandFileScan] = {}
+        stats = {}
+        for file_path in file_paths:
+            stat = file_path.stat()
+            cached = self.scan_cache.lookup(file_path, stat)
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                stats[file_path] = stat
+
+        misses = list(stats)
+        workers = min(Config.SCAN_WORKERS, len(misses))
+        scanned = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    scanned = list(pool.map(DataValidator.scan_brand_file, misses))
+            except Exception as e:
+                logger.debug(f"Parallel scan unavailable, scanning sequentially: {e}")
+        if scanned is None:
+            scanned = [DataValidator.scan_brand_file(file_path) for file_path in misses]
+
+        for file_path, (scan, sha256) in zip(misses, scanned):
+            results[file_path] = scan
+            self.scan_cache.store(file_path, stats[file_path], scan, sha256)
+
+        if misses:
+            self.scan_cache.save()
+        logger.info(
+            f"  Scanned {len(misses)} brand files "
+            f"({len(file_paths) - len(misses)} unchanged since last scan)"
+        )
+        return results
+
     def verify_brand_data(self) -> StageResult:
         """Verify all brand data files exist and are valid."""
         logger.info("\n" + "="*70)
@@ -338,30 +761,26 @@ class DataAggregationPipeline:
         invalid_files = []
         total_locations = 0
 
-        for brand_info in self.manifest:
-            ticker = brand_info.get('ticker', 'UNKNOWN')
-            file_rel = brand_info.get('file', '')
+        file_paths = [self.brand_file_path(brand_info) for brand_info in self.manifest]
+        scans = self.scan_brand_files([p for p in file_paths if p.exists()])
 
-            # Resolve file path
-            if file_rel.startswith('data/'):
-                file_path = self.data_dir / file_rel[5:]
-            else:
-                file_path = self.data_dir / file_rel
+        for brand_info, file_path in zip(self.manifest, file_paths):
+            ticker = brand_info.get('ticker', 'UNKNOWN')
 
             # Check existence
-            if not file_path.exists():
+            if file_path not in scans:
                 missing_files.append(ticker)
                 logger.warning(f"  ✗ {ticker}: File not found")
                 continue
 
             # Validate content
-            is_valid, errors, loc_count = DataValidator.validate_brand_file(file_path)
-            if not is_valid:
-                invalid_files.append((ticker, errors))
-                logger.warning(f"  ✗ {ticker}: Invalid - {errors[0]}")
+            scan = scans[file_path]
+            if not scan.valid:
+                invalid_files.append((ticker, scan.errors))
+                logger.warning(f"  ✗ {ticker}: Invalid - {scan.errors[0]}")
             else:
-                total_locations += loc_count
-                logger.info(f"  ✓ {ticker}: {loc_count:,} locations")
+                total_locations += scan.location_count
+                logger.info(f"  ✓ {ticker}: {scan.location_count:,} locations")
 
         self.quality_metrics.total_locations = total_locations
 
@@ -402,9 +821,16 @@ class DataAggregationPipeline:
         stage_name: str,
         script_name: str,
         env_vars: Optional[Dict] = None,
-        optional: bool = False
+        optional: bool = False,
+        provenance_stage: Optional[str] = None
     ) -> StageResult:
-        """Run a data enrichment stage."""
+        """
+        Run a data enrichment stage.
+
+        provenance_stage names the stage's provenance stats file; when the
+        script writes it during this run, the recomputed/unchanged counts
+        are added to the stage details.
+        """
         logger.info("\n" + "="*70)
         logger.info(f"STAGE {stage_num}: {stage_name}")
         logger.info("="*70)
@@ -428,6 +854,7 @@ class DataAggregationPipeline:
             return result
 
         # Run script with retry logic
+        started_at = datetime.now()
         start_time = time.time()
         success, stdout, stderr = ProcessRunner.run_script(
             script_path,
@@ -453,79 +880,137 @@ class DataAggregationPipeline:
             logger.error(f"  ✗ {message}")
             logger.debug(f"Full stderr: {stderr}")
 
+        details = {
+            'script': script_name,
+            'success': success,
+            'stderr_preview': stderr[:500] if stderr else None
+        }
+
+        # Incremental stages report how many locations they actually recomputed
+        stats = load_stage_stats(provenance_stage) if provenance_stage else None
+        if stats and datetime.fromisoformat(stats['updatedAt']) >= started_at:
+            details['recomputed'] = stats['recomputed']
+            details['unchanged'] = stats['unchanged']
+            details['total'] = stats['total']
+            logger.info(f"  Recomputed {stats['recomputed']:,}/{stats['total']:,} locations")
+
         result = StageResult(
             name=stage_name,
             status=status,
             duration=duration,
             message=message,
-            details={
-                'script': script_name,
-                'success': success,
-                'stderr_preview': stderr[:500] if stderr else None
-            }
+            details=details
         )
 
         self.stages.append(result)
         return result
 
-    def calculate_quality_metrics(self) -> bool:
-        """Calculate comprehensive data quality metrics."""
-        logger.info("\n" + "="*70)
-        logger.info("STAGE 5: Calculating Quality Metrics")
-        logger.info("="*70)
-
-        try:
-            required_demographic_fields = [
-                'medianIncome', 'populationDensity', 'consumerSpending',
-                'growthRate', 'educationIndex', 'employmentRate'
-            ]
-            required_accessibility_fields = ['walkScore', 'transitScore']
-            crime_fields = ['crimeIndex']
-            employment_fields = ['employmentRate']
-            transit_fields = ['transitScore']
-
-            for brand_info in self.manifest:
-                file_rel = brand_info.get('file', '') if isinstance(brand_info, dict) else ''
-
-                # Resolve file path
-                if file_rel.startswith('data/'):
-                    file_path = self.data_dir / file_rel[5:]
-                else:
-                    file_path = self.data_dir / file_rel
-
-                if not file_path.exists():
-                    continue
-
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    locations = json.load(f)
-
-                # Skip if not a list
-                if not isinstance(locations, list):
-                    continue
-
-                for loc in locations:
-                    attrs = loc.get('at', {})
-                    score = loc.get('s')
+    def run_stage_graph(self, graph: StageGraph) -> None:
+        """
+        Run enrichment stages as their dependencies finish, up to
+        Config.MAX_PARALLEL_STAGES at once, and record a timing report.
 
-                    if attrs:
-                        self.quality_metrics.with_attributes += 1
-                    if score:
-                        self.quality_metrics.with_scores += 1
+        A stage waits for its dependencies to finish, not to succeed, as in
+        the sequential pipeline. No new stage starts once the total
+        pipeline timeout has passed.
+        """
+        max_workers = Config.MAX_PARALLEL_STAGES if LOCKING_SUPPORTED else 1
+        stage_numbers = {stage.key: i + 2 for i, stage in enumerate(graph.stages)}
+        deadline = self.pipeline_start_time.timestamp() + Config.TOTAL_PIPELINE_TIMEOUT
+
+        graph_start = time.time()
+        timings: Dict[str, Dict[str, float]] = {}
+
+        def run(stage: StageSpec) -> StageResult:
+            start = time.time() - graph_start
+            result = self.run_enrichment_stage(
+                stage_numbers[stage.key],
+                stage.name,
+                stage.script,
+                env_vars={key: os.environ.get(key, '') for key in stage.env_keys},
+                optional=stage.optional,
+                provenance_stage=stage.key
+            )
+            timings[stage.key] = {'start': start, 'end': time.time() - graph_start}
+            return result
 
-                    if all(f in attrs for f in required_demographic_fields):
-                        self.quality_metrics.with_demographics += 1
+        started: Set[str] = set()
+        finished: Set[str] = set()
+        running = {}
 
-                    if all(f in attrs for f in required_accessibility_fields):
-                        self.quality_metrics.with_accessibility += 1
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(finished) < len(graph.stages):
+                for stage in graph.ready(finished, started):
+                    if len(running) >= max_workers:
+                        break
+                    started.add(stage.key)
+                    if time.time() >= deadline:
+                        message = "Not started: total pipeline timeout reached"
+                        logger.warning(f"  ⚠ {stage.name}: {message}")
+                        self.stages.append(StageResult(
+                            name=stage.name,
+                            status='timeout',
+                            duration=0.0,
+                            message=message,
+                            details={'script': stage.script}
+                        ))
+                        finished.add(stage.key)
+                        continue
+                    running[pool.submit(run, stage)] = stage.key
+
+                if not running:
+                    continue  # Stages just marked as timed out may unblock others
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    finished.add(running.pop(future))
+
+        durations = {key: t['end'] - t['start'] for key, t in timings.items()}
+        path, path_duration = graph.critical_path(durations)
+        wall_clock = time.time() - graph_start
+        sequential = sum(durations.values())
+
+        self.timing = {
+            'wallClock': round(wall_clock, 1),
+            'sequentialDuration': round(sequential, 1),
+            'speedup': round(sequential / wall_clock, 2) if wall_clock > 0 else None,
+            'maxParallelStages': max_workers,
+            'criticalPath': [graph.by_key[key].name for key in path],
+            'criticalPathDuration': round(path_duration, 1),
+            'stages': {
+                graph.by_key[key].name: {
+                    'start': round(t['start'], 1),
+                    'end': round(t['end'], 1),
+                    'dependsOn': sorted(graph.by_key[dep].name for dep in graph.dependencies[key]),
+                    'critical': key in path
+                }
+                for key, t in sorted(timings.items(), key=lambda item: item[1]['start'])
+            }
+        }
 
-                    if any(f in attrs for f in crime_fields):
-                        self.quality_metrics.with_crime_data += 1
+        logger.info(f"\nEnrichment wall clock: {wall_clock:.1f}s ({sequential:.1f}s of stage time)")
+        logger.info(f"Critical path ({path_duration:.1f}s): {' → '.join(self.timing['criticalPath'])}")
 
-                    if any(f in attrs for f in employment_fields):
-                        self.quality_metrics.with_employment_data += 1
+    def calculate_quality_metrics(self) -> bool:
+        """Calculate comprehensive data quality metrics."""
+        logger.info("\n" + "="*70)
+        logger.info(f"STAGE {len(ENRICHMENT_STAGES) + 2}: Calculating Quality Metrics")
+        logger.info("="*70)
 
-                    if any(f in attrs for f in transit_fields):
-                        self.quality_metrics.with_transit_data += 1
+        try:
+            # Only files rewritten by the enrichment stages are parsed again
+            file_paths = [self.brand_file_path(brand_info) for brand_info in self.manifest]
+            scans = self.scan_brand_files([p for p in file_paths if p.exists()])
+
+            metrics = self.quality_metrics
+            metrics.with_attributes = sum(scan.with_attributes for scan in scans.values())
+            metrics.with_scores = sum(scan.with_scores for scan in scans.values())
+            metrics.with_demographics = sum(scan.with_demographics for scan in scans.values())
+            metrics.with_accessibility = sum(scan.with_accessibility for scan in scans.values())
+            metrics.with_crime_data = sum(scan.with_crime_data for scan in scans.values())
+            metrics.with_employment_data = sum(scan.with_employment_data for scan in scans.values())
+            metrics.with_transit_data = sum(scan.with_transit_data for scan in scans.values())
 
             # Calculate percentages
             total = self.quality_metrics.total_locations
@@ -620,6 +1105,12 @@ class DataAggregationPipeline:
                         'transit': round(self.quality_metrics.transit_coverage, 1)
                     }
                 },
+                'timing': self.timing,
+                'recomputedLocations': {
+                    stage.name: stage.details['recomputed']
+                    for stage in self.stages
+                    if stage.details and 'recomputed' in stage.details
+                },
                 'success': self.is_successful()
             }
 
@@ -654,42 +1145,12 @@ class DataAggregationPipeline:
         if verify_result.status == 'error':
             logger.warning("⚠ Brand data verification found issues")
 
-        # Get API keys from environment
-        env_vars = {
-            'CENSUS_API_KEY': os.environ.get('CENSUS_API_KEY', ''),
-            'GOV_DATA_KEY': os.environ.get('GOV_DATA_KEY', ''),
-            'BLS_KEY': os.environ.get('BLS_KEY', '')
-        }
-
-        # Stage 2: Census enrichment
-        self.run_enrichment_stage(
-            2,
-            "Census Data Enrichment",
-            "aggregate_census_data.py",
-            env_vars={'CENSUS_API_KEY': env_vars['CENSUS_API_KEY']}
-        )
-
-        # Stage 3: Crime data enrichment
-        self.run_enrichment_stage(
-            3,
-            "Crime Data Enrichment",
-            "aggregate_crime_data.py",
-            env_vars={'GOV_DATA_KEY': env_vars['GOV_DATA_KEY']},
-            optional=True
-        )
-
-        # Stage 4: Employment data enrichment
-        self.run_enrichment_stage(
-            4,
-            "Employment Data Enrichment",
-            "aggregate_employment_data.py",
-            env_vars={'BLS_KEY': env_vars['BLS_KEY']},
-            optional=True
-        )
+        # Stages 2+: Enrichment, independent stages in parallel
+        self.run_stage_graph(StageGraph(ENRICHMENT_STAGES))
 
-        # Stage 5: Quality metrics
+        # Final stage: Quality metrics
         logger.info("\n" + "="*70)
-        logger.info("STAGE 5: Quality Metrics & Reports")
+        logger.info(f"STAGE {len(ENRICHMENT_STAGES) + 2}: Quality Metrics & Reports")
         logger.info("="*70)
 
         if not self.calculate_quality_metrics():
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Spatial Grid Index
+Uniform lat/lng grid for batch radius and nearest-point queries.
+
+Points are kept sorted by grid cell, so every cell is a contiguous slice of
+the point arrays. The index itself is only the sorted cell keys plus their
+start offsets, which makes it cheap to persist with np.save and to
+memory-map on later runs.
+
+Used by:
+- gtfs_stop_store.py (nearest transit stop)
+- boundary_index.py (grid cell math for boundary lookups)
+- trade_area.py (block group radius totals)
+"""
+
+import os
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3959
+MILES_PER_DEGREE_LAT = 69.0
+DEFAULT_CELL_DEG = 0.05  # ~3.5 miles north-south
+
+# Number of query/candidate pairs evaluated per distance block
+DISTANCE_BLOCK_SIZE = 4_000_000
+
+
+def haversine_miles(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    Vectorized haversine distance in miles.
+
+    Arguments broadcast like any NumPy expression, so passing a column of
+    locations and a row of features yields the full distance matrix. The
+    formula mirrors the scalar `haversine_distance` used by the scripts.
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lng1 = np.asarray(lng1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lng2 = np.asarray(lng2, dtype=np.float64)
+
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlat = np.radians(lat2 - lat1)
+    dlng = np.radians(lng2 - lng1)
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlng / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_MILES * c
+
+
+def _concat_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenate [start, end) integer ranges without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total, dtype=np.int64)
+
+
+class GridIndex:
+    """Grid index over points stored in cell order."""
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        cell_deg: float,
+        cell_keys: np.ndarray,
+        cell_starts: np.ndarray
+    ):
+        self.lat = lat
+        self.lng = lng
+        self.cell_deg = float(cell_deg)
+        self.cell_keys = cell_keys
+        self.cell_starts = cell_starts
+        self.n_cols = int(np.ceil(360.0 / self.cell_deg)) + 1
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # ------------------------------------------------------------------
+    # Construction & persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cell_rows_cols(lat, lng, cell_deg: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid row/column of each coordinate."""
+        rows = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / cell_deg).astype(np.int64)
+        cols = np.floor((np.asarray(lng, dtype=np.float64) + 180.0) / cell_deg).astype(np.int64)
+        return rows, cols
+
+    @classmethod
+    def build(
+        cls,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        cell_deg: float = DEFAULT_CELL_DEG
+    ) -> Tuple["GridIndex", np.ndarray]:
+        """
+        Build an index for the given points.
+
+        Returns (index, order): the index holds the points reordered by
+        cell, and `order` is the permutation callers apply to any other
+        per-point columns so they stay aligned.
+        """
+        n_cols = int(np.ceil(360.0 / cell_deg)) + 1
+        rows, cols = cls.cell_rows_cols(lat, lng, cell_deg)
+        keys = rows * n_cols + cols
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        cell_keys, cell_counts = np.unique(sorted_keys, return_counts=True)
+        cell_starts = np.zeros(len(cell_keys) + 1, dtype=np.int64)
+        np.cumsum(cell_counts, out=cell_starts[1:])
+
+        index = cls(
+            np.asarray(lat)[order],
+            np.asarray(lng)[order],
+            cell_deg,
+            cell_keys.astype(np.int64),
+            cell_starts
+        )
+        return index, order
+
+    def save(self, directory: str, prefix: str = "grid"):
+        """Write the cell keys and offsets next to the point columns."""
+        np.save(os.path.join(directory, f"{prefix}_keys.npy"), self.cell_keys)
+        np.save(os.path.join(directory, f"{prefix}_starts.npy"), self.cell_starts)
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        cell_deg: float,
+        prefix: str = "grid",
+        mmap: bool = True
+    ) -> "GridIndex":
+        """Load a saved index; `lat`/`lng` must already be in cell order."""
+        mode = "r" if mmap else None
+        cell_keys = np.load(os.path.join(directory, f"{prefix}_keys.npy"), mmap_mode=mode)
+        cell_starts = np.load(os.path.join(directory, f"{prefix}_starts.npy"), mmap_mode=mode)
+        return cls(lat, lng, cell_deg, cell_keys, cell_starts)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def candidates_in_box(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lng: float,
+        max_lng: float
+    ) -> np.ndarray:
+        """Row indices of all points in cells overlapping a lat/lng box."""
+        if len(self.cell_keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        r0, c0 = self.cell_rows_cols(min_lat, min_lng, self.cell_deg)
+        r1, c1 = self.cell_rows_cols(max_lat, max_lng, self.cell_deg)
+        rows = np.arange(int(r0), int(r1) + 1, dtype=np.int64)
+        cols = np.arange(int(c0), int(c1) + 1, dtype=np.int64)
+        keys = (rows[:, None] * self.n_cols + cols[None, :]).ravel()
+
+        pos = np.searchsorted(self.cell_keys, keys)
+        valid = pos < len(self.cell_keys)
+        pos, keys = pos[valid], keys[valid]
+        pos = pos[np.asarray(self.cell_keys)[pos] == keys]
+        return _concat_ranges(
+            np.asarray(self.cell_starts)[pos],
+            np.asarray(self.cell_starts)[pos + 1]
+        )
+
+    def _query_blocks(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        radius_miles: float
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Yield (query_idx, candidate_rows, distances) blocks.
+
+        Queries are grouped by their own grid cell so every query in a
+        group shares one candidate set, and each group is resolved with a
+        single broadcast distance matrix.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        rows, cols = self.cell_rows_cols(lats, lngs, self.cell_deg)
+        query_keys = rows * self.n_cols + cols
+
+        order = np.argsort(query_keys, kind="stable")
+        unique_keys, group_starts = np.unique(query_keys[order], return_index=True)
+        group_ends = np.append(group_starts[1:], len(order))
+
+        dlat = radius_miles / MILES_PER_DEGREE_LAT
+        for key, g0, g1 in zip(unique_keys, group_starts, group_ends):
+            query_idx = order[g0:g1]
+            row, col = divmod(int(key), self.n_cols)
+            cell_min_lat = row * self.cell_deg - 90.0
+            cell_min_lng = col * self.cell_deg - 180.0
+            cell_max_lat = cell_min_lat + self.cell_deg
+
+            # Longitude degrees shrink toward the poles; widen the box using
+            # the latitude farthest from the equator.
+            extreme_lat = min(89.0, max(abs(cell_min_lat - dlat), abs(cell_max_lat + dlat)))
+            dlng = dlat / max(np.cos(np.radians(extreme_lat)), 0.01)
+
+            candidates = self.candidates_in_box(
+                cell_min_lat - dlat,
+                cell_max_lat + dlat,
+                cell_min_lng - dlng,
+                cell_min_lng + self.cell_deg + dlng
+            )
+            if len(candidates) == 0:
+                continue
+
+            # Keep each distance matrix bounded in size
+            step = max(1, DISTANCE_BLOCK_SIZE // len(candidates))
+            for s in range(0, len(query_idx), step):
+                q = query_idx[s:s + step]
+                dist = haversine_miles(
+                    lats[q][:, None], lngs[q][:, None],
+                    np.asarray(self.lat)[candidates][None, :],
+                    np.asarray(self.lng)[candidates][None, :]
+                )
+                yield q, candidates, dist
+
+    def query_radius(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        radius_miles: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All (query, point) pairs within `radius_miles`.
+
+        Returns three aligned arrays: query index, point row and distance.
+        """
+        q_parts, p_parts, d_parts = [], [], []
+        for q, candidates, dist in self._query_blocks(lats, lngs, radius_miles):
+            qi, ci = np.nonzero(dist <= radius_miles)
+            if len(qi):
+                q_parts.append(q[qi])
+                p_parts.append(candidates[ci])
+                d_parts.append(dist[qi, ci])
+
+        if not q_parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), np.zeros(0, dtype=np.float64)
+        return np.concatenate(q_parts), np.concatenate(p_parts), np.concatenate(d_parts)
+
+    def nearest(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        search_radius_miles: float = 15.0,
+        max_radius_miles: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest point for every query.
+
+        Searches `search_radius_miles` first and widens the radius for the
+        queries that found nothing. Without `max_radius_miles` the last
+        resort is an exhaustive scan, so every query gets an answer as long
+        as the index is non-empty. Misses are reported as (-1, inf).
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        best_idx = np.full(len(lats), -1, dtype=np.int64)
+        best_dist = np.full(len(lats), np.inf)
+        if len(lats) == 0 or len(self) == 0:
+            return best_idx, best_dist
+
+        pending = np.arange(len(lats))
+        for radius in (search_radius_miles, search_radius_miles * 4, search_radius_miles * 16):
+            if not len(pending):
+                break
+            if max_radius_miles is not None:
+                radius = min(radius, max_radius_miles)
+            for q, candidates, dist in self._query_blocks(lats[pending], lngs[pending], radius):
+                col = np.argmin(dist, axis=1)
+                d = dist[np.arange(len(q)), col]
+                target = pending[q]
+                closer = (d <= radius) & (d < best_dist[target])
+                best_dist[target[closer]] = d[closer]
+                best_idx[target[closer]] = candidates[col[closer]]
+            pending = pending[best_idx[pending] < 0]
+            if max_radius_miles is not None and radius >= max_radius_miles:
+                break
+
+        if len(pending) and max_radius_miles is None:
+            all_rows = np.arange(len(self), dtype=np.int64)
+            step = max(1, DISTANCE_BLOCK_SIZE // len(self))
+            for s in range(0, len(pending), step):
+                q = pending[s:s + step]
+                dist = haversine_miles(
+                    lats[q][:, None], lngs[q][:, None],
+                    np.asarray(self.lat)[None, :], np.asarray(self.lng)[None, :]
+                )
+                col = np.argmin(dist, axis=1)
+                best_idx[q] = all_rows[col]
+                best_dist[q] = dist[np.arange(len(q)), col]
+
+        return best_idx, best_dist
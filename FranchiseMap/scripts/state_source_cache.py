@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+State Source Cache
+Shared cache for state-level source data (FBI crime estimates, BLS
+unemployment rates) used by the per-location enrichment scripts.
+
+Each source is fetched once per state per TTL, however many locations
+or runs use it:
+- prefetch() fetches every missing or expired state concurrently at
+  stage start
+- every fetch is saved to data/state_cache/<source>.json with its fetch
+  time, so later runs reuse it until the TTL expires (the data
+  aggregation workflow restores and saves this directory with
+  actions/cache)
+- failed fetches are remembered for a shorter TTL, so an unreachable API
+  isn't retried for every location
+
+Usage:
+    cache = StateSourceCache("bls", fetch_bls_state_employment, ttl=7 * DAY)
+    cache.prefetch(STATE_FIPS)
+    data = cache.get("CA")
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+STATE_CACHE_DIR = os.path.join(DATA_DIR, "state_cache")
+
+DAY = 24 * 60 * 60
+FAILURE_TTL = DAY  # Retry failed fetches after a day
+PREFETCH_WORKERS = 8
+
+
+class StateSourceCache:
+    """State-keyed cache of one source's responses with on-disk TTL persistence."""
+
+    def __init__(
+        self,
+        source: str,
+        fetch: Callable[[str], Optional[Dict]],
+        ttl: float,
+        cache_dir: str = STATE_CACHE_DIR,
+        failure_ttl: float = FAILURE_TTL
+    ):
+        self.source = source
+        self.fetch = fetch
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.path = os.path.join(cache_dir, f"{source}.json")
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def _is_fresh(self, state: str, now: float) -> bool:
+        entry = self._entries.get(state)
+        if entry is None:
+            return False
+        ttl = self.ttl if entry.get("data") is not None else self.failure_ttl
+        return now - entry.get("fetchedAt", 0) < ttl
+
+    def _fetch(self, state: str):
+        try:
+            data = self.fetch(state)
+        except Exception as e:
+            print(f"    {self.source} fetch failed for {state}: {e}")
+            data = None
+        with self._lock:
+            self._entries[state] = {"fetchedAt": time.time(), "data": data}
+            self.fetches += 1
+            self._dirty = True
+
+    def prefetch(self, states: Iterable[str], workers: int = PREFETCH_WORKERS) -> int:
+        """Fetch every missing or expired state concurrently; returns fetch count."""
+        now = time.time()
+        stale = sorted({s for s in states if s and not self._is_fresh(s, now)})
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+                list(pool.map(self._fetch, stale))
+            self.save()
+        return len(stale)
+
+    def get(self, state: str) -> Optional[Dict]:
+        """Cached response for a state (fetched and saved now if it wasn't prefetched)."""
+        if not state:
+            return None
+        if not self._is_fresh(state, time.time()):
+            self._fetch(state)
+            self.save()
+        return self._entries[state]["data"]
+
+    def save(self):
+        """Write fetched responses to disk."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Trade Area Demographics
+Population, households and income within 1, 3 and 5 miles of every
+location, aggregated from Census block groups.
+
+Each block group is represented by its TIGER internal point (INTPTLAT /
+INTPTLON in the block group shapefile's .dbf) and its ACS values from the
+census warehouse. The points go into a GridIndex, so each brand's
+locations are resolved with one batch radius query.
+
+Fields written:
+- at.tradeArea1 / at.tradeArea3 / at.tradeArea5:
+  {"population", "households", "medianIncome"}
+  medianIncome is the household-weighted mean of block group medians.
+
+Setup:
+1. Block group shapefiles (tl_2023_XX_bg.zip) unzipped in data/tiger/
+2. python trade_area.py --download      # ACS block group table (CENSUS_API_KEY)
+3. python trade_area.py
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from boundary_index import TIGER_DIR, find_shapefiles, read_dbf
+from brand_lock import brand_file_lock
+from census_warehouse import WAREHOUSE_DIR, download_acs, open_warehouse, write_table
+from provenance import StageTracker, source_version
+from spatial_grid import GridIndex
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+
+TRADE_AREA_RADII = (1, 3, 5)  # Miles
+
+# ACS variables published at block group level
+BLOCK_GROUP_VARIABLES = {
+    "B01003_001E": "population",
+    "B11001_001E": "households",
+    "B19013_001E": "median_income",
+}
+
+
+def load_block_group_centroids(tiger_dir: str = TIGER_DIR) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """(geoids, lats, lngs) of block group internal points from the .dbf files."""
+    geoids: List[str] = []
+    lats: List[float] = []
+    lngs: List[float] = []
+
+    for shp_path in find_shapefiles("block_group", tiger_dir):
+        dbf_path = os.path.splitext(shp_path)[0] + ".dbf"
+        if not os.path.exists(dbf_path):
+            continue
+        for record in read_dbf(dbf_path):
+            try:
+                lat = float(record["INTPTLAT"])
+                lng = float(record["INTPTLON"])
+            except (KeyError, ValueError):
+                continue
+            geoids.append(record.get("GEOID", ""))
+            lats.append(lat)
+            lngs.append(lng)
+
+    return geoids, np.array(lats, dtype=np.float64), np.array(lngs, dtype=np.float64)
+
+
+class TradeAreaEngine:
+    """Radius aggregates over block group points."""
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        population: np.ndarray,
+        households: np.ndarray,
+        median_income: np.ndarray,
+        sources: Optional[Dict] = None
+    ):
+        self.sources = sources or {}  # Identifies the source data (for provenance)
+        self.grid, order = GridIndex.build(lats, lngs)
+        self.population = np.nan_to_num(population[order])
+        self.households = np.nan_to_num(households[order])
+
+        # Income is averaged over households of block groups that report it
+        income = median_income[order]
+        reported = ~np.isnan(income)
+        self.income_households = np.where(reported, self.households, 0.0)
+        self.income_weighted = np.where(reported, income * self.households, 0.0)
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    def aggregate(
+        self,
+        lats: Sequence[float],
+        lngs: Sequence[float],
+        radii: Sequence[float] = TRADE_AREA_RADII
+    ) -> Dict[float, Dict[str, np.ndarray]]:
+        """
+        Totals within each radius for every location.
+
+        Returns {radius: {"population", "households", "medianIncome"}} of
+        arrays aligned with the input; medianIncome is NaN where no block
+        group in range reports income.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        n = len(lats)
+        query_idx, rows, dist = self.grid.query_radius(lats, lngs, max(radii))
+
+        results = {}
+        for radius in radii:
+            inside = dist <= radius
+            q, r = query_idx[inside], rows[inside]
+
+            def total(weights):
+                return np.bincount(q, weights=weights[r], minlength=n)
+
+            income_households = total(self.income_households)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                income = total(self.income_weighted) / income_households
+            results[radius] = {
+                "population": total(self.population),
+                "households": total(self.households),
+                "medianIncome": np.where(income_households > 0, income, np.nan),
+            }
+        return results
+
+
+def open_trade_area_engine(
+    tiger_dir: str = TIGER_DIR,
+    warehouse_dir: str = WAREHOUSE_DIR
+) -> Optional[TradeAreaEngine]:
+    """Engine from block group shapefiles + warehouse table, or None if missing."""
+    table = open_warehouse("block_group", warehouse_dir)
+    if table is None:
+        return None
+
+    geoids, lats, lngs = load_block_group_centroids(tiger_dir)
+    if not geoids:
+        return None
+
+    values = table.values_for(geoids, list(BLOCK_GROUP_VARIABLES))
+    missing = np.full(len(geoids), np.nan)
+    dbf_files = [
+        (os.path.basename(path), os.path.getsize(path), os.path.getmtime(path))
+        for path in (os.path.splitext(p)[0] + ".dbf" for p in find_shapefiles("block_group", tiger_dir))
+        if os.path.exists(path)
+    ]
+    return TradeAreaEngine(
+        lats,
+        lngs,
+        values.get("B01003_001E", missing),
+        values.get("B11001_001E", missing),
+        values.get("B19013_001E", missing),
+        sources={
+            "acs": [table.manifest.get("source"), table.manifest.get("builtAt")],
+            "blockGroups": dbf_files,
+        }
+    )
+
+
+def apply_trade_areas(locations: List[Dict], engine: TradeAreaEngine) -> int:
+    """Write at.tradeArea{1,3,5} on every location with coordinates."""
+    located = [loc for loc in locations if loc.get("lat") and loc.get("lng")]
+    if not located:
+        return 0
+
+    areas = engine.aggregate(
+        [loc["lat"] for loc in located],
+        [loc["lng"] for loc in located]
+    )
+    for i, location in enumerate(located):
+        attrs = location.setdefault("at", {})
+        for radius, totals in areas.items():
+            income = totals["medianIncome"][i]
+            attrs[f"tradeArea{radius}"] = {
+                "population": int(round(totals["population"][i])),
+                "households": int(round(totals["households"][i])),
+                "medianIncome": None if np.isnan(income) else int(round(income)),
+            }
+    return len(located)
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute trade-area demographics")
+    parser.add_argument("--ticker", type=str, default=None, help="Process specific ticker")
+    parser.add_argument("--download", action="store_true", help="Download the ACS block group table first")
+    parser.add_argument("--force", action="store_true", help="Recompute every location, even if unchanged")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("TRADE AREA DEMOGRAPHICS")
+    print("="*70)
+
+    if args.download:
+        print("📥 Downloading ACS block group table...")
+        geoids, columns = download_acs("block_group", list(BLOCK_GROUP_VARIABLES))
+        write_table("block_group", geoids, columns, source="Census API")
+
+    start = time.time()
+    engine = open_trade_area_engine()
+    if engine is None:
+        print("⚠️  Block group data not available")
+        print(f"   Needs *_bg.shp in {TIGER_DIR} and the ACS table (run with --download)")
+        return
+    print(f"✓ Loaded {len(engine):,} block groups ({time.time() - start:.1f}s)")
+
+    manifest_path = os.path.join(DATA_DIR, "manifest.json")
+    if not os.path.exists(manifest_path):
+        print("ERROR: manifest.json not found")
+        return
+
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    # Locations are recomputed only when their coordinates or the source data changed
+    tracker = StageTracker(
+        "trade_area",
+        source_version(__file__, engine.sources, TRADE_AREA_RADII),
+        force=args.force
+    )
+
+    total = 0
+    start = time.time()
+    for brand_info in manifest:
+        ticker = brand_info["ticker"]
+        if args.ticker and args.ticker != ticker:
+            continue
+
+        file_path = brand_info["file"]
+        if file_path.startswith("data/"):
+            data_file = os.path.join(DATA_DIR, file_path[5:])
+        else:
+            data_file = os.path.join(DATA_DIR, file_path)
+
+        if not os.path.exists(data_file):
+            print(f"  SKIP {ticker}: file not found")
+            continue
+
+        # Hold the brand file while other stages may be writing it
+        with brand_file_lock(data_file):
+            with open(data_file, "r") as f:
+                locations = json.load(f)
+
+            stale = tracker.pending([loc for loc in locations if loc.get("lat") and loc.get("lng")])
+            if not stale:
+                print(f"   ✓ {ticker}: unchanged")
+                continue
+
+            total += apply_trade_areas(stale, engine)
+            for location in stale:
+                tracker.mark(location)
+            with open(data_file, "w") as f:
+                json.dump(locations, f, separators=(',', ':'))
+        print(f"   ✓ {ticker}: {len(stale)}/{len(locations)} locations")
+
+    print(f"✓ Aggregated {total:,} locations in {time.time() - start:.1f}s")
+    tracker.save_stats()
+
+    print(f"\n{'='*70}")
+    print("TRADE AREA AGGREGATION COMPLETE")
+    print(f"Total locations processed: {total:,}")
+    print(f"{'='*70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,19 @@ let showLegend = true;
 let showGrid = true;
 let priceMode = 'percent'; // 'percent' or 'dollar' - default to percent
 let historicalCache = new Map();
+let shardCache = new Map();
 let customCache = {};
 
+// Downsampled per-ticker series (data/stocks/charts/, see export_chart_shards.py)
+// Each range loads only the resolution it needs
+const SHARD_FOR_RANGE = {
+    '1d': '1m', '5d': '1m', '1mo': '1m',
+    '6mo': '1y', 'ytd': '1y', '1y': '1y',
+    '2y': '5y', '5y': '5y',
+    '10y': '10y',
+    'max': 'max'
+};
+
 const MAX_TICKERS = 10;
 // Default stocks: SPY (market index) + 9 top franchise stocks
 // IMPORTANT: Available tickers come from data/franchise_stocks.csv (centralized dataset)
@@ -136,6 +147,11 @@ async function loadDefaultStocks() {
  * Load SPY data with multiple fallback strategies
  */
 async function loadSPYData(range) {
+    const shardSeries = await getShardSeries('SPY', SHARD_FOR_RANGE[range] || 'max');
+    if (shardSeries && shardSeries.length) {
+        return filterDataByRange(shardSeries, range);
+    }
+
     try {
         // First try: load from local cache/CSV
         const cachedSeries = await getLocalSeries('SPY');
@@ -634,7 +650,7 @@ async function updateStockTable() {
     const dateSet = new Set();
 
     for (const symbol of symbols) {
-        const series = await getLocalSeries(symbol);
+        const series = (await getShardSeries(symbol, '1m')) || await getLocalSeries(symbol);
         if (series && series.length) {
             const last30 = series.slice(-30);
             seriesBySymbol[symbol] = last30;
@@ -702,6 +718,11 @@ function formatDateShort(dateStr) {
 }
 
 async function fetchAdjustedPrices(ticker, range) {
+    const shardSeries = await getShardSeries(ticker, SHARD_FOR_RANGE[range] || 'max');
+    if (shardSeries && shardSeries.length) {
+        return filterDataByRange(shardSeries, range);
+    }
+
     const cachedSeries = await getLocalSeries(ticker);
     if (cachedSeries && cachedSeries.length) {
         return filterDataByRange(cachedSeries, range);
@@ -717,6 +738,35 @@ async function fetchAdjustedPrices(ticker, range) {
     throw new Error(`No data available for ${ticker}`);
 }
 
+async function getShardSeries(symbol, resolution) {
+    const key = `${symbol}/${resolution}`;
+    if (shardCache.has(key)) {
+        return shardCache.get(key);
+    }
+
+    let series = null;
+    try {
+        const shardUrl = new URL(`../data/stocks/charts/${symbol}/${resolution}.json`, window.location.href).toString();
+        const response = await fetch(shardUrl);
+        if (response.ok) {
+            const shard = await response.json();
+            series = shard.t.map((dateStr, i) => ({
+                date: new Date(dateStr),
+                price: shard.c[i],
+                open: shard.o[i],
+                high: shard.h[i],
+                low: shard.l[i],
+                volume: shard.v[i]
+            }));
+        }
+    } catch (e) {
+        console.debug(`No chart shard for ${key}:`, e.message);
+    }
+
+    shardCache.set(key, series);
+    return series;
+}
+
 async function getLocalSeries(symbol) {
     await loadCsvIntoCache();
 
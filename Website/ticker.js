@@ -138,7 +138,9 @@ async function fetchLiveTickerData() {
         isNegative: changePercent < 0,
         afterHours: false,
         source: 'finnhub',
-        fetchedAt: data.fetchedAt
+        fetchedAt: data.fetchedAt,
+        // Intraday 5-minute closes from the streaming daemon's bar buffers
+        sparkline: Array.isArray(quote.sparkline) ? quote.sparkline : null
       };
     }
 
@@ -461,9 +463,44 @@ function createTickerItem(stockInfo) {
   item.appendChild(price);
   item.appendChild(change);
 
+  if (stockInfo.sparkline && stockInfo.sparkline.length > 1) {
+    item.appendChild(createSparkline(stockInfo.sparkline, stockInfo.isPositive));
+  }
+
   return item;
 }
 
+/**
+ * Create an inline SVG sparkline of intraday closes
+ * @param {number[]} values - Closes, oldest first
+ * @param {boolean} isPositive - Whether the day is up (line color)
+ * @returns {SVGElement} Sparkline element
+ */
+function createSparkline(values, isPositive) {
+  const width = 80;
+  const height = 30;
+  const min = Math.min(...values);
+  const range = (Math.max(...values) - min) || 1;
+  const step = width / (values.length - 1);
+
+  const points = values.map((value, i) =>
+    `${(i * step).toFixed(1)},${(height - ((value - min) / range) * height).toFixed(1)}`
+  ).join(' ');
+
+  const svgNS = 'http://www.w3.org/2000/svg';
+  const svg = document.createElementNS(svgNS, 'svg');
+  svg.setAttribute('class', 'ticker-sparkline');
+  svg.setAttribute('viewBox', `0 0 ${width} ${height}`);
+  svg.setAttribute('preserveAspectRatio', 'none');
+
+  const line = document.createElementNS(svgNS, 'polyline');
+  line.setAttribute('points', points);
+  line.setAttribute('class', isPositive ? 'positive' : 'negative');
+  svg.appendChild(line);
+
+  return svg;
+}
+
 /**
  * Render all ticker items to the DOM
  * @param {Object} stockData - Stock data keyed by symbol
@@ -34,12 +34,22 @@ BRAND_METADATA_JSON = FRANCHISEMAP_DATA_DIR / 'brand_metadata.json'
 # Stock data directories
 STOCKS_DATA_DIR = REPO_ROOT / "data" / "stocks"
 HISTORICAL_STOCKS_CSV = STOCKS_DATA_DIR / "franchise_stocks_historical.csv"
-LIVE_TICKER_JSON = STOCKS_DATA_DIR / "live_ticker.json"
+HISTORICAL_STORE_DIR = STOCKS_DATA_DIR / "historical"
+INDICATORS_DIR = STOCKS_DATA_DIR / "indicators"
+CHART_SHARDS_DIR = STOCKS_DATA_DIR / "charts"
+ANALYTICS_DIR = STOCKS_DATA_DIR / "analytics"
+INTRADAY_STORE_DIR = STOCKS_DATA_DIR / "intraday"
+# Published where the ticker widgets read it (Website/ticker.js, evaluate.js, src/js)
+LIVE_TICKER_JSON = REPO_ROOT / "data" / "live_ticker.json"
 MAP_STOCKS_JSON = FRANCHISEMAP_DATA_DIR / "stocks.json"
+SHARE_COUNTS_JSON = STOCKS_DATA_DIR / "shares.json"
+QUOTE_CACHE_DB = DATA_AGGREGATION_ROOT / "cache" / "quotes.sqlite3"
 
 # Sports data directories
 SPORTS_DATA_DIR = REPO_ROOT / "data" / "sports"
 SPORTS_DATA_JSON = REPO_ROOT / "sports_data.json"
+HIGHLIGHT_CACHE_JSON = SPORTS_DATA_DIR / "highlights.json"
+CHAMPIONSHIP_CACHE_JSON = SPORTS_DATA_DIR / "championships.json"
 
 # Sports league-specific directories
 FOOTBALL_DATA_DIR = SPORTS_DATA_DIR / "football"
@@ -264,20 +264,22 @@ class FinnhubAPIHandler(APIHandler):
 
     BASE_URL = "https://finnhub.io/api/v1"
 
-    def __init__(self, api_key: str, **kwargs):
+    def __init__(self, api_key: str, cache=None, **kwargs):
         """
         Initialize Finnhub handler.
 
         Args:
             api_key: Finnhub API key
+            cache: QuoteCache consulted by get_quote (defaults to the shared cache)
             **kwargs: Additional arguments for APIHandler
         """
         super().__init__(**kwargs)
         self.api_key = api_key
+        self.cache = cache
 
     def get_quote(self, symbol: str) -> Dict[str, Any]:
         """
-        Get quote for a stock symbol.
+        Get quote for a stock symbol (via the shared quote cache).
 
         Args:
             symbol: Stock ticker symbol
@@ -285,9 +287,13 @@ class FinnhubAPIHandler(APIHandler):
         Returns:
             Quote data
         """
+        if self.cache is None:
+            from data_aggregation.pipelines.stocks.quote_cache import get_quote_cache
+            self.cache = get_quote_cache()
+
         url = f"{self.BASE_URL}/quote"
         params = {'symbol': symbol, 'token': self.api_key}
-        return self.get(url, params=params)
+        return self.cache.get_or_fetch('finnhub', symbol, lambda: self.get(url, params=params))
 
 
 class YouTubeAPIHandler(APIHandler):
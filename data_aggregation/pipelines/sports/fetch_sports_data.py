@@ -9,23 +9,51 @@ Data Sources:
 - ESPN API (free, no key required)
 - YouTube API (optional, requires YOUTUBE_API_KEY env var)
 
+Highlights are looked up after the scores are fetched, from a durable cache
+(highlight_cache.py) keyed by game; finals without one are searched most
+recent first, as far as the day's YouTube quota allows.
+
 Output:
 - FranchiseMap/data/sports_data.json - Unified file with all leagues
 - data/[sport]/current-week.json - NFL current week
 - data/[sport]/current-games.json - NBA, WNBA, NHL, MLB, MLS current games
+
+Leagues are fetched concurrently over one pooled HTTP session, with
+per-host concurrency limits and a deadline for the whole run. Each
+league's file is published as soon as that league is done; a league that
+misses the deadline keeps its previous data.
+
+With --daemon, the script keeps running and polls each league on its own
+schedule, driven by the state of its games: every POLL_LIVE seconds while
+a game is in progress, every POLL_SCHEDULED seconds while games are
+scheduled (waking early for the next start time), and every POLL_IDLE
+seconds when nothing is scheduled. Only leagues whose data changed are
+rewritten.
+
+Usage:
+    python3 fetch_sports_data.py            # Refresh all leagues once
+    python3 fetch_sports_data.py --daemon   # Keep polling by game state
 """
 
+import argparse
+
 import sys
 import json
+import threading
+import time
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, as_completed, wait
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 import os
 
 # Add repo root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from data_aggregation.config.paths_config import (
+    CHAMPIONSHIP_CACHE_JSON,
     SPORTS_DATA_JSON,
     FOOTBALL_GAMES_JSON,
     BASKETBALL_GAMES_JSON,
@@ -33,6 +61,7 @@ from data_aggregation.config.paths_config import (
     BASEBALL_GAMES_JSON,
     SOCCER_GAMES_JSON,
 )
+from data_aggregation.pipelines.sports.highlight_cache import SEARCH_COST, HighlightCache
 
 # --- CONFIGURATION ---
 
@@ -48,6 +77,44 @@ ESPN_URLS = {
     "MLS": "http://site.api.espn.com/apis/site/v2/sports/soccer/usa.1/scoreboard"
 }
 
+# Leagues in output order, and whether yesterday's games are fetched too
+# (daily sports get yesterday's games for highlights)
+LEAGUES = [
+    ("NFL", False),
+    ("NBA", True),
+    ("WNBA", True),
+    ("NHL", True),
+    ("MLB", True),
+    ("MLS", True),
+]
+
+# Concurrent requests allowed per host (others get DEFAULT_HOST_CONCURRENCY)
+HOST_CONCURRENCY = {
+    "site.api.espn.com": 6,
+    "www.googleapis.com": 2,
+}
+DEFAULT_HOST_CONCURRENCY = 4
+
+# Seconds the whole fetch may take before slow leagues are given up on
+FETCH_DEADLINE = float(os.environ.get("SPORTS_FETCH_DEADLINE", "90"))
+
+# Daemon polling intervals (seconds), chosen per league from its games
+POLL_LIVE = 30                # A game is in progress (or about to start)
+POLL_SCHEDULED = 15 * 60      # Only scheduled games remain
+POLL_IDLE = 6 * 60 * 60       # Nothing scheduled (off-season, or the day is over)
+POLL_RETRY = 2 * 60           # After a failed fetch
+PREGAME_LEAD = 5 * 60         # Switch to live polling this long before a start time
+
+# Per-league frontend files (NBA and WNBA share one; the later league wins)
+LEAGUE_OUTPUT_FILES = {
+    "nfl": FOOTBALL_GAMES_JSON,
+    "nba": BASKETBALL_GAMES_JSON,
+    "wnba": BASKETBALL_GAMES_JSON,
+    "nhl": HOCKEY_GAMES_JSON,
+    "mlb": BASEBALL_GAMES_JSON,
+    "mls": SOCCER_GAMES_JSON
+}
+
 # Championship/Finals dates for off-season fallback (approximate date ranges)
 # Format: (start_month, start_day, end_month, end_day, year_offset)
 # year_offset: 0 = current year, -1 = previous year
@@ -60,6 +127,11 @@ CHAMPIONSHIP_DATES = {
     "NFL": [(2, 1, 2, 15, 0)],           # Super Bowl: early February
 }
 
+# Championship windows are queried as date ranges of at most this many days,
+# fetched concurrently; results are cached in CHAMPIONSHIP_CACHE_JSON
+CHAMPIONSHIP_RANGE_DAYS = 7
+CHAMPIONSHIP_MAX_GAMES = 10
+
 YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 
 # Official YouTube channel IDs for better highlight search
@@ -80,12 +152,75 @@ NFL_FALLBACK_CHANNELS = [
     # Removed specific channel IDs as they may change
 ]
 
+# Most highlight searches per run (each costs up to two search.list calls)
+MAX_HIGHLIGHT_SEARCHES = int(os.environ.get("MAX_HIGHLIGHT_SEARCHES", "25"))
+
 # ESPN video base URL for game recaps
 ESPN_VIDEO_BASE = "https://www.espn.com/video/clip/_/id/"
 
+# --- HTTP ---
+
+_session = None
+_host_slots = {}
+_http_lock = threading.Lock()
+_deadline = None  # time.monotonic() value, set per run by fetch_all_leagues
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A request was cut short (or never sent) because the run deadline passed."""
+
+
+def create_session(pool_size=max(HOST_CONCURRENCY.values())):
+    """HTTP session with a per-host connection pool sized for concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(HOST_CONCURRENCY), pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def http_get(url, timeout=15, **kwargs):
+    """
+    GET through the shared session, within the host's concurrency limit.
+
+    The timeout is cut short so the request can't outlive the run deadline;
+    requests stopped by the deadline raise DeadlineExceeded.
+    """
+    global _session
+    host = urlsplit(url).hostname
+    with _http_lock:
+        if _session is None:
+            _session = create_session()
+        slots = _host_slots.get(host)
+        if slots is None:
+            slots = _host_slots[host] = threading.BoundedSemaphore(
+                HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY))
+
+    def remaining():
+        left = timeout if _deadline is None else min(timeout, _deadline - time.monotonic())
+        if left <= 0:
+            raise DeadlineExceeded(f"Fetch deadline passed before requesting {host}")
+        return left
+
+    if not slots.acquire(timeout=remaining()):
+        raise DeadlineExceeded(f"Fetch deadline passed waiting for {host}")
+    try:
+        return _session.get(url, timeout=remaining(), **kwargs)
+    except requests.exceptions.Timeout:
+        if _deadline is not None and time.monotonic() >= _deadline:
+            raise DeadlineExceeded(f"Fetch deadline passed waiting on {host}")
+        raise
+    finally:
+        slots.release()
+
+
 # --- HELPER FUNCTIONS ---
 
-def get_youtube_highlight(query, league, existing_cache=None):
+class YouTubeError(Exception):
+    """A highlight search failed (API error, quota exceeded or timeout)."""
+
+
+def get_youtube_highlight(query, league, highlights):
     """
     Finds a highlight video for a completed game using YouTube Data API.
 
@@ -93,17 +228,25 @@ def get_youtube_highlight(query, league, existing_cache=None):
     for embeddable highlights from any channel. For other leagues, we try the
     official channel first, then fall back to unrestricted search.
 
+    Every search is charged to the quota ledger in `highlights`.
+
     Returns:
-        Embeddable YouTube URL or None
-    """
-    if not YOUTUBE_API_KEY:
-        return None
+        Embeddable YouTube URL, or None if there is no highlight yet
 
-    # Check cache first to save API quota
-    cache_key = query.lower().replace(" ", "_")
-    if existing_cache and cache_key in existing_cache:
-        print(f"  Using cached video for: {query[:50]}...")
-        return existing_cache[cache_key]
+    Raises:
+        YouTubeError: If the search failed (nothing should be cached)
+    """
+    def search(params):
+        highlights.spend(SEARCH_COST)
+        data = http_get(YOUTUBE_SEARCH_URL, params=params, timeout=10).json()
+        if "error" in data:
+            error = data["error"]
+            reasons = [e.get("reason", "") for e in error.get("errors", [])]
+            if "quotaExceeded" in reasons or "quota" in error.get("message", "").lower():
+                highlights.exhaust()
+                raise YouTubeError("YouTube API quota exceeded")
+            raise YouTubeError(f"YouTube API error: {error.get('message', 'Unknown')}")
+        return data
 
     try:
         params = {
@@ -124,16 +267,7 @@ def get_youtube_highlight(query, league, existing_cache=None):
             if channel_id:
                 params['channelId'] = channel_id
 
-        resp = requests.get(YOUTUBE_SEARCH_URL, params=params, timeout=10)
-        data = resp.json()
-
-        if "error" in data:
-            error_msg = data['error'].get('message', 'Unknown')
-            if 'quota' in error_msg.lower():
-                print(f"  YouTube API quota exceeded")
-            else:
-                print(f"  YouTube API error: {error_msg}")
-            return None
+        data = search(params)
 
         # Try to find a working video from results
         if "items" in data and len(data["items"]) > 0:
@@ -146,8 +280,7 @@ def get_youtube_highlight(query, league, existing_cache=None):
         # Fallback: Search without channel restriction (for non-NFL leagues)
         if league != "NFL" and CHANNEL_IDS.get(league):
             del params['channelId']
-            resp = requests.get(YOUTUBE_SEARCH_URL, params=params, timeout=10)
-            data = resp.json()
+            data = search(params)
 
             if "items" in data and len(data["items"]) > 0:
                 video_id = data["items"][0]["id"]["videoId"]
@@ -156,11 +289,78 @@ def get_youtube_highlight(query, league, existing_cache=None):
         return None
 
     except requests.exceptions.Timeout:
-        print(f"  YouTube API timeout for: {query[:30]}...")
-        return None
-    except Exception as e:
-        print(f"  YouTube error: {e}")
-        return None
+        raise YouTubeError(f"YouTube API timeout for: {query[:30]}...")
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        raise YouTubeError(f"YouTube error: {e}")
+
+
+def highlight_key(league, game):
+    """Highlight cache key for a processed game."""
+    return f"{league.lower()}-{game.get('id', '')}"
+
+
+def highlight_query(league, game):
+    """YouTube search query for a processed game."""
+    game_date = datetime.fromisoformat(game["date"].replace("Z", "+00:00"))
+    away = game["awayTeam"]["shortName"]
+    home = game["homeTeam"]["shortName"]
+    return f"{league} {away} vs {home} highlights {game_date.strftime('%B %d %Y')}"
+
+
+def fill_highlights(results, highlights, max_searches=MAX_HIGHLIGHT_SEARCHES, now=None):
+    """
+    Attach highlight videos to finished games.
+
+    Cached highlights are attached directly. Finals still missing one (and
+    due for a search, see HighlightCache.due) are searched most recent
+    first, until max_searches or the day's quota is used up. Both hits and
+    misses are cached.
+
+    Args:
+        results: League data keyed by league (games are updated in place)
+        highlights: HighlightCache to read and record into
+        max_searches: Most games to search for in this call
+        now: Current time (aware, default now)
+
+    Returns:
+        Number of games that gained a highlight
+    """
+    now = now or datetime.now(timezone.utc)
+    queue = []
+    for league, data in results.items():
+        for game in data.get("games", []):
+            if not game.get("is_final") or not game.get("id"):
+                continue
+            key = highlight_key(league, game)
+            url = highlights.get(key)
+            if url:
+                game["video_url"] = url
+            elif YOUTUBE_API_KEY and highlights.due(key, _game_start(game), now):
+                queue.append((_game_start(game) or now, league, game))
+
+    if not queue:
+        return 0
+
+    # Most recent finals first
+    queue.sort(key=lambda item: item[0], reverse=True)
+    found = searched = 0
+    for start, league, game in queue:
+        if searched >= max_searches or highlights.remaining() < 2 * SEARCH_COST:
+            break
+        try:
+            url = get_youtube_highlight(highlight_query(league, game), league, highlights)
+        except YouTubeError as e:
+            print(f"  {e}")
+            break
+        searched += 1
+        highlights.record(highlight_key(league, game), url, start)
+        if url:
+            game["video_url"] = url
+            found += 1
+
+    print(f"Highlights: searched {searched} of {len(queue)} games, found {found} "
+          f"({highlights.remaining()} quota units left today)")
+    return found
 
 
 def get_recent_date_iso():
@@ -281,7 +481,7 @@ def extract_game_notes(event):
     return headlines
 
 
-def process_game(event, league, video_cache=None):
+def process_game(event, league, highlights=None):
     """Standardizes game data from ESPN API with enhanced player and odds data."""
     try:
         comp = event["competitions"][0]
@@ -325,12 +525,10 @@ def process_game(event, league, video_cache=None):
             clock = event.get("status", {}).get("displayClock", "")
             period = event.get("status", {}).get("period", "")
 
-        # Video search for completed games only (limit to save API quota)
+        # Cached highlight for completed games (searches run later, see fill_highlights)
         video_url = None
-        if is_final and YOUTUBE_API_KEY:
-            game_date = datetime.fromisoformat(event["date"].replace("Z", "+00:00"))
-            query = f"{league} {away_name} vs {home_name} highlights {game_date.strftime('%B %d %Y')}"
-            video_url = get_youtube_highlight(query, league, video_cache)
+        if is_final and highlights is not None:
+            video_url = highlights.get(f"{league.lower()}-{event.get('id', '')}")
 
         # Broadcast info
         broadcasts = comp.get("broadcasts", [])
@@ -419,87 +617,164 @@ def process_game(event, league, video_cache=None):
         return None
 
 
-def fetch_championship_games(league, url, video_cache=None):
-    """Fetch championship/finals games for off-season leagues."""
-    championship_dates = CHAMPIONSHIP_DATES.get(league)
-    if not championship_dates:
-        return []
-
-    all_games = []
-    seen_ids = set()
-    now = datetime.now()
-
-    for start_month, start_day, end_month, end_day, year_offset in championship_dates:
+def championship_windows(league, now=None):
+    """Most recent championship date windows for a league, as (start, end) dates."""
+    now = now or datetime.now()
+    windows = []
+    for start_month, start_day, end_month, end_day, year_offset in CHAMPIONSHIP_DATES.get(league, []):
         # Determine the year to check
         check_year = now.year + year_offset
 
         # If we're before the championship period this year, check last year
-        championship_start = datetime(check_year, start_month, start_day)
-        if now < championship_start:
+        if now < datetime(check_year, start_month, start_day):
             check_year -= 1
 
-        # Build date range to search
-        start_date = datetime(check_year, start_month, start_day)
-        end_date = datetime(check_year, end_month, end_day)
+        windows.append((datetime(check_year, start_month, start_day).date(),
+                        datetime(check_year, end_month, end_day).date()))
+    return windows
 
-        print(f"  Checking {league} championship games from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
 
-        # Fetch games for each day in the range (ESPN requires specific dates)
-        current_date = end_date  # Start from end to get most recent first
-        days_checked = 0
-        max_days = 20  # Limit to prevent too many API calls
+_championship_lock = threading.Lock()
 
-        while current_date >= start_date and days_checked < max_days:
-            date_str = current_date.strftime("%Y%m%d")
-            date_url = f"{url}?dates={date_str}"
 
-            try:
-                resp = requests.get(date_url, timeout=10)
-                if resp.ok:
-                    data = resp.json()
-                    events = data.get("events", [])
-
-                    for event in events:
-                        # Check if this is a playoff/championship game
-                        season_type = event.get("season", {}).get("type", 0)
-                        # Type 3 = postseason, Type 4 = offseason/exhibition
-                        # Also check event name for "Final", "Championship", "Cup", etc.
-                        event_name = event.get("name", "").lower()
-                        is_championship = (
-                            season_type == 3 or
-                            "final" in event_name or
-                            "championship" in event_name or
-                            "cup" in event_name or
-                            "world series" in event_name or
-                            "super bowl" in event_name or
-                            "stanley cup" in event_name
-                        )
-
-                        if is_championship or len(all_games) < 5:  # Get at least some games
-                            game = process_game(event, league, video_cache)
-                            if game and game["id"] not in seen_ids:
-                                game["is_championship"] = True
-                                all_games.append(game)
-                                seen_ids.add(game["id"])
+def load_championship_cache(path=CHAMPIONSHIP_CACHE_JSON):
+    """Cached championship results by league."""
+    try:
+        if path.exists():
+            with open(path, "r") as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Could not load championship cache: {e}")
+    return {}
 
-            except Exception as e:
-                pass  # Silently skip failed date fetches
 
-            current_date -= timedelta(days=1)
-            days_checked += 1
+def save_championship_results(league, entry, path=CHAMPIONSHIP_CACHE_JSON):
+    """Store one league's championship results (leagues save concurrently)."""
+    with _championship_lock:
+        cache = load_championship_cache(path)
+        cache[league] = entry
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
 
-            # Stop if we have enough games
-            if len(all_games) >= 10:
-                break
+
+def _fetch_event_range(url, start, end):
+    """Events between two dates (inclusive), or None if the request failed."""
+    date_url = f"{url}?dates={start:%Y%m%d}-{end:%Y%m%d}&limit=500"
+    try:
+        resp = http_get(date_url, timeout=15)
+        resp.raise_for_status()
+        return resp.json().get("events", [])
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"  Could not fetch {start:%Y-%m-%d} to {end:%Y-%m-%d}: {e}")
+        return None
+
+
+def _is_championship_event(event):
+    # Type 3 = postseason, Type 4 = offseason/exhibition
+    # Also check event name for "Final", "Championship", "Cup", etc.
+    season_type = event.get("season", {}).get("type", 0)
+    event_name = event.get("name", "").lower()
+    return (
+        season_type == 3 or
+        "final" in event_name or
+        "championship" in event_name or
+        "cup" in event_name or
+        "world series" in event_name or
+        "super bowl" in event_name or
+        "stanley cup" in event_name
+    )
+
+
+def fetch_championship_games(league, url, highlights=None, season_type=None, now=None,
+                             cache_path=CHAMPIONSHIP_CACHE_JSON):
+    """
+    Fetch championship/finals games for off-season leagues.
+
+    Results are cached per league in CHAMPIONSHIP_CACHE_JSON and reused
+    while the championship windows and the scoreboard's season type stay
+    the same, so off-season runs don't query ESPN again. Otherwise each
+    window is fetched as a few date-range queries, run concurrently.
+
+    Args:
+        league: League key (e.g. "NBA")
+        url: ESPN scoreboard URL
+        highlights: HighlightCache to attach cached highlights from
+        season_type: Season type of the current scoreboard (cache key)
+        now: Current time (default now)
+        cache_path: Championship results cache
+    """
+    now = now or datetime.now()
+    windows = championship_windows(league, now)
+    if not windows:
+        return []
+
+    window_key = ",".join(f"{start:%Y%m%d}-{end:%Y%m%d}" for start, end in windows)
+    cached = load_championship_cache(cache_path).get(league)
+    if cached and cached.get("windows") == window_key and cached.get("seasonType") == season_type:
+        games = cached.get("games", [])
+        for game in games:
+            if highlights is not None and not game.get("video_url"):
+                game["video_url"] = highlights.get(f"{league.lower()}-{game.get('id', '')}")
+        print(f"  Using cached {league} championship results ({len(games)} games)")
+        return games
+
+    # Split each window into ranges and fetch them all at once
+    ranges = []
+    for start, end in windows:
+        day = start
+        while day <= end:
+            range_end = min(day + timedelta(days=CHAMPIONSHIP_RANGE_DAYS - 1), end)
+            ranges.append((day, range_end))
+            day = range_end + timedelta(days=1)
+
+    print(f"  Checking {league} championship games in {window_key} ({len(ranges)} range queries)")
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        responses = list(pool.map(lambda r: _fetch_event_range(url, *r), ranges))
+
+    # Most recent first; championship games, plus a few others if there are not many
+    events = [event for events in responses if events for event in events]
+    events.sort(key=lambda event: event.get("date", ""), reverse=True)
+
+    all_games = []
+    seen_ids = set()
+    for event in events:
+        if len(all_games) >= CHAMPIONSHIP_MAX_GAMES:
+            break
+        if _is_championship_event(event) or len(all_games) < 5:  # Get at least some games
+            game = process_game(event, league, highlights)
+            if game and game["id"] not in seen_ids:
+                game["is_championship"] = True
+                all_games.append(game)
+                seen_ids.add(game["id"])
 
     if all_games:
         print(f"  Found {len(all_games)} {league} championship/playoff games")
 
+    # Only finished windows are final; cache them unless a query failed
+    if all(events is not None for events in responses) and \
+            all(end < now.date() for _, end in windows):
+        save_championship_results(league, {
+            "windows": window_key,
+            "seasonType": season_type,
+            "fetched": datetime.now(timezone.utc).isoformat(),
+            "games": all_games,
+        }, cache_path)
+
     return all_games
 
 
-def fetch_league(league, video_cache=None, include_yesterday=False):
-    """Generic function to fetch any league's data."""
+def fetch_league(league, highlights=None, include_yesterday=False, raise_errors=False):
+    """
+    Generic function to fetch any league's data.
+
+    Fetch errors return an empty result, or are raised with raise_errors
+    (so callers can keep the data they have).
+    """
     print(f"Fetching {league} Data...")
     url = ESPN_URLS.get(league)
     if not url:
@@ -508,10 +783,16 @@ def fetch_league(league, video_cache=None, include_yesterday=False):
 
     all_games = []
     seen_ids = set()
+    pool = ThreadPoolExecutor(max_workers=2)
 
     try:
-        # Fetch today's games
-        resp = requests.get(url, timeout=15)
+        # Fetch today's (and yesterday's) games in parallel
+        today_request = pool.submit(http_get, url, 15)
+        if include_yesterday:
+            yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
+            yesterday_request = pool.submit(http_get, f"{url}?dates={yesterday}", 15)
+
+        resp = today_request.result()
         resp.raise_for_status()
         data = resp.json()
 
@@ -525,24 +806,21 @@ def fetch_league(league, video_cache=None, include_yesterday=False):
         print(f"  Found {len(events)} {league} games today")
 
         for event in events:
-            game = process_game(event, league, video_cache)
+            game = process_game(event, league, highlights)
             if game and game["id"] not in seen_ids:
                 all_games.append(game)
                 seen_ids.add(game["id"])
 
         # Fetch yesterday's games for highlights (for daily sports)
         if include_yesterday:
-            yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-            yst_url = f"{url}?dates={yesterday}"
-
             try:
-                yst_resp = requests.get(yst_url, timeout=15)
+                yst_resp = yesterday_request.result()
                 yst_resp.raise_for_status()
                 yst_data = yst_resp.json()
 
                 yesterday_count = 0
                 for event in yst_data.get("events", []):
-                    game = process_game(event, league, video_cache)
+                    game = process_game(event, league, highlights)
                     if game and game["id"] not in seen_ids:
                         all_games.append(game)
                         seen_ids.add(game["id"])
@@ -556,7 +834,8 @@ def fetch_league(league, video_cache=None, include_yesterday=False):
         # If no games found, try to fetch championship/finals games
         if len(all_games) == 0:
             print(f"  No current {league} games, checking for championship results...")
-            championship_games = fetch_championship_games(league, url, video_cache)
+            season_type = (data.get("season") or {}).get("type")
+            championship_games = fetch_championship_games(league, url, highlights, season_type)
             all_games.extend(championship_games)
 
         result = {"games": all_games}
@@ -570,11 +849,67 @@ def fetch_league(league, video_cache=None, include_yesterday=False):
         return result
 
     except requests.exceptions.RequestException as e:
+        if raise_errors or isinstance(e, DeadlineExceeded):
+            raise
         print(f"  {league} fetch error: {e}")
         return {"games": [], "week": "Unknown"} if league == "NFL" else {"games": []}
     except Exception as e:
         print(f"  {league} processing error: {e}")
         return {"games": [], "week": "Unknown"} if league == "NFL" else {"games": []}
+    finally:
+        pool.shutdown(wait=False)
+
+
+def fetch_all_leagues(highlights=None, deadline=FETCH_DEADLINE, on_complete=None):
+    """
+    Fetch every league in LEAGUES concurrently.
+
+    Args:
+        highlights: HighlightCache to attach cached highlights from
+        deadline: Seconds the whole fetch may take
+        on_complete: Called as on_complete(league, data) as each league
+            finishes, so its data can be published without waiting for
+            the others
+
+    Returns:
+        (results, late): data per finished league, and the leagues that
+        missed the deadline
+    """
+    global _deadline
+    _deadline = time.monotonic() + deadline
+
+    pool = ThreadPoolExecutor(max_workers=len(LEAGUES))
+    futures = {
+        pool.submit(fetch_league, league, highlights, include_yesterday): league
+        for league, include_yesterday in LEAGUES
+    }
+    results = {}
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            league = futures[future]
+            try:
+                results[league] = future.result()
+            except DeadlineExceeded:
+                continue
+            if on_complete:
+                on_complete(league, results[league])
+    except TimeoutError:
+        pass
+    finally:
+        # Stragglers' requests are already bounded by the deadline
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    late = [league for league, _ in LEAGUES if league not in results]
+    return results, late
+
+
+def keep_previous_data(results, late, existing_data):
+    """Fill in leagues that missed the deadline with their data from the last run."""
+    for league in late:
+        print(f"  {league} missed the {FETCH_DEADLINE:.0f}s deadline, keeping previous data")
+        previous = (existing_data or {}).get(league.lower())
+        results[league] = previous or ({"games": [], "week": "Unknown"} if league == "NFL" else {"games": []})
+    return results
 
 
 def load_existing_data():
@@ -588,45 +923,28 @@ def load_existing_data():
     return None
 
 
-def build_video_cache(existing_data):
-    """Build a cache of existing video URLs to save API quota."""
-    cache = {}
-    if not existing_data:
-        return cache
+def load_highlight_cache(existing_data):
+    """Load the highlight cache, importing any highlights it doesn't have yet."""
+    highlights = HighlightCache()
+    seeded = highlights.seed(existing_data)
+    pruned = highlights.prune()
+    print(f"Loaded {len(highlights)} cached highlight lookups"
+          + (f" ({seeded} imported from sports_data.json)" if seeded else "")
+          + (f", pruned {pruned} old games" if pruned else ""))
+    return highlights
 
-    try:
-        for league in ["nfl", "nba", "wnba", "nhl", "mlb", "mls"]:
-            league_data = existing_data.get(league, {})
-            games = league_data.get("games", [])
-            for game in games:
-                if game.get("video_url"):
-                    away = game.get("awayTeam", {}).get("shortName", "")
-                    home = game.get("homeTeam", {}).get("shortName", "")
-                    if away and home:
-                        key = f"{league}_{away}_vs_{home}".lower().replace(" ", "_")
-                        cache[key] = game["video_url"]
-
-        if cache:
-            print(f"Loaded {len(cache)} cached video URLs")
-    except Exception as e:
-        print(f"Error building video cache: {e}")
 
-    return cache
+def _score(value):
+    """A score as a number (ESPN sends strings, which compare wrongly in the frontend)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
 
 
 def save_league_data(league_key, data):
     """Save individual league data to separate files for the frontend."""
-    # Map league keys to output files
-    file_map = {
-        "nfl": FOOTBALL_GAMES_JSON,
-        "nba": BASKETBALL_GAMES_JSON,
-        "wnba": BASKETBALL_GAMES_JSON,
-        "nhl": HOCKEY_GAMES_JSON,
-        "mlb": BASEBALL_GAMES_JSON,
-        "mls": SOCCER_GAMES_JSON
-    }
-
-    filepath = file_map.get(league_key.lower())
+    filepath = LEAGUE_OUTPUT_FILES.get(league_key.lower())
     if not filepath:
         print(f"  No output file configured for {league_key}")
         return
@@ -657,8 +975,8 @@ def save_league_data(league_key, data):
             "startTime": game.get("date", ""),
             "homeTeam": game.get("homeTeam", {}),
             "awayTeam": game.get("awayTeam", {}),
-            "homeScore": game.get("homeScore", 0),
-            "awayScore": game.get("awayScore", 0),
+            "homeScore": _score(game.get("homeScore")),
+            "awayScore": _score(game.get("awayScore")),
             "status": "final" if game.get("is_final") else ("in_progress" if game.get("is_active") else "scheduled"),
             "quarter": game.get("period", ""),
             "clock": game.get("clock", ""),
@@ -674,9 +992,148 @@ def save_league_data(league_key, data):
     print(f"  Saved {len(games)} games to {filepath}")
 
 
+# --- DAEMON ---
+
+def _game_start(game):
+    """A game's start time (aware), or None."""
+    try:
+        return datetime.fromisoformat(game["date"].replace("Z", "+00:00"))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def next_poll_delay(data, now=None):
+    """
+    Seconds until a league should be polled again, from its games' state.
+
+    Args:
+        data: League data from fetch_league
+        now: Current time (aware, default now)
+    """
+    now = now or datetime.now(timezone.utc)
+    games = data.get("games", [])
+    if any(g.get("is_active") for g in games):
+        return POLL_LIVE
+
+    starts = [_game_start(g) for g in games if not g.get("is_final")]
+    starts = [start for start in starts if start is not None]
+    if not starts:
+        return POLL_IDLE
+
+    until_start = (min(starts) - now).total_seconds() - PREGAME_LEAD
+    if until_start <= 0:
+        return POLL_LIVE  # Starting soon, or late going live
+    cap = POLL_SCHEDULED if until_start < POLL_IDLE else POLL_IDLE
+    return max(POLL_LIVE, min(until_start, cap))
+
+
+def _fingerprint(data):
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def save_unified_data(results):
+    """Write sports_data.json from per-league data (keyed by league)."""
+    final_data = {"last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")}
+    for league, _ in LEAGUES:
+        final_data[league.lower()] = results[league]
+
+    # Ensure output directory exists
+    SPORTS_DATA_JSON.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(SPORTS_DATA_JSON, "w") as f:
+        json.dump(final_data, f, indent=2)
+
+
+def run_daemon(stop=None):
+    """
+    Poll each league on its own schedule until stopped.
+
+    Each league is fetched when due, then rescheduled by next_poll_delay.
+    A league's file (and sports_data.json) is only rewritten when its data
+    changed; a failed fetch keeps the current data and retries after
+    POLL_RETRY seconds.
+
+    Args:
+        stop: threading.Event that ends the daemon when set
+    """
+    global _deadline
+    _deadline = None  # Per-request timeouts only
+    stop = stop or threading.Event()
+
+    existing_data = load_existing_data() or {}
+    highlights = load_highlight_cache(existing_data)
+    include_yesterday = dict(LEAGUES)
+    results = {
+        league: existing_data.get(league.lower()) or {"games": []}
+        for league in include_yesterday
+    }
+    fingerprints = {league: _fingerprint(data) for league, data in results.items()}
+
+    # Leagues sharing a file: only the last one in LEAGUES order writes it
+    file_owner = {LEAGUE_OUTPUT_FILES.get(league.lower()): league for league in include_yesterday}
+
+    due = {league: time.monotonic() for league in include_yesterday}
+    inflight = {}
+    polls = 0
+
+    with ThreadPoolExecutor(max_workers=len(LEAGUES)) as pool:
+        while not stop.is_set():
+            now = time.monotonic()
+            for league, when in due.items():
+                if when <= now and league not in inflight.values():
+                    future = pool.submit(fetch_league, league, highlights,
+                                         include_yesterday[league], True)
+                    inflight[future] = league
+                    polls += 1
+
+            idle = [when for league, when in due.items() if league not in inflight.values()]
+            timeout = max(0.0, min(idle) - now) if idle else None
+            if not inflight:
+                stop.wait(timeout)
+                continue
+
+            done, _ = wait(inflight, timeout=min(timeout, 1.0) if timeout is not None else 1.0,
+                           return_when=FIRST_COMPLETED)
+            changed = []
+            for future in done:
+                league = inflight.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"  {league} poll failed ({e}); retrying in {POLL_RETRY}s")
+                    due[league] = time.monotonic() + POLL_RETRY
+                    continue
+
+                delay = next_poll_delay(data)
+                due[league] = time.monotonic() + delay
+                live = len([g for g in data.get("games", []) if g.get("is_active")])
+                print(f"  {league}: {len(data.get('games', []))} games ({live} live), "
+                      f"next poll in {delay / 60:.1f} min")
+
+                fill_highlights({league: data}, highlights)
+                fingerprint = _fingerprint(data)
+                if fingerprint != fingerprints[league]:
+                    results[league] = data
+                    fingerprints[league] = fingerprint
+                    changed.append(league)
+
+            if done:
+                highlights.save()
+            for league in changed:
+                if file_owner.get(LEAGUE_OUTPUT_FILES.get(league.lower())) == league:
+                    save_league_data(league, results[league])
+            if changed:
+                save_unified_data(results)
+                print(f"[OK] Updated {', '.join(changed)} ({polls} league polls so far)")
+
+        for future in inflight:
+            future.cancel()
+
+
 # --- MAIN ---
 
-def main():
+def update_all():
+    """Refresh every league once and write all output files."""
     print("=" * 70)
     print("Sports Data Updater - All Leagues")
     print("=" * 70)
@@ -684,54 +1141,48 @@ def main():
     print(f"YouTube API Key: {'Present' if YOUTUBE_API_KEY else 'Not set'}")
     print()
 
-    # Load existing data for video cache
+    # Load existing data and the highlight cache
     existing_data = load_existing_data()
-    video_cache = build_video_cache(existing_data)
-
-    # Fetch all sports data
-    # Daily sports get yesterday's games too for highlights
-    nfl_data = fetch_league("NFL", video_cache, include_yesterday=False)
-    nba_data = fetch_league("NBA", video_cache, include_yesterday=True)
-    wnba_data = fetch_league("WNBA", video_cache, include_yesterday=True)
-    nhl_data = fetch_league("NHL", video_cache, include_yesterday=True)
-    mlb_data = fetch_league("MLB", video_cache, include_yesterday=True)
-    mls_data = fetch_league("MLS", video_cache, include_yesterday=True)
-
-    # Build final unified output
-    final_data = {
-        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"),
-        "nfl": nfl_data,
-        "nba": nba_data,
-        "wnba": wnba_data,
-        "nhl": nhl_data,
-        "mlb": mlb_data,
-        "mls": mls_data
-    }
-
-    # Ensure output directory exists
-    SPORTS_DATA_JSON.parent.mkdir(parents=True, exist_ok=True)
+    highlights = load_highlight_cache(existing_data)
+
+    # Fetch all leagues concurrently, publishing each league's file as it
+    # finishes. Leagues sharing a file are written in LEAGUES order.
+    order = [league for league, _ in LEAGUES]
+    saved = {}
+
+    def publish(league, data):
+        filepath = LEAGUE_OUTPUT_FILES.get(league.lower())
+        if order.index(league) >= saved.get(filepath, -1):
+            save_league_data(league, data)
+            saved[filepath] = order.index(league)
+
+    started = time.monotonic()
+    results, late = fetch_all_leagues(highlights, on_complete=publish)
+    print(f"\nFetched {len(results)}/{len(LEAGUES)} leagues in {time.monotonic() - started:.1f}s")
+
+    # Leagues that missed the deadline keep their previous data
+    keep_previous_data(results, late, existing_data)
+
+    # Search for missing highlights now that the scores are out, and
+    # republish the leagues that gained one
+    fresh = {league: results[league] for league in order if league not in late}
+    before = {league: _fingerprint(data) for league, data in fresh.items()}
+    if fill_highlights(fresh, highlights):
+        for league in order:
+            if league in fresh and _fingerprint(fresh[league]) != before[league]:
+                publish(league, fresh[league])
+    highlights.save()
 
     # Save unified file
-    with open(SPORTS_DATA_JSON, "w") as f:
-        json.dump(final_data, f, indent=2)
+    save_unified_data(results)
     print(f"[OK] Saved unified data to {SPORTS_DATA_JSON}")
 
-    # Also save individual league files for frontend compatibility
-    print("\nSaving individual league files...")
-    save_league_data("NFL", nfl_data)
-    save_league_data("NBA", nba_data)
-    save_league_data("WNBA", wnba_data)
-    save_league_data("NHL", nhl_data)
-    save_league_data("MLB", mlb_data)
-    save_league_data("MLS", mls_data)
-
     # Summary
     print()
     print("=" * 70)
     print("Summary:")
-    for league, data in [("NFL", nfl_data), ("NBA", nba_data), ("WNBA", wnba_data),
-                          ("NHL", nhl_data), ("MLB", mlb_data), ("MLS", mls_data)]:
-        games = data.get("games", [])
+    for league in order:
+        games = results[league].get("games", [])
         final_count = len([g for g in games if g.get("is_final")])
         video_count = len([g for g in games if g.get("video_url")])
         print(f"  {league}: {len(games)} games ({final_count} final, {video_count} with video)")
@@ -739,5 +1190,27 @@ def main():
     print("\n[OK] Done!")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Fetch scores for all sports leagues")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running, polling each league by the state of its games")
+    args = parser.parse_args()
+
+    if not args.daemon:
+        update_all()
+        return
+
+    print("=" * 70)
+    print("Sports Data Daemon - Adaptive Polling")
+    print("=" * 70)
+    print(f"Polling: {POLL_LIVE}s live, {POLL_SCHEDULED // 60} min scheduled, "
+          f"{POLL_IDLE // 3600} h idle")
+    print()
+    try:
+        run_daemon()
+    except KeyboardInterrupt:
+        print("\n[OK] Stopped")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Highlight Video Cache
+
+Durable cache of YouTube highlight lookups for fetch_sports_data.py, kept
+in data/sports/highlights.json (committed with the scores, so it survives
+between workflow runs).
+
+- Entries are keyed by game ("<league>-<ESPN event id>"), so a highlight
+  is remembered after the game leaves the scoreboard.
+- Misses are cached too: a game without a highlight is retried after
+  MISS_TTL, doubling with each miss, and not at all once it is older than
+  SEARCH_WINDOW (the search only covers the past week of uploads).
+- A ledger tracks the YouTube Data API units spent today (the quota
+  resets at midnight Pacific), so lookups stop before the quota runs out.
+
+Usage:
+    cache = HighlightCache()
+    url = cache.get("nba-401585123")
+    if cache.due("nba-401585123", game_start) and cache.remaining() >= SEARCH_COST:
+        cache.spend(SEARCH_COST)
+        ...
+        cache.record("nba-401585123", url, game_start)
+    cache.save()
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import HIGHLIGHT_CACHE_JSON
+
+# YouTube Data API quota (units per day) and cost of one search.list call
+DAILY_QUOTA = int(os.environ.get("YOUTUBE_DAILY_QUOTA", "10000"))
+SEARCH_COST = 100
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+# Retry a game without a highlight after this long (doubling per miss)
+MISS_TTL = timedelta(hours=3)
+
+# Stop searching for a game's highlight once it is this old
+SEARCH_WINDOW = timedelta(days=7)
+
+# Forget entries for games older than this
+RETENTION = timedelta(days=90)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class HighlightCache:
+    """Highlight URLs and cached misses by game, plus today's quota ledger."""
+
+    def __init__(self, path: Path = HIGHLIGHT_CACHE_JSON, daily_quota: int = DAILY_QUOTA):
+        self.path = Path(path)
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self.games: Dict[str, Dict[str, Any]] = {}
+        self.quota = {"day": None, "used": 0}
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self.games = data.get("games", {})
+                self.quota.update(data.get("quota", {}))
+            except (OSError, ValueError) as e:
+                print(f"Could not load highlight cache: {e}")
+
+    def __len__(self):
+        return len(self.games)
+
+    # --- Lookups ---
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached highlight URL for a game, or None."""
+        with self._lock:
+            entry = self.games.get(key)
+        return entry.get("url") if entry else None
+
+    def due(self, key: str, game_start: Optional[datetime], now: Optional[datetime] = None) -> bool:
+        """Whether a game's highlight should be searched for now."""
+        now = now or datetime.now(timezone.utc)
+        if game_start is not None and now - game_start > SEARCH_WINDOW:
+            return False
+        with self._lock:
+            entry = self.games.get(key)
+        if entry is None:
+            return True
+        if entry.get("url"):
+            return False
+        retry_at = _parse_time(entry.get("retryAt"))
+        return retry_at is None or now >= retry_at
+
+    def record(self, key: str, url: Optional[str], game_start: Optional[datetime],
+               now: Optional[datetime] = None) -> None:
+        """Store a search result; None records a miss with a growing retry delay."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            entry = {
+                "url": url,
+                "gameStart": game_start.isoformat() if game_start else None,
+                "checked": now.isoformat(),
+            }
+            if url is None:
+                misses = self.games.get(key, {}).get("misses", 0) + 1
+                entry["misses"] = misses
+                entry["retryAt"] = (now + MISS_TTL * 2 ** (misses - 1)).isoformat()
+            self.games[key] = entry
+
+    def seed(self, existing_data: Optional[Dict[str, Any]]) -> int:
+        """
+        Import highlight URLs from a previous sports_data.json.
+
+        Returns:
+            Number of games added
+        """
+        added = 0
+        for league, league_data in (existing_data or {}).items():
+            if not isinstance(league_data, dict):
+                continue
+            for game in league_data.get("games", []):
+                key = f"{league}-{game.get('id', '')}"
+                if game.get("id") and game.get("video_url") and key not in self.games:
+                    self.record(key, game["video_url"], _parse_time(game.get("date")))
+                    added += 1
+        return added
+
+    # --- Quota ledger ---
+
+    def _quota_day(self, now: Optional[datetime] = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        return now.astimezone(QUOTA_TZ).date().isoformat()
+
+    def remaining(self, now: Optional[datetime] = None) -> int:
+        """Quota units left today."""
+        with self._lock:
+            if self.quota.get("day") != self._quota_day(now):
+                return self.daily_quota
+            return max(0, self.daily_quota - self.quota.get("used", 0))
+
+    def spend(self, units: int = SEARCH_COST, now: Optional[datetime] = None) -> None:
+        """Record units spent on an API call."""
+        day = self._quota_day(now)
+        with self._lock:
+            if self.quota.get("day") != day:
+                self.quota = {"day": day, "used": 0}
+            self.quota["used"] += units
+
+    def exhaust(self, now: Optional[datetime] = None) -> None:
+        """Mark today's quota as used up (the API reported it exceeded)."""
+        with self._lock:
+            self.quota = {"day": self._quota_day(now), "used": self.daily_quota}
+
+    # --- Persistence ---
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop entries for games older than RETENTION; returns how many."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            stale = [
+                key for key, entry in self.games.items()
+                if (_parse_time(entry.get("gameStart")) or now) < now - RETENTION
+            ]
+            for key in stale:
+                del self.games[key]
+        return len(stale)
+
+    def save(self) -> None:
+        """Write the cache atomically."""
+        with self._lock:
+            data = {"quota": dict(self.quota), "games": dict(sorted(self.games.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Cross-Ticker Market Analytics
+
+Computes analytics across all franchise tickers in the historical store:
+
+- rolling correlation matrix of daily returns (CORRELATION_WINDOW days),
+  plus the average pairwise correlation as a daily series
+- beta and correlation of each ticker versus SPY (BETA_WINDOW days)
+- an equal-weighted and a cap-weighted franchise composite index
+
+Outputs to: data/stocks/analytics/
+- composite.json:   columnar daily index levels (t, equal, cap, avgCorrelation)
+                    for the index market widget
+- correlation.json: latest correlation matrix
+- betas.json:       latest beta/correlation versus SPY per ticker
+
+Returns use adjusted closes. Correlations are pairwise-complete (each pair
+uses the days both tickers traded), so delisted or newly listed tickers
+don't blank out the matrix. The composite is rebalanced daily: the equal
+index averages constituent returns, the cap index weights them by the
+previous day's market cap (current share counts from data/stocks/shares.json,
+kept by fetch_current_prices.py, times the previous close).
+
+Updates are incremental: state.npz keeps the last closes, the trailing
+BETA_WINDOW rows of returns and the latest index levels, so each run only
+reads the trading days after its asOf date. Run with --full to recompute
+from the entire history (also done automatically when the ticker set
+changes). Incremental output equals a --full recompute only while the
+share counts don't change: each run applies the current counts to its
+new days, whereas --full reweights the whole history with them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import ANALYTICS_DIR, SHARE_COUNTS_JSON
+from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+BENCHMARK = "SPY"
+
+# Trading days in each rolling window
+CORRELATION_WINDOW = 63
+BETA_WINDOW = 252
+
+# Fewer overlapping days than this gives no correlation/beta
+MIN_OBSERVATIONS = 20
+
+# Composite index level on its first day
+COMPOSITE_BASE = 100.0
+
+STATE_FILE = "state.npz"
+COMPOSITE_FILE = "composite.json"
+CORRELATION_FILE = "correlation.json"
+BETAS_FILE = "betas.json"
+
+
+def pairwise_moments(returns):
+    """
+    Pairwise-complete covariance and variances of return columns.
+
+    Args:
+        returns: (days, tickers) array with NaN for missing days
+
+    Returns:
+        (cov, var, n): cov[i, j] is the covariance of i and j over the days
+        both have returns, var[i, j] the variance of i over those same days,
+        n[i, j] the number of such days
+    """
+    valid = (~np.isnan(returns)).astype('float64')
+    x = np.where(valid > 0, returns, 0.0)
+
+    n = valid.T @ valid
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (x.T @ valid) / n              # mean of i over days shared with j
+        cov = (x.T @ x) / n - mean * mean.T
+        var = ((x * x).T @ valid) / n - mean * mean
+    return cov, var, n
+
+
+def correlation_matrix(returns):
+    """Pairwise-complete correlation matrix (NaN where under MIN_OBSERVATIONS)."""
+    cov, var, n = pairwise_moments(returns)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < MIN_OBSERVATIONS] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def benchmark_stats(returns, benchmark_index):
+    """
+    Beta and correlation of every column versus the benchmark column.
+
+    Returns:
+        (beta, correlation, observations) arrays, one entry per column
+    """
+    cov, var, n = pairwise_moments(returns)
+    b = benchmark_index
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = cov[:, b] / var[b, :]
+        corr = cov[:, b] / np.sqrt(var[:, b] * var[b, :])
+    observations = n[:, b]
+    beta[observations < MIN_OBSERVATIONS] = np.nan
+    corr[observations < MIN_OBSERVATIONS] = np.nan
+    return beta, np.clip(corr, -1.0, 1.0), observations
+
+
+def average_correlation(corr, members):
+    """Mean off-diagonal correlation among the member columns."""
+    sub = corr[np.ix_(members, members)]
+    upper = sub[np.triu_indices(len(members), k=1)]
+    upper = upper[~np.isnan(upper)]
+    return float(upper.mean()) if len(upper) else np.nan
+
+
+def load_share_counts(path=SHARE_COUNTS_JSON):
+    """Shares outstanding per ticker, as saved by fetch_current_prices.py."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    shares = saved.get('shares', {}) if isinstance(saved, dict) else {}
+    return {symbol: count for symbol, count in shares.items() if count}
+
+
+def load_state(output_dir=ANALYTICS_DIR):
+    path = Path(output_dir) / STATE_FILE
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(state, output_dir=ANALYTICS_DIR):
+    path = Path(output_dir) / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(payload, path, compact=True):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(payload, f, separators=(',', ':'))
+        else:
+            json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _rounded(values, digits):
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def advance(state, prices, shares):
+    """
+    Extend the analytics state with new trading days.
+
+    Args:
+        state: Previous state (an empty window and NaN closes to start)
+        prices: DataFrame of adjusted closes, new dates x state symbols
+        shares: Array of share counts per symbol (NaN = not cap-weighted)
+
+    Returns:
+        (state, series): the new state and a dict of per-day series
+        (dates, equal, cap, avgCorrelation) for the new days
+    """
+    symbols = list(state['symbols'])
+    members = [i for i, s in enumerate(symbols) if s != BENCHMARK]
+    closes = prices.to_numpy(dtype='float64')
+
+    # Previous close for each day: carry forward through missing days
+    carried = np.vstack([state['last_close'][None, :], closes])
+    carried = pd.DataFrame(carried).ffill().to_numpy()
+    previous = carried[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = closes / previous - 1.0
+
+    member_returns = returns[:, members]
+    has_return = ~np.isnan(member_returns)
+
+    # Equal weight: mean of the constituents that traded
+    with np.errstate(invalid='ignore'):
+        equal_returns = np.where(has_return.any(axis=1),
+                                 np.nansum(member_returns, axis=1) / has_return.sum(axis=1), 0.0)
+
+    # Cap weight: previous day's market cap of the constituents that traded
+    caps = np.where(has_return, previous[:, members] * shares[members], 0.0)
+    caps = np.nan_to_num(caps)
+    cap_total = caps.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cap_returns = np.where(cap_total > 0,
+                               (caps * np.nan_to_num(member_returns)).sum(axis=1) / cap_total, 0.0)
+
+    equal_levels = state['levels'][0] * np.cumprod(1.0 + equal_returns)
+    cap_levels = state['levels'][1] * np.cumprod(1.0 + cap_returns)
+
+    # Rolling windows over the retained returns plus the new days
+    window = np.vstack([state['window'], returns])
+    avg_corr = np.empty(len(returns))
+    offset = len(state['window'])
+    for i in range(len(returns)):
+        end = offset + i + 1
+        corr = correlation_matrix(window[max(0, end - CORRELATION_WINDOW):end])
+        avg_corr[i] = average_correlation(corr, members)
+
+    new_state = {
+        'symbols': state['symbols'],
+        'as_of': np.array(prices.index[-1]),
+        'last_close': carried[-1],
+        'window': window[-BETA_WINDOW:],
+        'levels': np.array([equal_levels[-1], cap_levels[-1]]),
+    }
+    series = {
+        'dates': list(prices.index),
+        'equal': equal_levels,
+        'cap': cap_levels,
+        'avgCorrelation': avg_corr,
+    }
+    return new_state, series
+
+
+def update_analytics(store=None, symbols=None, full=False, output_dir=ANALYTICS_DIR,
+                     shares=None):
+    """
+    Bring the analytics outputs up to date with the historical store.
+
+    Args:
+        store: HistoricalStore to read (defaults to the shared store)
+        symbols: Tickers to include (defaults to every stored symbol)
+        full: Recompute from the full history
+        output_dir: Where to write the outputs and state
+        shares: Share counts per symbol (defaults to the saved share counts)
+
+    Returns:
+        Number of new trading days processed
+    """
+    store = store or HistoricalStore()
+    output_dir = Path(output_dir)
+    stored = set(store.symbols())
+    symbols = sorted(stored.intersection(symbols) if symbols else stored)
+    shares = load_share_counts() if shares is None else shares
+    share_counts = np.array([shares.get(s, np.nan) for s in symbols], dtype='float64')
+
+    state = composite = None
+    if not full:
+        state = load_state(output_dir)
+        composite = _load_json(output_dir / COMPOSITE_FILE)
+    if state is not None and list(state['symbols']) != symbols:
+        print("⚠️  Ticker set changed - recomputing analytics from full history")
+        state = None
+    if state is None or composite is None:
+        state = composite = None
+
+    start = None
+    if state is not None:
+        start = (date.fromisoformat(str(state['as_of'])) + timedelta(days=1)).isoformat()
+
+    rows = store.load(symbols, start=start)
+    if rows.empty:
+        return 0
+
+    prices = rows.assign(price=rows['adjClose'].fillna(rows['close']))
+    prices = prices.pivot_table(index='date', columns='symbol', values='price', aggfunc='last')
+    prices = prices.reindex(columns=symbols).sort_index()
+
+    if state is None:
+        state = {
+            'symbols': np.array(symbols),
+            'last_close': np.full(len(symbols), np.nan),
+            'window': np.empty((0, len(symbols))),
+            'levels': np.array([COMPOSITE_BASE, COMPOSITE_BASE]),
+        }
+
+    state, series = advance(state, prices, share_counts)
+
+    # Append the new days to the widget's composite series
+    if composite is None:
+        composite = {'t': [], 'equal': [], 'cap': [], 'avgCorrelation': []}
+    composite.update({
+        'asOf': series['dates'][-1],
+        'base': COMPOSITE_BASE,
+        'constituents': [s for s in symbols if s != BENCHMARK],
+        'capWeighted': [s for s, n in zip(symbols, share_counts) if s != BENCHMARK and not np.isnan(n)],
+        'correlationWindow': CORRELATION_WINDOW,
+    })
+    composite['t'] += series['dates']
+    composite['equal'] += _rounded(series['equal'], 2)
+    # Without any market caps the cap-weighted series is undefined, not flat
+    cap_levels = series['cap'] if composite['capWeighted'] else np.full(len(series['cap']), np.nan)
+    composite['cap'] += _rounded(cap_levels, 2)
+    composite['avgCorrelation'] += _rounded(series['avgCorrelation'], 3)
+    _write_json(composite, output_dir / COMPOSITE_FILE)
+
+    # Latest correlation matrix and benchmark stats
+    window = state['window']
+    corr = correlation_matrix(window[-CORRELATION_WINDOW:])
+    _write_json({
+        'asOf': composite['asOf'],
+        'window': CORRELATION_WINDOW,
+        'symbols': symbols,
+        'matrix': [_rounded(row, 3) for row in corr],
+    }, output_dir / CORRELATION_FILE)
+
+    tickers = {}
+    if BENCHMARK in symbols:
+        beta, bench_corr, observations = benchmark_stats(window, symbols.index(BENCHMARK))
+        for i, symbol in enumerate(symbols):
+            if symbol == BENCHMARK:
+                continue
+            tickers[symbol] = {
+                'beta': None if np.isnan(beta[i]) else round(float(beta[i]), 3),
+                'correlation': None if np.isnan(bench_corr[i]) else round(float(bench_corr[i]), 3),
+                'observations': int(observations[i]),
+            }
+    _write_json({
+        'asOf': composite['asOf'],
+        'benchmark': BENCHMARK,
+        'window': BETA_WINDOW,
+        'tickers': tickers,
+    }, output_dir / BETAS_FILE, compact=False)
+
+    save_state(state, output_dir)
+    return len(series['dates'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute cross-ticker correlation, beta and composite index")
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute from the full history instead of the new days")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Computing Market Analytics")
+    print("=" * 70)
+
+    start = time.time()
+    days = update_analytics(full=args.full)
+
+    print(f"✓ Processed {days} trading days into {ANALYTICS_DIR} in {time.time() - start:.1f}s")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Precompute Trend Indicators
+
+Computes the trend indicators shown on the evaluation page
+(evaluate/trends-analysis.js) for every ticker in the historical store, so
+the browser fetches a small ready-made file instead of crunching years of
+history on every page load.
+
+Outputs to: data/stocks/indicators/<SYMBOL>.json (+ index.json)
+
+Each file holds the trailing INDICATOR_WINDOW trading days:
+- dates, close, sma20 and ema12 series
+- trend metrics (YTD/annual change, trend, volatility, momentum)
+- a 30-period linear-regression forecast
+
+Updates are incremental: only rows after a file's asOf date are read from
+the store, the moving averages are extended from the saved full-precision
+state (the last EMA value and the last SMA_PERIOD - 1 closes) while the
+stored rows keep their values, and the window is re-trimmed, so the result
+matches a --full recompute from the entire history.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import INDICATORS_DIR
+from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+# Trading days kept per ticker (a little over a year, so YTD always fits)
+INDICATOR_WINDOW = 260
+
+SMA_PERIOD = 20
+EMA_PERIOD = 12
+MOMENTUM_PERIOD = 12
+FORECAST_PERIODS = 30
+
+INDEX_FILE = "index.json"
+
+
+def _rounded(values, digits=4):
+    """JSON-friendly list with NaN as null."""
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def extend_ema(closes, previous=None, period=EMA_PERIOD):
+    """
+    EMA of closes, continuing from a previous EMA value if given
+    (seeded with the first close otherwise, as trends-analysis.js does).
+    """
+    closes = pd.Series(closes, dtype='float64')
+    if previous is not None:
+        closes = pd.concat([pd.Series([previous]), closes], ignore_index=True)
+    ema = closes.ewm(span=period, adjust=False).mean().to_numpy()
+    return ema[1:] if previous is not None else ema
+
+
+def trend_metrics(dates, closes, sma):
+    """Trend metrics over the window (see calculateTrendMetrics in trends-analysis.js)."""
+    current = closes[-1]
+    first = closes[0]
+
+    year_mask = dates.str.startswith(dates.iloc[-1][:4])
+    year_closes = closes[year_mask.to_numpy()]
+    ytd_change = (year_closes[-1] - year_closes[0]) / year_closes[0] * 100 if len(year_closes) else 0.0
+
+    last_sma = sma[~np.isnan(sma)]
+    if len(last_sma):
+        trend = 'uptrend' if current > last_sma[-1] else 'downtrend'
+    else:
+        trend = 'neutral'
+
+    returns = np.diff(closes) / closes[:-1]
+    volatility = float(np.std(returns) * 100) if len(returns) else 0.0
+
+    momentum = 0.0
+    if len(closes) > MOMENTUM_PERIOD:
+        base = closes[-MOMENTUM_PERIOD]
+        momentum = (current - base) / base * 100
+
+    return {
+        'currentPrice': round(float(current), 4),
+        'yearAgoPrice': round(float(first), 4),
+        'ytdChange': round(float(ytd_change), 4),
+        'annualChange': round(float((current - first) / first * 100), 4),
+        'trend': trend,
+        'volatility': round(volatility, 4),
+        'momentum': round(float(momentum), 4),
+        'dataPoints': int(len(closes))
+    }
+
+
+def linear_forecast(closes, periods=FORECAST_PERIODS):
+    """Linear-regression projection of the next `periods` closes."""
+    if len(closes) < 5:
+        return []
+    x = np.arange(len(closes))
+    slope, intercept = np.polyfit(x, closes, 1)
+    projected = intercept + slope * np.arange(len(closes), len(closes) + periods)
+    return _rounded(np.maximum(projected, 0.01))
+
+
+def build_indicators(symbol, dates, closes, ema_state=None, tail=None):
+    """
+    Indicator payload for a ticker.
+
+    Args:
+        symbol: Ticker
+        dates: New trading dates (YYYY-MM-DD)
+        closes: Closes for those dates
+        ema_state: Full-precision EMA at the last stored date (None = seed)
+        tail: Previous payload, whose series the new rows extend (its
+            state holds the closes the first new SMA values need)
+
+    Returns:
+        Payload dict ready to be written as JSON
+    """
+    dates = pd.Series(dates, dtype='object')
+    closes = np.asarray(closes, dtype='float64')
+    ema = extend_ema(closes, ema_state)
+    sma = pd.Series(closes).rolling(SMA_PERIOD).mean().to_numpy()
+
+    if tail:
+        # New SMA values only need the last SMA_PERIOD - 1 stored closes;
+        # older payloads without them fall back to the rounded tail
+        previous = tail.get('state', {}).get('closes') or tail['close'][-(SMA_PERIOD - 1):]
+        previous = np.asarray(previous, dtype='float64')
+        extended = np.concatenate([previous, closes])
+        sma = pd.Series(extended).rolling(SMA_PERIOD).mean().to_numpy()[len(previous):]
+
+        dates = pd.concat([pd.Series(tail['dates'], dtype='object'), dates], ignore_index=True)
+        closes = np.concatenate([np.asarray(tail['close'], dtype='float64'), closes])
+        ema = np.concatenate([np.asarray(tail['ema12'], dtype='float64'), ema])
+        sma = np.concatenate([np.asarray(tail['sma20'], dtype='float64'), sma])
+        full_closes = extended[-(SMA_PERIOD - 1):]
+    else:
+        full_closes = closes[-(SMA_PERIOD - 1):]
+
+    full_ema = float(ema[-1])
+
+    dates = dates.iloc[-INDICATOR_WINDOW:].reset_index(drop=True)
+    closes = closes[-INDICATOR_WINDOW:]
+    sma = sma[-INDICATOR_WINDOW:]
+    ema = ema[-INDICATOR_WINDOW:]
+
+    return {
+        'symbol': symbol,
+        'asOf': dates.iloc[-1],
+        'dates': dates.tolist(),
+        'close': _rounded(closes),
+        'sma20': _rounded(sma),
+        'ema12': _rounded(ema),
+        'metrics': trend_metrics(dates, closes, sma),
+        'forecast': linear_forecast(closes),
+        'state': {'ema12': full_ema, 'closes': [float(c) for c in full_closes]}
+    }
+
+
+def load_indicators(symbol, output_dir=INDICATORS_DIR):
+    path = Path(output_dir) / f"{symbol}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_indicators(payload, output_dir=INDICATORS_DIR):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{payload['symbol']}.json"
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def update_indicators(store=None, symbols=None, full=False, output_dir=INDICATORS_DIR):
+    """
+    Bring indicator files up to date with the historical store.
+
+    Returns:
+        (updated, unchanged) ticker counts
+    """
+    store = store or HistoricalStore()
+    symbols = symbols or store.symbols()
+    updated = unchanged = 0
+
+    index_path = Path(output_dir) / INDEX_FILE
+    index = {}
+    if index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f).get('symbols', {})
+
+    for symbol in symbols:
+        previous = None if full else load_indicators(symbol, output_dir)
+        last = store.last_date(symbol)
+        if last is None:
+            continue
+
+        if previous and previous['asOf'] >= last.isoformat():
+            index[symbol] = previous['asOf']
+            unchanged += 1
+            continue
+
+        start = None
+        if previous:
+            start = (date.fromisoformat(previous['asOf']) + timedelta(days=1)).isoformat()
+        rows = store.load([symbol], start=start)
+        rows = rows.dropna(subset=['close'])
+        if rows.empty:
+            unchanged += 1
+            continue
+
+        payload = build_indicators(
+            symbol,
+            rows['date'].tolist(),
+            rows['close'].to_numpy(),
+            ema_state=previous['state']['ema12'] if previous else None,
+            tail=previous
+        )
+        save_indicators(payload, output_dir)
+        index[symbol] = payload['asOf']
+        updated += 1
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'symbols': index, 'window': INDICATOR_WINDOW}, f, indent=2, sort_keys=True)
+
+    return updated, unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute trend indicators for the evaluation page")
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute from the full history instead of the new rows")
+    parser.add_argument("--symbols", nargs="+", help="Only these tickers")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Computing Trend Indicators")
+    print("=" * 70)
+
+    updated, unchanged = update_indicators(symbols=args.symbols, full=args.full)
+
+    print(f"✓ Updated {updated} tickers ({unchanged} unchanged) in {INDICATORS_DIR}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
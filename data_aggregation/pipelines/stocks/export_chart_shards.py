@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Export Downsampled Chart Shards
+
+Writes per-ticker chart series at several resolutions so StockChart only
+downloads the resolution a range needs, instead of the full daily history
+of every ticker.
+
+Outputs to: data/stocks/charts/<SYMBOL>/<resolution>.json (+ manifest.json)
+
+Resolutions:
+- 1m:  last 31 trading days, daily (also feeds the 30-day price table)
+- 1y:  last year, daily
+- 5y:  last 5 years, weekly bars
+- 10y: last 10 years, monthly bars
+- max: full history, daily, LTTB-downsampled to MAX_POINTS
+
+Weekly/monthly bars are aggregated for all tickers in one pandas groupby
+(open first, high max, low min, close last, volume sum). Any shard still
+longer than its point budget is reduced with Largest-Triangle-Three-Buckets,
+which keeps the peaks and troughs that give the line its shape.
+
+Each shard is columnar JSON: t (dates), c (close), o/h/l (open/high/low)
+and v (volume).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import CHART_SHARDS_DIR
+from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+MANIFEST_FILE = "manifest.json"
+
+# name -> lookback, bar interval and point budget
+RESOLUTIONS = {
+    '1m': {'rows': 31, 'interval': '1d', 'maxPoints': 31},
+    '1y': {'years': 1, 'interval': '1d', 'maxPoints': 260},
+    '5y': {'years': 5, 'interval': '1wk', 'maxPoints': 265},
+    '10y': {'years': 10, 'interval': '1mo', 'maxPoints': 125},
+    'max': {'interval': '1d', 'maxPoints': 600},
+}
+
+# pandas period codes for bar intervals
+PERIODS = {'1wk': 'W-FRI', '1mo': 'M'}
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def aggregate_bars(df, interval):
+    """
+    Aggregate daily rows (all tickers) into weekly or monthly bars,
+    dated by the last trading day in each bar.
+    """
+    if interval == '1d':
+        return df
+    dates = pd.to_datetime(df['date'])
+    period = dates.dt.to_period(PERIODS[interval])
+    bars = df.assign(_period=period).groupby(['symbol', '_period'], sort=True).agg(
+        date=('date', 'last'),
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        adjClose=('adjClose', 'last'),
+        volume=('volume', 'sum'),
+    )
+    return bars.reset_index().drop(columns='_period')
+
+
+def _column(values, digits=4):
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def shard_payload(symbol, resolution, rows):
+    """Columnar JSON payload for one ticker's shard."""
+    return {
+        'symbol': symbol,
+        'resolution': resolution,
+        'interval': RESOLUTIONS[resolution]['interval'],
+        'asOf': rows['date'].iloc[-1],
+        't': rows['date'].tolist(),
+        'c': _column(rows['close'].to_numpy(dtype='float64')),
+        'o': _column(rows['open'].to_numpy(dtype='float64')),
+        'h': _column(rows['high'].to_numpy(dtype='float64')),
+        'l': _column(rows['low'].to_numpy(dtype='float64')),
+        'v': [int(v) for v in rows['volume'].to_numpy(dtype='int64')],
+    }
+
+
+def build_shards(df, today=None):
+    """
+    Downsampled rows for every ticker and resolution.
+
+    Args:
+        df: Daily rows for all tickers (historical_store columns)
+        today: Reference date for lookbacks (defaults to the latest row)
+
+    Returns:
+        Dict mapping (symbol, resolution) to a DataFrame of chart points
+    """
+    df = df.dropna(subset=['close']).sort_values(['symbol', 'date'], ignore_index=True)
+    today = pd.Timestamp(today or df['date'].max())
+    shards = {}
+
+    for resolution, spec in RESOLUTIONS.items():
+        subset = df
+        if 'years' in spec:
+            cutoff = (today - pd.DateOffset(years=spec['years'])).strftime('%Y-%m-%d')
+            subset = df[df['date'] > cutoff]
+        if 'rows' in spec:
+            subset = subset.groupby('symbol', sort=False).tail(spec['rows'])
+
+        bars = aggregate_bars(subset, spec['interval'])
+
+        for symbol, rows in bars.groupby('symbol', sort=True):
+            rows = rows.reset_index(drop=True)
+            if len(rows) > spec['maxPoints']:
+                x = pd.to_datetime(rows['date']).to_numpy().astype('datetime64[D]').astype('float64')
+                keep = lttb_indices(x, rows['close'].to_numpy(dtype='float64'), spec['maxPoints'])
+                rows = rows.iloc[keep].reset_index(drop=True)
+            shards[(symbol, resolution)] = rows
+
+    return shards
+
+
+def export_chart_shards(store=None, output_dir=CHART_SHARDS_DIR):
+    """
+    Write every ticker's chart shards and the manifest.
+
+    Returns:
+        Number of shard files written
+    """
+    store = store or HistoricalStore()
+    output_dir = Path(output_dir)
+    shards = build_shards(store.load())
+
+    manifest = {
+        'generatedAt': datetime.utcnow().isoformat() + 'Z',
+        'resolutions': RESOLUTIONS,
+        'symbols': {}
+    }
+
+    for (symbol, resolution), rows in shards.items():
+        payload = shard_payload(symbol, resolution, rows)
+        path = output_dir / symbol / f"{resolution}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+        entry = manifest['symbols'].setdefault(symbol, {'asOf': payload['asOf'], 'points': {}})
+        entry['asOf'] = max(entry['asOf'], payload['asOf'])
+        entry['points'][resolution] = len(rows)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return len(shards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export downsampled chart shards for StockChart")
+    parser.parse_args()
+
+    print("=" * 70)
+    print("Exporting Chart Shards")
+    print("=" * 70)
+
+    start = time.time()
+    written = export_chart_shards()
+
+    print(f"✓ Wrote {written} shards to {CHART_SHARDS_DIR} in {time.time() - start:.1f}s")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,29 @@ This lightweight script runs frequently (every 30 minutes) to keep the map
 ticker widget up-to-date with current price information.
 
 Data Source: Yahoo Finance (yfinance library)
-Output: FranchiseMap/data/stocks.json
+Output: FranchiseMap/data/stocks.json, plus shares outstanding per ticker
+in data/stocks/shares.json for the cap-weighted composite
+(compute_analytics.py). Run with --shares to refresh only the share
+counts (at most once per SHARE_COUNTS_MAX_AGE).
 
 Note: Removed tickers like GNC, TAST (no longer public) are kept in
 update_historical_data.py for historical data preservation.
 """
 
+import argparse
+import os
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import yfinance as yf
 
 # Add repo root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from data_aggregation.config.paths_config import MAP_STOCKS_JSON
+from data_aggregation.config.paths_config import MAP_STOCKS_JSON, SHARE_COUNTS_JSON
+from data_aggregation.pipelines.stocks.fetch_live_ticker import market_closed_notice
+from data_aggregation.pipelines.stocks.quote_cache import get_quote_cache
 
 # ============================================================================
 # TICKER SYMBOLS - MUST SYNCHRONIZE WITH MASTER LIST
@@ -63,30 +70,58 @@ TICKER_SYMBOLS = [
     "GNC"
 ]
 
+# Share counts barely move; --shares refetches them at most once a day
+SHARE_COUNTS_MAX_AGE = timedelta(days=1)
 
-def fetch_stock_data():
-    """Fetch current stock data for all tickers."""
+
+def fetch_yahoo_quote(symbol):
+    """
+    Fetch the quote fields the widget needs from Yahoo Finance.
+
+    Returns:
+        dict: Raw quote fields, or None if no price was available
+    """
+    ticker = yf.Ticker(symbol)
+    info = ticker.info
+
+    # Get current price
+    current_price = info.get('currentPrice') or info.get('regularMarketPrice')
+    previous_close = info.get('previousClose') or info.get('regularMarketPreviousClose')
+
+    if current_price is None:
+        # Try getting from history
+        hist = ticker.history(period="1d")
+        if not hist.empty:
+            current_price = float(hist['Close'].iloc[-1])
+
+    if current_price is None:
+        return None
+
+    return {
+        "price": current_price,
+        "previousClose": previous_close,
+        "name": info.get('shortName', symbol),
+        "marketCap": info.get('marketCap'),
+        "volume": info.get('volume'),
+    }
+
+
+def fetch_stock_data(cache=None):
+    """Fetch current stock data for all tickers (via the shared quote cache)."""
     print(f"Fetching data for {len(TICKER_SYMBOLS)} tickers...")
 
+    cache = cache or get_quote_cache()
     results = {}
     errors = []
 
     for symbol in TICKER_SYMBOLS:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            # Get current price
-            current_price = info.get('currentPrice') or info.get('regularMarketPrice')
-            previous_close = info.get('previousClose') or info.get('regularMarketPreviousClose')
+            quote = cache.get_or_fetch('yahoo', symbol, lambda: fetch_yahoo_quote(symbol))
 
-            if current_price is None:
-                # Try getting from history
-                hist = ticker.history(period="1d")
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
+            if quote is not None:
+                current_price = quote['price']
+                previous_close = quote['previousClose']
 
-            if current_price is not None:
                 # Calculate change
                 change = 0
                 change_percent = 0
@@ -100,9 +135,9 @@ def fetch_stock_data():
                     "previousClose": round(previous_close, 2) if previous_close else None,
                     "change": round(change, 2),
                     "changePercent": round(change_percent, 2),
-                    "name": info.get('shortName', symbol),
-                    "marketCap": info.get('marketCap'),
-                    "volume": info.get('volume'),
+                    "name": quote['name'],
+                    "marketCap": quote['marketCap'],
+                    "volume": quote['volume'],
                 }
                 print(f"  ✓ {symbol}: ${current_price:.2f} ({change_percent:+.2f}%)")
             else:
@@ -116,12 +151,81 @@ def fetch_stock_data():
     return results, errors
 
 
+def _read_share_file(path):
+    """Saved share counts file ({"updatedAt", "shares"}), or None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return saved if isinstance(saved, dict) else None
+
+
+def save_share_counts(quotes, path=SHARE_COUNTS_JSON):
+    """
+    Save shares outstanding (market cap / price) from fetched quotes.
+
+    Counts are merged into the saved file, so a ticker whose quote failed
+    keeps its last known count.
+
+    Returns:
+        Number of tickers with an updated count
+    """
+    shares = (_read_share_file(path) or {}).get('shares', {})
+    updated = 0
+    for symbol, quote in quotes.items():
+        if quote.get('marketCap') and quote.get('price'):
+            shares[symbol] = quote['marketCap'] / quote['price']
+            updated += 1
+    if not updated:
+        return 0
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"updatedAt": datetime.utcnow().isoformat() + "Z", "shares": shares},
+                  f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return updated
+
+
+def refresh_share_counts(path=SHARE_COUNTS_JSON, max_age=SHARE_COUNTS_MAX_AGE):
+    """Refetch share counts unless the saved ones are newer than max_age."""
+    saved = _read_share_file(path)
+    if saved and saved.get('updatedAt'):
+        updated_at = datetime.fromisoformat(saved['updatedAt'].rstrip('Z'))
+        if datetime.utcnow() - updated_at < max_age:
+            print(f"✓ Share counts are current (updated {saved['updatedAt']})")
+            return 0
+
+    stock_data, _ = fetch_stock_data()
+    updated = save_share_counts(stock_data, path)
+    print(f"✓ Share counts updated for {updated} tickers in {path}")
+    return updated
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Fetch current prices for the FranchiseMap ticker widget")
+    parser.add_argument("--shares", action="store_true",
+                        help="Only refresh the share counts used by the cap-weighted composite")
+    args = parser.parse_args()
+
+    if args.shares:
+        refresh_share_counts()
+        return
+
     print("=" * 70)
     print("Fetching Current Stock Prices for FranchiseMap Ticker Widget")
     print("=" * 70)
     print()
 
+    # Skip holidays, weekends and nights once the last close is saved
+    if market_closed_notice(MAP_STOCKS_JSON):
+        print("\n⏸️  Skipping fetch - no new prices until the next session")
+        print("=" * 70)
+        return
+
     # Fetch data
     stock_data, errors = fetch_stock_data()
 
@@ -142,6 +246,9 @@ def main():
     with open(MAP_STOCKS_JSON, "w") as f:
         json.dump(output, f, indent=2)
 
+    # Keep the cap-weighted composite's share counts current too
+    save_share_counts(stock_data)
+
     print(f"\n{'='*70}")
     print(f"✓ Stock data saved to: {MAP_STOCKS_JSON}")
     print(f"Success: {len(stock_data)}/{len(TICKER_SYMBOLS)} tickers")
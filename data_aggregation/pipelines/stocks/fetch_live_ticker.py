@@ -15,15 +15,20 @@ to verify synchronization after any changes.
 import os
 import json
 import time
+import asyncio
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
 # Add repo root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from data_aggregation.config.paths_config import LIVE_TICKER_JSON
+from data_aggregation.pipelines.stocks.market_calendar import MARKET_TZ, has_new_data, holiday_name, next_open
+from data_aggregation.pipelines.stocks.quote_cache import get_quote_cache
 
 # ============================================================================
 # TICKER SYMBOLS - MUST MATCH update_historical_data.py
@@ -62,118 +67,130 @@ SYMBOL_MAP = {}
 
 # API Configuration
 FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY', '')
-FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
-
-# US Stock Market Holidays (2024-2026)
-# Source: NYSE/NASDAQ official holiday schedules
-US_MARKET_HOLIDAYS = {
-    # 2024
-    "2024-01-01",  # New Year's Day
-    "2024-01-15",  # Martin Luther King Jr. Day
-    "2024-02-19",  # Presidents' Day
-    "2024-03-29",  # Good Friday
-    "2024-05-27",  # Memorial Day
-    "2024-06-19",  # Juneteenth
-    "2024-07-04",  # Independence Day
-    "2024-09-02",  # Labor Day
-    "2024-11-28",  # Thanksgiving Day
-    "2024-12-25",  # Christmas Day
-
-    # 2025
-    "2025-01-01",  # New Year's Day
-    "2025-01-20",  # Martin Luther King Jr. Day
-    "2025-02-17",  # Presidents' Day
-    "2025-04-18",  # Good Friday
-    "2025-05-26",  # Memorial Day
-    "2025-06-19",  # Juneteenth
-    "2025-07-04",  # Independence Day
-    "2025-09-01",  # Labor Day
-    "2025-11-27",  # Thanksgiving Day
-    "2025-12-25",  # Christmas Day
-
-    # 2026
-    "2026-01-01",  # New Year's Day
-    "2026-01-19",  # Martin Luther King Jr. Day
-    "2026-02-16",  # Presidents' Day
-    "2026-04-03",  # Good Friday
-    "2026-05-25",  # Memorial Day
-    "2026-06-19",  # Juneteenth
-    "2026-07-03",  # Independence Day (observed, July 4 is Saturday)
-    "2026-09-07",  # Labor Day
-    "2026-11-26",  # Thanksgiving Day
-    "2026-12-25",  # Christmas Day
-}
-
-
-def is_market_holiday():
+FINNHUB_BASE_URL = os.environ.get('FINNHUB_BASE_URL', "https://finnhub.io/api/v1")
+
+# Rate limiting: Finnhub free tier allows 60 calls/minute
+FINNHUB_CALLS_PER_MINUTE = int(os.environ.get('FINNHUB_CALLS_PER_MINUTE', '60'))
+MAX_CONCURRENT_REQUESTS = 8
+
+# Publish a partial live_ticker.json at most this often while quotes arrive
+SNAPSHOT_INTERVAL = 2.0
+
+def snapshot_fetched_at(path=None):
     """
-    Check if today is a US market holiday
+    When a quotes snapshot was last completed.
 
     Returns:
-        bool: True if today is a market holiday
+        datetime: fetchedAt of a complete snapshot, or None if there is none
     """
-    # Get current date in ET timezone
     try:
-        import pytz
-
-        et_tz = pytz.timezone('America/New_York')
-        now_et = datetime.now(et_tz)
-        today = now_et.strftime('%Y-%m-%d')
+        with open(path or LIVE_TICKER_JSON, 'r') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or not snapshot.get('fetchedAt') or \
+            snapshot.get('complete') is False:
+        return None
+    return datetime.fromisoformat(snapshot['fetchedAt'].rstrip('Z')).replace(tzinfo=timezone.utc)
 
-        if today in US_MARKET_HOLIDAYS:
-            holiday_name = get_holiday_name(today)
-            print(f"🏖️  Market is closed today for {holiday_name}")
-            return True
 
+def market_closed_notice(output_path=None):
+    """
+    Print why a run can be skipped and return True if prices can't have
+    changed since the last snapshot (market closed and the close captured).
+    """
+    if has_new_data(snapshot_fetched_at(output_path)):
         return False
-    except ImportError:
-        # If pytz is not available, use UTC date as fallback
-        # This is less accurate but still works
-        today = datetime.utcnow().strftime('%Y-%m-%d')
-        return today in US_MARKET_HOLIDAYS
-
-
-def get_holiday_name(date_str):
-    """Get holiday name from date"""
-    holiday_names = {
-        "-01-01": "New Year's Day",
-        "-01-15": "Martin Luther King Jr. Day",
-        "-01-19": "Martin Luther King Jr. Day",
-        "-01-20": "Martin Luther King Jr. Day",
-        "-02-16": "Presidents' Day",
-        "-02-17": "Presidents' Day",
-        "-02-19": "Presidents' Day",
-        "-03-29": "Good Friday",
-        "-04-03": "Good Friday",
-        "-04-18": "Good Friday",
-        "-05-25": "Memorial Day",
-        "-05-26": "Memorial Day",
-        "-05-27": "Memorial Day",
-        "-06-19": "Juneteenth",
-        "-07-03": "Independence Day",
-        "-07-04": "Independence Day",
-        "-09-01": "Labor Day",
-        "-09-02": "Labor Day",
-        "-09-07": "Labor Day",
-        "-11-26": "Thanksgiving Day",
-        "-11-27": "Thanksgiving Day",
-        "-11-28": "Thanksgiving Day",
-        "-12-25": "Christmas Day",
-    }
 
-    for suffix, name in holiday_names.items():
-        if date_str.endswith(suffix):
-            return name
+    today = datetime.now(MARKET_TZ).date()
+    name = holiday_name(today)
+    if name:
+        print(f"🏖️  Market is closed today for {name}")
+    print("⏸️  Market is closed and the last close is already saved")
+    print(f"💡 Next session opens {next_open():%Y-%m-%d %H:%M} ET")
+    return True
 
-    return "Market Holiday"
 
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursting up to `capacity`.
+    """
 
-def fetch_quote(symbol):
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def create_session(pool_size=MAX_CONCURRENT_REQUESTS):
+    """HTTP session with a connection pool sized for concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def parse_quote(symbol, data):
     """
-    Fetch a single quote from Finnhub API
+    Convert a Finnhub quote response to our quote format
 
     Args:
         symbol: Stock symbol (e.g., "AAPL")
+        data: Finnhub /quote response
+
+    Returns:
+        dict: Quote data or None if the response has no price
+    """
+    # Finnhub returns: c (current), h (high), l (low), o (open), pc (previous close), t (timestamp)
+    if not (data.get('c') and data.get('c') > 0):
+        return None
+
+    current = data['c']
+    prev_close = data.get('pc', current)
+
+    # Calculate change
+    change = current - prev_close
+    change_percent = (change / prev_close * 100) if prev_close > 0 else 0
+
+    return {
+        'symbol': symbol,  # Use original symbol for consistency
+        'price': round(current, 2),
+        'change': round(change, 2),
+        'changePercent': round(change_percent, 2),
+        'isPositive': change > 0,
+        'isNegative': change < 0,
+        'high': round(data.get('h', current), 2),
+        'low': round(data.get('l', current), 2),
+        'open': round(data.get('o', current), 2),
+        'previousClose': round(prev_close, 2),
+        'timestamp': data.get('t', int(time.time())),
+        'source': 'finnhub'
+    }
+
+
+def fetch_quote(symbol, session=None, base_url=None, cache=None):
+    """
+    Fetch a single quote from Finnhub API (via the shared quote cache)
+
+    Args:
+        symbol: Stock symbol (e.g., "AAPL")
+        session: Pooled requests session (a one-off request if None)
+        base_url: Finnhub API base URL (defaults to FINNHUB_BASE_URL)
+        cache: QuoteCache to consult first (defaults to the shared cache)
 
     Returns:
         dict: Quote data or None if failed
@@ -181,43 +198,29 @@ def fetch_quote(symbol):
     # Map Yahoo-style symbols to Finnhub symbols
     finnhub_symbol = SYMBOL_MAP.get(symbol, symbol)
 
-    url = f"{FINNHUB_BASE_URL}/quote"
+    url = f"{base_url or FINNHUB_BASE_URL}/quote"
     params = {
         'symbol': finnhub_symbol,
         'token': FINNHUB_API_KEY
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
+    def request_quote():
+        response = (session or requests).get(url, params=params, timeout=10)
+        if response.status_code == 429:
+            # Over quota despite the bucket (e.g. another client on the key):
+            # wait for the window the API asks for, then retry once
+            time.sleep(float(response.headers.get('Retry-After', 1)))
+            response = (session or requests).get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
-
-        # Finnhub returns: c (current), h (high), l (low), o (open), pc (previous close), t (timestamp)
-        if data.get('c') and data.get('c') > 0:
-            current = data['c']
-            prev_close = data.get('pc', current)
-
-            # Calculate change
-            change = current - prev_close
-            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
-
-            return {
-                'symbol': symbol,  # Use original symbol for consistency
-                'price': round(current, 2),
-                'change': round(change, 2),
-                'changePercent': round(change_percent, 2),
-                'isPositive': change > 0,
-                'isNegative': change < 0,
-                'high': round(data.get('h', current), 2),
-                'low': round(data.get('l', current), 2),
-                'open': round(data.get('o', current), 2),
-                'previousClose': round(prev_close, 2),
-                'timestamp': data.get('t', int(time.time())),
-                'source': 'finnhub'
-            }
-        else:
+        return response.json()
+
+    try:
+        data = (cache or get_quote_cache()).get_or_fetch('finnhub', finnhub_symbol, request_quote)
+
+        quote = parse_quote(symbol, data)
+        if quote is None:
             print(f"⚠️  {symbol}: No valid data returned")
-            return None
+        return quote
 
     except requests.exceptions.RequestException as e:
         print(f"❌ {symbol}: Request failed - {e}")
@@ -227,6 +230,67 @@ def fetch_quote(symbol):
         return None
 
 
+async def fetch_all_quotes_async(symbols=None, base_url=None, output_path=None,
+                                 calls_per_minute=None, snapshot_interval=SNAPSHOT_INTERVAL,
+                                 cache=None):
+    """
+    Fetch quotes concurrently within Finnhub's rate limit
+
+    Requests share a pooled session and are paced by a token bucket that
+    refills at the per-minute quota but bursts only MAX_CONCURRENT_REQUESTS
+    calls, so a sweep is spread across the minute instead of firing at once. While quotes arrive, partial snapshots are
+    published (at most every snapshot_interval seconds), so one slow symbol
+    doesn't hold back the rest of the ticker file.
+
+    Args:
+        symbols: Symbols to fetch (defaults to TICKER_SYMBOLS)
+        base_url: Finnhub API base URL (defaults to FINNHUB_BASE_URL)
+        output_path: Snapshot file (defaults to LIVE_TICKER_JSON)
+        calls_per_minute: API quota (defaults to FINNHUB_CALLS_PER_MINUTE)
+        snapshot_interval: Minimum seconds between partial snapshots
+        cache: QuoteCache to consult first (defaults to the shared cache)
+
+    Returns:
+        dict: All quotes keyed by symbol
+    """
+    symbols = list(symbols or TICKER_SYMBOLS)
+    cache = cache or get_quote_cache()
+    calls_per_minute = calls_per_minute or FINNHUB_CALLS_PER_MINUTE
+    bucket = TokenBucket(calls_per_minute / 60.0, min(MAX_CONCURRENT_REQUESTS, calls_per_minute))
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    loop = asyncio.get_running_loop()
+    quotes = {}
+    total = len(symbols)
+
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+
+        async def fetch(symbol):
+            finnhub_symbol = SYMBOL_MAP.get(symbol, symbol)
+            async with semaphore:
+                if cache.get('finnhub', finnhub_symbol) is None:
+                    await bucket.acquire()  # Only API calls spend quota
+                quote = await loop.run_in_executor(pool, fetch_quote, symbol, session, base_url, cache)
+            if quote:
+                quotes[symbol] = quote
+                print(f"[{len(quotes)}/{total}] ✓ {symbol} ${quote['price']} ({quote['changePercent']:+.2f}%)")
+            else:
+                print(f"✗ {symbol} failed")
+
+        pending = {asyncio.create_task(fetch(symbol)) for symbol in symbols}
+        published = 0
+        last_publish = time.monotonic()
+
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=snapshot_interval)
+            if pending and len(quotes) > published and \
+                    time.monotonic() - last_publish >= snapshot_interval:
+                save_quotes(quotes, output_path, pending=len(pending), verbose=False)
+                published = len(quotes)
+                last_publish = time.monotonic()
+
+    return quotes
+
+
 def fetch_all_quotes():
     """
     Fetch quotes for all symbols with rate limiting
@@ -234,55 +298,62 @@ def fetch_all_quotes():
     Returns:
         dict: All quotes keyed by symbol
     """
-    quotes = {}
     total = len(TICKER_SYMBOLS)
 
     print(f"📊 Fetching {total} stock quotes from Finnhub...")
     print(f"⏰ Started at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
-    for i, symbol in enumerate(TICKER_SYMBOLS, 1):
-        print(f"[{i}/{total}] Fetching {symbol}...", end=" ")
-
-        quote = fetch_quote(symbol)
-
-        if quote:
-            quotes[symbol] = quote
-            print(f"✓ ${quote['price']} ({quote['changePercent']:+.2f}%)")
-        else:
-            print("✗ Failed")
-
-        # Rate limiting: Finnhub free tier allows 60 calls/minute
-        # Sleep 1.1 seconds between calls to stay under limit (55 calls/minute)
-        if i < total:
-            time.sleep(1.1)
+    quotes = asyncio.run(fetch_all_quotes_async())
 
     print(f"\n✅ Successfully fetched {len(quotes)}/{total} quotes")
     return quotes
 
 
-def save_quotes(quotes):
+def save_quotes(quotes, output_path=None, pending=0, verbose=True):
     """
     Save quotes to JSON file
 
+    Partial snapshots (pending > 0) keep the previous file's quotes for
+    symbols not fetched yet in this sweep. The file is replaced atomically,
+    so readers never see a half-written snapshot.
+
     Args:
         quotes: Dictionary of quotes
+        output_path: Output file (defaults to LIVE_TICKER_JSON)
+        pending: Symbols still being fetched (0 for the final snapshot)
+        verbose: Print a summary line
     """
+    output_path = Path(output_path or LIVE_TICKER_JSON)
+
     # Ensure data directory exists
-    LIVE_TICKER_JSON.parent.mkdir(parents=True, exist_ok=True)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    snapshot = quotes
+    if pending and output_path.exists():
+        try:
+            with open(output_path, 'r') as f:
+                snapshot = {**json.load(f).get('quotes', {}), **quotes}
+        except (OSError, ValueError):
+            pass
 
     # Add metadata
     output = {
-        'quotes': quotes,
+        'quotes': snapshot,
         'fetchedAt': datetime.utcnow().isoformat() + 'Z',
-        'count': len(quotes),
-        'source': 'finnhub'
+        'count': len(snapshot),
+        'source': 'finnhub',
+        'complete': pending == 0,
+        'pending': pending
     }
 
     # Write to file
-    with open(LIVE_TICKER_JSON, 'w') as f:
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
         json.dump(output, f, indent=2)
+    os.replace(tmp_path, output_path)
 
-    print(f"\n💾 Saved {len(quotes)} quotes to {LIVE_TICKER_JSON}")
+    if verbose:
+        print(f"\n💾 Saved {len(snapshot)} quotes to {output_path}")
 
 
 def main():
@@ -296,9 +367,9 @@ def main():
     print("📈 FINNHUB LIVE TICKER FETCHER")
     print("=" * 60)
 
-    # Check if today is a market holiday
-    if is_market_holiday():
-        print("\n⏸️  Skipping API calls - market is closed for holiday")
+    # Skip holidays, weekends and nights once the last close is saved
+    if market_closed_notice():
+        print("\n⏸️  Skipping API calls - no new prices until the next session")
         print("💡 No charges incurred, no actions used")
         print("\n" + "=" * 60)
         exit(0)
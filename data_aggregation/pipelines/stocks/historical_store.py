@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Partitioned Historical Stock Store
+
+Columnar, partitioned storage for daily OHLCV history, replacing the
+single franchise_stocks_historical.csv that had to be read, deduplicated,
+sorted and rewritten in full to append one day.
+
+Layout (under data/stocks/historical/):
+    _index.json                      first/last (and checked) date per symbol
+    <SYMBOL>/<YEAR>/base.npz         compacted, sorted rows for that year
+    <SYMBOL>/<YEAR>/delta-<ts>.npz   rows appended by one update run
+
+Each partition holds one array per column (date as datetime64[D], prices
+as float64, volume as int64), so a read only touches the symbols and
+years it asks for. Appends only write new delta files, so the daily cost
+depends on the new rows, not on the size of the history. Compaction
+merges a partition's deltas into its base once they pile up (or once the
+year is over), deduplicating by date with the newest row winning.
+
+Usage:
+    store = HistoricalStore()
+    store.append(new_df)
+    store.compact()
+    df = store.load(["MCD", "SPY"], start="2024-01-01", end="2024-06-30")
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import HISTORICAL_STOCKS_CSV, HISTORICAL_STORE_DIR
+
+COLUMNS = ['date', 'symbol', 'open', 'high', 'low', 'close', 'adjClose', 'volume']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'adjClose']
+
+INDEX_FILE = "_index.json"
+BASE_PARTITION = "base.npz"
+DELTA_PREFIX = "delta-"
+
+# Compact a partition once it has this many delta files
+COMPACT_THRESHOLD = 20
+
+
+def _to_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Convert rows for one symbol to typed column arrays."""
+    columns = {'date': pd.to_datetime(df['date']).values.astype('datetime64[D]')}
+    for name in PRICE_COLUMNS:
+        columns[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype='float64')
+    columns['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).to_numpy(dtype='int64')
+    return columns
+
+
+def _write_partition(path: Path, columns: Dict[str, np.ndarray]) -> None:
+    """Write a partition atomically (readers never see a partial file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **columns)
+    os.replace(tmp_path, path)
+
+
+def _read_partition(path: Path) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _merge(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatenate partitions (oldest first), keep the last row per date,
+    and sort by date.
+    """
+    merged = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    dates = merged['date']
+    # Last occurrence of each date wins: dedupe on the reversed arrays
+    _, first_in_reversed = np.unique(dates[::-1], return_index=True)
+    keep = len(dates) - 1 - first_in_reversed  # np.unique returns dates sorted
+    return {name: values[keep] for name, values in merged.items()}
+
+
+class HistoricalStore:
+    """Per-symbol, per-year partitioned store of daily OHLCV rows."""
+
+    def __init__(self, root: Path = HISTORICAL_STORE_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_FILE
+        self.index: Dict[str, Dict[str, str]] = {}
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    def is_empty(self) -> bool:
+        return not self.symbols()
+
+    def symbols(self) -> List[str]:
+        """Symbols with stored rows (not those only marked as checked)."""
+        return sorted(symbol for symbol, entry in self.index.items() if 'last' in entry)
+
+    def last_date(self, symbol: str) -> Optional[date]:
+        """Latest stored trading date for a symbol, or None if it has no rows."""
+        entry = self.index.get(symbol)
+        return date.fromisoformat(entry['last']) if entry and 'last' in entry else None
+
+    def covered_through(self, symbol: str) -> Optional[date]:
+        """
+        Last date a symbol is known to be complete through: its last stored
+        row, or a later date a fetch confirmed has no rows (delisted or
+        halted tickers), so those days aren't requested again.
+        """
+        entry = self.index.get(symbol)
+        dates = [entry[key] for key in ('last', 'checked') if key in entry] if entry else []
+        return date.fromisoformat(max(dates)) if dates else None
+
+    def mark_checked(self, symbol: str, through: date) -> None:
+        """
+        Record that a symbol has no rows to fetch through a date. Symbols
+        with no rows at all get an index entry too, so a dead ticker's
+        initial history isn't requested on every run.
+        """
+        covered = self.covered_through(symbol)
+        if covered is None or through > covered:
+            self.index.setdefault(symbol, {})['checked'] = through.isoformat()
+            self._save_index()
+
+    def latest_date(self) -> Optional[date]:
+        """Latest stored trading date across all symbols."""
+        dates = [self.last_date(symbol) for symbol in self.symbols()]
+        return max(dates) if dates else None
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(INDEX_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append rows as new delta partitions (one per symbol and year).
+
+        Args:
+            df: Rows with the COLUMNS of fetch_stock_data()
+
+        Returns:
+            Number of rows written
+        """
+        if df is None or df.empty:
+            return 0
+
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        years = pd.to_datetime(df['date']).dt.year
+        written = 0
+
+        for (symbol, year), rows in df.groupby([df['symbol'], years], sort=False):
+            columns = _to_columns(rows)
+            path = self.root / symbol / str(year) / f"{DELTA_PREFIX}{stamp}.npz"
+            _write_partition(path, columns)
+            written += len(rows)
+
+            first = str(columns['date'].min())
+            last = str(columns['date'].max())
+            entry = self.index.setdefault(symbol, {})
+            entry['first'] = min(entry.get('first', first), first)
+            entry['last'] = max(entry.get('last', last), last)
+
+        self._save_index()
+        return written
+
+    def _partition_files(self, partition_dir: Path) -> List[Path]:
+        """Base partition (if any) followed by deltas, oldest first."""
+        files = []
+        base = partition_dir / BASE_PARTITION
+        if base.exists():
+            files.append(base)
+        files.extend(sorted(partition_dir.glob(f"{DELTA_PREFIX}*.npz")))
+        return files
+
+    def compact_partition(self, partition_dir: Path) -> bool:
+        """Merge a partition's deltas into its base; returns True if it had any."""
+        files = self._partition_files(partition_dir)
+        deltas = [p for p in files if p.name != BASE_PARTITION]
+        if not deltas:
+            return False
+
+        merged = _merge([_read_partition(p) for p in files])
+        _write_partition(partition_dir / BASE_PARTITION, merged)
+        for path in deltas:
+            path.unlink()
+        return True
+
+    def compact(self, force: bool = False, threshold: int = COMPACT_THRESHOLD) -> int:
+        """
+        Compact partitions that need it: past years with any deltas, and
+        the current year once it has `threshold` deltas (every partition
+        with deltas if force is set).
+
+        Returns:
+            Number of partitions compacted
+        """
+        current_year = str(date.today().year)
+        compacted = 0
+        for symbol in self.symbols():
+            symbol_dir = self.root / symbol
+            if not symbol_dir.is_dir():
+                continue
+            for partition_dir in sorted(p for p in symbol_dir.iterdir() if p.is_dir()):
+                deltas = list(partition_dir.glob(f"{DELTA_PREFIX}*.npz"))
+                if not deltas:
+                    continue
+                if force or partition_dir.name != current_year or len(deltas) >= threshold:
+                    if self.compact_partition(partition_dir):
+                        compacted += 1
+        return compacted
+
+    def import_csv(self, csv_path: Path = HISTORICAL_STOCKS_CSV) -> int:
+        """One-time migration of the legacy flat CSV into compacted partitions."""
+        df = pd.read_csv(csv_path)
+        written = self.append(df)
+        self.compact(force=True)
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Load rows for the requested symbols and inclusive date range,
+        reading only the partitions that overlap it.
+
+        Args:
+            symbols: Tickers to load (all stored symbols if None)
+            start: First date (YYYY-MM-DD), unbounded if None
+            end: Last date (YYYY-MM-DD), unbounded if None
+
+        Returns:
+            DataFrame with COLUMNS, sorted by date and symbol
+        """
+        start_day = np.datetime64(start, 'D') if start else None
+        end_day = np.datetime64(end, 'D') if end else None
+        start_year = int(str(start_day)[:4]) if start_day is not None else None
+        end_year = int(str(end_day)[:4]) if end_day is not None else None
+
+        frames = []
+        for symbol in (symbols if symbols is not None else self.symbols()):
+            symbol_dir = self.root / symbol
+            if not symbol_dir.is_dir():
+                continue
+            for partition_dir in sorted(p for p in symbol_dir.iterdir() if p.is_dir()):
+                year = int(partition_dir.name)
+                if (start_year is not None and year < start_year) or \
+                        (end_year is not None and year > end_year):
+                    continue
+
+                files = self._partition_files(partition_dir)
+                if not files:
+                    continue
+                parts = [_read_partition(p) for p in files]
+                columns = parts[0] if len(parts) == 1 else _merge(parts)
+
+                mask = np.ones(len(columns['date']), dtype=bool)
+                if start_day is not None:
+                    mask &= columns['date'] >= start_day
+                if end_day is not None:
+                    mask &= columns['date'] <= end_day
+                if not mask.any():
+                    continue
+
+                frame = pd.DataFrame({name: values[mask] for name, values in columns.items()})
+                frame['symbol'] = symbol
+                frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+
+        df = pd.concat(frames, ignore_index=True)
+        df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+        return df[COLUMNS].sort_values(['date', 'symbol'], ignore_index=True)
+
+
+def load_history(
+    symbols: Optional[Iterable[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> pd.DataFrame:
+    """Load stored history for the given tickers and date range."""
+    return HistoricalStore().load(symbols, start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the partitioned historical stock store")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compact every partition that has pending deltas")
+    parser.add_argument("--export-csv", nargs="?", const=str(HISTORICAL_STOCKS_CSV), metavar="PATH",
+                        help="Write the full history to a flat CSV (default: %(const)s)")
+    args = parser.parse_args()
+
+    store = HistoricalStore()
+    if store.is_empty():
+        print(f"✗ No historical data in {store.root}")
+        sys.exit(1)
+
+    if args.compact:
+        print(f"✓ Compacted {store.compact(force=True)} partitions")
+
+    if args.export_csv:
+        df = store.load()
+        df.to_csv(args.export_csv, index=False)
+        print(f"✓ Exported {len(df)} records to {args.export_csv}")
+
+
+if __name__ == "__main__":
+    main()
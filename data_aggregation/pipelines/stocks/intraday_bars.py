@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Intraday Bar Aggregation
+
+Turns the live quote stream (quote_stream.py trades) into 1-minute and
+5-minute OHLCV bars per ticker.
+
+- Bars for the current session live in a fixed-size ring buffer per ticker
+  and resolution (numpy arrays, so memory stays bounded however long the
+  daemon runs); the oldest bars are overwritten once a buffer is full.
+- Sparklines for the ticker widget are read straight from the buffers and
+  embedded in live_ticker.json snapshots, so the widget never re-fetches
+  history for them.
+- At the close the session's bars are flushed to the columnar store:
+
+    data/stocks/intraday/<SYMBOL>/<YEAR>/<resolution>-<YYYY-MM-DD>.npz
+
+  with columns t (bar start, epoch seconds), open, high, low, close, volume.
+  Flushing the same session again merges with the existing file. The
+  buffers are kept (so sparklines survive the evening) until reset() at
+  the start of the next session.
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import INTRADAY_STORE_DIR
+from data_aggregation.pipelines.stocks.historical_store import _read_partition, _write_partition
+from data_aggregation.pipelines.stocks.market_calendar import MARKET_TZ
+
+# Bar resolutions (seconds per bar)
+RESOLUTIONS = {'1m': 60, '5m': 300}
+
+# Bars kept per buffer: a full extended session (4:00-20:00 ET)
+SESSION_SECONDS = 16 * 60 * 60
+
+SPARKLINE_RESOLUTION = '5m'
+SPARKLINE_POINTS = 78  # One regular session of 5-minute bars
+
+
+class BarRing:
+    """Fixed-capacity ring buffer of OHLCV bars at one resolution."""
+
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype='int64')
+        self.open = np.zeros(capacity, dtype='float64')
+        self.high = np.zeros(capacity, dtype='float64')
+        self.low = np.zeros(capacity, dtype='float64')
+        self.close = np.zeros(capacity, dtype='float64')
+        self.volume = np.zeros(capacity, dtype='int64')
+        self.count = 0
+        self.last = -1  # Slot of the newest bar
+
+    def __len__(self):
+        return self.count
+
+    def add(self, ts: float, price: float, volume: int = 0) -> None:
+        """Fold a trade into its bar, starting a new bar when the bucket changes."""
+        bucket = int(ts) - int(ts) % self.seconds
+
+        if self.count and bucket == self.t[self.last]:
+            slot = self.last
+            self.close[slot] = price
+        elif self.count and bucket < self.t[self.last]:
+            # Late trade: amend its bar if still buffered, keeping the close
+            slots = np.flatnonzero(self.t[:self.count] == bucket)
+            if not len(slots):
+                return
+            slot = slots[0]
+        else:
+            slot = (self.last + 1) % self.capacity
+            self.last = slot
+            self.count = min(self.count + 1, self.capacity)
+            self.t[slot] = bucket
+            self.open[slot] = self.high[slot] = self.low[slot] = self.close[slot] = price
+            self.volume[slot] = volume
+            return
+
+        self.high[slot] = max(self.high[slot], price)
+        self.low[slot] = min(self.low[slot], price)
+        self.volume[slot] += volume
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Bars oldest first, as columns."""
+        if self.count < self.capacity:
+            order = np.arange(self.count)
+        else:
+            order = np.roll(np.arange(self.capacity), -(self.last + 1))
+        return {
+            't': self.t[order],
+            'open': self.open[order],
+            'high': self.high[order],
+            'low': self.low[order],
+            'close': self.close[order],
+            'volume': self.volume[order],
+        }
+
+
+class IntradayAggregator:
+    """Per-ticker bar buffers for the current session."""
+
+    def __init__(self, resolutions: Optional[Dict[str, int]] = None):
+        self.resolutions = dict(resolutions or RESOLUTIONS)
+        self.rings: Dict[str, Dict[str, BarRing]] = {}
+        self.session: Optional[str] = None
+
+    def add_trade(self, symbol: str, price: float, volume: int = 0,
+                  ts: Optional[float] = None) -> None:
+        """Add a trade (ts in epoch seconds, default now) to every resolution."""
+        if not price or price <= 0:
+            return
+        ts = time.time() if ts is None else ts
+        if self.session is None:
+            self.session = datetime.fromtimestamp(ts, MARKET_TZ).date().isoformat()
+
+        rings = self.rings.get(symbol)
+        if rings is None:
+            rings = self.rings[symbol] = {
+                name: BarRing(seconds, -(-SESSION_SECONDS // seconds))
+                for name, seconds in self.resolutions.items()
+            }
+        for ring in rings.values():
+            ring.add(ts, price, int(volume or 0))
+
+    def bars(self, symbol: str, resolution: str = '1m') -> Dict[str, np.ndarray]:
+        """A ticker's bars at a resolution (empty columns if none)."""
+        rings = self.rings.get(symbol)
+        if rings is None:
+            return BarRing(self.resolutions[resolution], 0).columns()
+        return rings[resolution].columns()
+
+    def sparkline(self, symbol: str, resolution: str = SPARKLINE_RESOLUTION,
+                  points: int = SPARKLINE_POINTS) -> List[float]:
+        """Latest closes for a ticker, oldest first."""
+        closes = self.bars(symbol, resolution)['close'][-points:]
+        return [round(float(c), 2) for c in closes]
+
+    def flush(self, root: Path = INTRADAY_STORE_DIR) -> int:
+        """
+        Write the session's bars to the columnar store.
+
+        Returns:
+            Number of files written
+        """
+        if self.session is None:
+            return 0
+
+        written = 0
+        year = self.session[:4]
+        for symbol, rings in self.rings.items():
+            for name, ring in rings.items():
+                if not len(ring):
+                    continue
+                path = Path(root) / symbol / year / f"{name}-{self.session}.npz"
+                columns = ring.columns()
+                if path.exists():
+                    columns = _merge_bars(_read_partition(path), columns)
+                _write_partition(path, columns)
+                written += 1
+        return written
+
+    def reset(self) -> None:
+        """Drop all bars (start of a new session)."""
+        self.rings = {}
+        self.session = None
+
+
+def _merge_bars(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Combine two bar sets; new bars replace old ones with the same start."""
+    merged = {name: np.concatenate([old[name], new[name]]) for name in new}
+    _, first_in_reversed = np.unique(merged['t'][::-1], return_index=True)
+    keep = len(merged['t']) - 1 - first_in_reversed
+    return {name: values[keep] for name, values in merged.items()}
+
+
+def load_intraday(symbol: str, day: str, resolution: str = '1m',
+                  root: Path = INTRADAY_STORE_DIR) -> pd.DataFrame:
+    """
+    Load a flushed session's bars.
+
+    Args:
+        symbol: Ticker
+        day: Session date (YYYY-MM-DD)
+        resolution: Bar resolution ('1m' or '5m')
+        root: Intraday store directory
+
+    Returns:
+        DataFrame with a tz-aware (ET) time column and OHLCV, empty if none
+    """
+    path = Path(root) / symbol / day[:4] / f"{resolution}-{day}.npz"
+    if not path.exists():
+        return pd.DataFrame(columns=['time', 'open', 'high', 'low', 'close', 'volume'])
+    columns = _read_partition(path)
+    df = pd.DataFrame({name: columns[name] for name in ('open', 'high', 'low', 'close', 'volume')})
+    df.insert(0, 'time', pd.to_datetime(columns['t'], unit='s', utc=True).tz_convert(MARKET_TZ))
+    return df
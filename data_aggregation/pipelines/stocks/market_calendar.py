@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+NYSE Trading Calendar
+
+Computes NYSE trading days from the exchange's holiday rules instead of a
+hardcoded list of dates, so it keeps working in any year.
+
+Holidays (with weekend observance where the exchange observes it):
+- New Year's Day (Jan 1; Sunday -> Monday, Saturday is not observed)
+- Martin Luther King Jr. Day (third Monday of January)
+- Washington's Birthday (third Monday of February)
+- Good Friday (two days before Easter Sunday)
+- Memorial Day (last Monday of May)
+- Juneteenth (June 19, from 2022)
+- Independence Day (July 4)
+- Labor Day (first Monday of September)
+- Thanksgiving Day (fourth Thursday of November)
+- Christmas Day (December 25)
+
+Plus one-off closures (national days of mourning, weather) listed in
+SPECIAL_CLOSURES.
+
+Early closes (13:00 ET): July 3, the day after Thanksgiving and Christmas
+Eve, whenever they are trading days.
+
+Sessions (ET): pre-market 4:00-9:30, regular 9:30-16:00 (13:00 on early
+closes), after-hours until 20:00 (17:00 on early closes).
+
+is_open(now) / next_open(now) answer whether a session is running, and
+has_new_data(since) whether prices can have moved since a fetch, so
+fetchers and schedulers can skip or sleep through closed periods.
+
+Usage (for schedulers):
+    python3 -m data_aggregation.pipelines.stocks.market_calendar            # status
+    python3 -m data_aggregation.pipelines.stocks.market_calendar --is-open  # true/false
+"""
+
+import argparse
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+# Regular trading session (Eastern Time)
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Extended-hours sessions (Eastern Time)
+PRE_MARKET_OPEN = time(4, 0)
+AFTER_HOURS_CLOSE = time(20, 0)
+EARLY_AFTER_HOURS_CLOSE = time(17, 0)
+
+# Unscheduled full-day closures
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): "Hurricane Sandy",
+    date(2012, 10, 30): "Hurricane Sandy",
+    date(2018, 12, 5): "National Day of Mourning (George H.W. Bush)",
+    date(2025, 1, 9): "National Day of Mourning (Jimmy Carter)",
+}
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday (0=Monday) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> Dict[date, str]:
+    """Full-day NYSE closures in a year, mapped to the holiday name."""
+    holidays = {}
+
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # NYSE does not close the preceding Friday
+        holidays[_observed(new_year)] = "New Year's Day"
+
+    holidays[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Presidents' Day"
+    holidays[_easter(year) - timedelta(days=2)] = "Good Friday"
+    holidays[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    holidays[_observed(date(year, 7, 4))] = "Independence Day"
+    holidays[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    holidays[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    holidays[_observed(date(year, 12, 25))] = "Christmas Day"
+
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            holidays[day] = name
+
+    return holidays
+
+
+@lru_cache(maxsize=None)
+def nyse_early_closes(year: int) -> Dict[date, str]:
+    """13:00 ET early closes in a year, mapped to the reason."""
+    candidates = {
+        date(year, 7, 3): "Independence Day Eve",
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1): "Day after Thanksgiving",
+        date(year, 12, 24): "Christmas Eve",
+    }
+    return {day: name for day, name in candidates.items() if is_trading_day(day)}
+
+
+def holiday_name(day: date) -> Optional[str]:
+    """Name of the holiday closing the market on a day, if any."""
+    return nyse_holidays(day.year).get(day)
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+
+def trading_days(start: date, end: date) -> List[date]:
+    """Trading days from start through end (inclusive)."""
+    days = []
+    day = start
+    while day <= end:
+        if is_trading_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def previous_trading_day(day: date) -> date:
+    """Last trading day strictly before a day."""
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def session_hours(day: date) -> Optional[Tuple[time, time]]:
+    """Regular session (open, close) on a day, or None if the market is closed."""
+    if not is_trading_day(day):
+        return None
+    if day in nyse_early_closes(day.year):
+        return SESSION_OPEN, EARLY_CLOSE
+    return SESSION_OPEN, SESSION_CLOSE
+
+
+def _extended_hours(day: date) -> Optional[Tuple[time, time]]:
+    """Pre-market open and after-hours close on a day."""
+    hours = session_hours(day)
+    if hours is None:
+        return None
+    after_close = EARLY_AFTER_HOURS_CLOSE if hours[1] == EARLY_CLOSE else AFTER_HOURS_CLOSE
+    return PRE_MARKET_OPEN, after_close
+
+
+def _market_now(now: Optional[datetime]) -> datetime:
+    """Current time (or a given aware/UTC-naive time) in Eastern Time."""
+    if now is None:
+        return datetime.now(MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=ZoneInfo("UTC"))
+    return now.astimezone(MARKET_TZ)
+
+
+def session(now: Optional[datetime] = None) -> str:
+    """Session at a time: 'pre', 'regular', 'post' or 'closed'."""
+    now = _market_now(now)
+    hours = session_hours(now.date())
+    if hours is None:
+        return 'closed'
+    extended = _extended_hours(now.date())
+    current = now.time()
+    if hours[0] <= current < hours[1]:
+        return 'regular'
+    if extended[0] <= current < hours[0]:
+        return 'pre'
+    if hours[1] <= current < extended[1]:
+        return 'post'
+    return 'closed'
+
+
+def is_open(now: Optional[datetime] = None, extended: bool = False) -> bool:
+    """
+    Whether the market is trading at a time (default: now).
+
+    Args:
+        now: Time to check (aware, or naive UTC)
+        extended: Count pre-market and after-hours as open
+    """
+    current = session(now)
+    return current == 'regular' or (extended and current in ('pre', 'post'))
+
+
+def next_open(now: Optional[datetime] = None, extended: bool = False) -> datetime:
+    """Start of the next session after a time (now, if one is running)."""
+    now = _market_now(now)
+    if is_open(now, extended):
+        return now
+    day = now.date()
+    while True:
+        hours = _extended_hours(day) if extended else session_hours(day)
+        if hours is not None:
+            start = datetime.combine(day, hours[0], tzinfo=MARKET_TZ)
+            if start > now:
+                return start
+        day += timedelta(days=1)
+
+
+def last_close(now: Optional[datetime] = None) -> datetime:
+    """End of the most recent regular session that has finished by a time."""
+    now = _market_now(now)
+    day = now.date()
+    hours = session_hours(day)
+    if hours is None or now.time() < hours[1]:
+        day = previous_trading_day(day)
+        hours = session_hours(day)
+    return datetime.combine(day, hours[1], tzinfo=MARKET_TZ)
+
+
+def has_new_data(since: Optional[datetime], now: Optional[datetime] = None) -> bool:
+    """
+    Whether prices can have changed after a fetch made at `since`: the
+    regular session is running, or one has closed since the fetch.
+    """
+    if since is None:
+        return True
+    now = _market_now(now)
+    return is_open(now) or _market_now(since) < last_close(now)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NYSE market session status")
+    parser.add_argument("--is-open", action="store_true",
+                        help="Print true/false for whether the market is open")
+    parser.add_argument("--extended", action="store_true",
+                        help="Count pre-market and after-hours as open")
+    parser.add_argument("--grace", type=int, default=0,
+                        help="Also count as open this many minutes after a session ends")
+    args = parser.parse_args()
+
+    now = _market_now(None)
+    open_now = is_open(now, args.extended) or \
+        (args.grace > 0 and is_open(now - timedelta(minutes=args.grace), args.extended))
+
+    if args.is_open:
+        print("true" if open_now else "false")
+        return
+
+    today = now.date()
+    print(f"Now (ET):    {now:%Y-%m-%d %H:%M}")
+    print(f"Session:     {session(now)}")
+    if holiday_name(today):
+        print(f"Holiday:     {holiday_name(today)}")
+    if today in nyse_early_closes(today.year):
+        print(f"Early close: {nyse_early_closes(today.year)[today]} ({EARLY_CLOSE:%H:%M} ET)")
+    print(f"Last close:  {last_close(now):%Y-%m-%d %H:%M}")
+    print(f"Next open:   {next_open(now):%Y-%m-%d %H:%M}")
+
+
+if __name__ == "__main__":
+    main()
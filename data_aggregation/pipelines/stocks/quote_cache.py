@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Shared Quote Cache
+
+Process-safe, SQLite-backed cache consulted by every stock quote fetcher
+(fetch_live_ticker, fetch_current_prices, FinnhubAPIHandler) before it
+calls an API, so overlapping jobs don't multiply API usage or latency.
+
+- Entries are keyed by source ("finnhub", "yahoo") and symbol.
+- While the market is open an entry is fresh for QUOTE_TTL seconds.
+  While it is closed, an entry fetched after the last close stays fresh
+  until the next session opens, since prices can't change in between.
+- Refreshes are single-flight: the first caller to find a stale entry
+  takes a per-key lock and fetches; concurrent callers (threads or other
+  processes) wait on the lock and then read the refreshed entry. A caller
+  waits at most LOCK_TIMEOUT for the lock, then fetches anyway, so a hung
+  refresh can't stall every other job.
+
+Usage:
+    cache = get_quote_cache()
+    data = cache.get_or_fetch("finnhub", "MCD", lambda: request_quote("MCD"))
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import QUOTE_CACHE_DB
+from data_aggregation.pipelines.stocks.market_calendar import has_new_data
+
+# Freshness of a quote while the market is open (seconds)
+QUOTE_TTL = float(os.environ.get('QUOTE_CACHE_TTL', '60'))
+
+# How long a caller waits for another process's refresh (seconds)
+LOCK_TIMEOUT = 30.0
+
+# How often a waiting caller retries another process's lock (seconds)
+LOCK_POLL_INTERVAL = 0.05
+
+
+class QuoteCache:
+    """TTL quote cache shared by threads and processes through one SQLite file."""
+
+    def __init__(self, path: Path = QUOTE_CACHE_DB, ttl: float = QUOTE_TTL,
+                 lock_timeout: float = LOCK_TIMEOUT):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.lock_dir = self.path.with_name(self.path.name + ".locks")
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.fetches = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quotes ("
+                " source TEXT NOT NULL,"
+                " symbol TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (source, symbol))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+
+    def is_fresh(self, fetched_at: float, now: Optional[float] = None) -> bool:
+        """Whether an entry fetched at a time is still valid."""
+        now = time.time() if now is None else now
+        if now - fetched_at < self.ttl:
+            return True
+        # Closed: valid if fetched after the session it reflects had ended
+        return not has_new_data(datetime.fromtimestamp(fetched_at, timezone.utc),
+                                datetime.fromtimestamp(now, timezone.utc))
+
+    def get(self, source: str, symbol: str) -> Optional[Any]:
+        """Fresh cached data for a symbol, or None."""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT data, fetched_at FROM quotes WHERE source = ? AND symbol = ?",
+                (source, symbol)
+            ).fetchone()
+        if row is None or not self.is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put(self, source: str, symbol: str, data: Any) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO quotes (source, symbol, data, fetched_at) VALUES (?, ?, ?, ?)",
+                (source, symbol, json.dumps(data), time.time())
+            )
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """
+        Exclusive per-key lock across threads and processes. Waits at most
+        lock_timeout for it; after that the caller proceeds without it.
+        """
+        with self._guard:
+            thread_lock = self._thread_locks.setdefault(key, threading.Lock())
+
+        deadline = time.monotonic() + self.lock_timeout
+        thread_locked = thread_lock.acquire(timeout=self.lock_timeout)
+        try:
+            if fcntl is None:
+                yield
+                return
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.lock_dir / f"{key}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            print(f"⚠️  Quote cache lock {key} still held after "
+                                  f"{self.lock_timeout:g}s; fetching anyway")
+                            break
+                        time.sleep(LOCK_POLL_INTERVAL)
+                yield
+            finally:
+                os.close(fd)  # Closing the descriptor releases the lock
+        finally:
+            if thread_locked:
+                thread_lock.release()
+
+    def get_or_fetch(self, source: str, symbol: str, fetch: Callable[[], Any]) -> Optional[Any]:
+        """
+        Cached data for a symbol, refreshing it (single-flight) if stale.
+
+        Args:
+            source: Cache namespace (e.g. "finnhub")
+            symbol: Ticker symbol
+            fetch: Called to refresh; None results are returned but not cached
+
+        Returns:
+            Cached or freshly fetched data
+        """
+        data = self.get(source, symbol)
+        if data is not None:
+            return data
+
+        with self._key_lock(f"{source}-{symbol}"):
+            # Another caller may have refreshed it while we waited
+            data = self.get(source, symbol)
+            if data is not None:
+                return data
+
+            data = fetch()
+            with self._guard:
+                self.fetches += 1
+            if data is not None:
+                self.put(source, symbol, data)
+            return data
+
+
+_shared_cache: Optional[QuoteCache] = None
+
+
+def get_quote_cache() -> QuoteCache:
+    """Process-wide cache on QUOTE_CACHE_DB."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = QuoteCache()
+    return _shared_cache
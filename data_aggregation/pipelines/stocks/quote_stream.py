@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Live Quote Streaming Daemon
+
+Long-running alternative to the cron-driven fetch_live_ticker.py sweep.
+Keeps a Finnhub trade websocket subscription open for TICKER_SYMBOLS and
+maintains an in-memory quote table:
+
+- the table is seeded from a REST sweep (previous close, open, day range)
+  at the start of each session, then updated from the trade stream
+- updates are coalesced into atomic live_ticker.json snapshots every
+  SNAPSHOT_INTERVAL seconds (only when something changed)
+- trades are also aggregated into 1m/5m intraday bars (intraday_bars.py);
+  each snapshot quote carries a 5-minute sparkline from those bars, and the
+  session's bars are flushed to the intraday store at the close
+- dropped connections are retried with exponential backoff and jitter;
+  the backoff resets once a connection has subscribed
+- outside market hours the daemon disconnects and sleeps until the next
+  session opens
+
+Requires the `websockets` package (pip install websockets).
+
+Usage:
+    export FINNHUB_API_KEY="your_key_here"
+    python3 -m data_aggregation.pipelines.stocks.quote_stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from data_aggregation.config.paths_config import INTRADAY_STORE_DIR, LIVE_TICKER_JSON
+from data_aggregation.pipelines.stocks.fetch_live_ticker import (
+    FINNHUB_API_KEY,
+    SYMBOL_MAP,
+    TICKER_SYMBOLS,
+    fetch_all_quotes_async,
+    save_quotes,
+)
+from data_aggregation.pipelines.stocks.intraday_bars import IntradayAggregator
+from data_aggregation.pipelines.stocks.market_calendar import is_open, next_open
+
+FINNHUB_WS_URL = os.environ.get('FINNHUB_WS_URL', "wss://ws.finnhub.io")
+
+# Write live_ticker.json at most this often
+SNAPSHOT_INTERVAL = 5.0
+
+# Reconnect backoff (seconds)
+BACKOFF_MIN = 1.0
+BACKOFF_MAX = 60.0
+
+# Check market hours at least this often while connected
+RECEIVE_TIMEOUT = 30.0
+
+# Sleep in chunks while closed, so clock changes and shutdowns are noticed
+IDLE_CHECK_INTERVAL = 300.0
+
+
+class QuoteTable:
+    """In-memory quotes keyed by symbol, updated from trades."""
+
+    def __init__(self, quotes=None, bars=None):
+        self.quotes = dict(quotes or {})
+        self.bars = bars if bars is not None else IntradayAggregator()
+        self.version = 0
+
+    def seed(self, quotes):
+        """Refresh quotes from a REST sweep (start of session)."""
+        self.quotes.update(quotes)
+        self.version += 1
+
+    def apply_trade(self, symbol, price, timestamp_ms=None, volume=0):
+        """Update a symbol's quote and bars from a trade; returns False if unknown."""
+        quote = self.quotes.get(symbol)
+        if quote is None or not price or price <= 0:
+            return False
+
+        self.bars.add_trade(symbol, price, volume, timestamp_ms / 1000 if timestamp_ms else None)
+
+        prev_close = quote.get('previousClose') or price
+        change = price - prev_close
+        change_percent = (change / prev_close * 100) if prev_close > 0 else 0
+
+        quote.update({
+            'price': round(price, 2),
+            'change': round(change, 2),
+            'changePercent': round(change_percent, 2),
+            'isPositive': change > 0,
+            'isNegative': change < 0,
+            'high': round(max(quote.get('high', price), price), 2),
+            'low': round(min(quote.get('low', price), price), 2),
+            'timestamp': int(timestamp_ms / 1000) if timestamp_ms else int(time.time()),
+            'source': 'finnhub'
+        })
+        self.version += 1
+        return True
+
+    def apply_message(self, message):
+        """Apply a Finnhub websocket message; returns the number of trades applied."""
+        if message.get('type') != 'trade':
+            return 0
+        symbols = {SYMBOL_MAP.get(s, s): s for s in self.quotes}
+        applied = 0
+        trades = message.get('data')
+        for trade in trades if isinstance(trades, list) else []:
+            if not isinstance(trade, dict):
+                continue
+            symbol = symbols.get(trade.get('s'))
+            if symbol and self.apply_trade(symbol, trade.get('p'), trade.get('t'), trade.get('v') or 0):
+                applied += 1
+        return applied
+
+    def snapshot(self):
+        """Quotes with each symbol's intraday sparkline attached."""
+        quotes = {}
+        for symbol, quote in self.quotes.items():
+            # Drop a sparkline carried over from an earlier session's snapshot
+            quote = {key: value for key, value in quote.items() if key != 'sparkline'}
+            sparkline = self.bars.sparkline(symbol)
+            if sparkline:
+                quote['sparkline'] = sparkline
+            quotes[symbol] = quote
+        return quotes
+
+
+def load_snapshot(output_path=None):
+    """Quotes from the last live_ticker.json, if any."""
+    path = Path(output_path or LIVE_TICKER_JSON)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('quotes', {})
+    except (OSError, ValueError):
+        return {}
+
+
+async def snapshot_writer(table, output_path=None, interval=SNAPSHOT_INTERVAL):
+    """Coalesce table updates into one atomic snapshot per interval."""
+    written = table.version
+    while True:
+        await asyncio.sleep(interval)
+        if table.version != written:
+            written = table.version
+            save_quotes(table.snapshot(), output_path, verbose=False)
+
+
+async def stream_session(table, symbols, url, market_open=is_open, subscribed=None):
+    """
+    Subscribe and apply trades until the market closes.
+
+    Sets the `subscribed` event (if given) once every subscription is sent.
+    Raises on connection errors so the caller can back off and reconnect.
+    """
+    import websockets
+
+    async with websockets.connect(url, ping_interval=20, ping_timeout=20) as ws:
+        for symbol in symbols:
+            await ws.send(json.dumps({'type': 'subscribe', 'symbol': SYMBOL_MAP.get(symbol, symbol)}))
+        print(f"🔌 Subscribed to {len(symbols)} symbols")
+        if subscribed is not None:
+            subscribed.set()
+
+        while market_open():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=RECEIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                continue
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(message, dict):  # Anything else would crash the session
+                table.apply_message(message)
+
+
+async def run_daemon(symbols=None, url=None, output_path=None,
+                     snapshot_interval=SNAPSHOT_INTERVAL, market_open=is_open,
+                     seed=True, stop=None, intraday_root=INTRADAY_STORE_DIR):
+    """
+    Stream quotes during market hours and idle outside them.
+
+    Args:
+        symbols: Symbols to subscribe to (defaults to TICKER_SYMBOLS)
+        url: Websocket URL including the token (defaults to Finnhub)
+        output_path: Snapshot file (defaults to LIVE_TICKER_JSON)
+        snapshot_interval: Seconds between coalesced snapshot writes
+        market_open: Callable returning whether to stream right now
+        seed: Seed each session's quotes with a REST sweep
+        stop: asyncio.Event that ends the daemon when set
+        intraday_root: Where session bars are flushed at the close
+    """
+    import websockets
+
+    symbols = list(symbols or TICKER_SYMBOLS)
+    url = url or f"{FINNHUB_WS_URL}?token={FINNHUB_API_KEY}"
+    stop = stop or asyncio.Event()
+    table = QuoteTable(load_snapshot(output_path))
+    writer = asyncio.create_task(snapshot_writer(table, output_path, snapshot_interval))
+    backoff = BACKOFF_MIN
+    session_seeded = False
+    idle = False
+
+    try:
+        while not stop.is_set():
+            if not market_open():
+                wake = next_open()
+                if session_seeded or not idle:
+                    save_quotes(table.snapshot(), output_path, verbose=False)
+                    flushed = table.bars.flush(intraday_root)
+                    if flushed:
+                        print(f"💾 Flushed {flushed} intraday bar files")
+                    print(f"⏸️  Market closed - idle until {wake.isoformat()}")
+                session_seeded = False
+                idle = True
+                wait = max(0.0, (wake - datetime.now(timezone.utc)).total_seconds())
+                await _sleep_or_stop(stop, min(wait, IDLE_CHECK_INTERVAL) or 1.0)
+                continue
+
+            idle = False
+            if not session_seeded:
+                table.bars.reset()  # New session: yesterday's bars are already flushed
+                if seed:
+                    table.seed(await fetch_all_quotes_async(symbols, output_path=output_path))
+            session_seeded = True
+
+            subscribed = asyncio.Event()
+            session = asyncio.create_task(stream_session(table, symbols, url, market_open, subscribed))
+            stopper = asyncio.create_task(stop.wait())
+            try:
+                done, _ = await asyncio.wait({session, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                stopper.cancel()
+            if session not in done:
+                session.cancel()
+                break
+
+            try:
+                session.result()
+                backoff = BACKOFF_MIN  # Clean exit: the market closed
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                if subscribed.is_set():
+                    backoff = BACKOFF_MIN  # The connection worked; only failed connects back off
+                delay = backoff * (1 + random.random() * 0.25)
+                print(f"⚠️  Stream disconnected ({e}); reconnecting in {delay:.1f}s")
+                await _sleep_or_stop(stop, delay)
+                backoff = min(backoff * 2, BACKOFF_MAX)
+    finally:
+        writer.cancel()
+        save_quotes(table.snapshot(), output_path, verbose=False)
+        table.bars.flush(intraday_root)
+
+
+async def _sleep_or_stop(stop, seconds):
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream live quotes into live_ticker.json")
+    parser.add_argument("--interval", type=float, default=SNAPSHOT_INTERVAL,
+                        help="Seconds between snapshot writes")
+    args = parser.parse_args()
+
+    if not FINNHUB_API_KEY:
+        print("❌ Error: FINNHUB_API_KEY environment variable not set")
+        sys.exit(1)
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        print("❌ Error: the websockets package is required (pip install websockets)")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("📡 FINNHUB LIVE QUOTE STREAM")
+    print("=" * 60)
+
+    try:
+        asyncio.run(run_daemon(snapshot_interval=args.interval))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+
+if __name__ == '__main__':
+    main()
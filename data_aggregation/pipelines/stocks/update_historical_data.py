@@ -3,7 +3,8 @@
 Update Franchise Stock Historical Data
 
 Fetches latest stock data for franchise companies and market indices.
-Updates the CSV file with new data while preserving historical records.
+Appends new rows to the partitioned historical store (historical_store.py)
+while preserving historical records.
 
 This is the MASTER SOURCE for the FRANCHISE_STOCKS ticker list.
 All other stock scripts must synchronize their ticker lists with this file.
@@ -11,7 +12,8 @@ All other stock scripts must synchronize their ticker lists with this file.
 
 import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 import sys
 from pathlib import Path
 
@@ -19,6 +21,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from data_aggregation.config.paths_config import HISTORICAL_STOCKS_CSV
+from data_aggregation.pipelines.stocks.compute_analytics import update_analytics
+from data_aggregation.pipelines.stocks.compute_indicators import update_indicators
+from data_aggregation.pipelines.stocks.export_chart_shards import export_chart_shards
+from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+from data_aggregation.pipelines.stocks.market_calendar import last_close, previous_trading_day, trading_days
 
 # ============================================================================
 # MASTER TICKER LIST - SINGLE SOURCE OF TRUTH
@@ -57,6 +64,42 @@ FRANCHISE_STOCKS = [
 ]
 
 
+# Batched downloads: tickers needing the same date range share one request
+BATCH_SIZE = 50
+MAX_DOWNLOAD_WORKERS = 4
+
+# History fetched for tickers with no stored data
+INITIAL_HISTORY_DAYS = 365 * 10
+
+
+def _normalize_history(df, symbol):
+    """Convert a yfinance OHLCV frame for one symbol to our row format."""
+    df = df.dropna(subset=['Close']).reset_index()
+
+    # Rename columns to match our CSV format
+    df = df.rename(columns={
+        df.columns[0]: 'date',
+        'Open': 'open',
+        'High': 'high',
+        'Low': 'low',
+        'Close': 'close',
+        'Volume': 'volume'
+    })
+
+    # Add adjusted close (yfinance already adjusts Close for splits/dividends)
+    df['adjClose'] = df['close']
+
+    # Add symbol column
+    df['symbol'] = symbol
+
+    # Select only the columns we need
+    df = df[['date', 'symbol', 'open', 'high', 'low', 'close', 'adjClose', 'volume']]
+
+    # Convert date to string format
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    return df
+
+
 def fetch_stock_data(symbol, start_date, end_date):
     """Fetch historical stock data for a symbol."""
     try:
@@ -67,83 +110,158 @@ def fetch_stock_data(symbol, start_date, end_date):
             print(f"Warning: No data returned for {symbol}")
             return None
 
-        # Reset index to make Date a column
-        df = df.reset_index()
-
-        # Rename columns to match our CSV format
-        df = df.rename(columns={
-            'Date': 'date',
-            'Open': 'open',
-            'High': 'high',
-            'Low': 'low',
-            'Close': 'close',
-            'Volume': 'volume'
-        })
-
-        # Add adjusted close (yfinance already adjusts Close for splits/dividends)
-        df['adjClose'] = df['close']
+        df = _normalize_history(df, symbol)
+        print(f"✓ Fetched {len(df)} records for {symbol}")
+        return df
 
-        # Add symbol column
-        df['symbol'] = symbol
+    except Exception as e:
+        print(f"✗ Error fetching data for {symbol}: {e}")
+        return None
 
-        # Select only the columns we need
-        df = df[['date', 'symbol', 'open', 'high', 'low', 'close', 'adjClose', 'volume']]
 
-        # Convert date to string format
-        df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+def fetch_batch(symbols, start_date, end_date):
+    """
+    Fetch historical data for several symbols in one request.
 
-        print(f"✓ Fetched {len(df)} records for {symbol}")
-        return df
+    Args:
+        symbols: Tickers sharing the date range
+        start_date: First date to fetch
+        end_date: Last date to fetch (inclusive)
 
+    Returns:
+        Dict mapping symbol to its rows (symbols without data are omitted),
+        or None if the request itself failed
+    """
+    try:
+        data = yf.download(
+            symbols,
+            start=start_date,
+            end=end_date + timedelta(days=1),  # yfinance's end is exclusive
+            group_by='ticker',
+            auto_adjust=True,  # Same adjusted prices as Ticker.history()
+            threads=False,
+            progress=False,
+        )
     except Exception as e:
-        print(f"✗ Error fetching data for {symbol}: {e}")
+        print(f"✗ Error fetching batch {start_date} to {end_date}: {e}")
         return None
 
+    results = {}
+    if data is None or data.empty:
+        return results
+
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        else:
+            frame = data  # Single-ticker downloads may come back flat
+        if 'Close' not in frame or frame['Close'].dropna().empty:
+            continue
+        results[symbol] = _normalize_history(frame, symbol)
+
+    return results
+
+
+def missing_ranges(store, symbols, today=None):
+    """
+    Per-ticker date ranges still to fetch, grouped by range.
+
+    Each ticker is complete through its own last stored (or checked) date;
+    anything from the next trading day through the last completed session
+    is missing. Tickers with no history get INITIAL_HISTORY_DAYS.
+
+    Args:
+        store: HistoricalStore to check
+        symbols: Tickers to check
+        today: Reference date (sessions before it count as complete);
+            defaults to now, including today's session once it has closed
+
+    Returns:
+        Dict mapping (start_date, end_date) to the tickers missing that range
+    """
+    through = previous_trading_day(today) if today else last_close().date()
+    today = today or date.today()
+    groups = {}
+
+    for symbol in symbols:
+        covered = store.covered_through(symbol)
+        if covered is None:
+            start = today - timedelta(days=INITIAL_HISTORY_DAYS)
+        else:
+            start = covered + timedelta(days=1)
+
+        pending = trading_days(start, through)
+        if pending:
+            groups.setdefault((pending[0], pending[-1]), []).append(symbol)
+
+    return groups
+
 
 def main():
     print("=" * 70)
     print("Updating Franchise Stock Historical Data")
     print("=" * 70)
 
-    # Determine date range
-    # If CSV exists, fetch data from last date + 1 day
-    # Otherwise, fetch last 10 years of data
-
-    if HISTORICAL_STOCKS_CSV.exists():
-        print(f"\nExisting CSV found: {HISTORICAL_STOCKS_CSV}")
-        existing_df = pd.read_csv(HISTORICAL_STOCKS_CSV)
+    store = HistoricalStore()
 
-        # Get the latest date in the CSV
-        latest_date = pd.to_datetime(existing_df['date']).max()
-        start_date = latest_date + timedelta(days=1)
-        end_date = datetime.now()
+    # Migrate the legacy flat CSV into the partitioned store on first run
+    if store.is_empty() and HISTORICAL_STOCKS_CSV.exists():
+        print(f"\nMigrating existing CSV into partitioned store: {HISTORICAL_STOCKS_CSV}")
+        migrated = store.import_csv(HISTORICAL_STOCKS_CSV)
+        print(f"✓ Imported {migrated} records into {store.root}")
 
-        print(f"Fetching new data from {start_date.date()} to {end_date.date()}")
+    # Work out which trading days each ticker is missing
+    groups = missing_ranges(store, FRANCHISE_STOCKS)
 
-        # Check if we need to update
-        if start_date.date() >= end_date.date():
-            print("\n✓ CSV is already up to date!")
-            sys.exit(0)
-    else:
-        print(f"\nNo existing CSV found. Creating new file: {HISTORICAL_STOCKS_CSV}")
-        existing_df = None
+    if not groups:
+        print("\n✓ Store is already up to date!")
+        sys.exit(0)
 
-        # Fetch last 10 years of data
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365 * 10)
+    batches = []
+    for (start_date, end_date), symbols in sorted(groups.items()):
+        print(f"  {start_date} to {end_date}: {len(symbols)} tickers")
+        for i in range(0, len(symbols), BATCH_SIZE):
+            batches.append((symbols[i:i + BATCH_SIZE], start_date, end_date))
 
-        print(f"Fetching 10 years of historical data from {start_date.date()} to {end_date.date()}")
-
-    # Fetch data for all symbols
+    # Fetch all batches concurrently
     all_data = []
+    unanswered = []
 
-    print(f"\nFetching data for {len(FRANCHISE_STOCKS)} stocks...")
+    print(f"\nFetching data for {sum(len(b[0]) for b in batches)} stocks in {len(batches)} requests...")
     print("-" * 70)
 
-    for symbol in FRANCHISE_STOCKS:
-        df = fetch_stock_data(symbol, start_date, end_date)
-        if df is not None and not df.empty:
-            all_data.append(df)
+    with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(batches))) as pool:
+        futures = {pool.submit(fetch_batch, *batch): batch for batch in batches}
+        for future in as_completed(futures):
+            symbols, start_date, end_date = futures[future]
+            results = future.result()
+            # A failed request, or a multi-ticker batch with nothing at all
+            # in it, says nothing about the individual tickers
+            if results is None or (not results and len(symbols) > 1):
+                continue
+
+            for symbol in symbols:
+                if symbol in results:
+                    all_data.append(results[symbol])
+                    print(f"✓ Fetched {len(results[symbol])} records for {symbol}")
+                else:
+                    unanswered.append((symbol, start_date, end_date))
+
+    # yfinance reports a single ticker's failure inside a batch as empty or
+    # NaN, so ask again for that ticker alone; only a second empty answer
+    # marks the range as checked
+    for symbol, start_date, end_date in unanswered:
+        retry = fetch_batch([symbol], start_date, end_date)
+        if retry is None:
+            continue
+        if symbol in retry:
+            all_data.append(retry[symbol])
+            print(f"✓ Fetched {len(retry[symbol])} records for {symbol} (retry)")
+        else:
+            store.mark_checked(symbol, end_date)
+            print(f"Warning: No data returned for {symbol}")
 
     print("-" * 70)
 
@@ -151,31 +269,27 @@ def main():
         print("\n✗ No new data fetched. Exiting.")
         sys.exit(1)
 
-    # Combine all new data
+    # Append only the new rows; existing partitions are left untouched
     new_df = pd.concat(all_data, ignore_index=True)
+    written = store.append(new_df)
+    compacted = store.compact()
 
-    # Merge with existing data if it exists
-    if existing_df is not None:
-        combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-
-        # Remove duplicates (keep latest)
-        combined_df = combined_df.drop_duplicates(subset=['date', 'symbol'], keep='last')
-
-        # Sort by date and symbol
-        combined_df = combined_df.sort_values(['date', 'symbol'])
-    else:
-        combined_df = new_df.sort_values(['date', 'symbol'])
+    # Extend the evaluation page's trend indicators with the new days
+    indicators_updated, _ = update_indicators(store)
 
-    # Ensure output directory exists
-    HISTORICAL_STOCKS_CSV.parent.mkdir(parents=True, exist_ok=True)
+    # Re-export the downsampled chart series
+    shards_written = export_chart_shards(store)
 
-    # Save to CSV
-    combined_df.to_csv(HISTORICAL_STOCKS_CSV, index=False)
+    # Extend correlations, betas and the franchise composite index
+    analytics_days = update_analytics(store, symbols=FRANCHISE_STOCKS)
 
-    print(f"\n✓ Successfully updated {HISTORICAL_STOCKS_CSV}")
-    print(f"Total records: {len(combined_df)}")
-    print(f"Date range: {combined_df['date'].min()} to {combined_df['date'].max()}")
-    print(f"Stocks: {combined_df['symbol'].nunique()}")
+    print(f"\n✓ Successfully updated {store.root}")
+    print(f"New records: {written} ({compacted} partitions compacted)")
+    print(f"Date range: {new_df['date'].min()} to {new_df['date'].max()}")
+    print(f"Stocks: {len(store.symbols())}")
+    print(f"Indicator files updated: {indicators_updated}")
+    print(f"Chart shards written: {shards_written}")
+    print(f"Analytics days added: {analytics_days}")
     print("=" * 70)
 
 
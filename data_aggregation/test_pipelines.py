@@ -8,6 +8,15 @@ Validates:
 - Configuration files
 - Common utilities
 - Directory structure
+- Census warehouse builds (against a local stand-in Census API)
+- Enrichment stage provenance
+- State source cache (against a local stand-in FBI API)
+- Historical stock store coverage
+- Incremental indicator and analytics updates (against a full recompute)
+- Chart shard downsampling (LTTB against a reference implementation)
+- Stock frame validation (trailing z-scores against pandas rolling stats)
+- Live ticker fetching and streaming (against a local mock Finnhub)
+- Sports fetching limits and deadlines (against a local mock ESPN)
 """
 
 import sys
@@ -285,6 +294,1317 @@ def test_data_quality():
     return tests_passed
 
 
+def _franchise_scripts():
+    """Make the FranchiseMap enrichment scripts importable."""
+    scripts_dir = str(repo_root / "FranchiseMap" / "scripts")
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+
+def _write_polygon_shapefile(shp_path, field, features):
+    """Write a minimal polygon shapefile + dBASE table of (label, ring) features."""
+    import struct
+
+    records = []
+    for number, (_, ring) in enumerate(features, start=1):
+        lngs, lats = [p[0] for p in ring], [p[1] for p in ring]
+        content = struct.pack("<i4d2i", 5, min(lngs), min(lats), max(lngs), max(lats), 1, len(ring))
+        content += struct.pack("<i", 0) + b"".join(struct.pack("<2d", *p) for p in ring)
+        records.append(struct.pack(">2i", number, len(content) // 2) + content)
+    with open(shp_path, "wb") as f:
+        f.write(bytes(100) + b"".join(records))
+
+    width = max(len(label) for label, _ in features)
+    header = struct.pack("<4xIHH20x", len(features), 32 + 32 + 1, 1 + width)
+    descriptor = field.encode().ljust(11, b"\x00") + b"C" + bytes(4) + bytes([width]) + bytes(15)
+    rows = b"".join(b" " + label.encode().ljust(width) for label, _ in features)
+    with open(str(shp_path)[:-4] + ".dbf", "wb") as f:
+        f.write(header + descriptor + b"\x0d" + rows)
+
+
+def _start_mock_census(states, tracts):
+    """
+    Serve Census ACS responses from a local HTTP server.
+
+    `states` maps state FIPS -> variable values; `tracts` maps a tract
+    GEOID -> variable values. States without tracts answer 204.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            variables = query["get"][0].split(",")
+            geography = query["for"][0]
+            if geography == "state:*":
+                header = variables + ["state"]
+                rows = [[values.get(v, "") for v in variables] + [fips]
+                        for fips, values in sorted(states.items())]
+            else:
+                state = query["in"][0].split(":")[1]
+                header = variables + ["state", "county", "tract"]
+                rows = [[values.get(v, "") for v in variables] + [g[:2], g[2:5], g[5:]]
+                        for g, values in sorted(tracts.items()) if g[:2] == state]
+            if not rows:
+                self.send_response(204)
+                self.end_headers()
+                return
+            body = json.dumps([header] + rows).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_census_warehouse():
+    """Test building the ACS warehouse from a stand-in Census API."""
+    print("\n" + "="*70)
+    print("TESTING CENSUS WAREHOUSE")
+    print("="*70)
+
+    import tempfile
+
+    _franchise_scripts()
+    from boundary_index import open_boundary_index
+    from census_warehouse import download_acs, open_warehouse, write_table
+    from integrate_census_api import census_data_from_warehouse
+
+    tests_passed = True
+    variables = ["B19013_001E", "B01003_001E"]
+    server = _start_mock_census(
+        states={"06": {"B19013_001E": "84097", "B01003_001E": "39356104"},
+                "36": {"B19013_001E": "75157", "B01003_001E": "19994379"}},
+        tracts={"06037000100": {"B19013_001E": "120500", "B01003_001E": "4200"},
+                "06037000200": {"B19013_001E": "-666666666", "B01003_001E": "3100"}},
+    )
+    api_base = f"http://127.0.0.1:{server.server_address[1]}/data/2021/acs/acs5"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        warehouse_dir = str(tmp / "warehouse")
+        for geography in ("state", "tract"):
+            geoids, columns = download_acs(geography, variables, api_base=api_base,
+                                           api_key="", states=["06", "36"], verbose=False)
+            write_table(geography, geoids, columns, warehouse_dir, api_base)
+        server.shutdown()
+
+        # Two adjacent tracts in Los Angeles County
+        (tmp / "tiger").mkdir()
+        _write_polygon_shapefile(tmp / "tiger" / "tl_2021_06_tract.shp", "GEOID", [
+            ("06037000100", [(-118.30, 34.00), (-118.30, 34.10), (-118.20, 34.10),
+                             (-118.20, 34.00), (-118.30, 34.00)]),
+            ("06037000200", [(-118.20, 34.00), (-118.20, 34.10), (-118.10, 34.10),
+                             (-118.10, 34.00), (-118.20, 34.00)]),
+        ])
+        index_dir = str(tmp / "boundary_index")
+        open_boundary_index("tract", str(tmp / "tiger"), index_dir)
+
+        rows = census_data_from_warehouse(
+            [34.05, 34.05, 40.71, 34.05],
+            [-118.25, -118.15, -74.00, -117.50],
+            ["CA", "CA", "NY", None],
+            warehouse_dir, index_dir
+        )
+        tract_table = open_warehouse("tract", warehouse_dir)
+
+    checks = [
+        ("bulk download stores every tract", None if tract_table is None else len(tract_table), 2),
+        ("location joins its tract row", rows[0] and (rows[0].get("tract"), rows[0].get("median_income")),
+         ("06037000100", 120500.0)),
+        ("suppressed estimates are dropped", rows[1] and "median_income" in rows[1], False),
+        ("no tract falls back to the state row", rows[2] and rows[2].get("median_income"), 75157.0),
+        ("no tract or state gives None", rows[3], None),
+    ]
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_transit_provenance():
+    """Test that GTFS transit scores survive accessibility recomputes."""
+    print("\n" + "="*70)
+    print("TESTING TRANSIT PROVENANCE")
+    print("="*70)
+
+    import tempfile
+
+    _franchise_scripts()
+    from aggregate_accessibility_data import accessibility_tracker, apply_accessibility_scores
+    from aggregate_gtfs_data import enrich_locations_from_store, transit_tracker
+    from gtfs_stop_store import open_stop_store
+
+    tests_passed = True
+
+    def run(tracker, enrich, locations):
+        stale = tracker.pending(locations)
+        if stale:
+            enrich(stale)
+        for location in stale:
+            tracker.mark(location)
+        return len(stale)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = Path(tmp) / "feeds" / "septa"
+        feed.mkdir(parents=True)
+        (feed / "stops.txt").write_text(
+            "stop_id,stop_name,stop_lat,stop_lon\n1,Suburban Station,39.9541,-75.1677\n"
+        )
+        store = open_stop_store(str(feed.parent), str(Path(tmp) / "store"), verbose=False)
+
+        def transit(stale):
+            enrich_locations_from_store(stale, store)
+
+        locations = [{"id": "loc-1", "lat": 39.9526, "lng": -75.1652, "at": {}}]
+        run(accessibility_tracker(), apply_accessibility_scores, locations)
+        estimate = locations[0]["at"]["transitScore"]
+        run(transit_tracker(store), transit, locations)
+        gtfs_score = locations[0]["at"]["transitScore"]
+
+        # A monthly Walk Score refresh recomputes accessibility
+        run(accessibility_tracker(force=True), apply_accessibility_scores, locations)
+        overwritten = locations[0]["at"]["transitScore"]
+        rerun = run(transit_tracker(store), transit, locations)
+        restored = locations[0]["at"]["transitScore"]
+        unchanged = run(transit_tracker(store), transit, locations)
+
+    checks = [
+        ("GTFS score differs from the estimate", gtfs_score != estimate, True),
+        ("accessibility overwrites transitScore", overwritten, estimate),
+        ("transit recomputes the overwritten location", rerun, 1),
+        ("GTFS score survives", restored, gtfs_score),
+        ("transit skips it once restored", unchanged, 0),
+    ]
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def _start_mock_fbi(estimates):
+    """
+    Serve FBI UCR /api/estimates/states/<state>/<from>/<to> responses from a
+    local HTTP server; states missing from `estimates` answer 500. The
+    server counts requests in `server.hits`.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server.hits += 1
+            parts = urlparse(self.path).path.strip("/").split("/")
+            state = parts[3] if len(parts) == 6 and parts[:3] == ["api", "estimates", "states"] else None
+            if state not in estimates:
+                self.send_response(500)
+                self.end_headers()
+                return
+            body = json.dumps({
+                "results": estimates[state],
+                "pagination": {"count": len(estimates[state]), "page": 0, "pages": 1, "per_page": 0},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_state_source_cache():
+    """Test the persisted state source cache against a stand-in FBI API."""
+    print("\n" + "="*70)
+    print("TESTING STATE SOURCE CACHE")
+    print("="*70)
+
+    import tempfile
+
+    _franchise_scripts()
+    from aggregate_crime_data import crimes_per_100k, fetch_fbi_state_crime_data
+    from state_source_cache import DAY, StateSourceCache
+
+    tests_passed = True
+
+    def estimate(year, population, violent, prop):
+        return {"state_abbr": "CA", "year": year, "population": population,
+                "violent_crime": violent, "property_crime": prop,
+                "homicide": 2000, "robbery": 50000, "burglary": 150000}
+
+    # Fixture in the shape of the FBI estimates endpoint (one row per year)
+    fixture = {
+        "CA": [estimate(2021, 39142991, 192598, 847932), estimate(2022, 39029342, 194935, 921114)],
+        "VT": [{"state_abbr": "VT", "year": 2022, "population": 647064,
+                "violent_crime": 1432, "property_crime": 8867}],
+    }
+    server = _start_mock_fbi(fixture)
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def fetch(state):
+        return fetch_fbi_state_crime_data(state, api_base)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StateSourceCache("fbi_crime", fetch, ttl=30 * DAY, cache_dir=tmp)
+        prefetched = cache.prefetch(["CA", "ZZ"])
+        vt = cache.get("VT")  # Not prefetched: fetched on demand
+
+        reloaded = StateSourceCache("fbi_crime", fetch, ttl=30 * DAY, cache_dir=tmp)
+        hits = server.hits
+        refetched = reloaded.prefetch(["CA", "VT", "ZZ"])
+        ca = reloaded.get("CA")
+        failed = reloaded.get("ZZ")
+        hits_after = server.hits
+        expired = StateSourceCache("fbi_crime", fetch, ttl=0, cache_dir=tmp).prefetch(["CA"])
+    server.shutdown()
+
+    checks = [
+        ("prefetch fetches missing states", prefetched, 2),
+        ("latest year's rate is parsed", ca and round(crimes_per_100k(ca), 1),
+         round((194935 + 921114) / 39029342 * 100000, 1)),
+        ("on-demand fetch is saved without an explicit save()", vt is not None and refetched, 0),
+        ("cached states are not requested again", hits_after - hits, 0),
+        ("failed fetch is remembered as missing", failed, None),
+        ("expired entries are refetched", expired, 1),
+        ("rows without a population are ignored", crimes_per_100k({"results": [{"year": 2022}]}), None),
+    ]
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def _start_mock_finnhub(slow_symbols=(), delay=0.0):
+    """Serve Finnhub-style /quote responses from a local HTTP server."""
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            symbol = parse_qs(urlparse(self.path).query).get("symbol", [""])[0]
+            if symbol in slow_symbols:
+                time.sleep(delay)
+            body = json.dumps({"c": 101.5, "pc": 100.0, "h": 102.0, "l": 99.0,
+                               "o": 100.5, "t": 1700000000}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_historical_store():
+    """Test date coverage bookkeeping in the partitioned historical store."""
+    print("\n" + "="*70)
+    print("TESTING HISTORICAL STORE")
+    print("="*70)
+
+    import tempfile
+    from datetime import date
+    import pandas as pd
+    from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+    tests_passed = True
+
+    rows = pd.DataFrame({
+        "date": ["2024-06-03", "2024-06-04"], "symbol": ["MCD", "MCD"],
+        "open": [250.0, 251.0], "high": [252.0, 253.0], "low": [249.0, 250.0],
+        "close": [251.0, 252.0], "adjClose": [251.0, 252.0], "volume": [1000, 1200],
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoricalStore(tmp)
+        store.append(rows)
+        store.mark_checked("MCD", date(2024, 6, 5))
+        store.mark_checked("MCD", date(2024, 6, 1))  # Earlier dates never move coverage back
+        store.mark_checked("GNC", date(2024, 6, 5))  # No rows at all (dead ticker)
+
+        reloaded = HistoricalStore(tmp)
+        checks = [
+            ("checked date extends coverage", reloaded.covered_through("MCD"), date(2024, 6, 5)),
+            ("last stored row is unchanged", reloaded.last_date("MCD"), date(2024, 6, 4)),
+            ("tickers without rows are tracked", reloaded.covered_through("GNC"), date(2024, 6, 5)),
+            ("checked-only tickers have no rows", reloaded.last_date("GNC"), None),
+            ("checked-only tickers are not listed", reloaded.symbols(), ["MCD"]),
+            ("latest date ignores checked-only tickers", reloaded.latest_date(), date(2024, 6, 4)),
+            ("unknown tickers have no coverage", reloaded.covered_through("SPY"), None),
+        ]
+
+        reloaded.append(rows.assign(symbol="GNC"))
+        checks.append(("rows can follow a checked-only entry", reloaded.load(["GNC"])["date"].tolist(),
+                       ["2024-06-03", "2024-06-04"]))
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_incremental_indicators():
+    """Test that incremental indicator updates match a full recompute."""
+    print("\n" + "="*70)
+    print("TESTING INCREMENTAL INDICATORS")
+    print("="*70)
+
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from data_aggregation.pipelines.stocks.compute_indicators import load_indicators, update_indicators
+    from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+    tests_passed = True
+
+    # 300 sessions of a random walk (cent prices, so rounding is lossless)
+    dates = pd.bdate_range("2023-06-01", periods=300).strftime("%Y-%m-%d")
+    closes = np.round(100 + np.cumsum(np.random.default_rng(7).normal(0, 1, len(dates))), 2)
+    rows = pd.DataFrame({"date": dates, "symbol": "MCD", "open": closes, "high": closes,
+                         "low": closes, "close": closes, "adjClose": closes, "volume": 1000})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoricalStore(f"{tmp}/store")
+        incremental_dir = f"{tmp}/incremental"
+        store.append(rows.iloc[:280])
+        update_indicators(store, output_dir=incremental_dir)
+        for i in range(280, 300, 5):  # A few days at a time, like the daily job
+            store.append(rows.iloc[i:i + 5])
+            update_indicators(store, output_dir=incremental_dir)
+        incremental = load_indicators("MCD", incremental_dir)
+
+        update_indicators(store, full=True, output_dir=f"{tmp}/full")
+        full = load_indicators("MCD", f"{tmp}/full")
+
+    checks = [
+        ("window is filled", len(incremental["dates"]), 260),
+        ("no SMA gaps after incremental updates", incremental["sma20"].count(None), 0),
+    ]
+    for key in ("dates", "close", "sma20", "ema12", "metrics", "forecast", "state"):
+        checks.append((f"{key} matches --full", incremental[key] == full[key], True))
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_incremental_analytics():
+    """Test that incremental analytics updates match a full recompute."""
+    print("\n" + "="*70)
+    print("TESTING INCREMENTAL ANALYTICS")
+    print("="*70)
+
+    import json
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from data_aggregation.pipelines.stocks.compute_analytics import (
+        BETAS_FILE,
+        COMPOSITE_FILE,
+        CORRELATION_FILE,
+        update_analytics,
+    )
+    from data_aggregation.pipelines.stocks.historical_store import HistoricalStore
+
+    tests_passed = True
+
+    # 320 sessions for five tickers: WING lists on day 60 and JACK misses
+    # a few days, so carried-forward closes and pairwise windows are exercised
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range("2023-01-02", periods=320).strftime("%Y-%m-%d")
+    frames = []
+    for symbol in ("SPY", "MCD", "WEN", "JACK", "WING"):
+        closes = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), 2)
+        frame = pd.DataFrame({"date": dates, "symbol": symbol, "open": closes, "high": closes,
+                              "low": closes, "close": closes, "adjClose": closes, "volume": 1000})
+        if symbol == "WING":
+            frame = frame.iloc[60:]
+        if symbol == "JACK":
+            frame = frame.drop(index=[100, 101, 250, 301])
+        frames.append(frame)
+    rows = pd.concat(frames, ignore_index=True)
+    shares = {"MCD": 7e8, "WEN": 2e8, "JACK": 2e7, "WING": 3e7}
+
+    def outputs(output_dir):
+        loaded = {}
+        for name in (COMPOSITE_FILE, CORRELATION_FILE, BETAS_FILE):
+            with open(f"{output_dir}/{name}") as f:
+                loaded[name] = json.load(f)
+        return loaded
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoricalStore(f"{tmp}/store")
+        boundaries = [200, 240, 241, 290, 320]  # Daily runs, catch-ups and a single day
+        processed = []
+        start = 0
+        for end in boundaries:
+            store.append(rows[rows["date"].isin(dates[start:end])])
+            processed.append(update_analytics(store, output_dir=f"{tmp}/incremental", shares=shares))
+            start = end
+        incremental = outputs(f"{tmp}/incremental")
+
+        update_analytics(store, full=True, output_dir=f"{tmp}/full", shares=shares)
+        full = outputs(f"{tmp}/full")
+
+    checks = [
+        ("each run processes only its new days", processed, [200, 40, 1, 49, 30]),
+        ("cap index is populated", incremental[COMPOSITE_FILE]["cap"][-1] is not None, True),
+    ]
+    for name in (COMPOSITE_FILE, CORRELATION_FILE, BETAS_FILE):
+        checks.append((f"{name} matches --full", incremental[name] == full[name], True))
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_chart_shards():
+    """Test LTTB downsampling and chart shard resolutions."""
+    print("\n" + "="*70)
+    print("TESTING CHART SHARDS")
+    print("="*70)
+
+    import math
+    import numpy as np
+    import pandas as pd
+    from data_aggregation.pipelines.stocks.export_chart_shards import RESOLUTIONS, build_shards, lttb_indices
+
+    tests_passed = True
+
+    def reference_lttb(x, y, threshold):
+        """Straightforward Largest-Triangle-Three-Buckets (Steinarsson 2013)."""
+        n = len(x)
+        every = (n - 2) / (threshold - 2)
+        kept = [0]
+        a = 0
+        for i in range(threshold - 2):
+            avg_start = math.floor((i + 1) * every) + 1
+            avg_end = min(math.floor((i + 2) * every) + 1, n)
+            avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+            avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+            best, best_area = None, -1.0
+            for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+                area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+                if area > best_area:
+                    best, best_area = j, area
+            kept.append(best)
+            a = best
+        kept.append(n - 1)
+        return kept
+
+    rng = np.random.default_rng(11)
+    x = np.arange(1000, dtype='float64')
+    y = np.cumsum(rng.normal(0, 1, len(x)))
+    y[437] += 80  # A spike a chart must not lose
+    kept = lttb_indices(x, y, 100)
+
+    # Three years of one ticker's daily rows, ending on a Wednesday
+    dates = pd.bdate_range(end="2024-06-12", periods=800)
+    closes = np.round(100 + np.cumsum(rng.normal(0, 1, len(dates))), 2)
+    rows = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "symbol": "MCD", "open": closes,
+                         "high": closes + 1, "low": closes - 1, "close": closes,
+                         "adjClose": closes, "volume": 100})
+    shards = build_shards(rows)
+    weekly = shards[("MCD", "5y")]
+    monthly = shards[("MCD", "10y")]
+    may = rows[rows["date"].str.startswith("2024-05")]
+
+    checks = [
+        ("LTTB matches the reference algorithm", kept.tolist(), reference_lttb(x.tolist(), y.tolist(), 100)),
+        ("LTTB keeps the spike", 437 in kept, True),
+        ("short series are kept whole", len(lttb_indices(x[:50], y[:50], 100)), 50),
+        ("1m keeps the last 31 sessions", shards[("MCD", "1m")]["date"].tolist(), rows["date"].tolist()[-31:]),
+        ("1y is capped at its point budget", len(shards[("MCD", "1y")]), RESOLUTIONS["1y"]["maxPoints"]),
+        ("max is capped at its point budget", len(shards[("MCD", "max")]), RESOLUTIONS["max"]["maxPoints"]),
+        ("max keeps the first and last day", (shards[("MCD", "max")]["date"].iloc[[0, -1]].tolist()),
+         [rows["date"].iloc[0], rows["date"].iloc[-1]]),
+        ("weekly bars end on the last session", weekly["date"].iloc[-1], "2024-06-12"),
+        ("weekly bars are dated by their last session",
+         set(pd.to_datetime(weekly["date"].iloc[:-1]).dt.dayofweek), {4}),
+        ("monthly bar aggregates the month", monthly[monthly["date"] == may["date"].iloc[-1]][
+            ["open", "high", "low", "close", "volume"]].iloc[0].tolist(),
+         [may["open"].iloc[0], may["high"].max(), may["low"].min(), may["close"].iloc[-1], 100 * len(may)]),
+    ]
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_stock_frame_validation():
+    """Test vectorized OHLCV validation and its trailing z-scores."""
+    print("\n" + "="*70)
+    print("TESTING STOCK FRAME VALIDATION")
+    print("="*70)
+
+    from datetime import date, timedelta
+    import numpy as np
+    import pandas as pd
+    from data_aggregation.pipelines.stocks.market_calendar import trading_days
+    from data_ingestion.utils.validators import _trailing_zscore, validate_stock_frame
+
+    tests_passed = True
+    rng = np.random.default_rng(3)
+
+    # Trailing z-scores against pandas rolling stats over the previous rows
+    window = 20
+    codes = np.repeat([0, 1], 150)
+    values = rng.normal(0, 1, len(codes))
+    values[[7, 160, 161]] = np.nan
+    starts = np.where(codes == 0, 0, 150)
+    previous = pd.Series(values).groupby(codes).shift()
+    rolling = previous.groupby(codes).rolling(window, min_periods=max(2, window // 3))
+    expected = ((pd.Series(values) - rolling.mean().reset_index(level=0, drop=True))
+                / rolling.std().reset_index(level=0, drop=True)).to_numpy()
+    actual = _trailing_zscore(values, starts, window)
+    both = ~np.isnan(expected) & ~np.isnan(actual)
+
+    # 300 sessions for two tickers, then the same history with defects
+    sessions = trading_days(date(2023, 1, 3), date(2024, 6, 28))[:300]
+    frames = []
+    for symbol in ("MCD", "WEN"):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(sessions))))
+        frames.append(pd.DataFrame({
+            "date": [d.isoformat() for d in sessions], "symbol": symbol, "open": closes,
+            "high": closes * 1.01, "low": closes * 0.99, "close": closes,
+            "volume": np.round(1e6 * np.exp(rng.normal(0, 0.1, len(sessions)))),
+        }))
+    mcd, wen = frames
+    clean = validate_stock_frame(pd.concat(frames, ignore_index=True))
+
+    mcd = mcd.copy()
+    mcd.loc[100, "low"] = mcd.loc[100, "high"] + 1                 # Inconsistent OHLC
+    mcd.loc[200, ["close", "high"]] *= 3                            # Price spike
+    mcd = mcd.drop(index=150)                                       # Missing session
+    wen = wen.copy()
+    wen = pd.concat([wen.iloc[:51], wen.iloc[50:51], wen.iloc[51:]])  # Duplicate day
+    wen.iloc[[10, 11]] = wen.iloc[[11, 10]].to_numpy()              # Dates out of order
+    friday = next(i for i, d in enumerate(sessions) if i > 100 and d.weekday() == 4)
+    weekend = wen.iloc[friday + 1:friday + 2].assign(date=(sessions[friday] + timedelta(days=1)).isoformat())
+    wen = pd.concat([wen.iloc[:friday + 2], weekend, wen.iloc[friday + 2:]])  # Non-trading day
+    dirty = validate_stock_frame(pd.concat([mcd, wen], ignore_index=True))
+    spike = [d for d in dirty["anomaly_details"] if d["symbol"] == "MCD" and d["date"] == sessions[200].isoformat()]
+
+    checks = [
+        ("z-scores match pandas rolling stats", float(np.max(np.abs(actual[both] - expected[both]))) < 1e-9, True),
+        ("z-scores are undefined where pandas' are", (np.isnan(actual) == np.isnan(expected)).all(), True),
+        ("clean history is valid", clean["valid"], True),
+        ("clean history has no issues", sum(clean["issues"].values()), 0),
+        ("inconsistent OHLC is an error", dirty["issues"]["ohlc"], 1),
+        ("duplicate day is an error", dirty["issues"]["duplicate_dates"], 1),
+        ("out-of-order dates are an error", dirty["issues"]["non_monotonic_dates"], 1),
+        ("missing session is a gap", (dirty["issues"]["gaps"], dirty["missing_days"]), (1, 1)),
+        ("weekend row is flagged", dirty["issues"]["non_trading_days"], 1),
+        ("price spike is an outlier", bool(spike) and abs(spike[0].get("return_z", 0)) > 6, True),
+        ("errors invalidate the history", dirty["valid"], False),
+        ("per-ticker counts", {s: c["invalid"] for s, c in dirty["symbols"].items()}, {"MCD": 1, "WEN": 2}),
+    ]
+    for name, actual_value, expected_value in checks:
+        if actual_value == expected_value:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual_value} (expected {expected_value})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_market_calendar():
+    """Test the computed NYSE calendar against published schedules."""
+    print("\n" + "="*70)
+    print("TESTING MARKET CALENDAR")
+    print("="*70)
+
+    from datetime import date, datetime
+    from data_aggregation.pipelines.stocks.market_calendar import (
+        MARKET_TZ,
+        is_open,
+        last_close,
+        next_open,
+        nyse_early_closes,
+        nyse_holidays,
+    )
+
+    tests_passed = True
+
+    # NYSE published holidays for 2026 (July 4 falls on a Saturday)
+    published = {
+        date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3),
+        date(2026, 5, 25), date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7),
+        date(2026, 11, 26), date(2026, 12, 25),
+    }
+    if set(nyse_holidays(2026)) == published:
+        print("  ✓ 2026 holidays match the NYSE schedule")
+    else:
+        print(f"  ✗ 2026 holidays differ: {sorted(set(nyse_holidays(2026)) ^ published)}")
+        tests_passed = False
+
+    if set(nyse_early_closes(2024)) == {date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)}:
+        print("  ✓ 2024 early closes match the NYSE schedule")
+    else:
+        print(f"  ✗ 2024 early closes: {sorted(nyse_early_closes(2024))}")
+        tests_passed = False
+
+    def et(*args):
+        return datetime(*args, tzinfo=MARKET_TZ)
+
+    checks = [
+        ("open mid-session", is_open(et(2024, 11, 27, 12, 0)), True),
+        ("closed after an early close", is_open(et(2024, 11, 29, 13, 30)), False),
+        ("after-hours counts as extended", is_open(et(2024, 11, 29, 13, 30), extended=True), True),
+        ("closed on Thanksgiving", is_open(et(2024, 11, 28, 12, 0)), False),
+        ("next open skips the holiday", next_open(et(2024, 11, 27, 17, 0)), et(2024, 11, 29, 9, 30)),
+        ("last close honors the early close", last_close(et(2024, 11, 29, 15, 0)), et(2024, 11, 29, 13, 0)),
+    ]
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_live_ticker_fetcher():
+    """Test concurrent quote fetching against a mock Finnhub server."""
+    print("\n" + "="*70)
+    print("TESTING LIVE TICKER FETCHER")
+    print("="*70)
+
+    import asyncio
+    import json
+    import os
+    import tempfile
+    import threading
+    import time
+
+    from data_aggregation.pipelines.stocks.fetch_live_ticker import (
+        TokenBucket,
+        fetch_all_quotes_async,
+    )
+    from data_aggregation.pipelines.stocks.quote_cache import QuoteCache
+
+    tests_passed = True
+
+    # Token bucket: a burst of `capacity`, then `rate` per second
+    async def drain(count):
+        bucket = TokenBucket(rate=20, capacity=5)
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(drain(15))
+    if 0.45 <= elapsed < 1.0:
+        print(f"  ✓ TokenBucket paces requests ({elapsed:.2f}s for 15 tokens)")
+    else:
+        print(f"  ✗ TokenBucket took {elapsed:.2f}s for 15 tokens (expected ~0.5s)")
+        tests_passed = False
+
+    # A sweep bursts at most MAX_CONCURRENT_REQUESTS calls, then follows the
+    # quota: 14 symbols at 600 calls/minute take at least (14 - 8) / 10s
+    paced_server = _start_mock_finnhub()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.monotonic()
+        asyncio.run(fetch_all_quotes_async(
+            [f"T{i}" for i in range(14)],
+            base_url=f"http://127.0.0.1:{paced_server.server_address[1]}",
+            output_path=Path(tmp) / "live_ticker.json", calls_per_minute=600,
+            cache=QuoteCache(Path(tmp) / "quotes.sqlite3", ttl=60)))
+        elapsed = time.monotonic() - start
+    paced_server.shutdown()
+    if elapsed >= 0.55:
+        print(f"  ✓ Sweep paced by the per-minute quota ({elapsed:.2f}s for 14 calls)")
+    else:
+        print(f"  ✗ Sweep took {elapsed:.2f}s for 14 calls at 10/s (expected ~0.6s)")
+        tests_passed = False
+
+    # Partial snapshots are published before a slow symbol finishes
+    symbols = ["MCD", "YUM", "WEN", "DPZ", "SLOW"]
+    server = _start_mock_finnhub(slow_symbols={"SLOW"}, delay=1.5)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "live_ticker.json"
+        cache = QuoteCache(Path(tmp) / "quotes.sqlite3", ttl=60)
+        partial = {}
+
+        def watch():
+            deadline = time.monotonic() + 1.4
+            while time.monotonic() < deadline and not partial:
+                if output.exists():
+                    with open(output) as f:
+                        partial.update(json.load(f))
+                time.sleep(0.05)
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        quotes = asyncio.run(fetch_all_quotes_async(
+            symbols, base_url=base_url, output_path=output, snapshot_interval=0.2, cache=cache))
+        watcher.join()
+        server.shutdown()
+
+        # A second sweep is served from the cache without touching the API
+        fetches = cache.fetches
+        cached = asyncio.run(fetch_all_quotes_async(
+            symbols, base_url=base_url, output_path=output, cache=cache))
+        repeat_fetches = cache.fetches - fetches
+
+        # Concurrent callers single-flight a stale entry's refresh
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"c": 1.0}
+
+        threads = [threading.Thread(target=cache.get_or_fetch, args=("test", "X", slow_fetch))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if set(quotes) == set(symbols):
+        print(f"  ✓ Fetched all {len(quotes)} quotes from mock Finnhub")
+    else:
+        print(f"  ✗ Fetched {sorted(quotes)}, expected {sorted(symbols)}")
+        tests_passed = False
+
+    if partial.get("complete") is False and partial.get("count") == len(symbols) - 1:
+        print("  ✓ Partial snapshot published while a slow symbol was pending")
+    else:
+        print(f"  ✗ No partial snapshot before the slow symbol finished: {partial}")
+        tests_passed = False
+
+    if repeat_fetches == 0 and cached == quotes:
+        print("  ✓ Repeat sweep served from the quote cache")
+    else:
+        print(f"  ✗ Repeat sweep made {repeat_fetches} API calls")
+        tests_passed = False
+
+    if len(calls) == 1:
+        print("  ✓ Concurrent refreshes single-flighted")
+    else:
+        print(f"  ✗ {len(calls)} concurrent refreshes (expected 1)")
+        tests_passed = False
+
+    # A refresh lock held elsewhere (e.g. a hung process) is waited on only
+    # for lock_timeout, then the caller fetches anyway
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            stuck = QuoteCache(Path(tmp) / "quotes.sqlite3", ttl=60, lock_timeout=0.3)
+            stuck.lock_dir.mkdir(parents=True)
+            held = os.open(stuck.lock_dir / "test-HUNG.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(held, fcntl.LOCK_EX)
+            try:
+                start = time.monotonic()
+                data = stuck.get_or_fetch("test", "HUNG", lambda: {"c": 2.0})
+                waited = time.monotonic() - start
+            finally:
+                os.close(held)
+        if data == {"c": 2.0} and 0.3 <= waited < 1.5:
+            print(f"  ✓ Held refresh lock times out ({waited:.2f}s)")
+        else:
+            print(f"  ✗ Held refresh lock: got {data} after {waited:.2f}s (expected ~0.3s)")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_quote_stream():
+    """Test the streaming daemon against a mock Finnhub websocket."""
+    print("\n" + "="*70)
+    print("TESTING LIVE QUOTE STREAM")
+    print("="*70)
+
+    try:
+        import websockets
+    except ImportError:
+        print("  ⚠ websockets not installed, skipping")
+        return True
+
+    import asyncio
+    import json
+    import tempfile
+
+    from data_aggregation.pipelines.stocks.fetch_live_ticker import save_quotes
+    from data_aggregation.pipelines.stocks.intraday_bars import load_intraday
+    from data_aggregation.pipelines.stocks.quote_stream import run_daemon
+
+    connections = []
+
+    async def mock_finnhub(ws):
+        connections.append(ws)
+        for _ in range(2):
+            await ws.recv()  # subscribe messages
+        # Frames that aren't trade objects must be skipped, not end the daemon
+        for junk in ("[]", "null", "42", "not json", '{"type": "trade", "data": [null, 7]}'):
+            await ws.send(junk)
+        for i in range(10):
+            # One trade per minute, 2023-11-14 from 17:30 ET (1700001000 = 17:30)
+            await ws.send(json.dumps({"type": "trade",
+                                      "data": [{"s": "MCD", "p": 300.0 + i, "v": 100,
+                                                "t": (1700001000 + 60 * i) * 1000}]}))
+        if len(connections) == 1:
+            await ws.close()  # Drop the first connection to force a reconnect
+            return
+        await asyncio.Future()
+
+    async def run(output, intraday_root):
+        server = await websockets.serve(mock_finnhub, "127.0.0.1", 0)
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        market = {"open": True}
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(run_daemon(
+            ["MCD", "WEN"], url, output, snapshot_interval=0.1,
+            market_open=lambda: market["open"], seed=False, stop=stop,
+            intraday_root=intraday_root))
+
+        await asyncio.sleep(2.0)  # Long enough for one backoff and reconnect
+        market["open"] = False
+        await asyncio.sleep(0.3)
+        stop.set()
+        await asyncio.wait_for(daemon, timeout=5)
+        server.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "live_ticker.json"
+        save_quotes({"MCD": {"symbol": "MCD", "price": 290.0, "previousClose": 300.0},
+                     "WEN": {"symbol": "WEN", "price": 10.0, "previousClose": 10.0}},
+                    output, verbose=False)
+        asyncio.run(run(output, Path(tmp) / "intraday"))
+        with open(output) as f:
+            quote = json.load(f)["quotes"]["MCD"]
+        bars_1m = load_intraday("MCD", "2023-11-14", "1m", Path(tmp) / "intraday")
+        bars_5m = load_intraday("MCD", "2023-11-14", "5m", Path(tmp) / "intraday")
+
+    tests_passed = True
+    if len(connections) == 2:
+        print("  ✓ Reconnected after the stream dropped")
+    else:
+        print(f"  ✗ Expected 2 connections, got {len(connections)}")
+        tests_passed = False
+
+    if quote["price"] == 309.0 and quote["change"] == 9.0:
+        print("  ✓ Trades coalesced into the snapshot")
+    else:
+        print(f"  ✗ Unexpected snapshot quote: {quote}")
+        tests_passed = False
+
+    if quote.get("sparkline") == [304.0, 309.0]:
+        print("  ✓ Snapshot carries the 5-minute sparkline")
+    else:
+        print(f"  ✗ Unexpected sparkline: {quote.get('sparkline')}")
+        tests_passed = False
+
+    if len(bars_1m) == 10 and list(bars_5m["close"]) == [304.0, 309.0] and \
+            bars_5m["high"].iloc[1] == 309.0 and bars_5m["volume"].iloc[0] == 1000:
+        print("  ✓ Session bars flushed to the intraday store")
+    else:
+        print(f"  ✗ Unexpected flushed bars: {len(bars_1m)} 1m, 5m closes {list(bars_5m['close'])}")
+        tests_passed = False
+
+    # Connections that subscribe and then drop reconnect at the minimum
+    # backoff instead of doubling it every time
+    from data_aggregation.pipelines.stocks import quote_stream
+
+    attempts = []
+
+    async def flaky_finnhub(ws):
+        attempts.append(asyncio.get_running_loop().time())
+        for _ in range(2):
+            await ws.recv()
+        await ws.close()
+
+    async def run_flaky(output, intraday_root):
+        server = await websockets.serve(flaky_finnhub, "127.0.0.1", 0)
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(run_daemon(
+            ["MCD", "WEN"], url, output, snapshot_interval=0.1,
+            market_open=lambda: True, seed=False, stop=stop, intraday_root=intraday_root))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await asyncio.wait_for(daemon, timeout=5)
+        server.close()
+
+    backoff_min = quote_stream.BACKOFF_MIN
+    quote_stream.BACKOFF_MIN = 0.05
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            asyncio.run(run_flaky(Path(tmp) / "live_ticker.json", Path(tmp) / "intraday"))
+    finally:
+        quote_stream.BACKOFF_MIN = backoff_min
+
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    if len(gaps) >= 5 and max(gaps[3:]) < 0.2:
+        print(f"  ✓ Backoff reset after each subscribed connection ({len(attempts)} connections)")
+    else:
+        print(f"  ✗ Reconnect gaps kept growing: {[round(g, 2) for g in gaps]}")
+        tests_passed = False
+
+    return tests_passed
+
+
+def _start_mock_espn(slow_paths=(), delay=0.0):
+    """Serve ESPN-style scoreboards from a local HTTP server, tracking concurrency."""
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse
+
+    event = {
+        "id": "1", "date": "2026-10-18T23:00Z",
+        "status": {"type": {"state": "post", "completed": True, "detail": "Final"}},
+        "competitions": [{"competitors": [
+            {"homeAway": "home", "score": "23", "team": {"displayName": "Home"}},
+            {"homeAway": "away", "score": "9", "team": {"displayName": "Away"}},
+        ]}],
+    }
+    guard = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with guard:
+                server.in_flight += 1
+                server.peak = max(server.peak, server.in_flight)
+            try:
+                path = urlparse(self.path).path
+                if path in slow_paths:
+                    time.sleep(delay)
+                body = json.dumps({"events": [event], "week": {"number": 7}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                pass  # Client gave up (deadline)
+            finally:
+                with guard:
+                    server.in_flight -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.in_flight = server.peak = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_sports_polling():
+    """Test the sports daemon's poll schedule for each game state."""
+    print("\n" + "="*70)
+    print("TESTING SPORTS POLLING")
+    print("="*70)
+
+    from datetime import datetime, timezone
+    from data_aggregation.pipelines.sports.fetch_sports_data import (
+        POLL_IDLE,
+        POLL_LIVE,
+        POLL_SCHEDULED,
+        PREGAME_LEAD,
+        next_poll_delay,
+    )
+
+    tests_passed = True
+    now = datetime(2026, 10, 18, 18, 0, tzinfo=timezone.utc)
+
+    def game(start="2026-10-18T23:00Z", **state):
+        return {"date": start, "is_active": False, "is_final": False, **state}
+
+    checks = [
+        ("live game polls fast", [game(is_active=True), game()], POLL_LIVE),
+        ("scheduled games poll slowly", [game(is_final=True), game()], POLL_SCHEDULED),
+        ("wakes before the next start", [game("2026-10-18T18:10Z")], 10 * 60 - PREGAME_LEAD),
+        ("overdue start polls fast", [game("2026-10-18T17:55Z")], POLL_LIVE),
+        ("finished day idles", [game(is_final=True)], POLL_IDLE),
+        ("off-season idles", [], POLL_IDLE),
+    ]
+    for name, games, expected in checks:
+        actual = next_poll_delay({"games": games}, now)
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_sports_fetching():
+    """Test per-host request limits, the fetch deadline, late leagues and league files."""
+    print("\n" + "="*70)
+    print("TESTING SPORTS FETCHING")
+    print("="*70)
+
+    import json
+    import tempfile
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from data_aggregation.pipelines.sports import fetch_sports_data as sports
+
+    tests_passed = True
+    delay = 0.5
+    server = _start_mock_espn(slow_paths={"/slow", "/NHL"}, delay=delay)
+    base = f"http://127.0.0.1:{server.server_port}"
+    saved_urls = dict(sports.ESPN_URLS)
+    saved_limits = dict(sports.HOST_CONCURRENCY)
+    saved_files = dict(sports.LEAGUE_OUTPUT_FILES)
+
+    try:
+        # Per-host limit: 6 slow requests through 2 slots run in 3 waves
+        sports.HOST_CONCURRENCY["127.0.0.1"] = 2
+        sports._host_slots.pop("127.0.0.1", None)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            statuses = list(pool.map(lambda _: sports.http_get(f"{base}/slow").status_code, range(6)))
+        limited = time.monotonic() - started
+        limited_peak = server.peak
+
+        # Deadline: a passed deadline sends nothing; a near one cuts the wait short
+        sports._deadline = time.monotonic() - 1
+        try:
+            sports.http_get(f"{base}/fast")
+            before = "sent"
+        except sports.DeadlineExceeded:
+            before = "DeadlineExceeded"
+        sports._deadline = time.monotonic() + delay / 3
+        started = time.monotonic()
+        try:
+            sports.http_get(f"{base}/slow")
+            during = "completed"
+        except sports.DeadlineExceeded:
+            during = "DeadlineExceeded"
+        cut_short = time.monotonic() - started
+        sports._deadline = None
+
+        # fetch_all_leagues: NHL is too slow for the deadline, the rest publish as they finish
+        sports.HOST_CONCURRENCY["127.0.0.1"] = 6
+        sports._host_slots.pop("127.0.0.1", None)
+        sports.ESPN_URLS.update({league: f"{base}/{league}" for league, _ in sports.LEAGUES})
+        published = {}
+        started = time.monotonic()
+        results, late = sports.fetch_all_leagues(
+            deadline=delay * 0.6,
+            on_complete=lambda league, data: published.setdefault(league, time.monotonic() - started))
+        elapsed = time.monotonic() - started
+        previous = {"nhl": {"games": [{"id": "old"}]}}
+        sports.keep_previous_data(results, late, previous)
+        sports.keep_previous_data(results, ["MLS"], None)
+
+        # League files carry numeric scores (ESPN sends "23" and "9")
+        with tempfile.TemporaryDirectory() as tmp:
+            sports.LEAGUE_OUTPUT_FILES["nba"] = Path(tmp) / "current-games.json"
+            sports.save_league_data("NBA", results["NBA"])
+            with open(sports.LEAGUE_OUTPUT_FILES["nba"]) as f:
+                saved_game = json.load(f)["games"][0]
+    finally:
+        sports._deadline = None
+        sports.ESPN_URLS.clear()
+        sports.ESPN_URLS.update(saved_urls)
+        sports.HOST_CONCURRENCY.clear()
+        sports.HOST_CONCURRENCY.update(saved_limits)
+        sports.LEAGUE_OUTPUT_FILES.update(saved_files)
+        sports._host_slots.pop("127.0.0.1", None)
+        server.shutdown()
+
+    fast = [league for league, _ in sports.LEAGUES if league != "NHL"]
+    checks = [
+        ("all limited requests succeed", statuses, [200] * 6),
+        ("no more than 2 requests in flight", limited_peak, 2),
+        ("limited requests run in waves", limited >= delay * 3 * 0.9, True),
+        ("passed deadline raises before requesting", before, "DeadlineExceeded"),
+        ("near deadline raises DeadlineExceeded", during, "DeadlineExceeded"),
+        ("deadline cuts the request short", cut_short < delay * 0.8, True),
+        ("slow league is reported late", late, ["NHL"]),
+        ("other leagues publish", sorted(published), sorted(fast)),
+        ("other leagues publish before the deadline",
+         all(t < delay * 0.6 for t in published.values()), True),
+        ("fetch returns at the deadline", elapsed < delay, True),
+        ("finished league has its games", [g["id"] for g in results["NBA"]["games"]], ["1"]),
+        ("late league keeps its previous data", results["NHL"], {"games": [{"id": "old"}]}),
+        ("late league without previous data is empty", results["MLS"], {"games": []}),
+        ("league file scores are numbers", (saved_game["homeScore"], saved_game["awayScore"]), (23, 9)),
+    ]
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_highlight_cache():
+    """Test highlight caching, miss back-off and the quota ledger."""
+    print("\n" + "="*70)
+    print("TESTING HIGHLIGHT CACHE")
+    print("="*70)
+
+    import tempfile
+    from datetime import datetime, timedelta, timezone
+    from data_aggregation.pipelines.sports.highlight_cache import (
+        MISS_TTL,
+        SEARCH_COST,
+        SEARCH_WINDOW,
+        HighlightCache,
+    )
+
+    tests_passed = True
+    now = datetime(2026, 10, 18, 18, 0, tzinfo=timezone.utc)
+    start = now - timedelta(hours=4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "highlights.json"
+        cache = HighlightCache(path, daily_quota=1000)
+        cache.record("nba-1", "https://www.youtube.com/embed/x", start, now)
+        cache.record("nba-2", None, start, now)
+        cache.spend(SEARCH_COST, now)
+        cache.save()
+
+        cache = HighlightCache(path, daily_quota=1000)
+        cache.record("nba-2", None, start, now + MISS_TTL)
+        checks = [
+            ("hit survives a reload", cache.get("nba-1"), "https://www.youtube.com/embed/x"),
+            ("hit is not searched again", cache.due("nba-1", start, now), False),
+            ("unknown game is due", cache.due("nba-3", start, now), True),
+            ("second miss waits twice as long",
+             cache.due("nba-2", start, now + MISS_TTL * 2.9), False),
+            ("miss is retried after its back-off",
+             cache.due("nba-2", start, now + MISS_TTL * 3), True),
+            ("old games are not searched", cache.due("nba-3", now - SEARCH_WINDOW * 2, now), False),
+            ("ledger tracks today's spend", cache.remaining(now), 1000 - SEARCH_COST),
+            ("ledger resets the next day", cache.remaining(now + timedelta(days=1)), 1000),
+            ("seeding imports existing highlights",
+             cache.seed({"nfl": {"games": [{"id": "9", "date": "2026-10-12T17:00Z",
+                                            "video_url": "https://www.youtube.com/embed/y"}]}}), 1),
+        ]
+        cache.exhaust(now)
+        checks.append(("quota error exhausts the day", cache.remaining(now), 0))
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
+def test_championship_cache():
+    """Test championship windows and reuse of cached off-season results."""
+    print("\n" + "="*70)
+    print("TESTING CHAMPIONSHIP CACHE")
+    print("="*70)
+
+    import tempfile
+    from datetime import date, datetime
+    from data_aggregation.pipelines.sports.fetch_sports_data import (
+        championship_windows,
+        fetch_championship_games,
+        load_championship_cache,
+        save_championship_results,
+    )
+
+    tests_passed = True
+    now = datetime(2026, 10, 18, 12, 0)
+    unreachable = "http://127.0.0.1:9/nba"  # Any request here fails
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "championships.json"
+        save_championship_results("NBA", {
+            "windows": "20260601-20260625",
+            "seasonType": 4,
+            "games": [{"id": "401", "is_championship": True}],
+        }, path)
+
+        cached = fetch_championship_games("NBA", unreachable, season_type=4, now=now, cache_path=path)
+        refreshed = fetch_championship_games("NBA", unreachable, season_type=1, now=now, cache_path=path)
+
+        checks = [
+            ("window is this year's finals after they end",
+             championship_windows("NBA", now), [(date(2026, 6, 1), date(2026, 6, 25))]),
+            ("window is last year's finals before they start",
+             championship_windows("NBA", datetime(2026, 3, 1)), [(date(2025, 6, 1), date(2025, 6, 25))]),
+            ("same season type reuses the cache", [g["id"] for g in cached], ["401"]),
+            ("season type change refetches", refreshed, []),
+            ("failed refetch keeps the cached results",
+             load_championship_cache(path)["NBA"]["seasonType"], 4),
+        ]
+
+    for name, actual, expected in checks:
+        if actual == expected:
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✗ {name}: {actual} (expected {expected})")
+            tests_passed = False
+
+    return tests_passed
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*70)
@@ -298,6 +1618,21 @@ def main():
         "Ticker Synchronization": test_ticker_sync(),
         "Common Utilities": test_utilities(),
         "Data Quality": test_data_quality(),
+        "Census Warehouse": test_census_warehouse(),
+        "Transit Provenance": test_transit_provenance(),
+        "State Source Cache": test_state_source_cache(),
+        "Historical Store": test_historical_store(),
+        "Incremental Indicators": test_incremental_indicators(),
+        "Incremental Analytics": test_incremental_analytics(),
+        "Chart Shards": test_chart_shards(),
+        "Stock Frame Validation": test_stock_frame_validation(),
+        "Market Calendar": test_market_calendar(),
+        "Live Ticker Fetcher": test_live_ticker_fetcher(),
+        "Live Quote Stream": test_quote_stream(),
+        "Sports Polling": test_sports_polling(),
+        "Sports Fetching": test_sports_fetching(),
+        "Highlight Cache": test_highlight_cache(),
+        "Championship Cache": test_championship_cache(),
     }
 
     # Print summary
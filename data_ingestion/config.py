@@ -95,6 +95,10 @@ MAX_STOCK_PRICE = 100000.00
 # Minimum historical data (days)
 MIN_HISTORICAL_RECORDS = 252  # 1 trading year
 
+# Outlier detection (rolling z-score of daily log returns and log volume)
+OUTLIER_WINDOW = 63  # ~1 trading quarter
+OUTLIER_Z_THRESHOLD = 6.0
+
 # Date range for historical data
 START_DATE = "2015-01-01"
 END_DATE = None  # None means current date
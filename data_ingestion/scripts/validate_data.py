@@ -15,6 +15,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
+import pandas as pd
+
 from data_ingestion.config import (
     LOCATIONS_OUTPUT_DIR,
     STOCKS_OUTPUT_DIR,
@@ -24,7 +26,7 @@ from data_ingestion.config import (
 from data_ingestion.utils.logging import setup_logger
 from data_ingestion.utils.validators import (
     validate_locations_batch,
-    validate_stock_data
+    validate_stock_frame
 )
 from data_ingestion.utils.storage import load_json
 
@@ -120,7 +122,8 @@ class DataValidator:
             self.logger.warning(f"Stock directory not found: {STOCKS_OUTPUT_DIR}")
             return summary
 
-        # Find all stock files
+        # Load every stock file into one frame, one series per file
+        frames = []
         for json_file in STOCKS_OUTPUT_DIR.glob("*.json"):
             try:
                 data = load_json(json_file)
@@ -133,25 +136,44 @@ class DataValidator:
                     self.logger.warning(f"Invalid format in {json_file.name}")
                     continue
 
-                # Validate
-                result = validate_stock_data(records)
+                frame = pd.DataFrame.from_records(records)
+                frame["symbol"] = json_file.name
+                frames.append(frame)
 
-                summary["file_count"] += 1
-                summary["total_records"] += result.get("total", 0)
-                summary["valid_records"] += result.get("valid_records", 0)
-                summary["invalid_records"] += result.get("invalid_records", 0)
+            except Exception as e:
+                self.logger.error(f"Failed to load {json_file.name}: {e}")
 
-                summary["files"][json_file.name] = {
-                    "total": result.get("total", 0),
-                    "valid": result.get("valid_records", 0),
-                    "invalid": result.get("invalid_records", 0),
-                    "valid": result.get("valid", False)
-                }
+        if not frames:
+            return summary
 
-                self.logger.info(f"Validated {json_file.name}: {result.get('valid_records', 0)}/{result.get('total', 0)} valid")
+        # Validate all files in one vectorized pass
+        result = validate_stock_frame(pd.concat(frames, ignore_index=True))
+        summary["file_count"] = len(frames)
+        if "reason" in result:
+            self.logger.error(f"Stock validation failed: {result['reason']}")
+            summary["total_records"] = result["record_count"]
+            summary["invalid_records"] = result["record_count"]
+            return summary
 
-            except Exception as e:
-                self.logger.error(f"Failed to validate {json_file.name}: {e}")
+        summary["total_records"] = result["total"]
+        summary["valid_records"] = result["valid_records"]
+        summary["invalid_records"] = result["invalid_records"]
+        summary["anomalous_records"] = result["anomalous_records"]
+        summary["issues"] = result["issues"]
+        summary["error_details"] = result["error_details"]
+        summary["anomaly_details"] = result["anomaly_details"]
+
+        for file_name, counts in result["symbols"].items():
+            summary["files"][file_name] = {
+                "total": counts["total"],
+                "invalid": counts["invalid"],
+                "anomalies": counts["anomalies"],
+                "valid": counts["invalid"] == 0 and file_name not in result["insufficient_history"]
+            }
+            self.logger.info(
+                f"Validated {file_name}: {counts['total'] - counts['invalid']}/{counts['total']} valid, "
+                f"{counts['anomalies']} anomalies"
+            )
 
         return summary
 
@@ -265,6 +287,10 @@ class DataValidator:
                 print(f"  Total Records: {result['total_records']}")
                 print(f"  Valid: {result['valid_records']}")
                 print(f"  Invalid: {result['invalid_records']}")
+                print(f"  Anomalies: {result.get('anomalous_records', 0)}")
+                for issue, count in result.get("issues", {}).items():
+                    if count:
+                        print(f"    {issue}: {count}")
 
             elif data_type == "sports":
                 print(f"  Files: {result['file_count']}")
@@ -1,10 +1,16 @@
 """FranchiseIQ Data Ingestion Utilities Package"""
 
 from .logging import setup_logger
-from .validators import validate_location, validate_stock, validate_schema
+from .validators import (
+    validate_location,
+    validate_stock_record,
+    validate_stock_data,
+    validate_stock_frame,
+    validate_schema
+)
 from .formatters import (
     format_location,
-    format_stock,
+    format_stock_record,
     normalize_phone,
     parse_address
 )
@@ -13,10 +19,12 @@ from .storage import save_json, load_json, save_csv, load_csv
 __all__ = [
     "setup_logger",
     "validate_location",
-    "validate_stock",
+    "validate_stock_record",
+    "validate_stock_data",
+    "validate_stock_frame",
     "validate_schema",
     "format_location",
-    "format_stock",
+    "format_stock_record",
     "normalize_phone",
     "parse_address",
     "save_json",
@@ -8,15 +8,24 @@ import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
 try:
     import jsonschema
 except ImportError:
     jsonschema = None
 
+try:
+    from data_aggregation.pipelines.stocks.market_calendar import trading_days
+except ImportError:
+    trading_days = None
+
 from ..config import (
     MIN_LATITUDE, MAX_LATITUDE, MIN_LONGITUDE, MAX_LONGITUDE,
     VALID_US_STATES, VALID_CANADIAN_PROVINCES, VALID_COUNTRIES,
-    MIN_STOCK_PRICE, MAX_STOCK_PRICE, MIN_HISTORICAL_RECORDS
+    MIN_STOCK_PRICE, MAX_STOCK_PRICE, MIN_HISTORICAL_RECORDS,
+    OUTLIER_WINDOW, OUTLIER_Z_THRESHOLD
 )
 
 
@@ -263,6 +272,194 @@ def validate_stock_data(data: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
+def _trailing_zscore(values: np.ndarray, starts: np.ndarray, window: int) -> np.ndarray:
+    """Z-score of each value against the previous `window` values of its ticker.
+
+    Args:
+        values: Values sorted by ticker, then date (NaNs are skipped)
+        starts: Index of the first row of each row's ticker
+        window: Trailing window length
+
+    Returns:
+        Z-scores (NaN where the window holds too few values)
+    """
+    n = len(values)
+    present = ~np.isnan(values)
+    if not present.any():
+        return np.full(n, np.nan)
+
+    # Rolling sums as differences of running sums (centered for precision)
+    centered = np.where(present, values - np.nanmean(values), 0.0)
+    sums = np.concatenate([[0.0], np.cumsum(centered)])
+    squares = np.concatenate([[0.0], np.cumsum(centered ** 2)])
+    counts = np.concatenate([[0], np.cumsum(present)])
+
+    rows = np.arange(n)
+    lo = np.maximum(starts, rows - window)
+    count = counts[rows] - counts[lo]
+    total = sums[rows] - sums[lo]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        var = (squares[rows] - squares[lo] - total * mean) / (count - 1)
+        z = (centered - mean) / np.sqrt(np.maximum(var, 0.0))
+
+    enough = present & (count >= max(2, window // 3)) & (var > 1e-12)
+    return np.where(enough, z, np.nan)
+
+
+def validate_stock_frame(
+    df: pd.DataFrame,
+    window: int = OUTLIER_WINDOW,
+    z_threshold: float = OUTLIER_Z_THRESHOLD
+) -> Dict[str, Any]:
+    """Validate OHLCV history for any number of tickers in one vectorized pass.
+
+    Columnar counterpart of validate_stock_data. Errors make a row invalid:
+    missing values, prices out of range, inconsistent OHLC, negative volume,
+    dates that go backwards or repeat within a ticker. Anomalies are
+    reported but don't invalidate a row: gaps against the NYSE calendar,
+    rows on non-trading days, and daily returns or volumes more than
+    z_threshold standard deviations from the ticker's trailing window.
+
+    Args:
+        df: Rows with date, open, high, low, close, volume and (for more
+            than one ticker) symbol columns, in file order
+        window: Trailing window (rows) for the outlier z-scores
+        z_threshold: Absolute z-score above which a row is an outlier
+
+    Returns:
+        Dictionary with validation summary, per-ticker counts and the
+        first 10 errors and anomalies
+    """
+    missing_columns = [c for c in ["date", "open", "high", "low", "close", "volume"] if c not in df]
+    if missing_columns:
+        return {
+            "valid": False,
+            "reason": f"Missing required columns: {', '.join(missing_columns)}",
+            "record_count": len(df)
+        }
+
+    n = len(df)
+    symbols = df["symbol"].astype(str).to_numpy() if "symbol" in df else np.full(n, "")
+    codes, names = pd.factorize(symbols)
+    dates = pd.to_datetime(df["date"], errors="coerce", utc=True).dt.tz_localize(None)
+    days = dates.to_numpy().astype("datetime64[D]")
+    open_p, high, low, close = (
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64")
+        for c in ["open", "high", "low", "close"]
+    )
+    volume = pd.to_numeric(df["volume"], errors="coerce").to_numpy(dtype="float64")
+    prices = np.vstack([open_p, high, low, close])
+
+    # ---- Row errors (file order) ----
+    errors = {
+        "missing_values": np.isnat(days) | np.isnan(prices).any(axis=0) | np.isnan(volume),
+        "price_range": ((prices < MIN_STOCK_PRICE) | (prices > MAX_STOCK_PRICE)).any(axis=0),
+        "ohlc": (low > high) | (open_p < low) | (open_p > high) | (close < low) | (close > high),
+        "negative_volume": volume < 0,
+    }
+    same_as_previous = np.zeros(n, dtype=bool)
+    same_as_previous[1:] = codes[1:] == codes[:-1]
+    backwards = np.zeros(n, dtype=bool)
+    backwards[1:] = days[1:] < days[:-1]
+    errors["non_monotonic_dates"] = same_as_previous & backwards
+
+    # ---- Per-ticker series (sorted by ticker, then date) ----
+    order = np.lexsort((days, codes))
+    sorted_codes = codes[order]
+    sorted_days = days[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+
+    duplicates = np.zeros(n, dtype=bool)
+    duplicates[1:] = ~first[1:] & (sorted_days[1:] == sorted_days[:-1])
+    errors["duplicate_dates"] = np.zeros(n, dtype=bool)
+    errors["duplicate_dates"][order] = duplicates
+
+    anomalies = {}
+    missing_days = np.zeros(n, dtype="int64")
+    dated = ~np.isnat(sorted_days)
+    if trading_days is not None and dated.any():
+        lo_day, hi_day = sorted_days[dated].min(), sorted_days[dated].max()
+        calendar = np.array(trading_days(lo_day.astype(object), hi_day.astype(object)),
+                            dtype="datetime64[D]")
+        left = np.searchsorted(calendar, sorted_days, side="left")
+        right = np.searchsorted(calendar, sorted_days, side="right")
+        on_calendar = dated & (right > left)
+        between = np.zeros(n, dtype="int64")
+        between[1:] = left[1:] - right[:-1]
+        gap_rows = ~first & dated & (between > 0)
+        gap_rows[1:] &= dated[:-1]
+        missing_days[order] = np.where(gap_rows, between, 0)
+        anomalies["gaps"] = missing_days > 0
+        anomalies["non_trading_days"] = np.zeros(n, dtype=bool)
+        anomalies["non_trading_days"][order] = dated & ~on_calendar
+
+    sorted_close = np.where(close[order] > 0, close[order], np.nan)
+    returns = np.full(n, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = np.log(sorted_close[1:] / sorted_close[:-1])
+        log_volume = np.log1p(np.where(volume[order] >= 0, volume[order], np.nan))
+    returns[first] = np.nan
+
+    price_z = np.zeros(n)
+    volume_z = np.zeros(n)
+    price_z[order] = _trailing_zscore(returns, starts, window)
+    volume_z[order] = _trailing_zscore(log_volume, starts, window)
+    with np.errstate(invalid="ignore"):
+        anomalies["price_outliers"] = np.abs(price_z) > z_threshold
+        anomalies["volume_outliers"] = np.abs(volume_z) > z_threshold
+
+    # ---- Summary ----
+    invalid = np.logical_or.reduce(list(errors.values()))
+    anomalous = np.logical_or.reduce(list(anomalies.values()))
+    row_counts = np.bincount(codes, minlength=len(names))
+    invalid_counts = np.bincount(codes, weights=invalid, minlength=len(names))
+    anomaly_counts = np.bincount(codes, weights=anomalous, minlength=len(names))
+    short = [str(name) for name, count in zip(names, row_counts) if count < MIN_HISTORICAL_RECORDS]
+
+    def details(rows: np.ndarray, checks: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        out = []
+        for i in np.flatnonzero(rows)[:10]:
+            entry = {
+                "record": int(i),
+                "symbol": str(symbols[i]),
+                "date": str(days[i]),
+                "errors": [name for name, mask in checks.items() if mask[i]]
+            }
+            if missing_days[i]:
+                entry["missing_days"] = int(missing_days[i])
+            for key, z in (("return_z", price_z[i]), ("volume_z", volume_z[i])):
+                if np.abs(z) > z_threshold:
+                    entry[key] = round(float(z), 1)
+            out.append(entry)
+        return out
+
+    invalid_count = int(invalid.sum())
+    return {
+        "valid": invalid_count == 0 and not short,
+        "total": n,
+        "valid_records": n - invalid_count,
+        "invalid_records": invalid_count,
+        "anomalous_records": int(anomalous.sum()),
+        "missing_days": int(missing_days.sum()),
+        "issues": {name: int(mask.sum()) for name, mask in {**errors, **anomalies}.items()},
+        "insufficient_history": short,
+        "symbols": {
+            str(name): {
+                "total": int(row_counts[k]),
+                "invalid": int(invalid_counts[k]),
+                "anomalies": int(anomaly_counts[k])
+            }
+            for k, name in enumerate(names)
+        },
+        "error_details": details(invalid, errors),
+        "anomaly_details": details(anomalous, anomalies)
+    }
+
+
 # ============================================================================
 # SPORTS DATA VALIDATION
 # ============================================================================
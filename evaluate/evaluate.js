@@ -223,16 +223,34 @@ class EvaluationPage {
         console.warn(`Could not load live stock data:`, e);
       }
 
-      // Load historical stock data for YTD calculation
+      // Load precomputed trend indicators (trailing year of closes, metrics, forecast)
+      this.trendIndicators = null;
       try {
-        const csvResponse = await fetch('../data/franchise_stocks.csv');
-        if (csvResponse.ok) {
-          const csvText = await csvResponse.text();
-          this.historicalStockData = this.parseStockCSV(csvText, brandTicker);
-          console.log(`Loaded historical data for ${brandTicker}:`, this.historicalStockData.length, 'records');
+        const indicatorResponse = await fetch(`../data/stocks/indicators/${brandTicker}.json`);
+        if (indicatorResponse.ok) {
+          this.trendIndicators = await indicatorResponse.json();
+          this.historicalStockData = this.trendIndicators.dates.map((date, i) => ({
+            ticker: brandTicker,
+            date: date,
+            close: this.trendIndicators.close[i]
+          }));
         }
       } catch (e) {
-        console.warn(`Could not load historical stock data:`, e);
+        console.warn(`Could not load trend indicators for ${brandTicker}:`, e);
+      }
+
+      // Fall back to the full CSV for YTD calculation and client-side trends
+      if (!this.trendIndicators) {
+        try {
+          const csvResponse = await fetch('../data/franchise_stocks.csv');
+          if (csvResponse.ok) {
+            const csvText = await csvResponse.text();
+            this.historicalStockData = this.parseStockCSV(csvText, brandTicker);
+            console.log(`Loaded historical data for ${brandTicker}:`, this.historicalStockData.length, 'records');
+          }
+        } catch (e) {
+          console.warn(`Could not load historical stock data:`, e);
+        }
       }
 
       // Update brand header
@@ -639,7 +657,7 @@ class EvaluationPage {
         if (existingTrends) existingTrends.remove();
 
         // Initialize trends display
-        TrendsAnalysis.initializeTrends(tabElement, this.historicalStockData);
+        TrendsAnalysis.initializeTrends(tabElement, this.historicalStockData, this.trendIndicators);
       }
     }
   }
@@ -385,13 +385,17 @@ const TrendsAnalysis = (() => {
 
   /**
    * Initialize trends display in Overview tab
+   * Uses precomputed indicators (data/stocks/indicators/<TICKER>.json) when
+   * available, otherwise computes metrics and forecast from historicalData
    */
-  function initializeTrends(tabElement, historicalData) {
+  function initializeTrends(tabElement, historicalData, indicators = null) {
     if (!tabElement || !historicalData || historicalData.length === 0) return;
 
     // Calculate metrics
-    const metrics = calculateTrendMetrics(historicalData);
-    const forecast = generateForecast(historicalData, 30);
+    const metrics = indicators ? indicators.metrics : calculateTrendMetrics(historicalData);
+    const forecast = indicators
+      ? indicators.forecast.map((price, i) => ({ period: i + 1, price: price }))
+      : generateForecast(historicalData, 30);
 
     // Create trends section
     const trendsSection = document.createElement('div');
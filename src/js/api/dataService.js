@@ -209,8 +209,8 @@ const DataService = {
    */
   async getSportsData(sport) {
     const endpoints = {
-      football: 'data/football/current-week.json',
-      basketball: 'data/basketball/games.json'
+      football: 'data/sports/football/current-week.json',
+      basketball: 'data/sports/basketball/current-games.json'
     };
 
     return this.fetchJSON(endpoints[sport] || endpoints.football, {
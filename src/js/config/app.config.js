@@ -17,8 +17,8 @@ const APP_CONFIG = {
     liveTickerData: 'data/live_ticker.json',
     franchiseStocksCSV: 'data/franchise_stocks.csv',
     franchiseNews: 'FranchiseNews/data/franchise_news.json',
-    footballData: 'data/football/current-week.json',
-    basketballData: 'data/basketball/',
+    footballData: 'data/sports/football/current-week.json',
+    basketballData: 'data/sports/basketball/',
 
     // External APIs
     corsProxy: 'https://api.allorigins.win/raw?url=',
@@ -1,6 +1,7 @@
 /**
- * Index Market Widget - S&P 500 Chart
- * Uses Lightweight-Charts (TradingView OSS) and Stooq for data
+ * Index Market Widget - S&P 500 / Franchise Composite Chart
+ * Uses Lightweight-Charts (TradingView OSS), Stooq for the S&P 500 and the
+ * precomputed franchise composite (data/stocks/analytics/composite.json)
  */
 
 (function() {
@@ -12,6 +13,7 @@
         symbolName: 'S&P 500',
         corsProxy: 'https://api.allorigins.win/raw?url=',
         stooqBaseUrl: 'https://stooq.com/q/d/l/',
+        compositeUrl: '../../data/stocks/analytics/composite.json',
         defaultRange: '1Y',
         chartColors: {
             upColor: '#22c55e',
@@ -25,17 +27,28 @@
         }
     };
 
+    // Selectable indexes: the S&P 500 or a franchise composite series
+    const INDEXES = {
+        spx: { name: CONFIG.symbolName, label: 'Index' },
+        equal: { name: 'Franchise Composite', label: 'Equal-Weighted' },
+        cap: { name: 'Franchise Composite', label: 'Cap-Weighted' }
+    };
+
     // State
     let chart = null;
     let mainSeries = null;
     let volumeSeries = null;
     let currentChartType = 'line';
     let currentRange = CONFIG.defaultRange;
+    let currentIndex = 'spx';
     let cachedData = {};
+    let compositeData = null;
 
     // DOM Elements
     const elements = {
         chartContainer: null,
+        symbolName: null,
+        symbolLabel: null,
         currentPrice: null,
         priceChange: null,
         tooltip: null,
@@ -70,6 +83,8 @@
      */
     function cacheElements() {
         elements.chartContainer = document.getElementById('chart-container');
+        elements.symbolName = document.querySelector('.symbol-name');
+        elements.symbolLabel = document.querySelector('.symbol-label');
         elements.currentPrice = document.getElementById('current-price');
         elements.priceChange = document.getElementById('price-change');
         elements.tooltip = document.getElementById('chart-tooltip');
@@ -196,12 +211,42 @@
                     currentChartType = type;
                     createMainSeries();
                     // Re-apply cached data if available
-                    if (cachedData[currentRange]) {
-                        applyDataToChart(cachedData[currentRange]);
+                    const key = cacheKey(currentRange);
+                    if (cachedData[key]) {
+                        applyDataToChart(cachedData[key]);
                     }
                 }
             });
         });
+
+        // Index selector buttons
+        document.querySelectorAll('.index-btn').forEach(btn => {
+            btn.addEventListener('click', () => {
+                const index = btn.dataset.index;
+                if (index !== currentIndex && INDEXES[index]) {
+                    document.querySelectorAll('.index-btn').forEach(b => b.classList.remove('active'));
+                    btn.classList.add('active');
+                    currentIndex = index;
+                    updateIndexHeader();
+                    loadData(currentRange);
+                }
+            });
+        });
+    }
+
+    /**
+     * Update the header for the selected index
+     */
+    function updateIndexHeader() {
+        if (elements.symbolName) elements.symbolName.textContent = INDEXES[currentIndex].name;
+        if (elements.symbolLabel) elements.symbolLabel.textContent = INDEXES[currentIndex].label;
+    }
+
+    /**
+     * Cache key for the selected index and a range
+     */
+    function cacheKey(range) {
+        return `${currentIndex}:${range}`;
     }
 
     /**
@@ -225,15 +270,16 @@
     }
 
     /**
-     * Load data from Stooq
+     * Load data for the selected index (Stooq or the franchise composite)
      */
     async function loadData(range) {
         showLoading(true);
         hideError();
 
         // Check cache first
-        if (cachedData[range]) {
-            applyDataToChart(cachedData[range]);
+        const key = cacheKey(range);
+        if (cachedData[key]) {
+            applyDataToChart(cachedData[key]);
             showLoading(false);
             return;
         }
@@ -242,21 +288,26 @@
             const rangeConfig = TIME_RANGES[range];
             const { startDate, endDate } = getDateRange(rangeConfig);
 
-            const url = buildStooqUrl(startDate, endDate, rangeConfig.interval);
-            const proxyUrl = CONFIG.corsProxy + encodeURIComponent(url);
+            let data;
+            if (currentIndex === 'spx') {
+                const url = buildStooqUrl(startDate, endDate, rangeConfig.interval);
+                const proxyUrl = CONFIG.corsProxy + encodeURIComponent(url);
 
-            const response = await fetch(proxyUrl);
-            if (!response.ok) throw new Error('Failed to fetch data');
+                const response = await fetch(proxyUrl);
+                if (!response.ok) throw new Error('Failed to fetch data');
 
-            const csvText = await response.text();
-            const data = parseStooqCSV(csvText);
+                const csvText = await response.text();
+                data = parseStooqCSV(csvText);
+            } else {
+                data = await loadCompositeData(currentIndex, startDate);
+            }
 
             if (data.length === 0) {
                 throw new Error('No data available');
             }
 
             // Cache the data
-            cachedData[range] = data;
+            cachedData[key] = data;
 
             applyDataToChart(data);
             showLoading(false);
@@ -267,6 +318,29 @@
         }
     }
 
+    /**
+     * Load a franchise composite series (fetched once, sliced per range)
+     */
+    async function loadCompositeData(weighting, startDate) {
+        if (!compositeData) {
+            const response = await fetch(CONFIG.compositeUrl);
+            if (!response.ok) throw new Error('Failed to fetch composite index');
+            compositeData = await response.json();
+        }
+
+        const start = startDate.toISOString().slice(0, 10);
+        const values = compositeData[weighting] || [];
+        const data = [];
+
+        compositeData.t.forEach((date, i) => {
+            const value = values[i];
+            if (date < start || value == null) return;
+            data.push({ time: date, open: value, high: value, low: value, close: value, volume: 0 });
+        });
+
+        return data;
+    }
+
     /**
      * Build Stooq URL
      */